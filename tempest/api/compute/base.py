@@ -19,6 +19,7 @@ from oslo_log import log as logging
 from tempest_lib import exceptions as lib_exc
 
 from tempest.common import compute
+from tempest.common import shared_fixtures
 from tempest.common.utils import data_utils
 from tempest.common import waiters
 from tempest import config
@@ -30,6 +31,62 @@ CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
+def _create_shared_server(cls):
+    body, servers = compute.create_test_server(
+        cls.os, False, tenant_network=cls.get_tenant_network(),
+        name=data_utils.rand_name('tempest-shared-server'),
+        wait_until='ACTIVE')
+    return cls.os.servers_client.show_server(body['id'])
+
+
+def _delete_shared_server(cls, server):
+    cls.os.servers_client.delete_server(server['id'])
+    cls.os.servers_client.wait_for_server_termination(server['id'])
+
+
+def _create_shared_image(cls):
+    images_client = cls.os.images_client
+    server = shared_fixtures.acquire('server', cls)
+    try:
+        image = images_client.create_image(
+            server['id'], name=data_utils.rand_name('tempest-shared-image'))
+        image_id = data_utils.parse_image_id(image.response['location'])
+        waiters.wait_for_image_status(images_client, image_id, 'ACTIVE')
+        return images_client.show_image(image_id)
+    except Exception:
+        shared_fixtures.release('server', cls)
+        raise
+
+
+def _delete_shared_image(cls, image):
+    try:
+        cls.os.images_client.delete_image(image['id'])
+        cls.os.images_client.wait_for_resource_deletion(image['id'])
+    finally:
+        shared_fixtures.release('server', cls)
+
+
+def _create_shared_security_group(cls):
+    return cls.os.security_groups_client.create_security_group(
+        name=data_utils.rand_name('tempest-shared-securitygroup'),
+        description=data_utils.rand_name('description'))
+
+
+def _delete_shared_security_group(cls, security_group):
+    client = cls.os.security_groups_client
+    client.delete_security_group(security_group['id'])
+    client.wait_for_resource_deletion(security_group['id'])
+
+
+# An ACTIVE server, a snapshot of it and a security group, see
+# tempest.common.shared_fixtures
+shared_fixtures.register('server', _create_shared_server,
+                         _delete_shared_server)
+shared_fixtures.register('image', _create_shared_image, _delete_shared_image)
+shared_fixtures.register('security_group', _create_shared_security_group,
+                         _delete_shared_security_group)
+
+
 class BaseComputeTest(tempest.test.BaseTestCase):
     """Base test case class for all Compute API tests."""
 
@@ -21,22 +21,15 @@ from tempest import test
 
 class ServerAddressesTestJSON(base.BaseV2ComputeTest):
 
-    @classmethod
-    def setup_credentials(cls):
-        # This test module might use a network and a subnet
-        cls.set_network_resources(network=True, subnet=True)
-        super(ServerAddressesTestJSON, cls).setup_credentials()
-
-    @classmethod
-    def setup_clients(cls):
-        super(ServerAddressesTestJSON, cls).setup_clients()
-        cls.client = cls.servers_client
+    shared_fixtures = ['server']
 
     @classmethod
     def resource_setup(cls):
         super(ServerAddressesTestJSON, cls).resource_setup()
 
-        cls.server = cls.create_test_server(wait_until='ACTIVE')
+        cls.server = cls.shared['server']
+        # The shared server may belong to another tenant than the class
+        cls.client = cls.shared_os.servers_client
 
     @test.attr(type='smoke')
     @test.idempotent_id('6eb718c0-02d9-4d5e-acd1-4e0c269cef39')
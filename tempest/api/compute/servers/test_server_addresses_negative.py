@@ -21,20 +21,14 @@ from tempest import test
 
 class ServerAddressesNegativeTestJSON(base.BaseV2ComputeTest):
 
-    @classmethod
-    def setup_credentials(cls):
-        cls.set_network_resources(network=True, subnet=True)
-        super(ServerAddressesNegativeTestJSON, cls).setup_credentials()
-
-    @classmethod
-    def setup_clients(cls):
-        super(ServerAddressesNegativeTestJSON, cls).setup_clients()
-        cls.client = cls.servers_client
+    shared_fixtures = ['server']
 
     @classmethod
     def resource_setup(cls):
         super(ServerAddressesNegativeTestJSON, cls).resource_setup()
-        cls.server = cls.create_test_server(wait_until='ACTIVE')
+        cls.server = cls.shared['server']
+        # The shared server may belong to another tenant than the class
+        cls.client = cls.shared_os.servers_client
 
     @test.attr(type=['negative'])
     @test.idempotent_id('02c3f645-2d2e-4417-8525-68c0407d001b')
@@ -78,8 +78,10 @@ class BaseObjectTest(tempest.test.BaseTestCase):
             object_client = cls.object_client
         for cont in containers:
             try:
-                objlist = container_client.list_all_container_objects(cont)
-                # delete every object in the container
+                objlist = container_client.iter_container_objects(
+                    cont, prefetch=True)
+                # delete every object in the container, while the next
+                # page of the listing is requested
                 for obj in objlist:
                     try:
                         object_client.delete_object(cont, obj['name'])
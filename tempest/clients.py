@@ -19,8 +19,10 @@ from oslo_log import log as logging
 from tempest_lib.services.identity.v2.token_client import TokenClientJSON
 from tempest_lib.services.identity.v3.token_client import V3TokenClientJSON
 
+from tempest.common import connection_pool
 from tempest.common import cred_provider
 from tempest.common import negative_rest_client
+from tempest.common import service_client
 from tempest import config
 from tempest import exceptions
 from tempest import manager
@@ -153,6 +155,9 @@ class Manager(manager.Manager):
 
     """
     Top level manager for OpenStack tempest clients
+
+    Service clients are built lazily, the first time the corresponding
+    attribute is accessed, and are then cached on the manager.
     """
 
     default_params = {
@@ -172,20 +177,96 @@ class Manager(manager.Manager):
 
     def __init__(self, credentials=None, service=None):
         super(Manager, self).__init__(credentials=credentials)
+        self.service = service
+
+        self._set_compute_params()
+        self._set_identity_params()
+        self._set_volume_params()
+        self._set_object_storage_params()
+        self._set_connection_pool()
+
+    def _set_connection_pool(self):
+        pool_mode = CONF.identity.http_connection_pool
+        max_size = CONF.identity.http_pool_max_size
+        idle_timeout = CONF.identity.http_pool_idle_timeout
+        # NOTE: the pool shared by the process outlives the managers
+        self._owns_connection_pool = pool_mode == 'manager'
+        if pool_mode == 'manager':
+            self.connection_pool = connection_pool.ConnectionPool(
+                max_size, idle_timeout)
+        elif pool_mode == 'process':
+            self.connection_pool = connection_pool.get_shared_pool(
+                max_size, idle_timeout)
+        else:
+            self.connection_pool = None
 
-        self._set_compute_clients()
-        self._set_database_clients()
-        self._set_identity_clients()
-        self._set_volume_clients()
-        self._set_object_storage_clients()
+    def close(self):
+        """Closes the idle connections of the pool of the manager"""
+        if self._owns_connection_pool:
+            self.connection_pool.close()
 
-        self.baremetal_client = BaremetalClient(
+    def _setup_client(self, client):
+        if (self.connection_pool is not None and
+                isinstance(client, service_client.ServiceClient)):
+            client.use_connection_pool(self.connection_pool)
+
+    def _set_compute_params(self):
+        self.compute_params = {
+            'service': CONF.compute.catalog_type,
+            'region': CONF.compute.region or CONF.identity.region,
+            'endpoint_type': CONF.compute.endpoint_type,
+            'build_interval': CONF.compute.build_interval,
+            'build_timeout': CONF.compute.build_timeout
+        }
+        self.compute_params.update(self.default_params)
+
+    def _set_identity_params(self):
+        self.identity_params = {
+            'service': CONF.identity.catalog_type,
+            'region': CONF.identity.region
+        }
+        self.identity_params.update(self.default_params_with_timeout_values)
+        # Token clients do not use the catalog. They read auth_url, so they
+        # are only available if the corresponding API version is marked as
+        # enabled. Configuration errors are still reported at init time.
+        if CONF.identity_feature_enabled.api_v2 and not CONF.identity.uri:
+            msg = 'Identity v2 API enabled, but no identity.uri set'
+            raise exceptions.InvalidConfiguration(msg)
+        if CONF.identity_feature_enabled.api_v3 and not CONF.identity.uri_v3:
+            msg = 'Identity v3 API enabled, but no identity.uri_v3 set'
+            raise exceptions.InvalidConfiguration(msg)
+
+    def _set_volume_params(self):
+        self.volume_params = {
+            'service': CONF.volume.catalog_type,
+            'region': CONF.volume.region or CONF.identity.region,
+            'endpoint_type': CONF.volume.endpoint_type,
+            'build_interval': CONF.volume.build_interval,
+            'build_timeout': CONF.volume.build_timeout
+        }
+        self.volume_params.update(self.default_params)
+
+    def _set_object_storage_params(self):
+        self.object_storage_params = {
+            'service': CONF.object_storage.catalog_type,
+            'region': CONF.object_storage.region or CONF.identity.region,
+            'endpoint_type': CONF.object_storage.endpoint_type
+        }
+        self.object_storage_params.update(
+            self.default_params_with_timeout_values)
+
+    @manager.lazy_client
+    def baremetal_client(self):
+        return BaremetalClient(
             self.auth_provider,
             CONF.baremetal.catalog_type,
             CONF.identity.region,
             endpoint_type=CONF.baremetal.endpoint_type,
             **self.default_params_with_timeout_values)
-        self.network_client = NetworkClient(
+
+    @manager.lazy_client
+    def network_client(self):
+        return NetworkClient(
             self.auth_provider,
             CONF.network.catalog_type,
             CONF.network.region or CONF.identity.region,
@@ -193,36 +274,57 @@ class Manager(manager.Manager):
             build_interval=CONF.network.build_interval,
             build_timeout=CONF.network.build_timeout,
             **self.default_params)
-        self.messaging_client = MessagingClient(
+
+    @manager.lazy_client
+    def messaging_client(self):
+        return MessagingClient(
             self.auth_provider,
             CONF.messaging.catalog_type,
             CONF.identity.region,
             **self.default_params_with_timeout_values)
-        if CONF.service_available.ceilometer:
-            self.telemetry_client = TelemetryClient(
-                self.auth_provider,
-                CONF.telemetry.catalog_type,
-                CONF.identity.region,
-                endpoint_type=CONF.telemetry.endpoint_type,
-                **self.default_params_with_timeout_values)
-        if CONF.service_available.glance:
-            self.image_client = ImageClient(
-                self.auth_provider,
-                CONF.image.catalog_type,
-                CONF.image.region or CONF.identity.region,
-                endpoint_type=CONF.image.endpoint_type,
-                build_interval=CONF.image.build_interval,
-                build_timeout=CONF.image.build_timeout,
-                **self.default_params)
-            self.image_client_v2 = ImageClientV2(
-                self.auth_provider,
-                CONF.image.catalog_type,
-                CONF.image.region or CONF.identity.region,
-                endpoint_type=CONF.image.endpoint_type,
-                build_interval=CONF.image.build_interval,
-                build_timeout=CONF.image.build_timeout,
-                **self.default_params)
-        self.orchestration_client = OrchestrationClient(
+
+    @manager.lazy_client
+    def telemetry_client(self):
+        if not CONF.service_available.ceilometer:
+            raise AttributeError('telemetry_client')
+        return TelemetryClient(
+            self.auth_provider,
+            CONF.telemetry.catalog_type,
+            CONF.identity.region,
+            endpoint_type=CONF.telemetry.endpoint_type,
+            **self.default_params_with_timeout_values)
+
+    @manager.lazy_client
+    def image_client(self):
+        if not CONF.service_available.glance:
+            raise AttributeError('image_client')
+        return ImageClient(
+            self.auth_provider,
+            CONF.image.catalog_type,
+            CONF.image.region or CONF.identity.region,
+            endpoint_type=CONF.image.endpoint_type,
+            build_interval=CONF.image.build_interval,
+            build_timeout=CONF.image.build_timeout,
+            http_chunk_size=CONF.image.http_chunk_size,
+            **self.default_params)
+
+    @manager.lazy_client
+    def image_client_v2(self):
+        if not CONF.service_available.glance:
+            raise AttributeError('image_client_v2')
+        return ImageClientV2(
+            self.auth_provider,
+            CONF.image.catalog_type,
+            CONF.image.region or CONF.identity.region,
+            endpoint_type=CONF.image.endpoint_type,
+            build_interval=CONF.image.build_interval,
+            build_timeout=CONF.image.build_timeout,
+            http_chunk_size=CONF.image.http_chunk_size,
+            **self.default_params)
+
+    @manager.lazy_client
+    def orchestration_client(self):
+        return OrchestrationClient(
             self.auth_provider,
             CONF.orchestration.catalog_type,
             CONF.orchestration.region or CONF.identity.region,
@@ -230,227 +332,381 @@ class Manager(manager.Manager):
             build_interval=CONF.orchestration.build_interval,
             build_timeout=CONF.orchestration.build_timeout,
             **self.default_params)
-        self.data_processing_client = DataProcessingClient(
+
+    @manager.lazy_client
+    def data_processing_client(self):
+        return DataProcessingClient(
             self.auth_provider,
             CONF.data_processing.catalog_type,
             CONF.identity.region,
             endpoint_type=CONF.data_processing.endpoint_type,
             **self.default_params_with_timeout_values)
-        self.negative_client = negative_rest_client.NegativeRestClient(
-            self.auth_provider, service, **self.default_params)
-
-        # Generating EC2 credentials in tempest is only supported
-        # with identity v2
-        if CONF.identity_feature_enabled.api_v2 and \
-                CONF.identity.auth_version == 'v2':
-            # EC2 and S3 clients, if used, will check onfigured AWS credentials
-            # and generate new ones if needed
-            self.ec2api_client = botoclients.APIClientEC2(self.identity_client)
-            self.s3_client = botoclients.ObjectClientS3(self.identity_client)
-
-    def _set_compute_clients(self):
-        params = {
-            'service': CONF.compute.catalog_type,
-            'region': CONF.compute.region or CONF.identity.region,
-            'endpoint_type': CONF.compute.endpoint_type,
-            'build_interval': CONF.compute.build_interval,
-            'build_timeout': CONF.compute.build_timeout
-        }
-        params.update(self.default_params)
-
-        self.agents_client = AgentsClient(self.auth_provider, **params)
-        self.networks_client = NetworksClient(self.auth_provider, **params)
-        self.migrations_client = MigrationsClient(self.auth_provider,
-                                                  **params)
-        self.security_group_default_rules_client = (
-            SecurityGroupDefaultRulesClient(self.auth_provider, **params))
-        self.certificates_client = CertificatesClient(self.auth_provider,
-                                                      **params)
-        self.servers_client = ServersClient(
+
+    @manager.lazy_client
+    def negative_client(self):
+        return negative_rest_client.NegativeRestClient(
+            self.auth_provider, self.service, **self.default_params)
+
+    # Generating EC2 credentials in tempest is only supported
+    # with identity v2
+    @staticmethod
+    def _ec2_credentials_supported():
+        return (CONF.identity_feature_enabled.api_v2 and
+                CONF.identity.auth_version == 'v2')
+
+    # EC2 and S3 clients, if used, will check onfigured AWS credentials
+    # and generate new ones if needed
+    @manager.lazy_client
+    def ec2api_client(self):
+        if not self._ec2_credentials_supported():
+            raise AttributeError('ec2api_client')
+        return botoclients.APIClientEC2(self.identity_client)
+
+    @manager.lazy_client
+    def s3_client(self):
+        if not self._ec2_credentials_supported():
+            raise AttributeError('s3_client')
+        return botoclients.ObjectClientS3(self.identity_client)
+
+    # Compute clients
+
+    @manager.lazy_client
+    def agents_client(self):
+        return AgentsClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def networks_client(self):
+        return NetworksClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def migrations_client(self):
+        return MigrationsClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def security_group_default_rules_client(self):
+        return SecurityGroupDefaultRulesClient(self.auth_provider,
+                                               **self.compute_params)
+
+    @manager.lazy_client
+    def certificates_client(self):
+        return CertificatesClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def servers_client(self):
+        return ServersClient(
             self.auth_provider,
             enable_instance_password=CONF.compute_feature_enabled
                 .enable_instance_password,
-            **params)
-        self.server_groups_client = ServerGroupsClient(
-            self.auth_provider, **params)
-        self.limits_client = LimitsClient(self.auth_provider, **params)
-        self.images_client = ImagesClient(self.auth_provider, **params)
-        self.keypairs_client = KeyPairsClient(self.auth_provider, **params)
-        self.quotas_client = QuotasClient(self.auth_provider, **params)
-        self.quota_classes_client = QuotaClassesClient(self.auth_provider,
-                                                       **params)
-        self.flavors_client = FlavorsClient(self.auth_provider, **params)
-        self.extensions_client = ExtensionsClient(self.auth_provider,
-                                                  **params)
-        self.floating_ip_pools_client = FloatingIPPoolsClient(
-            self.auth_provider, **params)
-        self.floating_ips_bulk_client = FloatingIPsBulkClient(
-            self.auth_provider, **params)
-        self.floating_ips_client = FloatingIPsClient(self.auth_provider,
-                                                     **params)
-        self.security_group_rules_client = SecurityGroupRulesClient(
-            self.auth_provider, **params)
-        self.security_groups_client = SecurityGroupsClient(
-            self.auth_provider, **params)
-        self.interfaces_client = InterfacesClient(self.auth_provider,
-                                                  **params)
-        self.fixed_ips_client = FixedIPsClient(self.auth_provider,
-                                               **params)
-        self.availability_zone_client = AvailabilityZoneClient(
-            self.auth_provider, **params)
-        self.aggregates_client = AggregatesClient(self.auth_provider,
-                                                  **params)
-        self.services_client = ServicesClient(self.auth_provider, **params)
-        self.tenant_usages_client = TenantUsagesClient(self.auth_provider,
-                                                       **params)
-        self.hosts_client = HostsClient(self.auth_provider, **params)
-        self.hypervisor_client = HypervisorClient(self.auth_provider,
-                                                  **params)
-        self.instance_usages_audit_log_client = \
-            InstanceUsagesAuditLogClient(self.auth_provider, **params)
-        self.tenant_networks_client = \
-            TenantNetworksClient(self.auth_provider, **params)
-        self.baremetal_nodes_client = BaremetalNodesClient(
-            self.auth_provider, **params)
+            **self.compute_params)
+
+    @manager.lazy_client
+    def server_groups_client(self):
+        return ServerGroupsClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def limits_client(self):
+        return LimitsClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def images_client(self):
+        return ImagesClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def keypairs_client(self):
+        return KeyPairsClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def quotas_client(self):
+        return QuotasClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def quota_classes_client(self):
+        return QuotaClassesClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def flavors_client(self):
+        return FlavorsClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def extensions_client(self):
+        return ExtensionsClient(self.auth_provider, **self.compute_params)
 
+    @manager.lazy_client
+    def floating_ip_pools_client(self):
+        return FloatingIPPoolsClient(self.auth_provider,
+                                     **self.compute_params)
+
+    @manager.lazy_client
+    def floating_ips_bulk_client(self):
+        return FloatingIPsBulkClient(self.auth_provider,
+                                     **self.compute_params)
+
+    @manager.lazy_client
+    def floating_ips_client(self):
+        return FloatingIPsClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def security_group_rules_client(self):
+        return SecurityGroupRulesClient(self.auth_provider,
+                                        **self.compute_params)
+
+    @manager.lazy_client
+    def security_groups_client(self):
+        return SecurityGroupsClient(self.auth_provider,
+                                    **self.compute_params)
+
+    @manager.lazy_client
+    def interfaces_client(self):
+        return InterfacesClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def fixed_ips_client(self):
+        return FixedIPsClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def availability_zone_client(self):
+        return AvailabilityZoneClient(self.auth_provider,
+                                      **self.compute_params)
+
+    @manager.lazy_client
+    def aggregates_client(self):
+        return AggregatesClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def services_client(self):
+        return ServicesClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def tenant_usages_client(self):
+        return TenantUsagesClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def hosts_client(self):
+        return HostsClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def hypervisor_client(self):
+        return HypervisorClient(self.auth_provider, **self.compute_params)
+
+    @manager.lazy_client
+    def instance_usages_audit_log_client(self):
+        return InstanceUsagesAuditLogClient(self.auth_provider,
+                                            **self.compute_params)
+
+    @manager.lazy_client
+    def tenant_networks_client(self):
+        return TenantNetworksClient(self.auth_provider,
+                                    **self.compute_params)
+
+    @manager.lazy_client
+    def baremetal_nodes_client(self):
+        return BaremetalNodesClient(self.auth_provider,
+                                    **self.compute_params)
+
+    @manager.lazy_client
+    def volumes_extensions_client(self):
         # NOTE: The following client needs special timeout values because
         # the API is a proxy for the other component.
-        params_volume = copy.deepcopy(params)
+        params_volume = copy.deepcopy(self.compute_params)
         params_volume.update({
             'build_interval': CONF.volume.build_interval,
             'build_timeout': CONF.volume.build_timeout
         })
-        self.volumes_extensions_client = VolumesExtensionsClient(
+        return VolumesExtensionsClient(
             self.auth_provider, default_volume_size=CONF.volume.volume_size,
             **params_volume)
 
-    def _set_database_clients(self):
-        self.database_flavors_client = DatabaseFlavorsClient(
+    # Database clients
+
+    @manager.lazy_client
+    def database_flavors_client(self):
+        return DatabaseFlavorsClient(
             self.auth_provider,
             CONF.database.catalog_type,
             CONF.identity.region,
             **self.default_params_with_timeout_values)
-        self.database_limits_client = DatabaseLimitsClient(
+
+    @manager.lazy_client
+    def database_limits_client(self):
+        return DatabaseLimitsClient(
             self.auth_provider,
             CONF.database.catalog_type,
             CONF.identity.region,
             **self.default_params_with_timeout_values)
-        self.database_versions_client = DatabaseVersionsClient(
+
+    @manager.lazy_client
+    def database_versions_client(self):
+        return DatabaseVersionsClient(
             self.auth_provider,
             CONF.database.catalog_type,
             CONF.identity.region,
             **self.default_params_with_timeout_values)
 
-    def _set_identity_clients(self):
-        params = {
-            'service': CONF.identity.catalog_type,
-            'region': CONF.identity.region
-        }
-        params.update(self.default_params_with_timeout_values)
-        params_v2_admin = params.copy()
+    # Identity clients
+
+    @manager.lazy_client
+    def identity_client(self):
+        params_v2_admin = self.identity_params.copy()
         params_v2_admin['endpoint_type'] = CONF.identity.v2_admin_endpoint_type
         # Client uses admin endpoint type of Keystone API v2
-        self.identity_client = IdentityClient(self.auth_provider,
-                                              **params_v2_admin)
-        params_v2_public = params.copy()
+        return IdentityClient(self.auth_provider, **params_v2_admin)
+
+    @manager.lazy_client
+    def identity_public_client(self):
+        params_v2_public = self.identity_params.copy()
         params_v2_public['endpoint_type'] = (
             CONF.identity.v2_public_endpoint_type)
         # Client uses public endpoint type of Keystone API v2
-        self.identity_public_client = IdentityClient(self.auth_provider,
-                                                     **params_v2_public)
-        params_v3 = params.copy()
+        return IdentityClient(self.auth_provider, **params_v2_public)
+
+    @manager.lazy_client
+    def identity_v3_client(self):
+        params_v3 = self.identity_params.copy()
         params_v3['endpoint_type'] = CONF.identity.v3_endpoint_type
         # Client uses the endpoint type of Keystone API v3
-        self.identity_v3_client = IdentityV3Client(self.auth_provider,
-                                                   **params_v3)
-        self.endpoints_client = EndPointClient(self.auth_provider,
-                                               **params)
-        self.service_client = ServiceClient(self.auth_provider, **params)
-        self.policy_client = PolicyClient(self.auth_provider, **params)
-        self.region_client = RegionClient(self.auth_provider, **params)
-        self.credentials_client = CredentialsClient(self.auth_provider,
-                                                    **params)
-        # Token clients do not use the catalog. They only need default_params.
-        # They read auth_url, so they should only be set if the corresponding
-        # API version is marked as enabled
-        if CONF.identity_feature_enabled.api_v2:
-            if CONF.identity.uri:
-                self.token_client = TokenClientJSON(
-                    CONF.identity.uri, **self.default_params)
-            else:
-                msg = 'Identity v2 API enabled, but no identity.uri set'
-                raise exceptions.InvalidConfiguration(msg)
-        if CONF.identity_feature_enabled.api_v3:
-            if CONF.identity.uri_v3:
-                self.token_v3_client = V3TokenClientJSON(
-                    CONF.identity.uri_v3, **self.default_params)
-            else:
-                msg = 'Identity v3 API enabled, but no identity.uri_v3 set'
-                raise exceptions.InvalidConfiguration(msg)
-
-    def _set_volume_clients(self):
-        params = {
-            'service': CONF.volume.catalog_type,
-            'region': CONF.volume.region or CONF.identity.region,
-            'endpoint_type': CONF.volume.endpoint_type,
-            'build_interval': CONF.volume.build_interval,
-            'build_timeout': CONF.volume.build_timeout
-        }
-        params.update(self.default_params)
-
-        self.volume_qos_client = QosSpecsClient(self.auth_provider,
-                                                **params)
-        self.volume_qos_v2_client = QosSpecsV2Client(
-            self.auth_provider, **params)
-        self.volume_services_v2_client = VolumesServicesV2Client(
-            self.auth_provider, **params)
-        self.backups_client = BackupsClient(self.auth_provider, **params)
-        self.backups_v2_client = BackupsClientV2(self.auth_provider,
-                                                 **params)
-        self.snapshots_client = SnapshotsClient(self.auth_provider,
-                                                **params)
-        self.snapshots_v2_client = SnapshotsV2Client(self.auth_provider,
-                                                     **params)
-        self.volumes_client = VolumesClient(
+        return IdentityV3Client(self.auth_provider, **params_v3)
+
+    @manager.lazy_client
+    def endpoints_client(self):
+        return EndPointClient(self.auth_provider, **self.identity_params)
+
+    @manager.lazy_client
+    def service_client(self):
+        return ServiceClient(self.auth_provider, **self.identity_params)
+
+    @manager.lazy_client
+    def policy_client(self):
+        return PolicyClient(self.auth_provider, **self.identity_params)
+
+    @manager.lazy_client
+    def region_client(self):
+        return RegionClient(self.auth_provider, **self.identity_params)
+
+    @manager.lazy_client
+    def credentials_client(self):
+        return CredentialsClient(self.auth_provider, **self.identity_params)
+
+    # Token clients do not use the catalog. They only need default_params.
+    @manager.lazy_client
+    def token_client(self):
+        if not CONF.identity_feature_enabled.api_v2:
+            raise AttributeError('token_client')
+        return TokenClientJSON(CONF.identity.uri, **self.default_params)
+
+    @manager.lazy_client
+    def token_v3_client(self):
+        if not CONF.identity_feature_enabled.api_v3:
+            raise AttributeError('token_v3_client')
+        return V3TokenClientJSON(CONF.identity.uri_v3, **self.default_params)
+
+    # Volume clients
+
+    @manager.lazy_client
+    def volume_qos_client(self):
+        return QosSpecsClient(self.auth_provider, **self.volume_params)
+
+    @manager.lazy_client
+    def volume_qos_v2_client(self):
+        return QosSpecsV2Client(self.auth_provider, **self.volume_params)
+
+    @manager.lazy_client
+    def volume_services_v2_client(self):
+        return VolumesServicesV2Client(self.auth_provider,
+                                       **self.volume_params)
+
+    @manager.lazy_client
+    def backups_client(self):
+        return BackupsClient(self.auth_provider, **self.volume_params)
+
+    @manager.lazy_client
+    def backups_v2_client(self):
+        return BackupsClientV2(self.auth_provider, **self.volume_params)
+
+    @manager.lazy_client
+    def snapshots_client(self):
+        return SnapshotsClient(self.auth_provider, **self.volume_params)
+
+    @manager.lazy_client
+    def snapshots_v2_client(self):
+        return SnapshotsV2Client(self.auth_provider, **self.volume_params)
+
+    @manager.lazy_client
+    def volumes_client(self):
+        return VolumesClient(
             self.auth_provider, default_volume_size=CONF.volume.volume_size,
-            **params)
-        self.volumes_v2_client = VolumesV2Client(
+            **self.volume_params)
+
+    @manager.lazy_client
+    def volumes_v2_client(self):
+        return VolumesV2Client(
             self.auth_provider, default_volume_size=CONF.volume.volume_size,
-            **params)
-        self.volume_types_client = VolumeTypesClient(self.auth_provider,
-                                                     **params)
-        self.volume_services_client = VolumesServicesClient(
-            self.auth_provider, **params)
-        self.volume_hosts_client = VolumeHostsClient(self.auth_provider,
-                                                     **params)
-        self.volume_hosts_v2_client = VolumeHostsV2Client(
-            self.auth_provider, **params)
-        self.volume_quotas_client = VolumeQuotasClient(self.auth_provider,
-                                                       **params)
-        self.volume_quotas_v2_client = VolumeQuotasV2Client(self.auth_provider,
-                                                            **params)
-        self.volumes_extension_client = VolumeExtensionClient(
-            self.auth_provider, **params)
-        self.volumes_v2_extension_client = VolumeV2ExtensionClient(
-            self.auth_provider, **params)
-        self.volume_availability_zone_client = \
-            VolumeAvailabilityZoneClient(self.auth_provider, **params)
-        self.volume_v2_availability_zone_client = \
-            VolumeV2AvailabilityZoneClient(self.auth_provider, **params)
-        self.volume_types_v2_client = VolumeTypesV2Client(
-            self.auth_provider, **params)
-
-    def _set_object_storage_clients(self):
-        params = {
-            'service': CONF.object_storage.catalog_type,
-            'region': CONF.object_storage.region or CONF.identity.region,
-            'endpoint_type': CONF.object_storage.endpoint_type
-        }
-        params.update(self.default_params_with_timeout_values)
+            **self.volume_params)
+
+    @manager.lazy_client
+    def volume_types_client(self):
+        return VolumeTypesClient(self.auth_provider, **self.volume_params)
+
+    @manager.lazy_client
+    def volume_services_client(self):
+        return VolumesServicesClient(self.auth_provider,
+                                     **self.volume_params)
+
+    @manager.lazy_client
+    def volume_hosts_client(self):
+        return VolumeHostsClient(self.auth_provider, **self.volume_params)
+
+    @manager.lazy_client
+    def volume_hosts_v2_client(self):
+        return VolumeHostsV2Client(self.auth_provider, **self.volume_params)
+
+    @manager.lazy_client
+    def volume_quotas_client(self):
+        return VolumeQuotasClient(self.auth_provider, **self.volume_params)
+
+    @manager.lazy_client
+    def volume_quotas_v2_client(self):
+        return VolumeQuotasV2Client(self.auth_provider,
+                                    **self.volume_params)
+
+    @manager.lazy_client
+    def volumes_extension_client(self):
+        return VolumeExtensionClient(self.auth_provider,
+                                     **self.volume_params)
+
+    @manager.lazy_client
+    def volumes_v2_extension_client(self):
+        return VolumeV2ExtensionClient(self.auth_provider,
+                                       **self.volume_params)
+
+    @manager.lazy_client
+    def volume_availability_zone_client(self):
+        return VolumeAvailabilityZoneClient(self.auth_provider,
+                                            **self.volume_params)
+
+    @manager.lazy_client
+    def volume_v2_availability_zone_client(self):
+        return VolumeV2AvailabilityZoneClient(self.auth_provider,
+                                              **self.volume_params)
+
+    @manager.lazy_client
+    def volume_types_v2_client(self):
+        return VolumeTypesV2Client(self.auth_provider, **self.volume_params)
+
+    # Object storage clients
+
+    @manager.lazy_client
+    def account_client(self):
+        return AccountClient(self.auth_provider,
+                             **self.object_storage_params)
+
+    @manager.lazy_client
+    def container_client(self):
+        return ContainerClient(self.auth_provider,
+                               **self.object_storage_params)
 
-        self.account_client = AccountClient(self.auth_provider, **params)
-        self.container_client = ContainerClient(self.auth_provider, **params)
-        self.object_client = ObjectClient(self.auth_provider, **params)
+    @manager.lazy_client
+    def object_client(self):
+        return ObjectClient(self.auth_provider, **self.object_storage_params)
 
 
 class AdminManager(Manager):
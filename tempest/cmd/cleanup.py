@@ -48,10 +48,24 @@ saved_state.json and based on the **--delete-tempest-conf-objects** flag.
 By default the tempest and alternate tempest users and tenants are not
 deleted and the admin user specified in tempest.conf is never deleted.
 
+**--concurrency**: Number of tenants cleaned up in parallel (default 1).
+Within each tenant the services are always cleaned up in dependency order,
+e.g. servers, once terminated, before ports, routers, subnets and networks.
+Cleanup exits with a non-zero status if any tenant could not be cleaned up.
+
+**--max-in-flight**: Maximum number of concurrent delete requests issued by
+each service of a tenant (default 1).
+
+**--report**: Creates a report (cleanup_report.json) with the time spent and
+the number of deleted and failed objects for each cleanup service, and the
+tenants which could not be cleaned up (in the "_failed_tenants" array).
+
 Please run with **--help** to see full list of options.
 """
 import argparse
+from multiprocessing.pool import ThreadPool
 import sys
+import threading
 
 from oslo_log import log as logging
 from oslo_serialization import jsonutils as json
@@ -63,6 +77,7 @@ from tempest import config
 
 SAVED_STATE_JSON = "saved_state.json"
 DRY_RUN_JSON = "dry_run.json"
+REPORT_JSON = "cleanup_report.json"
 LOG = logging.getLogger(__name__)
 CONF = config.CONF
 
@@ -81,6 +96,9 @@ class Cleanup(object):
         self._init_admin_ids()
 
         self.admin_role_added = []
+        self.report = {}
+        self.failed_tenants = []
+        self._report_lock = threading.Lock()
 
         # available services
         self.tenant_services = cleanup_service.get_tenant_cleanup_services()
@@ -90,10 +108,11 @@ class Cleanup(object):
         opts = self.options
         if opts.init_saved_state:
             self._init_state()
-            return
+            return 0
 
         self._load_json()
         self._cleanup()
+        return 1 if self.failed_tenants else 0
 
     def _cleanup(self):
         LOG.debug("Begin cleanup")
@@ -117,10 +136,22 @@ class Cleanup(object):
         tenants = tenant_service.list()
         LOG.debug("Process %s tenants" % len(tenants))
 
-        # Loop through list of tenants and clean them up.
-        for tenant in tenants:
-            self._add_admin(tenant['id'])
-            self._clean_tenant(tenant)
+        # Loop through list of tenants and clean them up. The admin role is
+        # added upfront since the admin manager is shared by all tenants.
+        concurrency = min(self.options.concurrency, len(tenants))
+        if concurrency > 1:
+            for tenant in tenants:
+                self._add_admin(tenant['id'])
+            pool = ThreadPool(concurrency)
+            try:
+                pool.map(self._process_tenant, tenants)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for tenant in tenants:
+                self._add_admin(tenant['id'])
+                self._process_tenant(tenant)
 
         kwargs = {'data': self.dry_run_data,
                   'is_dry_run': is_dry_run,
@@ -130,6 +161,7 @@ class Cleanup(object):
         for service in self.global_services:
             svc = service(admin_mgr, **kwargs)
             svc.run()
+            self._add_to_report(svc)
 
         if is_dry_run:
             f.write(json.dumps(self.dry_run_data, sort_keys=True,
@@ -137,6 +169,40 @@ class Cleanup(object):
             f.close()
 
         self._remove_admin_user_roles()
+        self._write_report()
+
+    def _process_tenant(self, tenant):
+        try:
+            self._clean_tenant(tenant)
+        except Exception:
+            LOG.exception("Failed cleaning up tenant %s" % tenant['name'])
+            with self._report_lock:
+                self.failed_tenants.append(tenant['name'])
+
+    def _add_to_report(self, svc):
+        name = svc.__class__.__name__
+        with self._report_lock:
+            entry = self.report.setdefault(
+                name, {'time': 0.0, 'runs': 0, 'deleted': 0, 'failed': 0})
+            entry['time'] += svc.elapsed
+            entry['runs'] += 1
+            entry['deleted'] += svc.deleted
+            entry['failed'] += svc.failed
+
+    def _write_report(self):
+        for name, entry in sorted(self.report.items()):
+            LOG.info("%s: %d deleted, %d failed in %.2f s (%d runs)" %
+                     (name, entry['deleted'], entry['failed'],
+                      entry['time'], entry['runs']))
+        if self.failed_tenants:
+            LOG.error("Failed cleaning up tenants: %s" %
+                      ', '.join(sorted(self.failed_tenants)))
+        if self.options.report:
+            report = dict(self.report,
+                          _failed_tenants=sorted(self.failed_tenants))
+            with open(REPORT_JSON, 'w+') as f:
+                f.write(json.dumps(report, sort_keys=True,
+                                   indent=2, separators=(',', ': ')))
 
     def _remove_admin_user_roles(self):
         tenant_ids = self.admin_role_added
@@ -167,10 +233,14 @@ class Cleanup(object):
                   'saved_state_json': None,
                   'is_preserve': is_preserve,
                   'is_save_state': False,
-                  'tenant_id': tenant_id}
+                  'tenant_id': tenant_id,
+                  'max_in_flight': self.options.max_in_flight}
+        # tenant_services is ordered so that resources are deleted before
+        # the ones they depend on, so services must run one after the other
         for service in self.tenant_services:
             svc = service(mgr, **kwargs)
             svc.run()
+            self._add_to_report(svc)
 
     def _init_admin_ids(self):
         id_cl = self.admin_mgr.identity_client
@@ -211,6 +281,19 @@ class Cleanup(object):
                             help="Generate JSON file:" + DRY_RUN_JSON +
                             ", that reports the objects that would have "
                             "been deleted had a full cleanup been run.")
+        parser.add_argument('--concurrency', type=int,
+                            dest='concurrency', default=1,
+                            help="Number of tenants to clean up in "
+                            "parallel.")
+        parser.add_argument('--max-in-flight', type=int,
+                            dest='max_in_flight', default=1,
+                            help="Maximum number of concurrent delete "
+                            "requests issued by each service of a tenant.")
+        parser.add_argument('--report', action="store_true",
+                            dest='report', default=False,
+                            help="Generate JSON file: " + REPORT_JSON +
+                            ", with the time spent and the number of "
+                            "deleted objects for each cleanup service.")
 
         self.options = parser.parse_args()
 
@@ -287,9 +370,9 @@ class Cleanup(object):
 def main():
     cleanup_service.init_conf()
     cleanup = Cleanup()
-    cleanup.run()
+    result = cleanup.run()
     LOG.info('Cleanup finished!')
-    return 0
+    return result
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -14,9 +14,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from multiprocessing.pool import ThreadPool
+import threading
+import time
+
 from oslo_log import log as logging
 
 from tempest import clients
+from tempest.common import waiters
 from tempest import config
 from tempest import test
 
@@ -100,8 +105,14 @@ def _get_network_id(net_name, tenant_name):
 class BaseService(object):
     def __init__(self, kwargs):
         self.client = None
+        # Maximum number of delete requests sent concurrently by a service
+        self.max_in_flight = 1
         for key, value in kwargs.items():
             setattr(self, key, value)
+        self.deleted = 0
+        self.failed = 0
+        self.elapsed = 0.0
+        self._local = threading.local()
 
         self.tenant_filter = {}
         if hasattr(self, 'tenant_id'):
@@ -118,6 +129,56 @@ class BaseService(object):
         return [item for item in item_list
                 if item['tenant_id'] == self.tenant_id]
 
+    def _get_thread_client(self):
+        """Returns the clone of the client used by the current thread"""
+        if getattr(self._local, 'client', None) is None:
+            self._local.client = self.client.clone()
+        return self._local.client
+
+    def _delete_all(self, items, delete, error_msg):
+        """Deletes all the items, with up to max_in_flight concurrent calls
+
+        :param delete: callable taking a client and an item to delete
+        :param error_msg: message logged when a delete fails
+        :returns: the list of the items successfully deleted
+        """
+        def _delete(item, client):
+            try:
+                delete(client, item)
+                return item, True
+            except Exception:
+                LOG.exception(error_msg)
+                return item, False
+
+        try:
+            pool_size = min(self.max_in_flight, len(items))
+        except TypeError:
+            # Items streamed by an iter_* method of the client
+            pool_size = self.max_in_flight
+        if pool_size > 1:
+            pool = ThreadPool(pool_size)
+            try:
+                # NOTE: unlike map, imap_unordered does not wait for the
+                # whole list of items before starting to delete them
+                results = list(pool.imap_unordered(
+                    lambda item: _delete(item, self._get_thread_client()),
+                    items))
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [_delete(item, self.client) for item in items]
+        deleted = [item for item, ok in results if ok]
+        self.deleted += len(deleted)
+        self.failed += len(results) - len(deleted)
+        return deleted
+
+    def _delete_by_id(self, items, method, error_msg):
+        """Deletes all the items calling client.<method>(item['id'])"""
+        return self._delete_all(
+            items, lambda client, item: getattr(client, method)(item['id']),
+            error_msg)
+
     def list(self):
         pass
 
@@ -131,12 +192,14 @@ class BaseService(object):
         pass
 
     def run(self):
+        start = time.time()
         if self.is_dry_run:
             self.dry_run()
         elif self.is_save_state:
             self.save_state()
         else:
             self.delete()
+        self.elapsed = time.time() - start
 
 
 class SnapshotService(BaseService):
@@ -152,13 +215,9 @@ class SnapshotService(BaseService):
         return snaps
 
     def delete(self):
-        snaps = self.list()
-        client = self.client
-        for snap in snaps:
-            try:
-                client.delete_snapshot(snap['id'])
-            except Exception:
-                LOG.exception("Delete Snapshot exception.")
+        snaps = self.client.iter_snapshots()
+        self._delete_by_id(snaps, 'delete_snapshot',
+                           "Delete Snapshot exception.")
 
     def dry_run(self):
         snaps = self.list()
@@ -178,13 +237,18 @@ class ServerService(BaseService):
         return servers
 
     def delete(self):
-        client = self.client
-        servers = self.list()
-        for server in servers:
+        servers = self.client.iter_servers()
+        deleted = self._delete_by_id(servers, 'delete_server',
+                                     "Delete Server exception.")
+        # NOTE: the ports, and so the subnets and networks, of a server
+        # can only be deleted once the server is gone
+        if deleted:
             try:
-                client.delete_server(server['id'])
+                waiters.wait_for_servers_termination(
+                    self.client, [server['id'] for server in deleted],
+                    ignore_error=True)
             except Exception:
-                LOG.exception("Delete Server exception.")
+                LOG.exception("Wait for Servers termination exception.")
 
     def dry_run(self):
         servers = self.list()
@@ -200,13 +264,9 @@ class ServerGroupService(ServerService):
         return sgs
 
     def delete(self):
-        client = self.client
         sgs = self.list()
-        for sg in sgs:
-            try:
-                client.delete_server_group(sg['id'])
-            except Exception:
-                LOG.exception("Delete Server Group exception.")
+        self._delete_by_id(sgs, 'delete_server_group',
+                           "Delete Server Group exception.")
 
     def dry_run(self):
         sgs = self.list()
@@ -225,13 +285,9 @@ class StackService(BaseService):
         return stacks
 
     def delete(self):
-        client = self.client
         stacks = self.list()
-        for stack in stacks:
-            try:
-                client.delete_stack(stack['id'])
-            except Exception:
-                LOG.exception("Delete Stack exception.")
+        self._delete_by_id(stacks, 'delete_stack',
+                           "Delete Stack exception.")
 
     def dry_run(self):
         stacks = self.list()
@@ -250,14 +306,11 @@ class KeyPairService(BaseService):
         return keypairs
 
     def delete(self):
-        client = self.client
         keypairs = self.list()
-        for k in keypairs:
-            try:
-                name = k['keypair']['name']
-                client.delete_keypair(name)
-            except Exception:
-                LOG.exception("Delete Keypairs exception.")
+        self._delete_all(
+            keypairs, lambda client, k: client.delete_keypair(
+                k['keypair']['name']),
+            "Delete Keypairs exception.")
 
     def dry_run(self):
         keypairs = self.list()
@@ -277,13 +330,9 @@ class SecurityGroupService(BaseService):
         return secgrp_del
 
     def delete(self):
-        client = self.client
         secgrp_del = self.list()
-        for g in secgrp_del:
-            try:
-                client.delete_security_group(g['id'])
-            except Exception:
-                LOG.exception("Delete Security Groups exception.")
+        self._delete_by_id(secgrp_del, 'delete_security_group',
+                           "Delete Security Groups exception.")
 
     def dry_run(self):
         secgrp_del = self.list()
@@ -302,13 +351,9 @@ class FloatingIpService(BaseService):
         return floating_ips
 
     def delete(self):
-        client = self.client
         floating_ips = self.list()
-        for f in floating_ips:
-            try:
-                client.delete_floating_ip(f['id'])
-            except Exception:
-                LOG.exception("Delete Floating IPs exception.")
+        self._delete_by_id(floating_ips, 'delete_floating_ip',
+                           "Delete Floating IPs exception.")
 
     def dry_run(self):
         floating_ips = self.list()
@@ -327,13 +372,9 @@ class VolumeService(BaseService):
         return vols
 
     def delete(self):
-        client = self.client
-        vols = self.list()
-        for v in vols:
-            try:
-                client.delete_volume(v['id'])
-            except Exception:
-                LOG.exception("Delete Volume exception.")
+        vols = self.client.iter_volumes()
+        self._delete_by_id(vols, 'delete_volume',
+                           "Delete Volume exception.")
 
     def dry_run(self):
         vols = self.list()
@@ -349,7 +390,9 @@ class VolumeQuotaService(BaseService):
         client = self.client
         try:
             client.delete_quota_set(self.tenant_id)
+            self.deleted += 1
         except Exception:
+            self.failed += 1
             LOG.exception("Delete Volume Quotas exception.")
 
     def dry_run(self):
@@ -367,7 +410,9 @@ class NovaQuotaService(BaseService):
         client = self.client
         try:
             client.delete_quota_set(self.tenant_id)
+            self.deleted += 1
         except Exception:
+            self.failed += 1
             LOG.exception("Delete Quotas exception.")
 
     def dry_run(self):
@@ -382,32 +427,33 @@ class NetworkService(BaseService):
         super(NetworkService, self).__init__(kwargs)
         self.client = manager.network_client
 
-    def _filter_by_conf_networks(self, item_list):
-        if not item_list or not all(('network_id' in i for i in item_list)):
-            return item_list
+    def _filter_by_conf_networks(self, items):
+        """Yields the items not in the networks declared in tempest.conf"""
+        for item in items:
+            if item.get('network_id') not in CONF_NETWORKS:
+                yield item
+
+    def _filtered(self, networks):
+        """Yields the networks to clean up, from any iterable
 
-        return [item for item in item_list if item['network_id']
-                not in CONF_NETWORKS]
+        list() and delete() use it on listed and streamed networks.
+        """
+        for network in networks:
+            # filter out networks declared in tempest.conf
+            if not self.is_preserve or network['id'] not in CONF_NETWORKS:
+                yield network
 
     def list(self):
         client = self.client
         networks = client.list_networks(**self.tenant_filter)
-        networks = networks['networks']
-        # filter out networks declared in tempest.conf
-        if self.is_preserve:
-            networks = [network for network in networks
-                        if network['id'] not in CONF_NETWORKS]
+        networks = list(self._filtered(networks['networks']))
         LOG.debug("List count, %s Networks" % networks)
         return networks
 
     def delete(self):
-        client = self.client
-        networks = self.list()
-        for n in networks:
-            try:
-                client.delete_network(n['id'])
-            except Exception:
-                LOG.exception("Delete Network exception.")
+        networks = self.client.iter_networks(**self.tenant_filter)
+        self._delete_by_id(self._filtered(networks), 'delete_network',
+                           "Delete Network exception.")
 
     def dry_run(self):
         networks = self.list()
@@ -424,13 +470,9 @@ class NetworkFloatingIpService(NetworkService):
         return flips
 
     def delete(self):
-        client = self.client
-        flips = self.list()
-        for flip in flips:
-            try:
-                client.delete_floatingip(flip['id'])
-            except Exception:
-                LOG.exception("Delete Network Floating IP exception.")
+        flips = self.client.iter_floatingips(**self.tenant_filter)
+        self._delete_by_id(flips, 'delete_floatingip',
+                           "Delete Network Floating IP exception.")
 
     def dry_run(self):
         flips = self.list()
@@ -439,32 +481,31 @@ class NetworkFloatingIpService(NetworkService):
 
 class NetworkRouterService(NetworkService):
 
+    def _filtered(self, routers):
+        for router in routers:
+            if not self.is_preserve or router['id'] != CONF_PUB_ROUTER:
+                yield router
+
     def list(self):
         client = self.client
         routers = client.list_routers(**self.tenant_filter)
-        routers = routers['routers']
-        if self.is_preserve:
-            routers = [router for router in routers
-                       if router['id'] != CONF_PUB_ROUTER]
-
+        routers = list(self._filtered(routers['routers']))
         LOG.debug("List count, %s Routers" % len(routers))
         return routers
 
+    def _delete_router(self, client, router):
+        rid = router['id']
+        ports = [port for port
+                 in client.list_router_interfaces(rid)['ports']
+                 if port["device_owner"] == "network:router_interface"]
+        for port in ports:
+            client.remove_router_interface_with_port_id(rid, port['id'])
+        client.delete_router(rid)
+
     def delete(self):
-        client = self.client
-        routers = self.list()
-        for router in routers:
-            try:
-                rid = router['id']
-                ports = [port for port
-                         in client.list_router_interfaces(rid)['ports']
-                         if port["device_owner"] == "network:router_interface"]
-                for port in ports:
-                    client.remove_router_interface_with_port_id(rid,
-                                                                port['id'])
-                client.delete_router(rid)
-            except Exception:
-                LOG.exception("Delete Router exception.")
+        routers = self.client.iter_routers(**self.tenant_filter)
+        self._delete_all(self._filtered(routers), self._delete_router,
+                         "Delete Router exception.")
 
     def dry_run(self):
         routers = self.list()
@@ -482,13 +523,9 @@ class NetworkHealthMonitorService(NetworkService):
         return hms
 
     def delete(self):
-        client = self.client
         hms = self.list()
-        for hm in hms:
-            try:
-                client.delete_health_monitor(hm['id'])
-            except Exception:
-                LOG.exception("Delete Health Monitor exception.")
+        self._delete_by_id(hms, 'delete_health_monitor',
+                           "Delete Health Monitor exception.")
 
     def dry_run(self):
         hms = self.list()
@@ -506,13 +543,9 @@ class NetworkMemberService(NetworkService):
         return members
 
     def delete(self):
-        client = self.client
         members = self.list()
-        for member in members:
-            try:
-                client.delete_member(member['id'])
-            except Exception:
-                LOG.exception("Delete Member exception.")
+        self._delete_by_id(members, 'delete_member',
+                           "Delete Member exception.")
 
     def dry_run(self):
         members = self.list()
@@ -530,13 +563,9 @@ class NetworkVipService(NetworkService):
         return vips
 
     def delete(self):
-        client = self.client
         vips = self.list()
-        for vip in vips:
-            try:
-                client.delete_vip(vip['id'])
-            except Exception:
-                LOG.exception("Delete VIP exception.")
+        self._delete_by_id(vips, 'delete_vip',
+                           "Delete VIP exception.")
 
     def dry_run(self):
         vips = self.list()
@@ -554,13 +583,9 @@ class NetworkPoolService(NetworkService):
         return pools
 
     def delete(self):
-        client = self.client
         pools = self.list()
-        for pool in pools:
-            try:
-                client.delete_pool(pool['id'])
-            except Exception:
-                LOG.exception("Delete Pool exception.")
+        self._delete_by_id(pools, 'delete_pool',
+                           "Delete Pool exception.")
 
     def dry_run(self):
         pools = self.list()
@@ -578,13 +603,9 @@ class NetworkMeteringLabelRuleService(NetworkService):
         return rules
 
     def delete(self):
-        client = self.client
         rules = self.list()
-        for rule in rules:
-            try:
-                client.delete_metering_label_rule(rule['id'])
-            except Exception:
-                LOG.exception("Delete Metering Label Rule exception.")
+        self._delete_by_id(rules, 'delete_metering_label_rule',
+                           "Delete Metering Label Rule exception.")
 
     def dry_run(self):
         rules = self.list()
@@ -602,13 +623,9 @@ class NetworkMeteringLabelService(NetworkService):
         return labels
 
     def delete(self):
-        client = self.client
         labels = self.list()
-        for label in labels:
-            try:
-                client.delete_metering_label(label['id'])
-            except Exception:
-                LOG.exception("Delete Metering Label exception.")
+        self._delete_by_id(labels, 'delete_metering_label',
+                           "Delete Metering Label exception.")
 
     def dry_run(self):
         labels = self.list()
@@ -617,27 +634,25 @@ class NetworkMeteringLabelService(NetworkService):
 
 class NetworkPortService(NetworkService):
 
-    def list(self):
-        client = self.client
-        ports = [port for port in
-                 client.list_ports(**self.tenant_filter)['ports']
+    def _filtered(self, ports):
+        ports = (port for port in ports
                  if port["device_owner"] == "" or
-                 port["device_owner"].startswith("compute:")]
-
+                 port["device_owner"].startswith("compute:"))
         if self.is_preserve:
             ports = self._filter_by_conf_networks(ports)
+        return ports
 
+    def list(self):
+        client = self.client
+        ports = client.list_ports(**self.tenant_filter)
+        ports = list(self._filtered(ports['ports']))
         LOG.debug("List count, %s Ports" % len(ports))
         return ports
 
     def delete(self):
-        client = self.client
-        ports = self.list()
-        for port in ports:
-            try:
-                client.delete_port(port['id'])
-            except Exception:
-                LOG.exception("Delete Port exception.")
+        ports = self.client.iter_ports(**self.tenant_filter)
+        self._delete_by_id(self._filtered(ports), 'delete_port',
+                           "Delete Port exception.")
 
     def dry_run(self):
         ports = self.list()
@@ -645,27 +660,26 @@ class NetworkPortService(NetworkService):
 
 
 class NetworkSecGroupService(NetworkService):
-    def list(self):
-        client = self.client
-        filter = self.tenant_filter
+    def _filtered(self, secgroups):
         # cannot delete default sec group so never show it.
-        secgroups = [secgroup for secgroup in
-                     client.list_security_groups(**filter)['security_groups']
-                     if secgroup['name'] != 'default']
-
+        secgroups = (secgroup for secgroup in secgroups
+                     if secgroup['name'] != 'default')
         if self.is_preserve:
             secgroups = self._filter_by_conf_networks(secgroups)
+        return secgroups
+
+    def list(self):
+        client = self.client
+        secgroups = client.list_security_groups(**self.tenant_filter)
+        secgroups = list(self._filtered(secgroups['security_groups']))
         LOG.debug("List count, %s securtiy_groups" % len(secgroups))
         return secgroups
 
     def delete(self):
-        client = self.client
-        secgroups = self.list()
-        for secgroup in secgroups:
-            try:
-                client.delete_secgroup(secgroup['id'])
-            except Exception:
-                LOG.exception("Delete security_group exception.")
+        secgroups = self.client.iter_security_groups(**self.tenant_filter)
+        self._delete_by_id(self._filtered(secgroups),
+                           'delete_security_group',
+                           "Delete security_group exception.")
 
     def dry_run(self):
         secgroups = self.list()
@@ -674,23 +688,22 @@ class NetworkSecGroupService(NetworkService):
 
 class NetworkSubnetService(NetworkService):
 
+    def _filtered(self, subnets):
+        if self.is_preserve:
+            subnets = self._filter_by_conf_networks(subnets)
+        return subnets
+
     def list(self):
         client = self.client
         subnets = client.list_subnets(**self.tenant_filter)
-        subnets = subnets['subnets']
-        if self.is_preserve:
-            subnets = self._filter_by_conf_networks(subnets)
+        subnets = list(self._filtered(subnets['subnets']))
         LOG.debug("List count, %s Subnets" % len(subnets))
         return subnets
 
     def delete(self):
-        client = self.client
-        subnets = self.list()
-        for subnet in subnets:
-            try:
-                client.delete_subnet(subnet['id'])
-            except Exception:
-                LOG.exception("Delete Subnet exception.")
+        subnets = self.client.iter_subnets(**self.tenant_filter)
+        self._delete_by_id(self._filtered(subnets), 'delete_subnet',
+                           "Delete Subnet exception.")
 
     def dry_run(self):
         subnets = self.list()
@@ -710,13 +723,9 @@ class TelemetryAlarmService(BaseService):
         return alarms
 
     def delete(self):
-        client = self.client
         alarms = self.list()
-        for alarm in alarms:
-            try:
-                client.delete_alarm(alarm['id'])
-            except Exception:
-                LOG.exception("Delete Alarms exception.")
+        self._delete_by_id(alarms, 'delete_alarm',
+                           "Delete Alarms exception.")
 
     def dry_run(self):
         alarms = self.list()
@@ -744,13 +753,9 @@ class FlavorService(BaseService):
         return flavors
 
     def delete(self):
-        client = self.client
         flavors = self.list()
-        for flavor in flavors:
-            try:
-                client.delete_flavor(flavor['id'])
-            except Exception:
-                LOG.exception("Delete Flavor exception.")
+        self._delete_by_id(flavors, 'delete_flavor',
+                           "Delete Flavor exception.")
 
     def dry_run(self):
         flavors = self.list()
@@ -781,13 +786,9 @@ class ImageService(BaseService):
         return images
 
     def delete(self):
-        client = self.client
         images = self.list()
-        for image in images:
-            try:
-                client.delete_image(image['id'])
-            except Exception:
-                LOG.exception("Delete Image exception.")
+        self._delete_by_id(images, 'delete_image',
+                           "Delete Image exception.")
 
     def dry_run(self):
         images = self.list()
@@ -828,13 +829,9 @@ class UserService(IdentityService):
         return users
 
     def delete(self):
-        client = self.client
         users = self.list()
-        for user in users:
-            try:
-                client.delete_user(user['id'])
-            except Exception:
-                LOG.exception("Delete User exception.")
+        self._delete_by_id(users, 'delete_user',
+                           "Delete User exception.")
 
     def dry_run(self):
         users = self.list()
@@ -866,13 +863,9 @@ class RoleService(IdentityService):
             return []
 
     def delete(self):
-        client = self.client
         roles = self.list()
-        for role in roles:
-            try:
-                client.delete_role(role['id'])
-            except Exception:
-                LOG.exception("Delete Role exception.")
+        self._delete_by_id(roles, 'delete_role',
+                           "Delete Role exception.")
 
     def dry_run(self):
         roles = self.list()
@@ -903,13 +896,9 @@ class TenantService(IdentityService):
         return tenants
 
     def delete(self):
-        client = self.client
         tenants = self.list()
-        for tenant in tenants:
-            try:
-                client.delete_tenant(tenant['id'])
-            except Exception:
-                LOG.exception("Delete Tenant exception.")
+        self._delete_by_id(tenants, 'delete_tenant',
+                           "Delete Tenant exception.")
 
     def dry_run(self):
         tenants = self.list()
@@ -938,15 +927,14 @@ class DomainService(BaseService):
         LOG.debug("List count, %s Domains after reconcile" % len(domains))
         return domains
 
+    def _delete_domain(self, client, domain):
+        client.update_domain(domain['id'], enabled=False)
+        client.delete_domain(domain['id'])
+
     def delete(self):
-        client = self.client
         domains = self.list()
-        for domain in domains:
-            try:
-                client.update_domain(domain['id'], enabled=False)
-                client.delete_domain(domain['id'])
-            except Exception:
-                LOG.exception("Delete Domain exception.")
+        self._delete_all(domains, self._delete_domain,
+                         "Delete Domain exception.")
 
     def dry_run(self):
         domains = self.list()
@@ -978,8 +966,8 @@ def get_tenant_cleanup_services():
         if test.is_extension_enabled('metering', 'network'):
             tenant_services.append(NetworkMeteringLabelRuleService)
             tenant_services.append(NetworkMeteringLabelService)
-        tenant_services.append(NetworkRouterService)
         tenant_services.append(NetworkPortService)
+        tenant_services.append(NetworkRouterService)
         tenant_services.append(NetworkSubnetService)
         tenant_services.append(NetworkService)
         tenant_services.append(NetworkSecGroupService)
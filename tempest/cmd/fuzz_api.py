@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Utility for fuzzing the input validation of an API
+==================================================
+
+The negative tests send a few invalid values per field of the json-schema
+of an API description. This command sends thousands of mutations of the
+payload of a description, concurrently, and reports the distinct responses
+they got, by (status, error class) signature::
+
+    tempest-fuzz-api --service compute --requests 5000 \\
+        tempest.api_schema.request.compute.v2.flavors.flavor_list
+
+The description is the python path of a negative test description, or a
+JSON file. The ids of the resources of its url are given with
+``--resource name=id``. The credentials are those of the tempest
+configuration, the admin ones with --admin.
+
+The smallest payload getting each signature is written to the file given
+with --corpus. Server errors are the first signatures to look at.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from oslo_log import log as logging
+from oslo_utils import importutils
+
+from tempest import clients
+from tempest.common.generator import fuzzer
+
+LOG = logging.getLogger(__name__)
+
+
+def load_description(name):
+    """Returns a description from a JSON file, or a python path"""
+    if os.path.exists(name):
+        with open(name) as f:
+            return json.load(f)
+    return importutils.import_class(name)
+
+
+def get_options(args=None):
+    parser = argparse.ArgumentParser(
+        description='Send mutated requests to an API described like the '
+                    'negative tests.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--service', default='compute',
+                        help='Catalog type of the service of the API')
+    parser.add_argument('--resource', action='append', default=[],
+                        metavar='NAME=ID',
+                        help='Id of a resource of the url')
+    parser.add_argument('-n', '--requests', type=int, default=1000,
+                        help='Number of requests to send')
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help='Number of requests generated at once')
+    parser.add_argument('-c', '--concurrency', type=int,
+                        help='Number of requests in flight, [negative] '
+                             'batch_concurrency by default')
+    parser.add_argument('--seed', type=int,
+                        help='Seed of the random mutations')
+    parser.add_argument('--admin', action='store_true',
+                        help='Use the admin credentials')
+    parser.add_argument('--corpus',
+                        help='File to write the payload of each response '
+                             'signature to')
+    parser.add_argument('description',
+                        help='Python path of a negative test description, '
+                             'or JSON file of a description')
+    return parser.parse_args(args)
+
+
+def main(opts=None):
+    if not opts:
+        opts = get_options()
+    description = load_description(opts.description)
+    resources = {}
+    for resource in opts.resource:
+        name, sep, resource_id = resource.partition('=')
+        if not sep:
+            sys.exit("Invalid resource %s, expected NAME=ID" % resource)
+        resources[name] = resource_id
+
+    if opts.admin:
+        manager = clients.AdminManager(service=opts.service)
+    else:
+        manager = clients.Manager(service=opts.service)
+    api_fuzzer = fuzzer.Fuzzer(manager.negative_client, description,
+                               resources=resources,
+                               batch_size=opts.batch_size,
+                               concurrency=opts.concurrency, seed=opts.seed)
+    corpus = api_fuzzer.run(opts.requests)
+    for entry in corpus.to_list():
+        print("%-6s %-32s %6d  %s" % (entry['status'], entry['error'],
+                                      entry['count'], entry['mutation']))
+    if opts.corpus:
+        corpus.write(opts.corpus, description)
+
+
+if __name__ == "__main__":
+    main()
@@ -52,6 +52,10 @@ retrieve artefacts (like images) that will be referenced in the resource files.
 describing your cloud. Javelin may use this to determine if certain services
 are enabled and modify its behavior accordingly.
 
+**--concurrency**: (Optional) The number of steps, and of resources of a
+step, javelin creates or destroys at once. Defaults to 4, 1 runs everything
+in sequence.
+
 
 Resource file
 -------------
@@ -102,11 +106,19 @@ admin level access does not mask issues.
 The check phase will act like a unit test, using well known assert methods to
 verify that the correct resources exist.
 
+Each section of the resource file is created by a step which runs once the
+steps it depends on are done, for example the servers once the images,
+security groups and networks exist. Independent steps run concurrently, and
+the resources of a step are created concurrently, the servers and volumes of
+an owner being then waited for at once. The destroy mode runs the steps in
+reverse order.
+
 """
 
 import argparse
 import collections
 import datetime
+from multiprocessing.pool import ThreadPool
 import os
 import sys
 import unittest
@@ -115,11 +127,14 @@ import netaddr
 from oslo_log import log as logging
 from oslo_utils import timeutils
 import six
+from six import moves
 from tempest_lib import auth
 from tempest_lib import exceptions as lib_exc
 import yaml
 
+from tempest.common import waiters
 from tempest import config
+from tempest import manager
 from tempest.services.compute.json import flavors_client
 from tempest.services.compute.json import floating_ips_client
 from tempest.services.compute.json import security_group_rules_client
@@ -137,6 +152,8 @@ CONF = config.CONF
 OPTS = {}
 USERS = {}
 RES = collections.defaultdict(list)
+# Number of steps, and of resources of a step, handled at once
+CONCURRENCY = 4
 
 LOG = None
 
@@ -181,14 +198,8 @@ class OSClient(object):
             username=user,
             password=pw,
             tenant_name=tenant)
-        auth_provider_params = {
-            'disable_ssl_certificate_validation':
-                CONF.identity.disable_ssl_certificate_validation,
-            'ca_certs': CONF.identity.ca_certificates_file,
-            'trace_requests': CONF.debug.trace_requests
-        }
-        _auth = auth.KeystoneV2AuthProvider(
-            _creds, CONF.identity.uri, **auth_provider_params)
+        # NOTE: the auth providers of a user share its token
+        _auth = manager.get_auth_provider(_creds)
         self.identity = identity_client.IdentityClient(
             _auth,
             CONF.identity.catalog_type,
@@ -260,6 +271,48 @@ def client_for_user(name):
         LOG.error("%s not found in USERS: %s" % (name, USERS))
 
 
+def _parallel(func, items):
+    """Calls func on each item, CONCURRENCY items at once
+
+    :returns: the results of the calls, in the order of the items
+    """
+    items = list(items)
+    if CONCURRENCY <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    pool = ThreadPool(min(CONCURRENCY, len(items)))
+    try:
+        return pool.map(func, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _wait_by_owner(resources, resource_ids, wait):
+    """Waits for the resources of each owner at once
+
+    :param resources: the resource definitions
+    :param resource_ids: the id of each resource, None for the resources
+                         not to wait for
+    :param wait: callable called with a client of an owner and the ids of
+                 its resources
+    """
+    owners = collections.OrderedDict()
+    for resource, resource_id in zip(resources, resource_ids):
+        if resource_id is not None:
+            owners.setdefault(resource['owner'], []).append(resource_id)
+    _parallel(lambda owner: wait(client_for_user(owner), owners[owner]),
+              owners)
+
+
+def _wait_for_deletion(client, fetch, resource_ids, resource_type):
+    waiter = waiters.ResourceWaiter(
+        fetch, lambda resource: resource is None,
+        interval=client.build_interval, timeout=client.build_timeout,
+        resource_type=resource_type, target='deletion')
+    waiter.add(*resource_ids)
+    waiter.wait()
+
+
 ###################
 #
 # TENANTS
@@ -583,27 +636,49 @@ def _file_contents(fname):
         return f.read()
 
 
+def _create_object(obj):
+    LOG.debug("Object %s" % obj)
+    swift_role = obj.get('swift_role', 'Member')
+    _assign_swift_role(obj['owner'], swift_role)
+    client = client_for_user(obj['owner'])
+    client.containers.create_container(obj['container'])
+    client.objects.create_object(
+        obj['container'], obj['name'],
+        _file_contents(obj['file']))
+
+
 def create_objects(objects):
     if not objects:
         return
     LOG.info("Creating objects")
-    for obj in objects:
-        LOG.debug("Object %s" % obj)
-        swift_role = obj.get('swift_role', 'Member')
-        _assign_swift_role(obj['owner'], swift_role)
-        client = client_for_user(obj['owner'])
-        client.containers.create_container(obj['container'])
-        client.objects.create_object(
-            obj['container'], obj['name'],
-            _file_contents(obj['file']))
+    _parallel(_create_object, objects)
+
+
+def _destroy_object(obj):
+    client = client_for_user(obj['owner'])
+    r, body = client.objects.delete_object(obj['container'], obj['name'])
+    if not (200 <= int(r['status']) < 299):
+        raise ValueError("unable to destroy object: [%s] %s" % (r, body))
+
+
+def _destroy_container(owner_container):
+    owner, container = owner_container
+    client = client_for_user(owner)
+    try:
+        client.containers.delete_container(container)
+    except lib_exc.NotFound:
+        pass
+    except lib_exc.Conflict:
+        LOG.info("Container '%s' is not empty, not destroyed" % container)
 
 
 def destroy_objects(objects):
-    for obj in objects:
-        client = client_for_user(obj['owner'])
-        r, body = client.objects.delete_object(obj['container'], obj['name'])
-        if not (200 <= int(r['status']) < 299):
-            raise ValueError("unable to destroy object: [%s] %s" % (r, body))
+    if not objects:
+        return
+    LOG.info("Destroying objects")
+    _parallel(_destroy_object, objects)
+    containers = set((obj['owner'], obj['container']) for obj in objects)
+    _parallel(_destroy_container, containers)
 
 
 #######################
@@ -627,62 +702,76 @@ def _get_image_by_name(client, name):
     return None
 
 
+def _create_image(image):
+    client = client_for_user(image['owner'])
+
+    # DEPRECATED: 'format' was used for ami images
+    # Use 'disk_format' and 'container_format' instead
+    if 'format' in image:
+        LOG.warning("Deprecated: 'format' is deprecated for images "
+                    "description. Please use 'disk_format' and 'container_"
+                    "format' instead.")
+        image['disk_format'] = image['format']
+        image['container_format'] = image['format']
+
+    # only upload a new image if the name isn't there
+    if _get_image_by_name(client, image['name']):
+        LOG.info("Image '%s' already exists" % image['name'])
+        return
+
+    # special handling for 3 part image
+    extras = {}
+    if image['disk_format'] == 'ami':
+        name, fname = _resolve_image(image, 'aki')
+        aki = client.images.create_image(
+            'javelin_' + name, 'aki', 'aki')
+        client.images.store_image_file(aki.get('id'), open(fname, 'r'))
+        extras['kernel_id'] = aki.get('id')
+
+        name, fname = _resolve_image(image, 'ari')
+        ari = client.images.create_image(
+            'javelin_' + name, 'ari', 'ari')
+        client.images.store_image_file(ari.get('id'), open(fname, 'r'))
+        extras['ramdisk_id'] = ari.get('id')
+
+    _, fname = _resolve_image(image, 'file')
+    body = client.images.create_image(
+        image['name'], image['container_format'],
+        image['disk_format'], **extras)
+    image_id = body.get('id')
+    client.images.store_image_file(image_id, open(fname, 'r'))
+
+
 def create_images(images):
     if not images:
         return
     LOG.info("Creating images")
-    for image in images:
-        client = client_for_user(image['owner'])
-
-        # DEPRECATED: 'format' was used for ami images
-        # Use 'disk_format' and 'container_format' instead
-        if 'format' in image:
-            LOG.warning("Deprecated: 'format' is deprecated for images "
-                        "description. Please use 'disk_format' and 'container_"
-                        "format' instead.")
-            image['disk_format'] = image['format']
-            image['container_format'] = image['format']
-
-        # only upload a new image if the name isn't there
-        if _get_image_by_name(client, image['name']):
-            LOG.info("Image '%s' already exists" % image['name'])
-            continue
+    _parallel(_create_image, images)
+
 
-        # special handling for 3 part image
-        extras = {}
-        if image['disk_format'] == 'ami':
-            name, fname = _resolve_image(image, 'aki')
-            aki = client.images.create_image(
-                'javelin_' + name, 'aki', 'aki')
-            client.images.store_image_file(aki.get('id'), open(fname, 'r'))
-            extras['kernel_id'] = aki.get('id')
-
-            name, fname = _resolve_image(image, 'ari')
-            ari = client.images.create_image(
-                'javelin_' + name, 'ari', 'ari')
-            client.images.store_image_file(ari.get('id'), open(fname, 'r'))
-            extras['ramdisk_id'] = ari.get('id')
-
-        _, fname = _resolve_image(image, 'file')
-        body = client.images.create_image(
-            image['name'], image['container_format'],
-            image['disk_format'], **extras)
-        image_id = body.get('id')
-        client.images.store_image_file(image_id, open(fname, 'r'))
+def _destroy_image(image):
+    client = client_for_user(image['owner'])
+
+    response = _get_image_by_name(client, image['name'])
+    if not response:
+        LOG.info("Image '%s' does not exists" % image['name'])
+        return
+    client.images.delete_image(response['id'])
+
+    # the kernel and ramdisk of 3 part images are images too
+    if image.get('disk_format', image.get('format')) == 'ami':
+        for imgtype in ('aki', 'ari'):
+            name = 'javelin_' + image[imgtype]
+            response = _get_image_by_name(client, name)
+            if response:
+                client.images.delete_image(response['id'])
 
 
 def destroy_images(images):
     if not images:
         return
     LOG.info("Destroying images")
-    for image in images:
-        client = client_for_user(image['owner'])
-
-        response = _get_image_by_name(client, image['name'])
-        if not response:
-            LOG.info("Image '%s' does not exists" % image['name'])
-            continue
-        client.images.delete_image(response['id'])
+    _parallel(_destroy_image, images)
 
 
 #######################
@@ -721,107 +810,139 @@ def _get_resource_by_name(client, resource, name):
     raise ValueError('%s not found in %s resources' % (name, resource))
 
 
+def _create_network(network):
+    client = client_for_user(network['owner'])
+
+    # only create a network if the name isn't here
+    body = client.networks.list_networks()
+    if any(item['name'] == network['name'] for item in body['networks']):
+        LOG.warning("Dupplicated network name: %s" % network['name'])
+        return
+
+    client.networks.create_network(name=network['name'])
+
+
 def create_networks(networks):
     LOG.info("Creating networks")
-    for network in networks:
-        client = client_for_user(network['owner'])
+    _parallel(_create_network, networks)
 
-        # only create a network if the name isn't here
-        body = client.networks.list_networks()
-        if any(item['name'] == network['name'] for item in body['networks']):
-            LOG.warning("Dupplicated network name: %s" % network['name'])
-            continue
 
-        client.networks.create_network(name=network['name'])
+def _destroy_network(network):
+    client = client_for_user(network['owner'])
+    network_id = _get_resource_by_name(client.networks, 'networks',
+                                       network['name'])['id']
+    client.networks.delete_network(network_id)
 
 
 def destroy_networks(networks):
-    LOG.info("Destroying subnets")
-    for network in networks:
-        client = client_for_user(network['owner'])
-        network_id = _get_resource_by_name(client.networks, 'networks',
-                                           network['name'])['id']
-        client.networks.delete_network(network_id)
+    LOG.info("Destroying networks")
+    _parallel(_destroy_network, networks)
+
+
+def _create_subnet(subnet):
+    client = client_for_user(subnet['owner'])
+
+    network = _get_resource_by_name(client.networks, 'networks',
+                                    subnet['network'])
+    ip_version = netaddr.IPNetwork(subnet['range']).version
+    # ensure we don't overlap with another subnet in the network
+    try:
+        client.networks.create_subnet(network_id=network['id'],
+                                      cidr=subnet['range'],
+                                      name=subnet['name'],
+                                      ip_version=ip_version)
+    except lib_exc.BadRequest as e:
+        is_overlapping_cidr = 'overlaps with another subnet' in str(e)
+        if not is_overlapping_cidr:
+            raise
 
 
 def create_subnets(subnets):
     LOG.info("Creating subnets")
-    for subnet in subnets:
-        client = client_for_user(subnet['owner'])
+    _parallel(_create_subnet, subnets)
 
-        network = _get_resource_by_name(client.networks, 'networks',
-                                        subnet['network'])
-        ip_version = netaddr.IPNetwork(subnet['range']).version
-        # ensure we don't overlap with another subnet in the network
-        try:
-            client.networks.create_subnet(network_id=network['id'],
-                                          cidr=subnet['range'],
-                                          name=subnet['name'],
-                                          ip_version=ip_version)
-        except lib_exc.BadRequest as e:
-            is_overlapping_cidr = 'overlaps with another subnet' in str(e)
-            if not is_overlapping_cidr:
-                raise
+
+def _destroy_subnet(subnet):
+    client = client_for_user(subnet['owner'])
+    subnet_id = _get_resource_by_name(client.networks,
+                                      'subnets', subnet['name'])['id']
+    client.networks.delete_subnet(subnet_id)
 
 
 def destroy_subnets(subnets):
     LOG.info("Destroying subnets")
-    for subnet in subnets:
-        client = client_for_user(subnet['owner'])
-        subnet_id = _get_resource_by_name(client.networks,
-                                          'subnets', subnet['name'])['id']
-        client.networks.delete_subnet(subnet_id)
+    _parallel(_destroy_subnet, subnets)
+
+
+def _create_router(router):
+    client = client_for_user(router['owner'])
+
+    # only create a router if the name isn't here
+    body = client.networks.list_routers()
+    if any(item['name'] == router['name'] for item in body['routers']):
+        LOG.warning("Dupplicated router name: %s" % router['name'])
+        return
+
+    client.networks.create_router(router['name'])
 
 
 def create_routers(routers):
     LOG.info("Creating routers")
-    for router in routers:
-        client = client_for_user(router['owner'])
+    _parallel(_create_router, routers)
 
-        # only create a router if the name isn't here
-        body = client.networks.list_routers()
-        if any(item['name'] == router['name'] for item in body['routers']):
-            LOG.warning("Dupplicated router name: %s" % router['name'])
-            continue
 
-        client.networks.create_router(router['name'])
+def _destroy_router(router):
+    client = client_for_user(router['owner'])
+    router_id = _get_resource_by_name(client.networks,
+                                      'routers', router['name'])['id']
+    client.networks.delete_router(router_id)
 
 
 def destroy_routers(routers):
     LOG.info("Destroying routers")
-    for router in routers:
-        client = client_for_user(router['owner'])
-        router_id = _get_resource_by_name(client.networks,
-                                          'routers', router['name'])['id']
-        for subnet in router['subnet']:
-            subnet_id = _get_resource_by_name(client.networks,
-                                              'subnets', subnet)['id']
-            client.networks.remove_router_interface_with_subnet_id(router_id,
-                                                                   subnet_id)
-        client.networks.delete_router(router_id)
+    _parallel(_destroy_router, routers)
+
+
+def _add_router_interface(router):
+    client = client_for_user(router['owner'])
+    router_id = _get_resource_by_name(client.networks,
+                                      'routers', router['name'])['id']
+
+    for subnet in router['subnet']:
+        subnet_id = _get_resource_by_name(client.networks,
+                                          'subnets', subnet)['id']
+        # connect routers to their subnets
+        client.networks.add_router_interface_with_subnet_id(router_id,
+                                                            subnet_id)
+    # connect routers to exteral network if set to "gateway"
+    if router['gateway']:
+        if CONF.network.public_network_id:
+            ext_net = CONF.network.public_network_id
+            client.networks._update_router(
+                router_id, set_enable_snat=True,
+                external_gateway_info={"network_id": ext_net})
+        else:
+            raise ValueError('public_network_id is not configured.')
 
 
 def add_router_interface(routers):
-    for router in routers:
-        client = client_for_user(router['owner'])
-        router_id = _get_resource_by_name(client.networks,
-                                          'routers', router['name'])['id']
-
-        for subnet in router['subnet']:
-            subnet_id = _get_resource_by_name(client.networks,
-                                              'subnets', subnet)['id']
-            # connect routers to their subnets
-            client.networks.add_router_interface_with_subnet_id(router_id,
-                                                                subnet_id)
-        # connect routers to exteral network if set to "gateway"
-        if router['gateway']:
-            if CONF.network.public_network_id:
-                ext_net = CONF.network.public_network_id
-                client.networks._update_router(
-                    router_id, set_enable_snat=True,
-                    external_gateway_info={"network_id": ext_net})
-            else:
-                raise ValueError('public_network_id is not configured.')
+    _parallel(_add_router_interface, routers)
+
+
+def _remove_router_interface(router):
+    client = client_for_user(router['owner'])
+    router_id = _get_resource_by_name(client.networks,
+                                      'routers', router['name'])['id']
+    for subnet in router['subnet']:
+        subnet_id = _get_resource_by_name(client.networks,
+                                          'subnets', subnet)['id']
+        client.networks.remove_router_interface_with_subnet_id(router_id,
+                                                               subnet_id)
+
+
+def remove_router_interface(routers):
+    LOG.info("Removing router interfaces")
+    _parallel(_remove_router_interface, routers)
 
 
 #######################
@@ -846,94 +967,134 @@ def _get_flavor_by_name(client, name):
     return None
 
 
+def _create_server(server):
+    client = client_for_user(server['owner'])
+
+    if _get_server_by_name(client, server['name']):
+        LOG.info("Server '%s' already exists" % server['name'])
+        return None
+
+    image_id = _get_image_by_name(client, server['image'])['id']
+    flavor_id = _get_flavor_by_name(client, server['flavor'])['id']
+    # validate neutron is enabled and ironic disabled
+    kwargs = dict()
+    if (CONF.service_available.neutron and
+            not CONF.baremetal.driver_enabled and server.get('networks')):
+        get_net_id = lambda x: (_get_resource_by_name(
+            client.networks, 'networks', x)['id'])
+        kwargs['networks'] = [{'uuid': get_net_id(network)}
+                              for network in server['networks']]
+    body = client.servers.create_server(
+        server['name'], image_id, flavor_id, **kwargs)
+    return body['id']
+
+
+def _setup_server(server_and_id):
+    server, server_id = server_and_id
+    client = client_for_user(server['owner'])
+    # create to security group(s) after server spawning
+    for secgroup in server['secgroups']:
+        client.servers.add_security_group(server_id, secgroup)
+    if CONF.compute.use_floatingip_for_ssh:
+        floating_ip_pool = server.get('floating_ip_pool')
+        floating_ip = client.floating_ips.create_floating_ip(
+            pool_name=floating_ip_pool)
+        client.floating_ips.associate_floating_ip_to_server(
+            floating_ip['ip'], server_id)
+
+
+def _wait_for_servers_active(client, server_ids):
+    waiters.wait_for_servers_status(client.servers, server_ids, 'ACTIVE')
+
+
 def create_servers(servers):
     if not servers:
         return
     LOG.info("Creating servers")
-    for server in servers:
-        client = client_for_user(server['owner'])
+    server_ids = _parallel(_create_server, servers)
+    _wait_by_owner(servers, server_ids, _wait_for_servers_active)
+    _parallel(_setup_server, [(server, server_id) for server, server_id
+                              in zip(servers, server_ids)
+                              if server_id is not None])
+
 
-        if _get_server_by_name(client, server['name']):
-            LOG.info("Server '%s' already exists" % server['name'])
+def _release_floating_ips(client, server_id):
+    for floating_ip in client.floating_ips.list_floating_ips():
+        if floating_ip['instance_id'] != server_id:
             continue
+        client.floating_ips.disassociate_floating_ip_from_server(
+            floating_ip['ip'], server_id)
+        client.floating_ips.delete_floating_ip(floating_ip['id'])
 
-        image_id = _get_image_by_name(client, server['image'])['id']
-        flavor_id = _get_flavor_by_name(client, server['flavor'])['id']
-        # validate neutron is enabled and ironic disabled
-        kwargs = dict()
-        if (CONF.service_available.neutron and
-                not CONF.baremetal.driver_enabled and server.get('networks')):
-            get_net_id = lambda x: (_get_resource_by_name(
-                client.networks, 'networks', x)['id'])
-            kwargs['networks'] = [{'uuid': get_net_id(network)}
-                                  for network in server['networks']]
-        body = client.servers.create_server(
-            server['name'], image_id, flavor_id, **kwargs)
-        server_id = body['id']
-        client.servers.wait_for_server_status(server_id, 'ACTIVE')
-        # create to security group(s) after server spawning
-        for secgroup in server['secgroups']:
-            client.servers.add_security_group(server_id, secgroup)
-        if CONF.compute.use_floatingip_for_ssh:
-            floating_ip_pool = server.get('floating_ip_pool')
-            floating_ip = client.floating_ips.create_floating_ip(
-                pool_name=floating_ip_pool)
-            client.floating_ips.associate_floating_ip_to_server(
-                floating_ip['ip'], server_id)
+
+def _destroy_server(server):
+    client = client_for_user(server['owner'])
+
+    response = _get_server_by_name(client, server['name'])
+    if not response:
+        LOG.info("Server '%s' does not exist" % server['name'])
+        return None
+
+    if CONF.compute.use_floatingip_for_ssh:
+        _release_floating_ips(client, response['id'])
+    client.servers.delete_server(response['id'])
+    return response['id']
+
+
+def _wait_for_servers_termination(client, server_ids):
+    fetch = waiters.list_fetcher(
+        lambda: client.servers.list_servers(detail=True), key='servers')
+    _wait_for_deletion(client.servers, fetch, server_ids, 'Server')
 
 
 def destroy_servers(servers):
     if not servers:
         return
     LOG.info("Destroying servers")
-    for server in servers:
-        client = client_for_user(server['owner'])
+    server_ids = _parallel(_destroy_server, servers)
+    _wait_by_owner(servers, server_ids, _wait_for_servers_termination)
 
-        response = _get_server_by_name(client, server['name'])
-        if not response:
-            LOG.info("Server '%s' does not exist" % server['name'])
-            continue
 
-        # TODO(EmilienM): disassociate floating IP from server and release it.
-        client.servers.delete_server(response['id'])
-        client.servers.wait_for_server_termination(response['id'],
-                                                   ignore_error=True)
+def _create_secgroup(secgroup):
+    client = client_for_user(secgroup['owner'])
+
+    # only create a security group if the name isn't here
+    # i.e. a security group may be used by another server
+    # only create a router if the name isn't here
+    body = client.secgroups.list_security_groups()
+    if any(item['name'] == secgroup['name'] for item in body):
+        LOG.warning("Security group '%s' already exists" %
+                    secgroup['name'])
+        return
+
+    body = client.secgroups.create_security_group(
+        name=secgroup['name'], description=secgroup['description'])
+    secgroup_id = body['id']
+    # for each security group, create the rules
+    for rule in secgroup['rules']:
+        ip_proto, from_port, to_port, cidr = rule.split()
+        client.secrules.create_security_group_rule(
+            parent_group_id=secgroup_id, ip_protocol=ip_proto,
+            from_port=from_port, to_port=to_port, cidr=cidr)
 
 
 def create_secgroups(secgroups):
     LOG.info("Creating security groups")
-    for secgroup in secgroups:
-        client = client_for_user(secgroup['owner'])
-
-        # only create a security group if the name isn't here
-        # i.e. a security group may be used by another server
-        # only create a router if the name isn't here
-        body = client.secgroups.list_security_groups()
-        if any(item['name'] == secgroup['name'] for item in body):
-            LOG.warning("Security group '%s' already exists" %
-                        secgroup['name'])
-            continue
+    _parallel(_create_secgroup, secgroups)
 
-        body = client.secgroups.create_security_group(
-            name=secgroup['name'], description=secgroup['description'])
-        secgroup_id = body['id']
-        # for each security group, create the rules
-        for rule in secgroup['rules']:
-            ip_proto, from_port, to_port, cidr = rule.split()
-            client.secrules.create_security_group_rule(
-                parent_group_id=secgroup_id, ip_protocol=ip_proto,
-                from_port=from_port, to_port=to_port, cidr=cidr)
+
+def _destroy_secgroup(secgroup):
+    client = client_for_user(secgroup['owner'])
+    sg_id = _get_resource_by_name(client.secgroups,
+                                  'security_groups',
+                                  secgroup['name'])
+    # sg rules are deleted automatically
+    client.secgroups.delete_security_group(sg_id['id'])
 
 
 def destroy_secgroups(secgroups):
     LOG.info("Destroying security groups")
-    for secgroup in secgroups:
-        client = client_for_user(secgroup['owner'])
-        sg_id = _get_resource_by_name(client.secgroups,
-                                      'security_groups',
-                                      secgroup['name'])
-        # sg rules are deleted automatically
-        client.secgroups.delete_security_group(sg_id['id'])
+    _parallel(_destroy_secgroup, secgroups)
 
 
 #######################
@@ -950,40 +1111,89 @@ def _get_volume_by_name(client, name):
     return None
 
 
+def _create_volume(volume):
+    client = client_for_user(volume['owner'])
+
+    # only create a volume if the name isn't here
+    if _get_volume_by_name(client, volume['name']):
+        LOG.info("volume '%s' already exists" % volume['name'])
+        return None
+
+    size = volume['gb']
+    v_name = volume['name']
+    body = client.volumes.create_volume(size=size,
+                                        display_name=v_name)
+    return body['id']
+
+
+def _wait_for_volumes_available(client, volume_ids):
+    waiters.wait_for_volumes_status(client.volumes, volume_ids, 'available')
+
+
 def create_volumes(volumes):
     if not volumes:
         return
     LOG.info("Creating volumes")
-    for volume in volumes:
-        client = client_for_user(volume['owner'])
+    volume_ids = _parallel(_create_volume, volumes)
+    _wait_by_owner(volumes, volume_ids, _wait_for_volumes_available)
 
-        # only create a volume if the name isn't here
-        if _get_volume_by_name(client, volume['name']):
-            LOG.info("volume '%s' already exists" % volume['name'])
-            continue
 
-        size = volume['gb']
-        v_name = volume['name']
-        body = client.volumes.create_volume(size=size,
-                                            display_name=v_name)
-        client.volumes.wait_for_volume_status(body['id'], 'available')
+def _detach_volume(volume):
+    client = client_for_user(volume['owner'])
+    response = _get_volume_by_name(client, volume['name'])
+    if not response:
+        return None
+    volume_id = response['id']
+    if not client.volumes.show_volume(volume_id).get('attachments'):
+        return None
+    client.volumes.detach_volume(volume_id)
+    return volume_id
+
+
+def detach_volumes(volumes):
+    """Detaches the attached volumes, and waits for them to be available"""
+    if not volumes:
+        return
+    LOG.info("Detaching volumes")
+    volume_ids = _parallel(_detach_volume, volumes)
+    _wait_by_owner(volumes, volume_ids, _wait_for_volumes_available)
+
+
+def _destroy_volume(volume):
+    client = client_for_user(volume['owner'])
+    response = _get_volume_by_name(client, volume['name'])
+    if not response:
+        LOG.info("Volume '%s' does not exist" % volume['name'])
+        return None
+    client.volumes.delete_volume(response['id'])
+    return response['id']
+
+
+def _wait_for_volumes_deletion(client, volume_ids):
+    fetch = waiters.list_fetcher(
+        lambda: client.volumes.list_volumes(detail=True))
+    _wait_for_deletion(client.volumes, fetch, volume_ids, 'Volume')
 
 
 def destroy_volumes(volumes):
-    for volume in volumes:
-        client = client_for_user(volume['owner'])
-        volume_id = _get_volume_by_name(client, volume['name'])['id']
-        client.volumes.detach_volume(volume_id)
-        client.volumes.delete_volume(volume_id)
+    if not volumes:
+        return
+    detach_volumes(volumes)
+    LOG.info("Destroying volumes")
+    volume_ids = _parallel(_destroy_volume, volumes)
+    _wait_by_owner(volumes, volume_ids, _wait_for_volumes_deletion)
+
+
+def _attach_volume(volume):
+    client = client_for_user(volume['owner'])
+    server_id = _get_server_by_name(client, volume['server'])['id']
+    volume_id = _get_volume_by_name(client, volume['name'])['id']
+    device = volume['device']
+    client.volumes.attach_volume(volume_id, server_id, device)
 
 
 def attach_volumes(volumes):
-    for volume in volumes:
-        client = client_for_user(volume['owner'])
-        server_id = _get_server_by_name(client, volume['server'])['id']
-        volume_id = _get_volume_by_name(client, volume['name'])['id']
-        device = volume['device']
-        client.volumes.attach_volume(volume_id, server_id, device)
+    _parallel(_attach_volume, volumes)
 
 
 #######################
@@ -992,50 +1202,142 @@ def attach_volumes(volumes):
 #
 #######################
 
-def create_resources():
-    LOG.info("Creating Resources")
-    # first create keystone level resources, and we need to be admin
-    # for those.
-    create_tenants(RES['tenants'])
-    create_users(RES['users'])
-    collect_users(RES['users'])
+Step = collections.namedtuple('Step', ['name', 'resources', 'create',
+                                       'destroy', 'requires'])
+
 
-    # next create resources in a well known order
-    create_objects(RES['objects'])
-    create_images(RES['images'])
+def _steps():
+    """Returns the steps creating and destroying the resources
 
+    A step requires the steps creating the resources it uses, and is
+    destroyed before them.
+    """
+    steps = [
+        Step('tenants', 'tenants', create_tenants, destroy_tenants, []),
+        Step('users', 'users', create_users, destroy_users, ['tenants']),
+        Step('collect_users', 'users', collect_users, None, ['users']),
+        Step('objects', 'objects', create_objects, destroy_objects,
+             ['collect_users']),
+        Step('images', 'images', create_images, destroy_images,
+             ['collect_users']),
+        Step('secgroups', 'secgroups', create_secgroups, destroy_secgroups,
+             ['collect_users']),
+        Step('volumes', 'volumes', create_volumes, destroy_volumes,
+             ['collect_users']),
+    ]
+    server_requires = ['images', 'secgroups']
     # validate neutron is enabled and ironic is disabled
     if CONF.service_available.neutron and not CONF.baremetal.driver_enabled:
-        create_networks(RES['networks'])
-        create_subnets(RES['subnets'])
-        create_routers(RES['routers'])
-        add_router_interface(RES['routers'])
-
-    create_secgroups(RES['secgroups'])
-    create_volumes(RES['volumes'])
+        steps.extend([
+            Step('networks', 'networks', create_networks, destroy_networks,
+                 ['collect_users']),
+            Step('subnets', 'subnets', create_subnets, destroy_subnets,
+                 ['networks']),
+            Step('routers', 'routers', create_routers, destroy_routers,
+                 ['collect_users']),
+            Step('router_interfaces', 'routers', add_router_interface,
+                 remove_router_interface, ['routers', 'subnets']),
+        ])
+        server_requires.append('router_interfaces')
 
     # Only attempt attaching the volumes if servers are defined in the
     # resourcefile
     if 'servers' in RES:
-        create_servers(RES['servers'])
-        attach_volumes(RES['volumes'])
+        steps.extend([
+            Step('servers', 'servers', create_servers, destroy_servers,
+                 server_requires),
+            Step('volume_attachments', 'volumes', attach_volumes,
+                 detach_volumes, ['servers', 'volumes']),
+        ])
+    return steps
+
+
+def _run_steps(steps, action, reverse=False):
+    """Runs the action of the steps along their dependencies
+
+    A step runs once the steps it requires are done, or with reverse once
+    the steps requiring it are done. Up to CONCURRENCY steps run at once.
+    Once a step fails no other step is started, and its error is raised
+    once the running steps are done.
+
+    :param action: 'create' or 'destroy'
+    """
+    names = set(step.name for step in steps)
+    waiting_for = dict((step.name, set()) for step in steps)
+    unblocks = dict((step.name, []) for step in steps)
+    for step in steps:
+        for required in step.requires:
+            if required not in names:
+                continue
+            if reverse:
+                waiting_for[required].add(step.name)
+                unblocks[step.name].append(required)
+            else:
+                waiting_for[step.name].add(required)
+                unblocks[required].append(step.name)
+    by_name = dict((step.name, step) for step in steps)
+    # NOTE: the order of the steps is kept among the ready ones
+    order = [step.name for step in steps]
+    if reverse:
+        order.reverse()
+
+    done = moves.queue.Queue()
+
+    def run(name):
+        step = by_name[name]
+        func = getattr(step, action)
+        try:
+            if func is not None:
+                func(RES[step.resources])
+        except Exception:
+            done.put((name, sys.exc_info()))
+        else:
+            done.put((name, None))
+
+    pool = ThreadPool(max(CONCURRENCY, 1))
+    running = set()
+    pending = list(order)
+    error = None
+    try:
+        while True:
+            if error is None:
+                ready = [name for name in pending if not waiting_for[name]]
+                for name in ready:
+                    pending.remove(name)
+                    running.add(name)
+                    LOG.debug("Starting step %s" % name)
+                    pool.apply_async(run, (name,))
+            if not running:
+                break
+            name, exc_info = done.get()
+            running.remove(name)
+            if exc_info is not None:
+                LOG.error("Step %s failed" % name)
+                error = error or exc_info
+                continue
+            for blocked in unblocks[name]:
+                waiting_for[blocked].discard(name)
+    finally:
+        pool.close()
+        pool.join()
+    if error is not None:
+        six.reraise(*error)
+    if pending:
+        raise RuntimeError("Steps %s have circular dependencies" %
+                           ", ".join(pending))
+
+
+def create_resources():
+    LOG.info("Creating Resources")
+    # keystone level resources are created first, as admin, then the
+    # resources of each owner once the resources they use exist.
+    _run_steps(_steps(), 'create')
 
 
 def destroy_resources():
     LOG.info("Destroying Resources")
     # Destroy in inverse order of create
-    destroy_servers(RES['servers'])
-    destroy_images(RES['images'])
-    destroy_objects(RES['objects'])
-    destroy_volumes(RES['volumes'])
-    if CONF.service_available.neutron and not CONF.baremetal.driver_enabled:
-        destroy_routers(RES['routers'])
-        destroy_subnets(RES['subnets'])
-        destroy_networks(RES['networks'])
-    destroy_secgroups(RES['secgroups'])
-    destroy_users(RES['users'])
-    destroy_tenants(RES['tenants'])
-    LOG.warn("Destroy mode incomplete")
+    _run_steps(_steps(), 'destroy', reverse=True)
 
 
 def get_options():
@@ -1074,6 +1376,13 @@ def get_options():
                         metavar='<auth-tenant-name>',
                         default=os.environ.get('OS_TENANT_NAME'),
                         help=('Defaults to env[OS_TENANT_NAME].'))
+    parser.add_argument('--concurrency',
+                        type=int,
+                        default=CONCURRENCY,
+                        metavar='<count>',
+                        help=('Number of steps, and of resources of a step, '
+                              'processed at once. Defaults to %d.' %
+                              CONCURRENCY))
 
     OPTS = parser.parse_args()
     if OPTS.mode not in ('create', 'check', 'destroy'):
@@ -1092,7 +1401,9 @@ def setup_logging():
 
 def main():
     global RES
+    global CONCURRENCY
     get_options()
+    CONCURRENCY = OPTS.concurrency
     setup_logging()
     RES.update(load_resources(OPTS.resources))
 
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Utility for listing the tempest tests without importing them
+============================================================
+
+Lists the ids of the tempest tests from a static index of the test modules,
+see tempest.test_discover.index. The index is cached and only the modules
+changed since the previous listing are parsed again, so listing the tests
+takes a fraction of the time of ``testr list-tests``::
+
+    tempest-list-tests --attr smoke 'tempest\\.api\\.compute' > smoke.list
+    testr run --load-list smoke.list
+
+The tests of the few modules generating their tests at import time are
+listed by importing these modules only, unless --static-only is given.
+"""
+
+import argparse
+import os
+import re
+import unittest
+
+from tempest.test_discover import index
+
+
+def get_options(args=None):
+    parser = argparse.ArgumentParser(
+        description='List the tempest tests from a static index.')
+    parser.add_argument('--top-dir', default=os.getcwd(),
+                        help='Directory of the tempest source tree, by '
+                             'default the current directory')
+    parser.add_argument('--index', default='.tempest-test-index.json',
+                        help='Cache of the index, relative to the top '
+                             'directory')
+    parser.add_argument('--attr', action='append', default=[],
+                        help='Only list the tests with this attribute, '
+                             'such as smoke or a service name')
+    parser.add_argument('--static-only', action='store_true',
+                        help='Do not import the modules generating their '
+                             'tests')
+    parser.add_argument('filters', nargs='*',
+                        help='Regular expressions the test ids must match '
+                             'one of')
+    return parser.parse_args(args)
+
+
+def _loaded_test_ids(module_names):
+    loader = unittest.TestLoader()
+
+    def ids(suite):
+        for test in suite:
+            if isinstance(test, unittest.TestSuite):
+                for test_id in ids(test):
+                    yield test_id
+            else:
+                yield test.id()
+    for module_name in module_names:
+        for test_id in ids(loader.loadTestsFromName(module_name)):
+            yield test_id
+
+
+def _attrs(test_id):
+    match = re.search(r'\[(.*)\]$', test_id)
+    return set(match.group(1).split(',')) if match else set()
+
+
+def list_tests(opts):
+    test_index = index.TestIndex(
+        opts.top_dir, os.path.join(opts.top_dir, opts.index))
+    test_index.update()
+    test_ids = list(test_index.test_ids())
+    if not opts.static_only:
+        test_ids.extend(_loaded_test_ids(test_index.dynamic_modules()))
+    filters = [re.compile(f) for f in opts.filters]
+    for test_id in test_ids:
+        if filters and not any(f.search(test_id) for f in filters):
+            continue
+        if not set(opts.attr).issubset(_attrs(test_id)):
+            continue
+        yield test_id
+
+
+def main(opts=None):
+    if not opts:
+        opts = get_options()
+    for test_id in list_tests(opts):
+        print(test_id)
+
+
+if __name__ == "__main__":
+    main()
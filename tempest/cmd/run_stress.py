@@ -16,6 +16,7 @@
 
 import argparse
 import inspect
+import os
 import sys
 try:
     from unittest import loader
@@ -80,6 +81,9 @@ parser.add_argument('-S', '--stop', action='store_true',
                     default=False, help="Stop on first error")
 parser.add_argument('-n', '--number', type=int,
                     help="How often an action is executed for each process")
+parser.add_argument('-m', '--metrics-file',
+                    help="Write latency percentiles and throughput of each "
+                         "action as JSON to this file")
 group = parser.add_mutually_exclusive_group(required=True)
 group.add_argument('-a', '--all', action='store_true',
                    help="Execute all stress tests")
@@ -95,6 +99,8 @@ group.add_argument('-t', "--tests", nargs='?',
 def main():
     ns = parser.parse_args()
     result = 0
+    if ns.metrics_file and os.path.exists(ns.metrics_file):
+        os.remove(ns.metrics_file)
     if not ns.all:
         tests = json.load(open(ns.tests, 'r'))
     else:
@@ -108,7 +114,8 @@ def main():
             step_result = driver.stress_openstack([test],
                                                   duration,
                                                   ns.number,
-                                                  ns.stop)
+                                                  ns.stop,
+                                                  ns.metrics_file)
             # NOTE(mkoderer): we just save the last result code
             if (step_result != 0):
                 result = step_result
@@ -118,7 +125,8 @@ def main():
         result = driver.stress_openstack(tests,
                                          ns.duration,
                                          ns.number,
-                                         ns.stop)
+                                         ns.stop,
+                                         ns.metrics_file)
     return result
 
 
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Utility for splitting a tempest run over workers by measured cost
+================================================================
+
+Test classes record their wall time and the servers and volumes they create
+in the file set by the [debug] test_history_file option. This command reads
+that history and splits the tests of a list, such as the output of
+``testr list-tests``, over a number of workers::
+
+    testr list-tests > tests.list
+    tempest-schedule-tests --history /var/lib/tempest/history.json \\
+        --workers 4 --max-servers 10 tests.list schedule/
+
+It writes ``schedule/worker-N.list`` with the test ids of each worker, to be
+run with ``--load-list``, and ``schedule/schedule.json`` with the classes and
+estimated time of each worker.
+
+The --max-servers and --max-volumes limits are the quotas of the tenant, when
+the workers share the same credentials. Classes are then spread so that the
+classes running at the same time do not exceed them.
+"""
+
+import argparse
+import sys
+
+from oslo_log import log as logging
+
+from tempest.test_discover import scheduler
+
+LOG = logging.getLogger(__name__)
+
+
+def get_options(args=None):
+    parser = argparse.ArgumentParser(
+        description='Split the tests of a list over workers, using the '
+                    'recorded cost of their classes.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--history', required=True,
+                        help='Test history file, set as [debug] '
+                             'test_history_file in previous runs')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='Number of workers')
+    parser.add_argument('--max-servers', type=int,
+                        help='Servers quota of a tenant shared by the '
+                             'workers')
+    parser.add_argument('--max-volumes', type=int,
+                        help='Volumes quota of a tenant shared by the '
+                             'workers')
+    parser.add_argument('--default-cost', type=float,
+                        help='Time of the classes without history, by '
+                             'default the median time of the known ones')
+    parser.add_argument('test_list',
+                        help="File of test ids, one per line, '-' for "
+                             "stdin")
+    parser.add_argument('output_dir',
+                        help='Directory of the worker lists')
+    return parser.parse_args(args)
+
+
+def main(opts=None):
+    if not opts:
+        opts = get_options()
+    if opts.test_list == '-':
+        test_ids = sys.stdin.read().split()
+    else:
+        with open(opts.test_list) as f:
+            test_ids = f.read().split()
+    limits = {}
+    if opts.max_servers is not None:
+        limits['servers'] = opts.max_servers
+    if opts.max_volumes is not None:
+        limits['volumes'] = opts.max_volumes
+
+    stats = scheduler.History(opts.history).load()
+    class_names = set(scheduler.class_id(test_id) for test_id in test_ids)
+    workers = scheduler.partition(class_names, stats, opts.workers,
+                                  limits=limits,
+                                  default_cost=opts.default_cost)
+    summary = scheduler.write_schedule(workers, test_ids, opts.output_dir)
+    unknown = len([name for name in class_names if name not in stats])
+    print("%d classes over %d workers, estimated time %.0fs, %d classes "
+          "without history" % (len(class_names), opts.workers,
+                               summary['makespan'], unknown))
+
+
+if __name__ == "__main__":
+    main()
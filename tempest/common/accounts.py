@@ -17,6 +17,7 @@ import os
 
 from oslo_concurrency import lockutils
 from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
 import six
 import yaml
 
@@ -208,6 +209,37 @@ class Accounts(cred_provider.CredentialProvider):
             if not os.listdir(self.accounts_dir):
                 os.rmdir(self.accounts_dir)
 
+    def _get_allocations(self):
+        """Returns a dict mapping allocated hashes to their owner name"""
+        allocations = {}
+        if not os.path.isdir(self.accounts_dir):
+            return allocations
+        for _hash in os.listdir(self.accounts_dir):
+            path = os.path.join(self.accounts_dir, _hash)
+            with open(path, 'r') as fd:
+                allocations[_hash] = fd.read()
+        return allocations
+
+    def get_stats(self):
+        """Returns the utilisation of the configured accounts
+
+        The result contains the total and allocated number of accounts,
+        the same numbers for each role and the owner of each allocated
+        account.
+        """
+        allocations = self._get_allocations()
+        owners = dict((k, v) for k, v in allocations.items()
+                      if k in self.hash_dict['creds'])
+        roles = {}
+        for role, hashes in self.hash_dict['roles'].items():
+            roles[role] = {
+                'total': len(hashes),
+                'allocated': len([h for h in hashes if h in owners])}
+        return {'total': len(self.hash_dict['creds']),
+                'allocated': len(owners),
+                'roles': roles,
+                'owners': owners}
+
     def get_hash(self, creds):
         for _hash in self.hash_dict['creds']:
             # Comparing on the attributes that are expected in the YAML
@@ -295,6 +327,74 @@ class Accounts(cred_provider.CredentialProvider):
         return net_creds
 
 
+class IndexedAccounts(Accounts):
+    """Credentials provider tracking allocations in a single index file
+
+    Instead of one lock file per allocated account, all the allocations are
+    kept in one JSON index mapping account hashes to their owner. The
+    external lock is only held for one small read and write of the index,
+    and free accounts are found with dict lookups, so allocation does not
+    slow down as the accounts file and the number of workers grow.
+    """
+
+    def __init__(self, identity_version=None, name=None):
+        super(IndexedAccounts, self).__init__(
+            identity_version=identity_version, name=name)
+        self.index_path = os.path.join(lockutils.get_lock_path(CONF),
+                                       'test_accounts.json')
+        self._match_hash_lists = {}
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r') as fd:
+                return json.loads(fd.read())
+        except IOError:
+            return {}
+
+    def _write_index(self, index):
+        if not index:
+            os.remove(self.index_path)
+            return
+        # Write to a temporary file and rename it over the index, so
+        # readers not holding the lock never see a partial index
+        tmp_path = '%s.%s' % (self.index_path, os.getpid())
+        with open(tmp_path, 'w') as fd:
+            fd.write(json.dumps(index))
+        os.rename(tmp_path, self.index_path)
+
+    def _get_match_hash_list(self, roles=None):
+        key = tuple(sorted(roles)) if roles else ()
+        if key not in self._match_hash_lists:
+            self._match_hash_lists[key] = list(
+                super(IndexedAccounts, self)._get_match_hash_list(roles))
+        return self._match_hash_lists[key]
+
+    def _get_free_hash(self, hashes):
+        with lockutils.lock('test_accounts_index', external=True):
+            index = self._read_index()
+            for _hash in hashes:
+                if _hash not in index:
+                    index[_hash] = self.name
+                    self._write_index(index)
+                    return _hash
+        names = set(index[_hash] for _hash in hashes)
+        msg = ('Insufficient number of users provided. %s have allocated all '
+               'the credentials for this allocation request' % ','.join(names))
+        raise exceptions.InvalidConfiguration(msg)
+
+    def remove_hash(self, hash_string):
+        with lockutils.lock('test_accounts_index', external=True):
+            index = self._read_index()
+            if index.pop(hash_string, None) is None:
+                LOG.warning('Expected account %s to be allocated in %s, but '
+                            'it was not' % (hash_string, self.index_path))
+            else:
+                self._write_index(index)
+
+    def _get_allocations(self):
+        return self._read_index()
+
+
 class NotLockingAccounts(Accounts):
     """Credentials provider which always returns the first and second
     configured accounts as primary and alt users.
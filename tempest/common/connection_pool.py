@@ -0,0 +1,173 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import socket
+import threading
+import time
+
+import httplib2
+from six.moves import http_client as httplib
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+# Errors of a request sent over a kept-alive connection which the server had
+# already closed, before any byte of the response was received
+STALE_CONNECTION_ERRORS = (httplib.BadStatusLine, socket.error)
+
+
+def is_stale_connection_error(exc):
+    """Whether a request failed because its reused connection was closed"""
+    return (isinstance(exc, STALE_CONNECTION_ERRORS) and
+            not isinstance(exc, socket.timeout))
+
+
+def body_position(body):
+    """Returns the position to send a request body again from
+
+    :returns: 0 for bodies which are not files, the current position of
+              seekable files, or None if the body can not be sent again
+    """
+    if not hasattr(body, 'read'):
+        return 0
+    try:
+        return body.tell()
+    except (AttributeError, IOError, OSError, ValueError):
+        return None
+
+
+class ConnectionPool(object):
+    """Keep-alive HTTP connections shared by several clients
+
+    Idle connections are kept per endpoint, at most max_size of them, and
+    are closed once they have been idle for idle_timeout seconds. The most
+    recently used connection of an endpoint is handed out first, so it is
+    the least likely to have been closed by the server.
+
+    The pool also keeps the last TLS session of each endpoint, so new
+    connections supporting it can resume the session instead of going
+    through a full handshake.
+    """
+
+    def __init__(self, max_size=10, idle_timeout=4):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._idle = {}
+        self._tls_sessions = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        """Returns an idle connection to the endpoint, or None"""
+        expired = []
+        now = time.time()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle and now - idle[0][1] > self.idle_timeout:
+                expired.append(idle.pop(0)[0])
+            self.evictions += len(expired)
+            if idle:
+                self.hits += 1
+                conn = idle.pop()[0]
+            else:
+                self.misses += 1
+                conn = None
+        for old_conn in expired:
+            old_conn.close()
+        return conn
+
+    def release(self, key, conn):
+        """Gives back a connection, once its last response was read"""
+        if getattr(conn, 'sock', None) is None:
+            # Closed by the client or the server
+            return
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_size:
+                idle.append((conn, time.time()))
+                return
+            self.evictions += 1
+        conn.close()
+
+    def get_tls_session(self, key):
+        return self._tls_sessions.get(key)
+
+    def set_tls_session(self, key, session):
+        self._tls_sessions[key] = session
+
+    def stats(self):
+        with self._lock:
+            idle = sum(len(conns) for conns in self._idle.values())
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'idle': idle}
+
+    def close(self):
+        with self._lock:
+            idle = self._idle
+            self._idle = {}
+        for conns in idle.values():
+            for conn, released in conns:
+                conn.close()
+
+
+def get_shared_pool(max_size=10, idle_timeout=4):
+    """Returns the connection pool shared by the whole process"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ConnectionPool(max_size, idle_timeout)
+        return _shared_pool
+
+
+class PooledHttp(httplib2.Http):
+    """httplib2 Http object taking its connections from a ConnectionPool
+
+    Unlike the ClosingHttp object used by default, requests are kept alive
+    and their connections are given back to the pool once the response is
+    read, so the clients sharing the pool reuse them.
+    """
+
+    def __init__(self, pool, **kwargs):
+        super(PooledHttp, self).__init__(**kwargs)
+        self.pool = pool
+
+    def clone(self):
+        """Returns a PooledHttp object of the same pool and settings
+
+        The connections of an Http object can not be used by several
+        threads at once, each thread uses its own clone. The clones still
+        share the connections of the pool.
+        """
+        return PooledHttp(
+            self.pool,
+            disable_ssl_certificate_validation=(
+                self.disable_ssl_certificate_validation),
+            ca_certs=self.ca_certs, timeout=self.timeout)
+
+    def request(self, uri, method='GET', *args, **kwargs):
+        scheme, authority, request_uri, defrag_uri = httplib2.urlnorm(uri)
+        key = scheme + ':' + authority
+        conn = self.pool.acquire(key)
+        if conn is not None:
+            self.connections[key] = conn
+        try:
+            return super(PooledHttp, self).request(uri, method, *args,
+                                                   **kwargs)
+        finally:
+            # NOTE: redirects may have opened connections to other hosts
+            for conn_key, conn in list(self.connections.items()):
+                self.pool.release(conn_key, conn)
+            self.connections.clear()
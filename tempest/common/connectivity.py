@@ -0,0 +1,327 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Reachability checks of many (source, destination) pairs at once.
+
+The destinations of the test node are probed together, every round: with
+ICMP echo requests sent from a single socket when the process may open an
+ICMP socket, else with concurrent ping processes, or with TCP connections.
+The destinations of a guest are pinged concurrently from a single ssh
+session to it, and the guests are probed concurrently.
+"""
+
+import collections
+import errno
+from multiprocessing.pool import ThreadPool
+import os
+import select
+import socket
+import struct
+import subprocess
+import time
+
+import netaddr
+from oslo_log import log as logging
+from tempest_lib.common.utils import misc as misc_utils
+from tempest_lib import exceptions as lib_exc
+
+LOG = logging.getLogger(__name__)
+
+LOCAL = 'localhost'
+
+METHODS = ('auto', 'icmp', 'ping', 'tcp')
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+
+def _checksum(data):
+    data = bytearray(data)
+    if len(data) % 2:
+        data.append(0)
+    total = sum(data[i] << 8 | data[i + 1] for i in range(0, len(data), 2))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+def echo_request(ident, seq, payload=b'tempest'):
+    """Returns an ICMP echo request packet"""
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    checksum = _checksum(header + payload)
+    return struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, ident,
+                       seq) + payload
+
+
+def _open_icmp_socket():
+    """Returns a raw or unprivileged ICMP socket, or None if not permitted"""
+    for sock_type in (socket.SOCK_RAW, socket.SOCK_DGRAM):
+        try:
+            return socket.socket(socket.AF_INET, sock_type,
+                                 socket.IPPROTO_ICMP)
+        except (socket.error, OSError):
+            continue
+    return None
+
+
+def icmp_probe(addresses, timeout=1):
+    """Sends an ICMP echo request to each IPv4 address at once
+
+    :returns: the addresses which replied within timeout seconds, or None
+              if the process may not open an ICMP socket
+    """
+    sock = _open_icmp_socket()
+    if sock is None:
+        return None
+    # NOTE: the kernel sets the identifier of the unprivileged sockets, the
+    # replies are matched by their source address
+    raw = sock.type == socket.SOCK_RAW
+    ident = os.getpid() & 0xffff
+    pending = set(addresses)
+    replied = set()
+    try:
+        for seq, address in enumerate(addresses):
+            try:
+                sock.sendto(echo_request(ident, seq & 0xffff), (address, 0))
+            except (socket.error, OSError) as e:
+                LOG.debug("Failed to send an echo request to %s: %s",
+                          address, e)
+        deadline = time.time() + timeout
+        while pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            readable, _, _ = select.select([sock], [], [], remaining)
+            if not readable:
+                break
+            data, (source, _) = sock.recvfrom(4096)
+            data = bytearray(data)
+            if raw:
+                # Raw sockets receive the IP header
+                data = data[(data[0] & 0x0f) * 4:]
+            if len(data) < 8 or data[0] != ICMP_ECHO_REPLY:
+                continue
+            if raw and struct.unpack('!H', bytes(data[4:6]))[0] != ident:
+                continue
+            if source in pending:
+                pending.discard(source)
+                replied.add(source)
+    finally:
+        sock.close()
+    return replied
+
+
+def ping_probe(addresses, timeout=1):
+    """Runs a ping process for each address, concurrently
+
+    :returns: the addresses which replied within timeout seconds
+    """
+    procs = []
+    for address in addresses:
+        cmd = 'ping6' if netaddr.IPAddress(address).version == 6 else 'ping'
+        procs.append((address, subprocess.Popen(
+            [cmd, '-c1', '-w%d' % max(int(timeout), 1), address],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)))
+    replied = set()
+    for address, proc in procs:
+        proc.communicate()
+        if proc.returncode == 0:
+            replied.add(address)
+    return replied
+
+
+def tcp_probe(addresses, port=22, timeout=1):
+    """Opens a TCP connection to the port of each address, concurrently
+
+    A refused connection counts as a reply, the address being reachable.
+
+    :returns: the addresses which replied within timeout seconds
+    """
+    socks = {}
+    replied = set()
+    for address in addresses:
+        family = (socket.AF_INET6 if netaddr.IPAddress(address).version == 6
+                  else socket.AF_INET)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(0)
+        result = sock.connect_ex((address, port))
+        if result in (0, errno.ECONNREFUSED):
+            replied.add(address)
+            sock.close()
+        elif result in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+            socks[sock] = address
+        else:
+            sock.close()
+    deadline = time.time() + timeout
+    try:
+        while socks:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            _, writable, _ = select.select([], list(socks), [], remaining)
+            if not writable:
+                break
+            for sock in writable:
+                address = socks.pop(sock)
+                error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if error in (0, errno.ECONNREFUSED):
+                    replied.add(address)
+                sock.close()
+    finally:
+        for sock in socks:
+            sock.close()
+    return replied
+
+
+class ConnectivityMatrix(object):
+    """Results of a connectivity check
+
+    The results map each (source, destination) pair to the seconds it took
+    to reach the expected connectivity, or to None if it did not within
+    the timeout. The source is LOCAL for the test node, else the host of
+    the ssh connection to the guest.
+    """
+
+    def __init__(self, should_succeed=True):
+        self.should_succeed = should_succeed
+        self.results = collections.OrderedDict()
+
+    @property
+    def succeeded(self):
+        return all(elapsed is not None for elapsed in self.results.values())
+
+    def failures(self):
+        return [pair for pair, elapsed in self.results.items()
+                if elapsed is None]
+
+    def __str__(self):
+        expected = 'reachable' if self.should_succeed else 'unreachable'
+        lines = []
+        for (source, dest), elapsed in self.results.items():
+            if elapsed is None:
+                state = 'not %s' % expected
+            else:
+                state = '%s after %.1fs' % (expected, elapsed)
+            lines.append('%s -> %s: %s' % (source, dest, state))
+        return '\n'.join(lines)
+
+
+class ConnectivityChecker(object):
+    """Checks the reachability of many destinations at once
+
+    :param method: how the test node probes its destinations: 'icmp' with
+                   an ICMP socket, 'ping' with ping processes, 'tcp' with
+                   TCP connections to port, 'auto' for icmp when the process
+                   may open an ICMP socket, else ping. IPv6 destinations are
+                   probed with ping6 unless the method is tcp.
+    :param interval: seconds between two probing rounds
+    :param probe_timeout: seconds to wait for the replies of a round
+    :param port: port of the tcp method
+    :param concurrency: number of sources probed at once
+    """
+
+    def __init__(self, method='auto', interval=1, probe_timeout=1, port=22,
+                 concurrency=8):
+        if method not in METHODS:
+            raise ValueError("Unknown connectivity check method %s" % method)
+        self.method = method
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.port = port
+        self.concurrency = concurrency
+        self._icmp_available = method in ('auto', 'icmp')
+
+    def _probe_local(self, addresses):
+        if self.method == 'tcp':
+            return tcp_probe(addresses, self.port, self.probe_timeout)
+        replied = set()
+        others = list(addresses)
+        if self._icmp_available:
+            v4 = [a for a in addresses if netaddr.IPAddress(a).version == 4]
+            result = icmp_probe(v4, self.probe_timeout) if v4 else set()
+            if result is None:
+                if self.method == 'icmp':
+                    LOG.warning("Can not open an ICMP socket, falling back "
+                                "to ping")
+                self._icmp_available = False
+            else:
+                replied.update(result)
+                others = [a for a in addresses if a not in v4]
+        if others:
+            replied.update(ping_probe(others, self.probe_timeout))
+        return replied
+
+    def _probe_remote(self, source, addresses):
+        try:
+            return set(source.ping_hosts(addresses))
+        except lib_exc.SSHExecCommandFailed as e:
+            LOG.warning("Failed to ping %s via a ssh connection from %s: %s",
+                        ', '.join(addresses), source.ssh_client.host, e)
+            return set()
+
+    def _probe(self, source_and_addresses):
+        source, addresses = source_and_addresses
+        if source is None:
+            return self._probe_local(addresses)
+        return self._probe_remote(source, addresses)
+
+    @staticmethod
+    def _source_name(source):
+        return LOCAL if source is None else source.ssh_client.host
+
+    def check(self, pairs, should_succeed=True, timeout=60):
+        """Probes the pairs until all reach the expected connectivity
+
+        :param pairs: (source, destination) pairs, the source being None
+                      for the test node, else a RemoteClient of a guest
+        :param should_succeed: whether the destinations should become
+                               reachable, or unreachable
+        :param timeout: seconds to wait for all the pairs
+        :returns: the ConnectivityMatrix of the pairs
+        """
+        matrix = ConnectivityMatrix(should_succeed)
+        sources = collections.OrderedDict()
+        for source, dest in pairs:
+            key = id(source)
+            if key not in sources:
+                sources[key] = (source, [])
+            if dest not in sources[key][1]:
+                sources[key][1].append(dest)
+            matrix.results[(self._source_name(source), dest)] = None
+        pool = ThreadPool(max(min(self.concurrency, len(sources)), 1))
+        start = time.time()
+        try:
+            while sources:
+                probes = list(sources.values())
+                replies = pool.map(self._probe, probes)
+                elapsed = time.time() - start
+                for (source, dests), replied in zip(probes, replies):
+                    name = self._source_name(source)
+                    for dest in list(dests):
+                        if (dest in replied) == should_succeed:
+                            matrix.results[(name, dest)] = elapsed
+                            dests.remove(dest)
+                    if not dests:
+                        del sources[id(source)]
+                if not sources or time.time() - start >= timeout:
+                    break
+                time.sleep(self.interval)
+        finally:
+            pool.close()
+            pool.join()
+        if not matrix.succeeded:
+            caller = misc_utils.find_test_caller()
+            LOG.info('(%s) Connectivity check failed:\n%s', caller, matrix)
+        return matrix
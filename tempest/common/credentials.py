@@ -41,6 +41,9 @@ def get_isolated_credentials(name, network_resources=None,
         if (CONF.auth.test_accounts_file and
                 os.path.isfile(CONF.auth.test_accounts_file)):
             # Most params are not relevant for pre-created accounts
+            if CONF.auth.test_accounts_allocator == 'index':
+                return accounts.IndexedAccounts(
+                    name=name, identity_version=identity_version)
             return accounts.Accounts(name=name,
                                      identity_version=identity_version)
         else:
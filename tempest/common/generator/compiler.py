@@ -0,0 +1,213 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Memoised compilation of the negative test descriptions.
+
+A description is compiled once into its scenarios, each of them carrying
+the complete payload to send, so the negative tests do not instantiate a
+generator and generate the valid and invalid payloads for every scenario.
+The compiled scenarios are kept in memory and, when the [negative]
+scenario_cache_dir option is set, in a JSON file per description, keyed by
+a hash of the description and of the generator classes.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import sys
+import threading
+import uuid
+
+from oslo_log import log as logging
+from oslo_utils import importutils
+from six.moves.urllib import parse as urlparse
+
+import tempest.common.generator.valid_generator as valid
+from tempest import config
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+# Version of the compiled scenarios, to invalidate older cache files
+CACHE_VERSION = 1
+
+_lock = threading.Lock()
+_generators = {}
+_compiled = {}
+
+
+def get_generator(class_path=None):
+    """Returns the shared instance of a negative test generator class
+
+    Instantiating a generator reflects over all its methods, so a single
+    instance of each generator class is used.
+
+    :param class_path: the generator class, [negative] test_generator by
+                       default
+    """
+    class_path = class_path or CONF.negative.test_generator
+    generator = _generators.get(class_path)
+    if generator is None:
+        generator = importutils.import_class(class_path)()
+        with _lock:
+            generator = _generators.setdefault(class_path, generator)
+    return generator
+
+
+def get_valid_generator():
+    return get_generator('%s.%s' % (valid.ValidTestGenerator.__module__,
+                                    valid.ValidTestGenerator.__name__))
+
+
+def http_arguments(json_dict, url, method):
+    """Returns the url and the body of a request sending the given data
+
+    The data of the methods without a body is sent as a query string.
+    """
+    LOG.debug("dict: %s url: %s method: %s" % (json_dict, url, method))
+    if not json_dict:
+        return url, None
+    elif method in ["GET", "HEAD", "PUT", "DELETE"]:
+        return "%s?%s" % (url, urlparse.urlencode(json_dict)), None
+    else:
+        return url, json.dumps(json_dict)
+
+
+def _module_mtime(cls):
+    path = getattr(sys.modules[cls.__module__], '__file__', None)
+    if path is None:
+        return None
+    return os.path.getmtime(path)
+
+
+def description_key(description, class_path=None):
+    """Returns the hash identifying the compiled scenarios of a description
+
+    Editing the generators changes the generated scenarios, so the
+    modification time of their modules is part of the key.
+    """
+    generator = get_generator(class_path)
+    data = {
+        'version': CACHE_VERSION,
+        'description': description,
+        'generator': '%s.%s' % (type(generator).__module__,
+                                type(generator).__name__),
+        'mtimes': [_module_mtime(type(generator)),
+                   _module_mtime(valid.ValidTestGenerator)],
+    }
+    return hashlib.sha1(
+        json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class _Scenario(object):
+    """The test attributes expected by BasicGeneratorSet.generate_payload"""
+
+    def __init__(self, scenario):
+        self._negtest_generator = scenario['_negtest_generator']
+        self._negtest_schema = scenario['_negtest_schema']
+        self._negtest_path = scenario['_negtest_path']
+
+
+def _invalid_payload(generator, scenario, valid_payload):
+    test = _Scenario(scenario)
+    if not test._negtest_path:
+        # NOTE: generators of the top level object replace the whole body
+        result = test._negtest_generator(test._negtest_schema)
+        if result is None:
+            return copy.deepcopy(valid_payload), None
+        return result[1], result[2]
+    payload = copy.deepcopy(valid_payload)
+    expected_result = generator.generate_payload(test, payload)
+    return payload, expected_result
+
+
+def _compile(description, class_path):
+    generator = get_generator(class_path)
+    generator.validate_schema(description)
+    schema = description.get("json-schema")
+    scenarios = []
+    for resource in description.get("resources", []):
+        expected_result = None
+        if isinstance(resource, dict):
+            expected_result = resource['expected_result']
+            resource = resource['name']
+        scenarios.append(["inv_res_%s" % resource,
+                          {"resource": [resource, str(uuid.uuid4())],
+                           "expected_result": expected_result}])
+    valid_payload = None
+    if schema is not None:
+        valid_payload = get_valid_generator().generate_valid(schema)
+        for scenario in generator.generate_scenarios(schema):
+            payload, expected_result = _invalid_payload(
+                generator, scenario, valid_payload)
+            scenarios.append([scenario['_negtest_name'],
+                              {"_negtest_name": scenario['_negtest_name'],
+                               "_negtest_payload": payload,
+                               "_negtest_expected_result": expected_result}])
+    return {'valid_payload': valid_payload, 'scenarios': scenarios}
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return None
+
+
+def _save(path, compiled):
+    # NOTE: parallel workers may compile the same description
+    tmp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp_path, 'w') as f:
+        json.dump(compiled, f, sort_keys=True)
+    os.rename(tmp_path, path)
+
+
+def compile_description(description, class_path=None, cache_dir=None):
+    """Returns the compiled scenarios of a negative test description
+
+    :param description: the description of the API call, see
+                        NegativeAutoTest.generate_scenario
+    :param class_path: the generator class, [negative] test_generator by
+                       default
+    :param cache_dir: directory of the compiled scenario files, [negative]
+                      scenario_cache_dir by default
+    :returns: a dict with the valid payload of the description and the list
+              of its [name, attributes] scenarios. The compiled scenarios
+              are shared, they must not be modified.
+    """
+    key = description_key(description, class_path)
+    compiled = _compiled.get(key)
+    if compiled is not None:
+        return compiled
+    cache_dir = cache_dir or CONF.negative.scenario_cache_dir
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, key + '.json')
+        compiled = _load(path)
+    if compiled is None:
+        LOG.debug("Compiling the negative scenarios of %s",
+                  description['name'])
+        compiled = _compile(description, class_path)
+        if path is not None:
+            try:
+                os.makedirs(cache_dir)
+            except OSError:
+                if not os.path.isdir(cache_dir):
+                    raise
+            _save(path, compiled)
+    with _lock:
+        return _compiled.setdefault(key, compiled)
@@ -0,0 +1,240 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+import random
+import string
+
+from oslo_log import log as logging
+import six
+
+import tempest.common.generator.base_generator as base
+import tempest.common.generator.valid_generator as valid
+
+LOG = logging.getLogger(__name__)
+
+# Marker of a mutation removing a property from its object
+REMOVE = object()
+
+TYPES = ("string", "integer", "number", "boolean", "object", "array", "null")
+
+SPECIAL_STRINGS = [
+    " ", "  x  ", "\t", "\n", "\r\n", "\x00", "\x1b[0m", "\\", "/", "%",
+    "%s%s%s", "%n", "{}", "[]", "'", '"', "`", "<script>", "&amp;",
+    "../../../../etc/passwd", "null", "None", "true", "NaN", "-1", "1e309",
+    "0x10", u"\u00e9", u"\u2603", u"\u202e", u"\ufeff", u"\U0001f4a9",
+    u"\u0130\u0131", u"x" * 255 + u"\u00e9",
+]
+
+FORMAT_STRINGS = {
+    "uuid": ["00000000-0000-0000-0000-00000000000", "not-a-uuid",
+             "00000000-0000-0000-0000-0000000000000",
+             "g0000000-0000-0000-0000-000000000000"],
+    "date-time": ["2015-13-01T00:00:00Z", "2015-02-30T00:00:00Z",
+                  "2015-01-01T25:00:00Z", "2015-01-01", "yesterday"],
+    "ipv4": ["256.0.0.1", "1.2.3", "1.2.3.4.5", "::1", "-1.0.0.0"],
+    "ipv6": ["::g", "1:2:3:4:5:6:7:8:9", "1.2.3.4", ":::"],
+    "uri": ["http://", "://x", "http://[::1", "x" * 2048],
+    "email": ["@", "x@", "@x", "x@@x"],
+}
+
+INTEGERS = [0, -1, 1, 2 ** 31 - 1, 2 ** 31, -2 ** 31 - 1, 2 ** 32,
+            2 ** 63 - 1, 2 ** 63, -2 ** 63 - 1, 2 ** 64, 10 ** 100]
+
+LENGTHS = [0, 1, 255, 256, 4096, 65536]
+
+CHARSETS = [string.ascii_letters, string.digits, string.printable,
+            u"".join(six.unichr(c) for c in range(0x80, 0x250)),
+            u"".join(six.unichr(c) for c in range(0x4e00, 0x4f00))]
+
+
+class FuzzTestGenerator(base.BasicGeneratorSet):
+    """Generates many schema guided mutations of the fields of a payload
+
+    Unlike the generators of NegativeTestGenerator, which return a single
+    invalid value, the generators of this class return a list of values
+    mutating a field: boundary values of its constraints, values of other
+    types and strings known to upset parsers. Random values are also
+    generated, for fuzzing beyond the systematic mutations.
+
+    This generator is used by tempest.common.generator.fuzzer, it can not be
+    used as the [negative] test_generator.
+    """
+
+    def __init__(self, seed=None):
+        super(FuzzTestGenerator, self).__init__()
+        self.random = random.Random(seed)
+        self.valid = valid.ValidTestGenerator()
+
+    @base.generator_type(*TYPES)
+    def gen_type_confusion(self, schema):
+        return [None, True, False, 0, -1, 1.5, "", "x", [], {}, [None],
+                {"": None}, [[[[[[[[]]]]]]]]]
+
+    @base.generator_type("string")
+    def gen_str_lengths(self, schema):
+        lengths = set(LENGTHS)
+        for bound in ("minLength", "maxLength"):
+            if bound in schema:
+                lengths.update([schema[bound] - 1, schema[bound],
+                                schema[bound] + 1])
+        return ["x" * length for length in sorted(lengths) if length >= 0]
+
+    @base.generator_type("string")
+    def gen_str_special(self, schema):
+        return list(SPECIAL_STRINGS)
+
+    @base.generator_type("string")
+    def gen_str_format(self, schema):
+        values = list(FORMAT_STRINGS.get(schema.get("format"), []))
+        for value in schema.get("enum", []):
+            if isinstance(value, six.string_types):
+                values.extend([value.swapcase(), " %s" % value,
+                               "%s\x00" % value, value * 2])
+        return values
+
+    @base.generator_type("integer", "number")
+    def gen_int_boundaries(self, schema):
+        values = set(INTEGERS)
+        for bound in ("minimum", "maximum"):
+            if bound in schema:
+                values.update([schema[bound] - 1, schema[bound],
+                               schema[bound] + 1])
+        values = sorted(values)
+        # Numbers as strings, and floats where integers are expected
+        values.extend(["1", "-1", "1.0", " 1"])
+        if schema.get("type") != "number":
+            values.extend([0.5, 1.0, -0.0, 1e309])
+        return values
+
+    @base.generator_type("boolean")
+    def gen_bool(self, schema):
+        return ["true", "True", "false", 1, 0, "yes", "1", ""]
+
+    @base.generator_type("array")
+    def gen_array(self, schema):
+        size = schema.get("maxItems", 100) + 1
+        return [[], [None] * size, ["x"] * size, [[]], [{}]]
+
+    @base.generator_type("object")
+    def gen_obj(self, schema):
+        values = [{}, {"$$$$$$$$$$": "xxx"}, {"": ""}]
+        try:
+            valid_obj = self.valid.generate_valid(schema)
+        except TypeError:
+            return values
+        for key in sorted(valid_obj):
+            partial = copy.deepcopy(valid_obj)
+            del partial[key]
+            values.append(partial)
+        extended = copy.deepcopy(valid_obj)
+        extended["$$$$$$$$$$"] = "xxx"
+        values.append(extended)
+        return values
+
+    @staticmethod
+    def _schema_types(schema):
+        schema_type = schema.get("type", "string")
+        if isinstance(schema_type, list):
+            return schema_type
+        return [schema_type]
+
+    def generators(self, schema):
+        """Returns the generators of the types of a schema"""
+        generators = []
+        for schema_type in self._schema_types(schema):
+            for generator in self.types_dict.get(schema_type, []):
+                if generator not in generators:
+                    generators.append(generator)
+        return generators
+
+    def fields(self, schema, path=()):
+        """Returns the path and the schema of every field of a schema"""
+        fields = [(path, schema)]
+        if "object" in self._schema_types(schema):
+            properties = schema.get("properties", {})
+            for name in sorted(properties):
+                fields.extend(self.fields(properties[name], path + (name,)))
+        return fields
+
+    def mutations(self, schema):
+        """Yields the (path, name, value) systematic mutations of a schema"""
+        for path, field_schema in self.fields(schema):
+            if path:
+                yield path, "remove", REMOVE
+            for generator in self.generators(field_schema):
+                for value in generator(field_schema):
+                    yield path, generator.__name__, value
+
+    def random_value(self, schema):
+        """Returns a random value, most likely of the type of the schema"""
+        kind = self.random.choice(self._schema_types(schema) +
+                                  ["string", "integer"])
+        if kind == "integer":
+            return self.random.getrandbits(self.random.randint(1, 70)) * \
+                self.random.choice([1, -1])
+        elif kind == "number":
+            return self.random.uniform(-1e12, 1e12)
+        elif kind == "boolean":
+            return self.random.choice([True, False])
+        elif kind == "array":
+            return [self.random_value({}) for i in
+                    range(self.random.randint(0, 5))]
+        elif kind == "object":
+            return dict((self.random_string(8), self.random_value({}))
+                        for i in range(self.random.randint(0, 5)))
+        return self.random_string()
+
+    def random_string(self, max_length=None):
+        # NOTE: lengths are mostly short, with a long tail
+        length = int(self.random.expovariate(1.0 / 16))
+        if max_length is not None:
+            length = min(length, max_length)
+        charset = self.random.choice(CHARSETS)
+        return u"".join(self.random.choice(charset) for i in range(length))
+
+    def random_mutation(self, schema):
+        """Returns a (path, name, value) mutation of a random field"""
+        path, field_schema = self.random.choice(self.fields(schema))
+        generators = self.generators(field_schema)
+        if generators and self.random.random() < 0.5:
+            generator = self.random.choice(generators)
+            values = generator(field_schema)
+            if values:
+                return path, generator.__name__, self.random.choice(values)
+        return path, "random", self.random_value(field_schema)
+
+
+def apply_mutation(payload, path, value):
+    """Returns a copy of the payload with the field of the path mutated
+
+    :returns: the mutated payload, or None if an earlier mutation removed
+              the field or changed its parent into a value which is not an
+              object
+    """
+    if not path:
+        return copy.deepcopy(value) if value is not REMOVE else None
+    payload = copy.deepcopy(payload)
+    parent = payload
+    for key in path[:-1]:
+        if not isinstance(parent, dict) or key not in parent:
+            return None
+        parent = parent[key]
+    if not isinstance(parent, dict):
+        return None
+    if value is REMOVE:
+        parent.pop(path[-1], None)
+    else:
+        parent[path[-1]] = copy.deepcopy(value)
+    return payload
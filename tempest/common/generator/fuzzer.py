@@ -0,0 +1,262 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Fuzzing of an API described like the negative tests.
+
+The fuzzer first sends the systematic mutations of every field of the
+description's json-schema generated by FuzzTestGenerator, then random
+mutations. Requests are sent in batches, concurrently, through
+NegativeRestClient.send_requests.
+
+Responses are deduplicated by their (status, error class) signature. The
+payloads getting a response with a new signature are explored first: more
+mutations of them are queued ahead of the others, and random mutations are
+preferably applied to the payloads of the rarest signatures. The corpus
+keeps the smallest payload of each signature.
+"""
+
+import heapq
+import itertools
+import json
+import time
+
+from oslo_log import log as logging
+import six
+
+from tempest.common.generator import compiler
+from tempest.common.generator import fuzz_generator
+
+LOG = logging.getLogger(__name__)
+
+# Priorities of the queued payloads, lowest first
+NOVEL = 0
+SYSTEMATIC = 1
+RANDOM = 2
+
+# Mutations queued for each payload getting a response with a new signature
+NOVEL_CHILDREN = 20
+
+QUERY_METHODS = ["GET", "HEAD", "PUT", "DELETE"]
+
+
+def error_class(body):
+    """Returns the class of the error of a response body
+
+    The error class is the key of the single entry of a JSON error body,
+    such as badRequest or itemNotFound, along with the type of the error
+    when the entry has one, as the NeutronError of networking.
+    """
+    if not body:
+        return None
+    try:
+        data = json.loads(body)
+    except (TypeError, ValueError):
+        return 'text'
+    if isinstance(data, dict) and len(data) == 1:
+        key, value = list(data.items())[0]
+        if isinstance(value, dict) and 'type' in value:
+            return '%s.%s' % (key, value['type'])
+        return key
+    return 'json'
+
+
+def signature(result):
+    """Returns the (status, error class) signature of a request result
+
+    :param result: the (resp, body) of a request, or the exception raised
+                   by the request
+    """
+    if isinstance(result, Exception):
+        return None, type(result).__name__
+    resp, body = result
+    return resp.status, error_class(body)
+
+
+def _size(payload):
+    return len(json.dumps(payload, sort_keys=True))
+
+
+class Corpus(object):
+    """The smallest payload getting each response signature"""
+
+    def __init__(self):
+        self.entries = {}
+
+    def add(self, signature, payload, mutation):
+        """Records the signature of the response of a payload
+
+        :returns: True if the signature was not seen before
+        """
+        size = _size(payload)
+        entry = self.entries.get(signature)
+        if entry is None:
+            self.entries[signature] = {
+                'status': signature[0], 'error': signature[1],
+                'payload': payload, 'mutation': mutation, 'size': size,
+                'count': 1}
+            return True
+        entry['count'] += 1
+        if size < entry['size']:
+            entry.update(payload=payload, mutation=mutation, size=size)
+        return False
+
+    def choose(self, rand):
+        """Returns a payload, the rarer its signature the more likely"""
+        entries = list(self.entries.values())
+        weights = [1.0 / entry['count'] for entry in entries]
+        point = rand.uniform(0, sum(weights))
+        for entry, weight in zip(entries, weights):
+            point -= weight
+            if point <= 0:
+                return entry['payload']
+        return entries[-1]['payload']
+
+    def to_list(self):
+        return sorted(self.entries.values(),
+                      key=lambda e: (str(e['status']), str(e['error'])))
+
+    def write(self, path, description):
+        with open(path, 'w') as f:
+            json.dump({'name': description['name'],
+                       'http-method': description['http-method'],
+                       'url': description['url'],
+                       'signatures': self.to_list()}, f, indent=1,
+                      sort_keys=True)
+
+
+class Fuzzer(object):
+    """Fuzzes the API of a negative test description
+
+    :param client: the NegativeRestClient sending the requests
+    :param description: the description of the API call, see
+                        NegativeAutoTest.generate_scenario
+    :param resources: the ids of the resources of the url of the
+                      description, by resource name
+    :param batch_size: number of requests generated and sent at once
+    :param concurrency: number of requests in flight, [negative]
+                        batch_concurrency by default
+    :param seed: seed of the random mutations, to reproduce a run
+    """
+
+    def __init__(self, client, description, resources=None, batch_size=100,
+                 concurrency=None, seed=None):
+        self.client = client
+        self.description = description
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.generator = fuzz_generator.FuzzTestGenerator(seed)
+        self.schema = (description.get("json-schema") or
+                       {"type": "object", "properties": {}})
+        self.valid_payload = compiler.compile_description(
+            description)['valid_payload'] or {}
+        resources = resources or {}
+        self.resources = [
+            resources.get(r['name'] if isinstance(r, dict) else r)
+            for r in description.get("resources", [])]
+        self.corpus = Corpus()
+        self.sent = 0
+        self._seen = set()
+        self._queue = []
+        self._counter = itertools.count()
+
+    def _push(self, priority, payload, mutation):
+        if payload is None:
+            return False
+        if (self.description["http-method"] in QUERY_METHODS and
+                not isinstance(payload, dict)):
+            # Only objects can be sent as a query string
+            return False
+        key = json.dumps(payload, sort_keys=True)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        heapq.heappush(self._queue, (priority, next(self._counter),
+                                     payload, mutation))
+        return True
+
+    def _push_mutation(self, priority, payload, mutation, path, name, value):
+        label = "%s:%s" % (".".join(six.text_type(p) for p in path) or
+                           "<body>", name)
+        if mutation:
+            label = "%s > %s" % (mutation, label)
+        return self._push(priority, fuzz_generator.apply_mutation(
+            payload, path, value), label)
+
+    def _push_random(self, priority, payload, mutation, count):
+        pushed = 0
+        # NOTE: random mutations may all have been seen already
+        for i in range(count * 10):
+            path, name, value = self.generator.random_mutation(self.schema)
+            if self._push_mutation(priority, payload, mutation, path, name,
+                                   value):
+                pushed += 1
+                if pushed == count:
+                    break
+        return pushed
+
+    def _next_batch(self, size):
+        if len(self._queue) < size:
+            rand = self.generator.random
+            for i in range(size - len(self._queue)):
+                if self.corpus.entries and rand.random() < 0.8:
+                    payload = self.corpus.choose(rand)
+                else:
+                    payload = self.valid_payload
+                self._push_random(RANDOM, payload, None, 1)
+        return [heapq.heappop(self._queue)
+                for i in range(min(size, len(self._queue)))]
+
+    def _request(self, payload):
+        method = self.description["http-method"]
+        if method in QUERY_METHODS:
+            url, body = compiler.http_arguments(
+                payload, self.description["url"], method)
+        else:
+            # NOTE: empty payloads such as 0 or "" are sent too
+            url, body = self.description["url"], json.dumps(payload)
+        return method, url, self.resources, body
+
+    def run(self, max_requests):
+        """Sends up to max_requests mutated requests
+
+        :returns: the corpus of the response signatures
+        """
+        self._push(SYSTEMATIC, self.valid_payload, "<valid>")
+        for path, name, value in self.generator.mutations(self.schema):
+            self._push_mutation(SYSTEMATIC, self.valid_payload, None, path,
+                                name, value)
+        start = time.time()
+        while self.sent < max_requests:
+            batch = self._next_batch(min(self.batch_size,
+                                         max_requests - self.sent))
+            if not batch:
+                break
+            results = self.client.send_requests(
+                [self._request(payload) for _, _, payload, _ in batch],
+                self.concurrency)
+            for (_, _, payload, mutation), result in zip(batch, results):
+                sig = signature(result)
+                if self.corpus.add(sig, payload, mutation):
+                    LOG.info("New response %s:%s of %s for %s", sig[0],
+                             sig[1], self.description["name"], mutation)
+                    self._push_random(NOVEL, payload, mutation,
+                                      NOVEL_CHILDREN)
+            self.sent += len(batch)
+        elapsed = time.time() - start
+        LOG.info("Sent %d requests to %s in %.1fs (%.1f requests/s), %d "
+                 "response signatures", self.sent, self.description["name"],
+                 elapsed, self.sent / elapsed if elapsed else 0,
+                 len(self.corpus.entries))
+        return self.corpus
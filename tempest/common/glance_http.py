@@ -17,6 +17,7 @@
 
 import copy
 import hashlib
+import mmap
 import posixpath
 import re
 import socket
@@ -31,6 +32,7 @@ from six.moves import http_client as httplib
 from six.moves.urllib import parse as urlparse
 from tempest_lib import exceptions as lib_exc
 
+from tempest.common import connection_pool
 from tempest import exceptions as exc
 
 LOG = logging.getLogger(__name__)
@@ -39,11 +41,46 @@ CHUNKSIZE = 1024 * 64  # 64kB
 TOKEN_CHARS_RE = re.compile('^[-A-Za-z0-9+/=]*$')
 
 
+def iter_body_chunks(body, chunk_size=None):
+    """Yields the chunks of a request body without copying them
+
+    mmap objects are sliced with a memoryview, file objects supporting
+    readinto() are read into a single reused buffer, and other file like
+    objects are read chunk by chunk.
+    """
+    chunk_size = chunk_size or CHUNKSIZE
+    if isinstance(body, mmap.mmap):
+        try:
+            view = memoryview(body)
+        except TypeError:
+            # python 2 mmap objects do not support memoryview
+            view = None
+        if view is not None:
+            for offset in moves.xrange(body.tell(), len(view), chunk_size):
+                yield view[offset:offset + chunk_size]
+            return
+    if hasattr(body, 'readinto'):
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
+        size = body.readinto(buf)
+        while size:
+            yield view[:size]
+            size = body.readinto(buf)
+        return
+    chunk = body.read(chunk_size)
+    while chunk:
+        yield chunk
+        chunk = body.read(chunk_size)
+
+
 class HTTPClient(object):
 
-    def __init__(self, auth_provider, filters, **kwargs):
+    def __init__(self, auth_provider, filters, chunk_size=None,
+                 connection_pool=None, **kwargs):
         self.auth_provider = auth_provider
         self.filters = filters
+        self.chunk_size = chunk_size
+        self.connection_pool = connection_pool
         self.endpoint = auth_provider.base_url(filters)
         endpoint_parts = urlparse.urlparse(self.endpoint)
         self.endpoint_scheme = endpoint_parts.scheme
@@ -54,6 +91,12 @@ class HTTPClient(object):
         self.connection_class = self.get_connection_class(self.endpoint_scheme)
         self.connection_kwargs = self.get_connection_kwargs(
             self.endpoint_scheme, **kwargs)
+        self.connection_key = 'glance:%s:%s:%s' % (self.endpoint_scheme,
+                                                   self.endpoint_hostname,
+                                                   self.endpoint_port)
+        if connection_pool is not None and self.endpoint_scheme == 'https':
+            self.connection_kwargs['tls_sessions'] = (connection_pool,
+                                                      self.connection_key)
 
     @staticmethod
     def get_connection_class(scheme):
@@ -76,6 +119,17 @@ class HTTPClient(object):
         return _kwargs
 
     def get_connection(self):
+        return self._get_pooled_connection()[0]
+
+    def _get_pooled_connection(self):
+        """Returns a connection, and whether it was idle in the pool"""
+        if self.connection_pool is not None:
+            conn = self.connection_pool.acquire(self.connection_key)
+            if conn is not None:
+                return conn, True
+        return self._new_connection(), False
+
+    def _new_connection(self):
         _class = self.connection_class
         try:
             return _class(self.endpoint_hostname, self.endpoint_port,
@@ -83,6 +137,17 @@ class HTTPClient(object):
         except httplib.InvalidURL:
             raise exc.EndpointNotFound
 
+    def _send_request(self, conn, method, conn_url, kwargs):
+        if kwargs['headers'].get('Transfer-Encoding') == 'chunked':
+            conn.putrequest(method, conn_url)
+            for header, value in kwargs['headers'].items():
+                conn.putheader(header, value)
+            conn.endheaders()
+            self._send_chunked(conn, kwargs['body'])
+        else:
+            conn.request(method, conn_url, **kwargs)
+        return conn.getresponse()
+
     def _http_request(self, url, method, **kwargs):
         """Send an http request with the specified characteristics.
 
@@ -95,26 +160,29 @@ class HTTPClient(object):
 
         self._log_request(method, url, kwargs['headers'])
 
-        conn = self.get_connection()
+        conn, reused = self._get_pooled_connection()
+        position = connection_pool.body_position(kwargs.get('body'))
 
         try:
             url_parts = urlparse.urlparse(url)
             conn_url = posixpath.normpath(url_parts.path)
             LOG.debug('Actual Path: {path}'.format(path=conn_url))
-            if kwargs['headers'].get('Transfer-Encoding') == 'chunked':
-                conn.putrequest(method, conn_url)
-                for header, value in kwargs['headers'].items():
-                    conn.putheader(header, value)
-                conn.endheaders()
-                chunk = kwargs['body'].read(CHUNKSIZE)
-                # Chunk it, baby...
-                while chunk:
-                    conn.send('%x\r\n%s\r\n' % (len(chunk), chunk))
-                    chunk = kwargs['body'].read(CHUNKSIZE)
-                conn.send('0\r\n\r\n')
-            else:
-                conn.request(method, conn_url, **kwargs)
-            resp = conn.getresponse()
+            try:
+                resp = self._send_request(conn, method, conn_url, kwargs)
+            except connection_pool.STALE_CONNECTION_ERRORS as e:
+                # NOTE: the server may have closed an idle connection of the
+                # pool before we sent the request, it is sent again once
+                # over a new connection.
+                if (not reused or position is None or
+                        not connection_pool.is_stale_connection_error(e)):
+                    raise
+                LOG.debug('Pooled connection to %s closed (%s), sending '
+                          'the request again', self.endpoint, e)
+                conn.close()
+                if hasattr(kwargs.get('body'), 'seek'):
+                    kwargs['body'].seek(position)
+                conn = self._new_connection()
+                resp = self._send_request(conn, method, conn_url, kwargs)
         except socket.gaierror as e:
             message = ("Error finding address for %(url)s: %(e)s" %
                        {'url': url, 'e': e})
@@ -124,17 +192,33 @@ class HTTPClient(object):
                        {'endpoint': self.endpoint, 'e': e})
             raise exc.TimeoutException(message)
 
-        body_iter = ResponseBodyIterator(resp)
+        body_iter = ResponseBodyIterator(resp, self.chunk_size)
         # Read body into string if it isn't obviously image data
         if resp.getheader('content-type', None) != 'application/octet-stream':
             body_str = ''.join([body_chunk for body_chunk in body_iter])
             body_iter = six.StringIO(body_str)
-            self._log_response(resp, None)
-        else:
-            self._log_response(resp, body_iter)
+            # NOTE: streamed responses keep their connection until read
+            if (self.connection_pool is not None and
+                    not getattr(resp, 'will_close', True)):
+                self.connection_pool.release(self.connection_key, conn)
+        # NOTE: image data is streamed to the caller, never log it
+        self._log_response(resp, None)
 
         return resp, body_iter
 
+    def _send_chunked(self, conn, body):
+        """Sends a body with the chunked transfer encoding
+
+        Each chunk is sent from the buffer it was read into, the chunk
+        framing is sent separately rather than copied around the data.
+        """
+        separator = b''
+        for chunk in iter_body_chunks(body, self.chunk_size):
+            conn.send(separator + six.b('%x\r\n' % len(chunk)))
+            conn.send(chunk)
+            separator = b'\r\n'
+        conn.send(separator + b'0\r\n\r\n')
+
     def _log_request(self, method, url, headers):
         LOG.info('Request: ' + method + ' ' + url)
         if headers:
@@ -233,10 +317,12 @@ class VerifiedHTTPSConnection(httplib.HTTPSConnection):
     """
     def __init__(self, host, port=None, key_file=None, cert_file=None,
                  ca_certs=None, timeout=None, insecure=False,
-                 ssl_compression=True):
+                 ssl_compression=True, tls_sessions=None):
         httplib.HTTPSConnection.__init__(self, host, port,
                                          key_file=key_file,
                                          cert_file=cert_file)
+        # (connection pool, key) used to resume TLS sessions, if any
+        self.tls_sessions = tls_sessions
         self.key_file = key_file
         self.cert_file = cert_file
         self.timeout = timeout
@@ -346,7 +432,16 @@ class VerifiedHTTPSConnection(httplib.HTTPSConnection):
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO,
                             struct.pack('LL', self.timeout, 0))
         self.sock = OpenSSLConnectionDelegator(self.context, sock)
+        if self.tls_sessions is None:
+            self.sock.connect((self.host, self.port))
+            return
+        pool, key = self.tls_sessions
+        session = pool.get_tls_session(key)
+        if session is not None:
+            self.sock.set_session(session)
         self.sock.connect((self.host, self.port))
+        self.sock.do_handshake()
+        pool.set_tls_session(key, self.sock.get_session())
 
     def close(self):
         if self.sock:
@@ -361,16 +456,31 @@ class VerifiedHTTPSConnection(httplib.HTTPSConnection):
 class ResponseBodyIterator(object):
     """A class that acts as an iterator over an HTTP response."""
 
-    def __init__(self, resp):
+    def __init__(self, resp, chunk_size=None):
         self.resp = resp
+        self.chunk_size = chunk_size
 
     def __iter__(self):
-        while True:
-            yield self.next()
+        return self
 
     def next(self):
-        chunk = self.resp.read(CHUNKSIZE)
+        chunk = self.resp.read(self.chunk_size or CHUNKSIZE)
         if chunk:
             return chunk
         else:
             raise StopIteration()
+
+    __next__ = next
+
+    def write_to(self, sink):
+        """Writes the rest of the body to a file like object
+
+        The body is never held in memory as a whole, and it is read into a
+        single reused buffer when the response supports readinto().
+        Returns the number of bytes written.
+        """
+        written = 0
+        for chunk in iter_body_chunks(self.resp, self.chunk_size):
+            sink.write(chunk)
+            written += len(chunk)
+        return written
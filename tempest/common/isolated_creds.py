@@ -13,6 +13,9 @@
 #    under the License.
 
 import abc
+import atexit
+import threading
+
 import netaddr
 from oslo_log import log as logging
 import six
@@ -28,6 +31,10 @@ from tempest.services.identity.v2.json import identity_client as v2_identity
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
+_cidr_allocators = {}
+_pools = {}
+_lock = threading.Lock()
+
 
 @six.add_metaclass(abc.ABCMeta)
 class CredsClient(object):
@@ -144,14 +151,201 @@ def get_creds_client(identity_client, project_domain_name=None):
         return V3CredsClient(identity_client, project_domain_name)
 
 
+class CidrAllocator(object):
+    """Allocates the subnets of the isolated tenant networks
+
+    The subnets of the base CIDR are handed out in order, skipping the ones
+    used by this process or overlapping with an existing subnet. Existing
+    subnets are listed when the allocator is first used, and again when it
+    runs out of subnets, rather than found by trial and error when creating
+    the subnets. Subnets released by this process are reused first.
+    """
+
+    def __init__(self, base_cidr, mask_bits):
+        self.base_cidr = netaddr.IPNetwork(base_cidr)
+        self.mask_bits = mask_bits
+        self._lock = threading.Lock()
+        self._candidates = None
+        self._existing = []
+        self._used = set()
+        self._released = []
+
+    def _load_existing(self, network_client):
+        subnets = network_client.list_subnets(
+            ip_version=self.base_cidr.version)['subnets']
+        existing = (netaddr.IPNetwork(subnet['cidr']) for subnet in subnets)
+        self._existing = [cidr for cidr in existing
+                          if self._overlap(cidr, self.base_cidr)]
+        self._candidates = self.base_cidr.subnet(self.mask_bits)
+
+    @staticmethod
+    def _overlap(first, second):
+        return first.first <= second.last and second.first <= first.last
+
+    def _is_free(self, cidr):
+        return cidr not in self._used and not any(
+            self._overlap(cidr, existing) for existing in self._existing)
+
+    def allocate(self, network_client):
+        with self._lock:
+            if self._released:
+                cidr = self._released.pop()
+                self._used.add(cidr)
+                return cidr
+            for reload_existing in (self._candidates is None, True):
+                if reload_existing:
+                    self._load_existing(network_client)
+                for cidr in self._candidates:
+                    if self._is_free(cidr):
+                        self._used.add(cidr)
+                        return cidr
+        message = 'Available CIDR for subnet creation could not be found'
+        raise Exception(message)
+
+    def mark_existing(self, cidr):
+        """Records a subnet created by someone else since the listing"""
+        with self._lock:
+            self._used.discard(cidr)
+            self._existing.append(cidr)
+
+    def release(self, cidr):
+        with self._lock:
+            if cidr in self._used:
+                self._used.remove(cidr)
+                self._released.append(cidr)
+
+
+def get_cidr_allocator():
+    key = (CONF.network.tenant_network_cidr,
+           CONF.network.tenant_network_mask_bits)
+    with _lock:
+        if key not in _cidr_allocators:
+            _cidr_allocators[key] = CidrAllocator(*key)
+        return _cidr_allocators[key]
+
+
+class CredentialsPool(object):
+    """Isolated credentials created ahead of demand
+
+    A background thread keeps `size` primary credential sets, with their
+    network resources, ready to be handed out to the test classes of the
+    process. Released credentials are deleted by the same thread, and the
+    remaining ones when the process exits.
+    """
+
+    def __init__(self, size, identity_version=None):
+        self.size = size
+        self.identity_version = identity_version
+        self._ready = []
+        self._released = []
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._failed = False
+        self._creds = None
+        self._thread = None
+
+    def _start(self):
+        self._creds = IsolatedCreds(identity_version=self.identity_version,
+                                    name='tempest-pool', use_pool=False)
+        self._thread = threading.Thread(target=self._work)
+        self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def _needs_work(self):
+        return (self._released or
+                (not self._failed and len(self._ready) < self.size))
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._stopped and not self._needs_work():
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                released = self._released
+                self._released = []
+            if released:
+                self._destroy(released)
+                continue
+            try:
+                credentials = self._creds.provision('primary')
+            except Exception:
+                LOG.exception("Failed to create pooled isolated credentials, "
+                              "creating them on demand from now on")
+                with self._condition:
+                    self._failed = True
+                continue
+            with self._condition:
+                self._ready.append(credentials)
+
+    def _destroy(self, credentials):
+        self._creds.isolated_creds = dict(
+            (str(index), creds) for index, creds in enumerate(credentials))
+        try:
+            self._creds.clear_isolated_creds()
+        except Exception:
+            LOG.exception("Failed to delete pooled isolated credentials")
+
+    def get(self):
+        """Returns ready credentials, or None if none is available yet"""
+        with self._condition:
+            if self._thread is None:
+                self._start()
+            credentials = self._ready.pop(0) if self._ready else None
+            self._condition.notify()
+        return credentials
+
+    def release(self, credentials):
+        with self._condition:
+            if not self._stopped:
+                self._released.append(credentials)
+                self._condition.notify()
+                return
+        # NOTE: credentials released at exit once the pool is shut down, like
+        # the fixture tenant of tempest.common.shared_fixtures, are deleted
+        # right away since the thread is gone
+        self._destroy([credentials])
+
+    def shutdown(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        # NOTE: the credentials being provisioned are only added to the
+        # ready ones once the thread is done with them
+        if self._thread is not None:
+            self._thread.join()
+        with self._condition:
+            remaining = self._ready + self._released
+            self._ready = []
+            self._released = []
+        if remaining:
+            self._destroy(remaining)
+
+
+def get_credentials_pool(identity_version):
+    size = CONF.auth.isolated_creds_pool_size
+    if not size:
+        return None
+    with _lock:
+        if identity_version not in _pools:
+            _pools[identity_version] = CredentialsPool(size, identity_version)
+        return _pools[identity_version]
+
+
 class IsolatedCreds(cred_provider.CredentialProvider):
 
     def __init__(self, identity_version=None, name=None,
-                 network_resources=None):
+                 network_resources=None, use_pool=True):
         super(IsolatedCreds, self).__init__(identity_version, name,
                                             network_resources)
         self.network_resources = network_resources
         self.isolated_creds = {}
+        # Pooled credentials are created with the default network resources
+        self.pool = None
+        if use_pool and not network_resources:
+            self.pool = get_credentials_pool(self.identity_version)
+        self._pooled = set()
         self.ports = []
         self.default_admin_creds = cred_provider.get_configured_credentials(
             'identity_admin', fill_in=True,
@@ -265,7 +459,8 @@ class IsolatedCreds(cred_provider.CredentialProvider):
             if router:
                 self._clear_isolated_router(router['id'], router['name'])
             if subnet:
-                self._clear_isolated_subnet(subnet['id'], subnet['name'])
+                self._clear_isolated_subnet(subnet['id'], subnet['name'],
+                                            subnet.get('cidr'))
             if network:
                 self._clear_isolated_network(network['id'], network['name'])
             raise
@@ -277,9 +472,9 @@ class IsolatedCreds(cred_provider.CredentialProvider):
         return resp_body['network']
 
     def _create_subnet(self, subnet_name, tenant_id, network_id):
-        base_cidr = netaddr.IPNetwork(CONF.network.tenant_network_cidr)
-        mask_bits = CONF.network.tenant_network_mask_bits
-        for subnet_cidr in base_cidr.subnet(mask_bits):
+        allocator = get_cidr_allocator()
+        while True:
+            subnet_cidr = allocator.allocate(self.network_admin_client)
             try:
                 if self.network_resources:
                     resp_body = self.network_admin_client.\
@@ -299,10 +494,10 @@ class IsolatedCreds(cred_provider.CredentialProvider):
                 break
             except lib_exc.BadRequest as e:
                 if 'overlaps with another subnet' not in str(e):
+                    allocator.release(subnet_cidr)
                     raise
-        else:
-            message = 'Available CIDR for subnet creation could not be found'
-            raise Exception(message)
+                # Created by another process since the subnets were listed
+                allocator.mark_existing(subnet_cidr)
         return resp_body['subnet']
 
     def _create_router(self, router_name, tenant_id):
@@ -318,28 +513,40 @@ class IsolatedCreds(cred_provider.CredentialProvider):
         self.network_admin_client.add_router_interface_with_subnet_id(
             router_id, subnet_id)
 
+    def provision(self, credential_type):
+        """Creates new credentials and their network resources"""
+        if credential_type in ['primary', 'alt', 'admin']:
+            is_admin = (credential_type == 'admin')
+            credentials = self._create_creds(admin=is_admin)
+        else:
+            credentials = self._create_creds(roles=credential_type)
+        # Maintained until tests are ported
+        LOG.info("Acquired isolated creds:\n credentials: %s"
+                 % credentials)
+        if (CONF.service_available.neutron and
+                not CONF.baremetal.driver_enabled and
+                CONF.auth.create_isolated_networks):
+            network, subnet, router = self._create_network_resources(
+                credentials.tenant_id)
+            credentials.set_resources(network=network, subnet=subnet,
+                                      router=router)
+            LOG.info("Created isolated network resources for : \n"
+                     + " credentials: %s" % credentials)
+        return credentials
+
     def get_credentials(self, credential_type):
         if self.isolated_creds.get(str(credential_type)):
             credentials = self.isolated_creds[str(credential_type)]
         else:
-            if credential_type in ['primary', 'alt', 'admin']:
-                is_admin = (credential_type == 'admin')
-                credentials = self._create_creds(admin=is_admin)
+            credentials = None
+            if self.pool is not None and credential_type in ['primary',
+                                                             'alt']:
+                credentials = self.pool.get()
+            if credentials is None:
+                credentials = self.provision(credential_type)
             else:
-                credentials = self._create_creds(roles=credential_type)
+                self._pooled.add(str(credential_type))
             self.isolated_creds[str(credential_type)] = credentials
-            # Maintained until tests are ported
-            LOG.info("Acquired isolated creds:\n credentials: %s"
-                     % credentials)
-            if (CONF.service_available.neutron and
-                not CONF.baremetal.driver_enabled and
-                CONF.auth.create_isolated_networks):
-                network, subnet, router = self._create_network_resources(
-                    credentials.tenant_id)
-                credentials.set_resources(network=network, subnet=subnet,
-                                          router=router)
-                LOG.info("Created isolated network resources for : \n"
-                         + " credentials: %s" % credentials)
         return credentials
 
     def get_primary_creds(self):
@@ -373,13 +580,15 @@ class IsolatedCreds(cred_provider.CredentialProvider):
             LOG.warn('router with name: %s not found for delete' %
                      router_name)
 
-    def _clear_isolated_subnet(self, subnet_id, subnet_name):
+    def _clear_isolated_subnet(self, subnet_id, subnet_name, cidr=None):
         net_client = self.network_admin_client
         try:
             net_client.delete_subnet(subnet_id)
         except lib_exc.NotFound:
             LOG.warn('subnet with name: %s not found for delete' %
                      subnet_name)
+        if cidr:
+            get_cidr_allocator().release(netaddr.IPNetwork(cidr))
 
     def _clear_isolated_network(self, network_id, network_name):
         net_client = self.network_admin_client
@@ -425,13 +634,20 @@ class IsolatedCreds(cred_provider.CredentialProvider):
             if (not self.network_resources or
                 self.network_resources.get('subnet')):
                 self._clear_isolated_subnet(creds.subnet['id'],
-                                            creds.subnet['name'])
+                                            creds.subnet['name'],
+                                            creds.subnet.get('cidr'))
             if (not self.network_resources or
                 self.network_resources.get('network')):
                 self._clear_isolated_network(creds.network['id'],
                                              creds.network['name'])
 
     def clear_isolated_creds(self):
+        # Pooled credentials are deleted in the background by the pool
+        for key in self._pooled:
+            credentials = self.isolated_creds.pop(key, None)
+            if credentials is not None:
+                self.pool.release(credentials)
+        self._pooled = set()
         if not self.isolated_creds:
             return
         self._clear_isolated_net_resources()
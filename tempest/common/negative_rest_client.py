@@ -15,6 +15,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from multiprocessing.pool import ThreadPool
+import threading
+
 from tempest.common import service_client
 from tempest import config
 
@@ -83,3 +86,43 @@ class NegativeRestClient(service_client.ServiceClient):
             assert False
 
         return resp, body
+
+    def _thread_client(self, local):
+        """Returns the clone of the client used by the current thread"""
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = self.clone()
+        return client
+
+    def send_requests(self, requests, concurrency=None):
+        """Sends independent requests concurrently
+
+        Each worker thread sends its requests through its own copy of the
+        client, as the HTTP connections of a client can not be shared
+        between threads. The authentication is shared.
+
+        :param requests: list of (method, url_template, resources, body)
+        :param concurrency: number of requests in flight, [negative]
+                            batch_concurrency by default
+        :returns: the (resp, body) of each request, in the order of the
+                  requests. Exceptions raised by a request are returned in
+                  place of its response.
+        """
+        concurrency = concurrency or CONF.negative.batch_concurrency
+        local = threading.local()
+
+        def send(request):
+            method, url_template, resources, body = request
+            client = self._thread_client(local)
+            try:
+                return client.send_request(method, url_template, resources,
+                                           body=body)
+            except Exception as e:
+                return e
+
+        pool = ThreadPool(max(min(concurrency, len(requests)), 1))
+        try:
+            return pool.map(send, requests)
+        finally:
+            pool.close()
+            pool.join()
@@ -0,0 +1,176 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Cached validation of API responses against their JSON schemas.
+
+jsonschema.validate() checks the schema itself and builds a new validator
+for every response. Schemas are module level constants, so the validator of
+each schema is built once and cached by schema identity instead. Responses
+can also be validated only once every N calls of a schema, with the
+[debug] response_validation_sample_rate option, and the time spent
+validating is accounted per schema and logged at the end of the process.
+"""
+
+import atexit
+import sys
+import threading
+import time
+
+import jsonschema
+from oslo_log import log as logging
+from tempest_lib.common import rest_client
+from tempest_lib import exceptions as lib_exc
+
+from tempest import config
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+# Bound of the caches, in case schemas are built on the fly
+MAX_CACHED_SCHEMAS = 1024
+
+_lock = threading.Lock()
+_validators = {}
+_stats = {}
+
+
+def _schema_name(schema):
+    """Returns the module and the name of a schema of tempest.api_schema"""
+    for module_name, module in list(sys.modules.items()):
+        if module is None or not module_name.startswith('tempest.api_schema'):
+            continue
+        for name, value in vars(module).items():
+            if value is schema:
+                return '%s.%s' % (module_name[len('tempest.api_schema.'):],
+                                  name)
+    return 'schema-%x' % id(schema)
+
+
+class SchemaStats(object):
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.name = _schema_name(schema)
+        self.calls = 0
+        self.validations = 0
+        self.time = 0.0
+
+    def to_dict(self):
+        return {'calls': self.calls, 'validations': self.validations,
+                'time': self.time}
+
+
+def get_validator(schema):
+    """Returns the cached validator of a schema
+
+    The schema is kept along with its validator, so its id can not be
+    reused by another schema.
+    """
+    entry = _validators.get(id(schema))
+    if entry is None or entry[0] is not schema:
+        validator_class = rest_client.JSONSCHEMA_VALIDATOR
+        validator_class.check_schema(schema)
+        validator = validator_class(
+            schema, format_checker=rest_client.FORMAT_CHECKER)
+        with _lock:
+            if len(_validators) >= MAX_CACHED_SCHEMAS:
+                _validators.clear()
+            _validators[id(schema)] = entry = (schema, validator)
+    return entry[1]
+
+
+def _get_stats(schema):
+    stats = _stats.get(id(schema))
+    if stats is None or stats.schema is not schema:
+        stats = SchemaStats(schema)
+        with _lock:
+            if len(_stats) >= MAX_CACHED_SCHEMAS:
+                _stats.clear()
+            _stats[id(schema)] = stats
+    return stats
+
+
+def get_stats():
+    """Returns the validation counters and time of each schema, by name"""
+    with _lock:
+        return dict((stats.name, stats.to_dict())
+                    for stats in _stats.values())
+
+
+def validate_response(schema, resp, body):
+    """Validates a response like RestClient.validate_response does"""
+    # Only check the response if the status code is a success code
+    if resp.status not in (rest_client.HTTP_SUCCESS +
+                           rest_client.HTTP_REDIRECTION):
+        return
+    rest_client.RestClient.expected_success(schema['status_code'],
+                                            resp.status)
+    stats = _get_stats(schema)
+    with _lock:
+        stats.calls += 1
+        calls = stats.calls
+    sample_rate = CONF.debug.response_validation_sample_rate
+    if sample_rate > 1 and (calls - 1) % sample_rate:
+        return
+    start = time.time()
+    try:
+        _validate(schema, resp, body)
+    finally:
+        duration = time.time() - start
+        with _lock:
+            stats.validations += 1
+            stats.time += duration
+
+
+def _validate(schema, resp, body):
+    # Check the body of a response
+    body_schema = schema.get('response_body')
+    if body_schema:
+        try:
+            get_validator(body_schema).validate(body)
+        except jsonschema.ValidationError as ex:
+            msg = ("HTTP response body is invalid (%s)") % ex
+            raise lib_exc.InvalidHTTPResponseBody(msg)
+    else:
+        if body:
+            msg = ("HTTP response body should not exist (%s)") % body
+            raise lib_exc.InvalidHTTPResponseBody(msg)
+
+    # Check the header of a response
+    header_schema = schema.get('response_header')
+    if header_schema:
+        try:
+            get_validator(header_schema).validate(resp)
+        except jsonschema.ValidationError as ex:
+            msg = ("HTTP response header is invalid (%s)") % ex
+            raise lib_exc.InvalidHTTPResponseHeader(msg)
+
+
+def log_stats():
+    """Logs the validation time of each schema, slowest first
+
+    Called at the end of the process, and by the stress workers which do not
+    run the exit handlers.
+    """
+    with _lock:
+        stats = sorted(((s.name, s.calls, s.validations, s.time)
+                        for s in _stats.values()),
+                       key=lambda s: s[3], reverse=True)
+    for name, calls, validations, duration in stats:
+        LOG.debug("Schema %s: %d responses, %d validated in %.3fs",
+                  name, calls, validations, duration)
+
+
+atexit.register(log_stats)
@@ -12,11 +12,26 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+
+from oslo_serialization import jsonutils as json
+from six.moves.urllib import parse as urllib
 from tempest_lib.common import rest_client
+from tempest_lib import exceptions as lib_exc
+
+from tempest.common import connection_pool
+from tempest.common import schema_validation
+from tempest.common import token_cache
 
 
 class ServiceClient(rest_client.RestClient):
 
+    # Keep-alive connections used by the client, see use_connection_pool
+    connection_pool = None
+
+    # Number of items requested per page by the iter_* methods
+    page_size = 1000
+
     def __init__(self, auth_provider, service, region,
                  endpoint_type=None, build_interval=None, build_timeout=None,
                  disable_ssl_certificate_validation=None, ca_certs=None,
@@ -38,6 +53,118 @@ class ServiceClient(rest_client.RestClient):
         super(ServiceClient, self).__init__(auth_provider, service, region,
                                             **params)
 
+    def request(self, method, url, extra_headers=False, headers=None,
+                body=None):
+        provider = self.auth_provider
+        # NOTE: alternate auth data is only used for the next request
+        alt_auth = getattr(provider, 'alt_part', None) is not None
+        try:
+            return super(ServiceClient, self).request(
+                method, url, extra_headers=extra_headers, headers=headers,
+                body=body)
+        except lib_exc.Unauthorized:
+            # A token shared with the auth providers of other workers may
+            # have been revoked by one of their tests
+            if (alt_auth or
+                    not isinstance(provider,
+                                   token_cache.CachedAuthProviderMixin) or
+                    not provider.renew_rejected_auth()):
+                raise
+        return super(ServiceClient, self).request(
+            method, url, extra_headers=extra_headers, headers=headers,
+            body=body)
+
+    @classmethod
+    def validate_response(cls, schema, resp, body):
+        schema_validation.validate_response(schema, resp, body)
+
+    def iter_pages(self, url, key, params=None, page_size=None,
+                   schema=None):
+        """Yields the items of a paginated collection
+
+        The collection is requested page_size items at a time, following
+        the next link of each page, or the id of its last item when the
+        service does not return links. Each page is parsed and its items
+        yielded before the next page is requested, so callers can start
+        working on the first items without holding the whole collection.
+
+        :param url: URL of the collection, without query string
+        :param key: key of the list of items in the response body
+        :param params: dict of filters of the collection
+        :param schema: schema validating each page, or None to only check
+                       the status code
+        """
+        params = dict(params or {})
+        params['limit'] = page_size or self.page_size
+        # NOTE: the last item of a page is the marker of the next one. It is
+        # only yielded once the next page is received, so that callers
+        # deleting the items do not delete the marker before it is used.
+        last = []
+        while True:
+            resp, body = self.get('%s?%s' % (url, urllib.urlencode(
+                sorted(params.items()), doseq=1)))
+            body = json.loads(body)
+            if schema:
+                self.validate_response(schema, resp, body)
+            else:
+                self.expected_success(200, resp.status)
+            items = body[key]
+            marker = _next_marker(body.get(key + '_links'), items,
+                                  params['limit'])
+            for item in last:
+                yield item
+            # NOTE: a service ignoring the marker returns the same page
+            # again, which is dropped instead of being yielded twice and
+            # requested forever.
+            if 'marker' in params and marker == params['marker']:
+                return
+            for item in items[:-1]:
+                yield item
+            last = items[-1:]
+            if marker is None:
+                for item in last:
+                    yield item
+                return
+            params['marker'] = marker
+
+    def use_connection_pool(self, pool):
+        """Sends the requests over keep-alive connections of a pool"""
+        self.connection_pool = pool
+        dscv = self.http_obj.disable_ssl_certificate_validation
+        self.http_obj = connection_pool.PooledHttp(
+            pool, disable_ssl_certificate_validation=dscv,
+            ca_certs=self.http_obj.ca_certs)
+
+    def clone(self):
+        """Returns a copy of the client with its own connections
+
+        The connections of a client can not be used by several threads at a
+        time, so each thread sending requests concurrently uses a clone of
+        the client. The clone shares the authentication and the connection
+        pool of the client.
+        """
+        client = copy.copy(self)
+        if hasattr(self.http_obj, 'clone'):
+            client.http_obj = self.http_obj.clone()
+        else:
+            client.http_obj = copy.copy(self.http_obj)
+            client.http_obj.connections = {}
+        return client
+
+
+def _next_marker(links, items, limit):
+    """Returns the marker of the page following items, or None"""
+    if links is not None:
+        for link in links:
+            if link.get('rel') == 'next':
+                query = urllib.urlparse(link['href']).query
+                return urllib.parse_qs(query).get('marker', [None])[0]
+        return None
+    # NOTE: a service not paginating returns more than limit items
+    if not items or len(items) != limit:
+        return None
+    return items[-1]['id']
+
 
 class ResponseBody(dict):
     """Class that wraps an http response and dict body into a single value.
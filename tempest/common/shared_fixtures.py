@@ -0,0 +1,207 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Read-only resources shared by several test classes.
+
+A test class lists the names of the shared fixtures it needs in its
+``shared_fixtures`` attribute and finds them in ``cls.shared`` once its
+clients are set up::
+
+    class ServerAddressesTestJSON(base.BaseV2ComputeTest):
+
+        shared_fixtures = ['server']
+
+        def test_list_server_addresses(self):
+            self.shared_os.servers_client.list_addresses(
+                self.shared['server']['id'])
+
+Tests must not modify the shared resources, and must use them with the
+clients of ``cls.shared_os``, the client manager of the tenant owning them.
+
+A fixture is created by the first class of the worker needing it and handed
+to the next classes. Isolated tenants are deleted with their class, so the
+fixtures of the classes using isolated credentials belong to a fixture
+tenant of the worker instead, taken from the isolated credentials pool and
+deleted with its fixtures at the end of the worker. The fixtures of the
+configured credentials, used by all the classes, are also kept until the end
+of the worker. Locked pre-provisioned accounts belong to a single class at a
+time, so their fixtures are owned by the class itself, reference counted and
+deleted when the last class using them ends, leaving nothing behind in the
+account handed to the next class.
+
+Fixtures are registered with register(), see tempest.api.compute.base for
+examples.
+"""
+
+import atexit
+import threading
+
+from oslo_log import log as logging
+
+from tempest import clients
+from tempest.common import fixed_network
+from tempest.common import isolated_creds
+from tempest import config
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+_factories = {}
+_entries = {}
+_created = 0
+_fixture_tenant = None
+# NOTE: a fixture may acquire the fixtures it depends on while created
+_lock = threading.RLock()
+
+
+class _Entry(object):
+
+    def __init__(self, owner, resource, index):
+        self.owner = owner
+        self.resource = resource
+        self.index = index
+        self.users = 0
+        self.keep = False
+
+
+class FixtureTenant(object):
+    """Isolated tenant owning the fixtures of the worker
+
+    It stands for the test class owning the fixtures, providing the same
+    os client manager and get_tenant_network method.
+    """
+
+    def __init__(self):
+        self.__name__ = 'SharedFixtures'
+        self._creds_provider = isolated_creds.IsolatedCreds(
+            name='shared-fixtures',
+            identity_version=CONF.identity.auth_version)
+        self.os = clients.Manager(
+            credentials=self._creds_provider.get_primary_creds())
+
+    def get_tenant_network(self):
+        networks_client = self.os.networks_client
+        # See tempest.test.BaseTestCase.get_tenant_network
+        if not CONF.service_available.neutron:
+            networks_client = clients.Manager(
+                self._creds_provider.get_admin_creds()).networks_client
+        return fixed_network.get_tenant_network(self._creds_provider,
+                                                networks_client)
+
+    def clear(self):
+        self.os.close()
+        self._creds_provider.clear_isolated_creds()
+
+
+def get_fixture_tenant():
+    """Returns the fixture tenant of the worker, creating it if needed"""
+    global _fixture_tenant
+    with _lock:
+        if _fixture_tenant is None:
+            _fixture_tenant = FixtureTenant()
+        return _fixture_tenant
+
+
+def register(name, create, delete):
+    """Registers a shared fixture
+
+    :param create: callable taking the owner of the fixture, a test class or
+                   the fixture tenant, and returning the resource
+    :param delete: callable taking the owner of the fixture and the resource
+    """
+    _factories[name] = (create, delete)
+
+
+def _key(name, owner):
+    return name, owner.os.credentials.tenant_id
+
+
+def acquire(name, owner, keep=False):
+    """Returns the fixture of the primary tenant of an owner
+
+    :param owner: test class using the fixture, or the fixture tenant
+
+    :param keep: keep the fixture once it is not used anymore, for the next
+                 classes with the same tenant
+    """
+    global _created
+    key = _key(name, owner)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            create, _ = _factories[name]
+            LOG.debug("Creating shared fixture %s for %s", name,
+                      owner.__name__)
+            resource = create(owner)
+            _created += 1
+            entry = _Entry(owner, resource, _created)
+            _entries[key] = entry
+        entry.users += 1
+        entry.keep = entry.keep or keep
+        return entry.resource
+
+
+def release(name, owner):
+    """Releases a fixture acquired for an owner
+
+    The fixture is deleted when it is not used anymore, unless it was
+    acquired with keep.
+    """
+    key = _key(name, owner)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            # Already deleted by delete_all
+            return
+        entry.users -= 1
+        if entry.users > 0 or entry.keep:
+            return
+        del _entries[key]
+        _delete(name, entry)
+
+
+def _delete(name, entry):
+    _, delete = _factories[name]
+    LOG.debug("Deleting shared fixture %s of %s", name,
+              entry.owner.__name__)
+    delete(entry.owner, entry.resource)
+
+
+def delete_all():
+    """Deletes the kept fixtures and the fixture tenant
+
+    It is called at the end of the worker process.
+    """
+    global _fixture_tenant
+    with _lock:
+        entries = sorted(_entries.items(), key=lambda item: item[1].index,
+                         reverse=True)
+        _entries.clear()
+        fixture_tenant = _fixture_tenant
+        _fixture_tenant = None
+    # The fixtures are deleted before the fixtures they depend on
+    for (name, tenant_id), entry in entries:
+        try:
+            _delete(name, entry)
+        except Exception:
+            LOG.exception("Deletion of shared fixture %s failed", name)
+    if fixture_tenant is not None:
+        try:
+            fixture_tenant.clear()
+        except Exception:
+            LOG.exception("Deletion of the shared fixture tenant failed")
+
+
+atexit.register(delete_all)
@@ -0,0 +1,244 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+import re
+import socket
+import threading
+import time
+import uuid
+import warnings
+
+from oslo_log import log as logging
+import six
+from tempest_lib.common import ssh
+from tempest_lib import exceptions as lib_exc
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    import paramiko
+
+LOG = logging.getLogger(__name__)
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+# Errors of a pooled connection closed by the server, or by a reboot
+CONNECTION_ERRORS = (EOFError, socket.error, paramiko.SSHException)
+
+
+class SSHConnectionPool(object):
+    """Authenticated ssh connections shared by several clients
+
+    One connection is kept per (host, user, credentials). Paramiko
+    multiplexes the channels of concurrent commands over it, so a single
+    handshake serves all the commands run on a guest. Keepalive messages
+    are sent every keepalive seconds, and the connections unused for
+    idle_timeout seconds are closed.
+    """
+
+    def __init__(self, idle_timeout=60, keepalive=10):
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._connections = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _evict_idle(self):
+        expired = []
+        now = time.time()
+        with self._lock:
+            for key, (conn, used) in list(self._connections.items()):
+                if now - used > self.idle_timeout:
+                    expired.append(conn)
+                    del self._connections[key]
+            self.evictions += len(expired)
+        for conn in expired:
+            conn.close()
+
+    @staticmethod
+    def _is_active(conn):
+        transport = conn.get_transport()
+        return transport is not None and transport.is_active()
+
+    def acquire(self, key, connect):
+        """Returns the connection of a key
+
+        :param connect: callable returning a new connection, called when
+                        the key has no active connection
+        :returns: the connection, and whether it was already open
+        """
+        self._evict_idle()
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                conn, used = self._connections.get(key, (None, None))
+            if conn is not None and self._is_active(conn):
+                with self._lock:
+                    self.hits += 1
+                    self._connections[key] = (conn, time.time())
+                return conn, True
+            if conn is not None:
+                conn.close()
+            conn = connect()
+            transport = conn.get_transport()
+            if transport is not None and self.keepalive:
+                transport.set_keepalive(self.keepalive)
+            with self._lock:
+                self.misses += 1
+                self._connections[key] = (conn, time.time())
+            return conn, False
+
+    def discard(self, key, conn):
+        """Closes a connection which is not usable anymore"""
+        with self._lock:
+            if self._connections.get(key, (None,))[0] is conn:
+                del self._connections[key]
+                self.evictions += 1
+        conn.close()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions,
+                    'open': len(self._connections)}
+
+    def close(self):
+        with self._lock:
+            connections = self._connections
+            self._connections = {}
+        for conn, used in connections.values():
+            conn.close()
+
+
+def get_shared_pool(idle_timeout=60, keepalive=10):
+    """Returns the ssh connection pool shared by the whole process"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = SSHConnectionPool(idle_timeout, keepalive)
+        return _shared_pool
+
+
+class PooledClient(ssh.Client):
+    """ssh client taking its connections from an SSHConnectionPool
+
+    Unlike tempest_lib's client, which connects and authenticates for every
+    command, the commands run over the pooled connection of the host, user
+    and credentials. When a reused connection turns out to be closed, as
+    after a reboot of the guest, the command is run again once over a new
+    connection.
+    """
+
+    def __init__(self, host, username, password=None, timeout=300, pkey=None,
+                 channel_timeout=10, look_for_keys=False, key_filename=None,
+                 pool=None):
+        super(PooledClient, self).__init__(
+            host, username, password=password, timeout=timeout, pkey=pkey,
+            channel_timeout=channel_timeout, look_for_keys=look_for_keys,
+            key_filename=key_filename)
+        self.pool = pool or get_shared_pool()
+        self._local = threading.local()
+
+    @property
+    def pool_key(self):
+        secret = (self.pkey.get_base64() if self.pkey is not None
+                  else self.password) or self.key_filename or ''
+        digest = hashlib.sha1(six.text_type(secret).encode('utf-8'))
+        return '%s@%s:%s' % (self.username, self.host, digest.hexdigest())
+
+    def _get_ssh_connection(self, sleep=1.5, backoff=1):
+        connect = super(PooledClient, self)._get_ssh_connection
+        conn, reused = self.pool.acquire(
+            self.pool_key, lambda: connect(sleep=sleep, backoff=backoff))
+        self._local.conn = conn
+        self._local.reused = reused
+        return conn
+
+    def exec_command(self, cmd, encoding="utf-8"):
+        try:
+            return super(PooledClient, self).exec_command(cmd, encoding)
+        except CONNECTION_ERRORS as e:
+            if not getattr(self._local, 'reused', False):
+                raise
+            LOG.warning("Pooled ssh connection to %s@%s failed (%s), "
+                        "running the command again over a new connection",
+                        self.username, self.host, e)
+            self.pool.discard(self.pool_key, self._local.conn)
+            return super(PooledClient, self).exec_command(cmd, encoding)
+
+    def test_connection_auth(self):
+        """Raises an exception when we can not connect to server via ssh."""
+        # NOTE: the connection is kept for the next commands
+        self._get_ssh_connection()
+
+    def exec_commands(self, cmds):
+        """Runs several commands over a single channel
+
+        The commands run one after the other in a single shell, each in its
+        own subshell, and the output of each of them is returned. The
+        stderr of the commands is not captured.
+
+        :raises: SSHExecCommandFailed for the first command with a nonzero
+                 status
+        """
+        return exec_commands(self, cmds)
+
+
+def batch_script(cmds, marker):
+    """Returns a shell script running cmds and printing their status"""
+    lines = []
+    for index, cmd in enumerate(cmds):
+        lines.append('s=0; ( %s ) || s=$?; echo; echo "%s %d $s"' %
+                     (cmd, marker, index))
+    return '\n'.join(lines)
+
+
+def parse_batch_output(output, cmds, marker):
+    """Returns the (output, status) of each command of a batch script"""
+    results = []
+    pattern = re.compile(r'^%s (\d+) (\d+)$' % marker, re.M)
+    start = 0
+    for match in pattern.finditer(output):
+        # NOTE: the newline echoed before the marker is not command output
+        out = output[start:match.start()]
+        if out.endswith('\n'):
+            out = out[:-1]
+        results.append((out, int(match.group(2))))
+        start = match.end() + 1
+    if len(results) != len(cmds):
+        raise lib_exc.SSHExecCommandFailed(
+            command=' ; '.join(cmds), exit_status=-1, stderr='',
+            stdout=output)
+    return results
+
+
+def exec_commands(client, cmds):
+    """Runs several commands with a single exec_command of a client"""
+    if not cmds:
+        return []
+    marker = '__tempest_%s__' % uuid.uuid4().hex
+    output = client.exec_command(batch_script(cmds, marker))
+    outputs = []
+    for cmd, (out, status) in zip(cmds, parse_batch_output(output, cmds,
+                                                           marker)):
+        if status != 0:
+            raise lib_exc.SSHExecCommandFailed(
+                command=cmd, exit_status=status, stderr='', stdout=out)
+        outputs.append(out)
+    return outputs
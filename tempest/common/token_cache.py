@@ -0,0 +1,294 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import atexit
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+from oslo_concurrency import lockutils
+from oslo_log import log as logging
+from tempest_lib import auth
+
+LOG = logging.getLogger(__name__)
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def fingerprint(auth_url, auth_params):
+    """Returns the cache key of the credentials authenticating on a url
+
+    The key is a hash of all the authentication parameters, password
+    included, so the cache files do not hold the credentials.
+    """
+    data = json.dumps([auth_url, auth_params], sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class TokenCache(object):
+    """Keystone tokens and service catalogs shared by auth providers
+
+    The auth data of a set of credentials, the token and the service catalog
+    returned by Keystone, is kept until refresh_threshold seconds before the
+    token expires, and given to every auth provider of the same credentials
+    instead of authenticating again. Tokens are renewed ahead of their
+    expiry, so tests do not get a token expiring in the middle of them.
+
+    With a path, the auth data is also kept in one file per credentials in
+    this directory, so the test workers share it. The files are only
+    readable by their owner, and an external lock per credentials makes
+    the workers authenticate once for all.
+    """
+
+    def __init__(self, path=None, refresh_threshold=300):
+        self.path = path
+        self.refresh_threshold = datetime.timedelta(seconds=refresh_threshold)
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.invalidations = 0
+        self._entries = {}
+        self._revoked = set()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _is_fresh(self, entry):
+        return (entry['expires'] - self.refresh_threshold >
+                datetime.datetime.utcnow())
+
+    @contextlib.contextmanager
+    def _key_lock(self, key):
+        with self._lock:
+            lock = self._key_locks.setdefault(key, threading.Lock())
+        with lock:
+            if self.path is None:
+                yield
+            else:
+                with lockutils.lock('token-%s' % key, external=True,
+                                    lock_path=self.path):
+                    yield
+
+    def _file(self, key):
+        return os.path.join(self.path, '%s.json' % key)
+
+    def _read(self, key):
+        try:
+            with open(self._file(key)) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        return {'auth_data': tuple(data['auth_data']),
+                'expires': datetime.datetime.strptime(
+                    data['expires'], auth.ISO8601_FLOAT_SECONDS)}
+
+    def _write(self, key, entry):
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        # Write to a temporary file only readable by its owner, and rename
+        # it, so other workers never read a partial file
+        tmp_path = '%s.%s' % (self._file(key), os.getpid())
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'auth_data': list(entry['auth_data']),
+                       'expires': entry['expires'].strftime(
+                           auth.ISO8601_FLOAT_SECONDS)}, f)
+        os.rename(tmp_path, self._file(key))
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get_auth(self, key, authenticate, expiry):
+        """Returns the cached auth data of the key
+
+        :param key: fingerprint of the credentials
+        :param authenticate: callable returning new (token, auth_data)
+        :param expiry: callable returning the expiry datetime of the
+                       (token, auth_data) given to it
+        """
+        entry = self._entries.get(key)
+        if entry is not None and self._is_fresh(entry):
+            self._count('hits')
+            return entry['auth_data']
+        with self._key_lock(key):
+            # Another thread or worker may have authenticated meanwhile
+            entry = self._entries.get(key)
+            if (entry is None or not self._is_fresh(entry)) and self.path:
+                entry = self._read(key) or entry
+            if entry is not None and self._is_fresh(entry):
+                self._count('hits')
+                self._entries[key] = entry
+                return entry['auth_data']
+            self._count('refreshes' if entry is not None else 'misses')
+            auth_data = authenticate()
+            entry = {'auth_data': auth_data, 'expires': expiry(auth_data)}
+            self._entries[key] = entry
+            if self.path:
+                self._write(key, entry)
+        return auth_data
+
+    def invalidate(self, key, token=None):
+        """Drops the auth data of a key
+
+        :param token: only drop the auth data if it has this token, so a
+                      token renewed by another provider is kept
+        """
+        with self._key_lock(key):
+            entry = self._entries.get(key)
+            if self.path:
+                entry = self._read(key) or entry
+            if entry is None or (token is not None and
+                                 entry['auth_data'][0] != token):
+                return
+            self._count('invalidations')
+            self._entries.pop(key, None)
+            if self.path:
+                try:
+                    os.remove(self._file(key))
+                except OSError:
+                    pass
+
+    def holds(self, key, token):
+        """Whether token is the cached token of the key"""
+        entry = self._entries.get(key)
+        return entry is not None and entry['auth_data'][0] == token
+
+    def revoke(self, token):
+        """Drops a token revoked on purpose by a test
+
+        The revoked token is remembered, so that the 401 responses it gets
+        are not mistaken for the rejection of a token revoked elsewhere.
+        """
+        with self._lock:
+            self._revoked.add(token)
+        for key, entry in list(self._entries.items()):
+            if entry['auth_data'][0] == token:
+                self.invalidate(key, token)
+
+    def is_revoked(self, token):
+        return token in self._revoked
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'refreshes': self.refreshes,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries)}
+
+
+def get_shared_cache(path=None, refresh_threshold=300):
+    """Returns the token cache shared by the whole process"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = TokenCache(path, refresh_threshold)
+            atexit.register(_log_stats, _shared_cache)
+        return _shared_cache
+
+
+def _log_stats(cache):
+    LOG.info("Token cache: %(hits)d hits, %(misses)d misses, %(refreshes)d "
+             "refreshes, %(invalidations)d invalidations, %(entries)d "
+             "entries", cache.stats())
+
+
+class CachedAuthProviderMixin(object):
+    """Auth provider getting its auth data from a TokenCache
+
+    The cache key is computed from the credentials given to the provider,
+    before they are filled with the data returned by Keystone.
+    """
+
+    def __init__(self, credentials, auth_url, token_cache=None, **kwargs):
+        super(CachedAuthProviderMixin, self).__init__(credentials, auth_url,
+                                                      **kwargs)
+        self.token_cache = token_cache
+        self.cache_key = fingerprint(auth_url, self._auth_params())
+        # Token revoked by a test through this provider, kept until
+        # clear_auth() as the test expects its requests to be rejected
+        self.revoked_token = None
+
+    def _get_auth(self):
+        authenticate = super(CachedAuthProviderMixin, self)._get_auth
+        if self.token_cache is None:
+            return authenticate()
+        return self.token_cache.get_auth(self.cache_key, authenticate,
+                                         self.expiry)
+
+    def is_expired(self, auth_data):
+        # NOTE: the token may have been dropped from the cache by another
+        # provider of the same credentials, a test revoking it
+        if (self.token_cache is not None and
+                auth_data[0] != self.revoked_token and
+                not self.token_cache.holds(self.cache_key, auth_data[0])):
+            return True
+        return super(CachedAuthProviderMixin, self).is_expired(auth_data)
+
+    def clear_auth(self):
+        if self.token_cache is not None and self.cache is not None:
+            self.token_cache.invalidate(self.cache_key, self.cache[0])
+        self.revoked_token = None
+        super(CachedAuthProviderMixin, self).clear_auth()
+
+    def revoke_token(self, token):
+        """Drops a token revoked by a test from the cache
+
+        The other providers of the same credentials get a new token, while
+        this provider keeps sending the revoked one until clear_auth().
+        """
+        if self.token_cache is None:
+            return
+        self.token_cache.revoke(token)
+        if self.cache is not None and self.cache[0] == token:
+            self.revoked_token = token
+
+    def renew_rejected_auth(self):
+        """Drops the token after a 401 response, to get a new one
+
+        A shared token may have been revoked by a test of another worker.
+        The tokens revoked by the tests of this process are not renewed,
+        those tests expect their requests to be rejected.
+
+        :returns: whether the next requests will use a new token
+        """
+        if self.token_cache is None or self.cache is None:
+            return False
+        if self.token_cache.is_revoked(self.cache[0]):
+            return False
+        LOG.info("Token rejected by a service, authenticating again")
+        self.clear_auth()
+        return True
+
+
+class CachedKeystoneV2AuthProvider(CachedAuthProviderMixin,
+                                   auth.KeystoneV2AuthProvider):
+
+    def expiry(self, auth_data):
+        return self._parse_expiry_time(auth_data[1]['token']['expires'])
+
+
+class CachedKeystoneV3AuthProvider(CachedAuthProviderMixin,
+                                   auth.KeystoneV3AuthProvider):
+
+    def expiry(self, auth_data):
+        return self._parse_expiry_time(auth_data[1]['expires_at'])
+
+
+def revoke_token(auth_provider, token):
+    """Drops a token revoked by a test from the cache of its provider"""
+    if isinstance(auth_provider, CachedAuthProviderMixin):
+        auth_provider.revoke_token(token)
@@ -18,6 +18,7 @@ from oslo_log import log as logging
 import six
 from tempest_lib.common import ssh
 
+from tempest.common import ssh_pool
 from tempest import config
 from tempest import exceptions
 
@@ -44,9 +45,17 @@ class RemoteClient(object):
                     break
             else:
                 raise exceptions.ServerUnreachable()
-        self.ssh_client = ssh.Client(ip_address, username, password,
-                                     ssh_timeout, pkey=pkey,
-                                     channel_timeout=connect_timeout)
+        if CONF.validation.ssh_connection_pool:
+            pool = ssh_pool.get_shared_pool(
+                CONF.validation.ssh_pool_idle_timeout,
+                CONF.validation.ssh_keepalive_interval)
+            self.ssh_client = ssh_pool.PooledClient(
+                ip_address, username, password, ssh_timeout, pkey=pkey,
+                channel_timeout=connect_timeout, pool=pool)
+        else:
+            self.ssh_client = ssh.Client(ip_address, username, password,
+                                         ssh_timeout, pkey=pkey,
+                                         channel_timeout=connect_timeout)
 
     def exec_command(self, cmd):
         # Shell options below add more clearness on failures,
@@ -55,6 +64,14 @@ class RemoteClient(object):
         LOG.debug("Remote command: %s" % cmd)
         return self.ssh_client.exec_command(cmd)
 
+    def exec_commands(self, cmds):
+        """Runs several commands in a single ssh session
+
+        :returns: the output of each command
+        :raises: SSHExecCommandFailed for the first failing command
+        """
+        return ssh_pool.exec_commands(self, cmds)
+
     def validate_authentication(self):
         """Validate ssh connection and authentication
            This method raises an Exception when the validation fails.
@@ -100,6 +117,24 @@ class RemoteClient(object):
         cmd += ' -c{0} -w{0} -s{1} {2}'.format(count, size, host)
         return self.exec_command(cmd)
 
+    def ping_hosts(self, hosts, count=CONF.compute.ping_count,
+                   size=CONF.compute.ping_size):
+        """Pings hosts concurrently, in a single ssh session
+
+        :returns: the hosts which replied
+        """
+        pings = []
+        for host in hosts:
+            addr = netaddr.IPAddress(host)
+            cmd = 'ping6' if addr.version == 6 else 'ping'
+            pings.append('({0} -c{1} -w{1} -s{2} {3} >/dev/null 2>&1 && '
+                         'echo {3}) &'.format(cmd, count, size, host))
+        if not pings:
+            return []
+        output = self.exec_command(' '.join(pings) + ' wait')
+        replied = set(output.split())
+        return [host for host in hosts if host in replied]
+
     def get_mac_address(self):
         cmd = "ip addr | awk '/ether/ {print $2}'"
         return self.exec_command(cmd)
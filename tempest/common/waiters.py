@@ -15,6 +15,7 @@ import time
 
 from oslo_log import log as logging
 from tempest_lib.common.utils import misc as misc_utils
+from tempest_lib import exceptions as lib_exc
 
 from tempest import config
 from tempest import exceptions
@@ -23,77 +24,271 @@ CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
-# NOTE(afazekas): This function needs to know a token and a subject.
-def wait_for_server_status(client, server_id, status, ready_wait=True,
-                           extra_timeout=0, raise_on_error=True):
-    """Waits for a server to reach a given status."""
+class ResourceWaiter(object):
+    """Waits for a group of resources to reach a desired state.
+
+    On every tick all the pending resources are resolved with a single call
+    to ``fetch``, so waiting on many resources of the same kind costs one
+    API call per tick instead of one per resource.
+
+    :param fetch: callable taking a list of resource ids and returning a
+                  dict mapping each id to its current representation, or to
+                  None if the resource could not be found.
+    :param is_complete: predicate called with a resource representation
+                        (possibly None), returning True once the resource
+                        has reached the desired state.
+    :param check_error: optional callable called with the resource id and
+                        its representation, expected to raise if the
+                        resource went into an unrecoverable state.
+    :param get_state: optional callable returning a printable summary of a
+                      resource state, used for logging state transitions
+                      and in timeout messages. Defaults to the 'status' key.
+    :param interval: seconds to sleep between two ticks.
+    :param timeout: seconds to wait before raising TimeoutException.
+    :param backoff: factor applied to the interval after each tick in which
+                    no pending resource changed state. 1.0 disables backoff.
+    :param max_interval: upper bound for the interval when backing off.
+    :param resource_type: human readable resource name for messages.
+    :param target: human readable description of the desired state.
+    """
+
+    def __init__(self, fetch, is_complete, check_error=None, get_state=None,
+                 interval=1, timeout=60, backoff=1.0, max_interval=None,
+                 resource_type='Resource', target=None):
+        self.fetch = fetch
+        self.is_complete = is_complete
+        self.check_error = check_error
+        self.get_state = get_state or _get_status
+        self.interval = interval
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_interval = max_interval or interval * 10
+        self.resource_type = resource_type
+        self.target = target
+        self.pending = []
+        self.resources = {}
+        self._states = {}
+
+    def add(self, *resource_ids):
+        """Adds resources to the set of resources to wait for."""
+        for resource_id in resource_ids:
+            if resource_id not in self.pending:
+                self.pending.append(resource_id)
+
+    def _poll(self, elapsed):
+        """Resolves pending resources and returns whether any changed."""
+        changed = False
+        current = self.fetch(list(self.pending))
+        for resource_id in list(self.pending):
+            resource = current.get(resource_id)
+            self.resources[resource_id] = resource
+            state = None if resource is None else self.get_state(resource)
+            old_state = self._states.get(resource_id)
+            if resource_id in self._states and state != old_state:
+                LOG.info('%s %s state transition "%s" ==> "%s" after %d '
+                         'second wait', self.resource_type, resource_id,
+                         old_state, state, elapsed)
+                changed = True
+            self._states[resource_id] = state
+            if self.is_complete(resource):
+                self.pending.remove(resource_id)
+                continue
+            if resource is None:
+                raise lib_exc.NotFound('%s %s not found' %
+                                       (self.resource_type, resource_id))
+            if self.check_error:
+                self.check_error(resource_id, resource)
+        return changed
+
+    def _timeout_message(self):
+        message = ('%s %s failed to reach %s within the required time '
+                   '(%s s).' % (self.resource_type, ', '.join(
+                       str(r) for r in self.pending), self.target,
+                       self.timeout))
+        message += ' Current state: %s.' % ', '.join(
+            '%s=%s' % (r, self._states.get(r)) for r in self.pending)
+        caller = misc_utils.find_test_caller()
+        if caller:
+            message = '(%s) %s' % (caller, message)
+        return message
+
+    def wait(self):
+        """Blocks until every added resource is complete.
+
+        :returns: dict mapping each resource id to its last representation.
+        :raises TimeoutException: if some resources are still pending after
+                                  the timeout expired.
+        """
+        start = int(time.time())
+        interval = self.interval
+        self._poll(0)
+        while self.pending:
+            if int(time.time()) - start >= self.timeout:
+                raise exceptions.TimeoutException(self._timeout_message())
+            time.sleep(interval)
+            if self._poll(time.time() - start):
+                interval = self.interval
+            else:
+                interval = min(interval * self.backoff, self.max_interval)
+        return self.resources
+
+
+def show_fetcher(show):
+    """Builds a ResourceWaiter fetch function from a per-resource getter."""
+    def fetch(resource_ids):
+        return dict((r, show(r)) for r in resource_ids)
+    return fetch
+
 
-    def _get_task_state(body):
-        return body.get('OS-EXT-STS:task_state', None)
+def list_fetcher(list_resources, key=None, id_key='id'):
+    """Builds a ResourceWaiter fetch function from a collection listing.
+
+    :param list_resources: callable returning the collection body.
+    :param key: key of the resource list in the body, if the body is not
+                the list itself.
+    :param id_key: name of the resource id attribute.
+    """
+    def fetch(resource_ids):
+        body = list_resources()
+        resources = body[key] if key else body
+        index = dict((r[id_key], r) for r in resources)
+        return dict((r, index.get(r)) for r in resource_ids)
+    return fetch
+
+
+def deletion_fetcher(client):
+    """Builds a ResourceWaiter fetch function from is_resource_deleted.
+
+    :param client: a client with an is_resource_deleted method, the
+                   resources not deleted yet are represented by empty dicts.
+    """
+    def fetch(resource_ids):
+        return dict((r, None if client.is_resource_deleted(r) else {})
+                    for r in resource_ids)
+    return fetch
+
+
+def _get_status(resource):
+    return resource.get('status')
+
+
+def _get_server_state(body):
+    return '/'.join((body['status'],
+                     str(body.get('OS-EXT-STS:task_state', None))))
+
+
+def _server_waiter(client, fetch, status, ready_wait=True, extra_timeout=0,
+                   raise_on_error=True, **kwargs):
 
     # NOTE(afazekas): UNKNOWN status possible on ERROR
     # or in a very early stage.
-    body = client.show_server(server_id)
-    old_status = server_status = body['status']
-    old_task_state = task_state = _get_task_state(body)
-    start_time = int(time.time())
-    timeout = client.build_timeout + extra_timeout
-    while True:
+    def is_complete(body):
+        if body is None:
+            return False
+        server_status = body['status']
         # NOTE(afazekas): Now the BUILD status only reached
         # between the UNKNOWN->ACTIVE transition.
         # TODO(afazekas): enumerate and validate the stable status set
         if status == 'BUILD' and server_status != 'UNKNOWN':
-            return
-        if server_status == status:
-            if ready_wait:
-                if status == 'BUILD':
-                    return
-                # NOTE(afazekas): The instance is in "ready for action state"
-                # when no task in progress
-                # NOTE(afazekas): Converted to string bacuse of the XML
-                # responses
-                if str(task_state) == "None":
-                    # without state api extension 3 sec usually enough
-                    time.sleep(CONF.compute.ready_wait)
-                    return
-            else:
-                return
+            return True
+        if server_status != status:
+            return False
+        if not ready_wait:
+            return True
+        # NOTE(afazekas): The instance is in "ready for action state"
+        # when no task in progress
+        # NOTE(afazekas): Converted to string bacuse of the XML
+        # responses
+        return str(body.get('OS-EXT-STS:task_state', None)) == "None"
 
-        time.sleep(client.build_interval)
-        body = client.show_server(server_id)
-        server_status = body['status']
-        task_state = _get_task_state(body)
-        if (server_status != old_status) or (task_state != old_task_state):
-            LOG.info('State transition "%s" ==> "%s" after %d second wait',
-                     '/'.join((old_status, str(old_task_state))),
-                     '/'.join((server_status, str(task_state))),
-                     time.time() - start_time)
-        if (server_status == 'ERROR') and raise_on_error:
+    def check_error(server_id, body):
+        if (body['status'] == 'ERROR') and raise_on_error:
             if 'fault' in body:
                 raise exceptions.BuildErrorException(body['fault'],
                                                      server_id=server_id)
             else:
                 raise exceptions.BuildErrorException(server_id=server_id)
 
-        timed_out = int(time.time()) - start_time >= timeout
-
-        if timed_out:
-            expected_task_state = 'None' if ready_wait else 'n/a'
-            message = ('Server %(server_id)s failed to reach %(status)s '
-                       'status and task state "%(expected_task_state)s" '
-                       'within the required time (%(timeout)s s).' %
-                       {'server_id': server_id,
-                        'status': status,
-                        'expected_task_state': expected_task_state,
-                        'timeout': timeout})
-            message += ' Current status: %s.' % server_status
-            message += ' Current task state: %s.' % task_state
-            caller = misc_utils.find_test_caller()
-            if caller:
-                message = '(%s) %s' % (caller, message)
-            raise exceptions.TimeoutException(message)
-        old_status = server_status
-        old_task_state = task_state
+    expected_task_state = 'None' if ready_wait else 'n/a'
+    target = '%s status and task state "%s"' % (status, expected_task_state)
+    return ResourceWaiter(
+        fetch, is_complete, check_error=check_error,
+        get_state=_get_server_state,
+        interval=client.build_interval,
+        timeout=client.build_timeout + extra_timeout,
+        resource_type='Server', target=target, **kwargs)
+
+
+def _wait_for_servers(waiter, status, ready_wait):
+    waiter.wait()
+    if ready_wait and status != 'BUILD':
+        # without state api extension 3 sec usually enough
+        time.sleep(CONF.compute.ready_wait)
+
+
+# NOTE(afazekas): This function needs to know a token and a subject.
+def wait_for_server_status(client, server_id, status, ready_wait=True,
+                           extra_timeout=0, raise_on_error=True):
+    """Waits for a server to reach a given status."""
+    waiter = _server_waiter(client, show_fetcher(client.show_server), status,
+                            ready_wait=ready_wait,
+                            extra_timeout=extra_timeout,
+                            raise_on_error=raise_on_error)
+    waiter.add(server_id)
+    _wait_for_servers(waiter, status, ready_wait)
+
+
+def wait_for_servers_status(client, server_ids, status, ready_wait=True,
+                            extra_timeout=0, raise_on_error=True,
+                            backoff=1.0, max_interval=None):
+    """Waits for many servers to reach a given status.
+
+    All the servers are resolved with one detailed server list call per
+    tick, so they must all be visible to the client's tenant.
+    """
+    fetch = list_fetcher(lambda: client.list_servers(detail=True),
+                         key='servers')
+    waiter = _server_waiter(client, fetch, status, ready_wait=ready_wait,
+                            extra_timeout=extra_timeout,
+                            raise_on_error=raise_on_error,
+                            backoff=backoff, max_interval=max_interval)
+    waiter.add(*server_ids)
+    _wait_for_servers(waiter, status, ready_wait)
+
+
+def wait_for_servers_termination(client, server_ids, ignore_error=False,
+                                 backoff=1.0, max_interval=None):
+    """Waits for many servers to be deleted.
+
+    All the servers are resolved with one detailed server list call per
+    tick, so they must all be visible to the client's tenant.
+    """
+    def check_error(server_id, body):
+        if body['status'] == 'ERROR' and not ignore_error:
+            raise exceptions.BuildErrorException(server_id=server_id)
+
+    fetch = list_fetcher(lambda: client.list_servers(detail=True),
+                         key='servers')
+    waiter = ResourceWaiter(
+        fetch, lambda body: body is None, check_error=check_error,
+        get_state=_get_server_state, interval=client.build_interval,
+        timeout=client.build_timeout, backoff=backoff,
+        max_interval=max_interval, resource_type='Server',
+        target='termination')
+    waiter.add(*server_ids)
+    waiter.wait()
+
+
+def _image_waiter(client, fetch, status, **kwargs):
+    def check_error(image_id, image):
+        if image['status'] == 'ERROR':
+            raise exceptions.AddImageException(image_id=image_id)
+
+    return ResourceWaiter(
+        fetch, lambda image: image is not None and image['status'] == status,
+        check_error=check_error,
+        interval=client.build_interval, timeout=client.build_timeout,
+        resource_type='Image', target='%s state' % status, **kwargs)
 
 
 def wait_for_image_status(client, image_id, status):
@@ -102,55 +297,57 @@ def wait_for_image_status(client, image_id, status):
     The client should have a show_image(image_id) method to get the image.
     The client should also have build_interval and build_timeout attributes.
     """
-    image = client.show_image(image_id)
-    start = int(time.time())
-
-    while image['status'] != status:
-        time.sleep(client.build_interval)
-        image = client.show_image(image_id)
-        status_curr = image['status']
-        if status_curr == 'ERROR':
-            raise exceptions.AddImageException(image_id=image_id)
+    waiter = _image_waiter(client, show_fetcher(client.show_image), status)
+    waiter.add(image_id)
+    waiter.wait()
+
+
+def wait_for_images_status(client, image_ids, status, backoff=1.0,
+                           max_interval=None):
+    """Waits for many images to reach a given status.
+
+    The client should have a list_images(detail=True) method returning the
+    list of images.
+    """
+    fetch = list_fetcher(lambda: client.list_images(detail=True))
+    waiter = _image_waiter(client, fetch, status, backoff=backoff,
+                           max_interval=max_interval)
+    waiter.add(*image_ids)
+    waiter.wait()
+
+
+def _volume_waiter(client, fetch, status, **kwargs):
+    def check_error(volume_id, volume):
+        if volume['status'] == 'error':
+            raise exceptions.VolumeBuildErrorException(volume_id=volume_id)
 
-        # check the status again to avoid a false negative where we hit
-        # the timeout at the same time that the image reached the expected
-        # status
-        if status_curr == status:
-            return
-
-        if int(time.time()) - start >= client.build_timeout:
-            message = ('Image %(image_id)s failed to reach %(status)s state'
-                       '(current state %(status_curr)s) '
-                       'within the required time (%(timeout)s s).' %
-                       {'image_id': image_id,
-                        'status': status,
-                        'status_curr': status_curr,
-                        'timeout': client.build_timeout})
-            caller = misc_utils.find_test_caller()
-            if caller:
-                message = '(%s) %s' % (caller, message)
-            raise exceptions.TimeoutException(message)
+    return ResourceWaiter(
+        fetch,
+        lambda volume: volume is not None and volume['status'] == status,
+        check_error=check_error,
+        interval=client.build_interval, timeout=client.build_timeout,
+        resource_type='Volume', target='%s status' % status, **kwargs)
 
 
 def wait_for_volume_status(client, volume_id, status):
     """Waits for a Volume to reach a given status."""
-    body = client.show_volume(volume_id)
-    volume_status = body['status']
-    start = int(time.time())
-
-    while volume_status != status:
-        time.sleep(client.build_interval)
-        body = client.show_volume(volume_id)
-        volume_status = body['status']
-        if volume_status == 'error':
-            raise exceptions.VolumeBuildErrorException(volume_id=volume_id)
+    waiter = _volume_waiter(client, show_fetcher(client.show_volume), status)
+    waiter.add(volume_id)
+    waiter.wait()
+
 
-        if int(time.time()) - start >= client.build_timeout:
-            message = ('Volume %s failed to reach %s status (current %s) '
-                       'within the required time (%s s).' %
-                       (volume_id, status, volume_status,
-                        client.build_timeout))
-            raise exceptions.TimeoutException(message)
+def wait_for_volumes_status(client, volume_ids, status, backoff=1.0,
+                            max_interval=None):
+    """Waits for many Volumes to reach a given status.
+
+    The client should have a list_volumes(detail=True) method returning the
+    list of volumes.
+    """
+    fetch = list_fetcher(lambda: client.list_volumes(detail=True))
+    waiter = _volume_waiter(client, fetch, status, backoff=backoff,
+                            max_interval=max_interval)
+    waiter.add(*volume_ids)
+    waiter.wait()
 
 
 def wait_for_bm_node_status(client, node_id, attr, status):
@@ -158,25 +355,11 @@ def wait_for_bm_node_status(client, node_id, attr, status):
 
     The client should have a show_node(node_uuid) method to get the node.
     """
-    _, node = client.show_node(node_id)
-    start = int(time.time())
-
-    while node[attr] != status:
-        time.sleep(client.build_interval)
-        _, node = client.show_node(node_id)
-        status_curr = node[attr]
-        if status_curr == status:
-            return
-
-        if int(time.time()) - start >= client.build_timeout:
-            message = ('Node %(node_id)s failed to reach %(attr)s=%(status)s '
-                       'within the required time (%(timeout)s s).' %
-                       {'node_id': node_id,
-                        'attr': attr,
-                        'status': status,
-                        'timeout': client.build_timeout})
-            message += ' Current state of %s: %s.' % (attr, status_curr)
-            caller = misc_utils.find_test_caller()
-            if caller:
-                message = '(%s) %s' % (caller, message)
-            raise exceptions.TimeoutException(message)
+    waiter = ResourceWaiter(
+        show_fetcher(lambda node_id: client.show_node(node_id)[1]),
+        lambda node: node is not None and node[attr] == status,
+        get_state=lambda node: node[attr],
+        interval=client.build_interval, timeout=client.build_timeout,
+        resource_type='Node', target='%s=%s' % (attr, status))
+    waiter.add(node_id)
+    waiter.wait()
@@ -53,6 +53,15 @@ AuthGroup = [
                     "at least `2 * CONC` distinct accounts configured in "
                     " the `test_accounts_file`, with CONC == the "
                     "number of concurrent test processes."),
+    cfg.StrOpt('test_accounts_allocator',
+               default='files',
+               choices=['files', 'index'],
+               help="How credentials from the `test_accounts_file` are "
+                    "allocated to test classes running in parallel. "
+                    "'files' creates one lock file per allocated account, "
+                    "'index' tracks all the allocations in a single shared "
+                    "index file, which is faster with many workers and "
+                    "large accounts files."),
     cfg.BoolOpt('allow_tenant_isolation',
                 default=True,
                 help="Allows test cases to create/destroy tenants and "
@@ -82,6 +91,14 @@ AuthGroup = [
                      "creates. However in some neutron configurations, like "
                      "with VLAN provider networks, this doesn't work. So if "
                      "set to False the isolated networks will not be created"),
+    cfg.IntOpt('isolated_creds_pool_size',
+               default=0,
+               help="Number of primary and alt isolated credential sets, "
+                    "including their network resources, that each test "
+                    "process creates ahead of demand in a background "
+                    "thread. Test classes get them without waiting, and "
+                    "they are deleted in the background once released. "
+                    "0 disables the pool."),
 ]
 
 identity_group = cfg.OptGroup(name='identity',
@@ -98,6 +115,40 @@ IdentityGroup = [
                default=None,
                help='Specify a CA bundle file to use in verifying a '
                     'TLS (https) server certificate.'),
+    cfg.StrOpt('http_connection_pool',
+               default='none',
+               choices=['none', 'manager', 'process'],
+               help="Keep the HTTP connections of the service clients "
+                    "alive and share them between the clients of a same "
+                    "client manager ('manager') or of the whole process "
+                    "('process'). By default a new connection is opened "
+                    "for each request."),
+    cfg.IntOpt('http_pool_max_size',
+               default=10,
+               help="Maximum number of idle connections kept per endpoint "
+                    "by an HTTP connection pool."),
+    cfg.IntOpt('http_pool_idle_timeout',
+               default=4,
+               help="Time in seconds after which an idle pooled HTTP "
+                    "connection is closed. It should be lower than the "
+                    "keep-alive timeout of the API servers, 5 seconds by "
+                    "default for Apache."),
+    cfg.BoolOpt('token_cache',
+                default=True,
+                help="Share the token and service catalog of the same "
+                     "credentials between all the auth providers of the "
+                     "process, instead of authenticating for each client "
+                     "manager."),
+    cfg.StrOpt('token_cache_dir',
+               help="Directory where the tokens and service catalogs are "
+                    "also cached, to share them between the test workers. "
+                    "The cache files are only readable by their owner. "
+                    "Requires token_cache. Unset by default, the tokens "
+                    "are then only shared within a worker."),
+    cfg.IntOpt('token_refresh_threshold',
+               default=300,
+               help="Time in seconds before their expiry at which the "
+                    "cached tokens are renewed."),
     cfg.StrOpt('uri',
                help="Full URI of the OpenStack Identity API (Keystone), v2"),
     cfg.StrOpt('uri_v3',
@@ -254,6 +305,14 @@ ComputeGroup = [
                default=120,
                help="Timeout in seconds to wait for ping to "
                     "succeed."),
+    cfg.StrOpt('ping_method',
+               default='auto',
+               choices=['auto', 'icmp', 'ping', 'tcp'],
+               help="How the test node checks that addresses are "
+                    "reachable: 'icmp' sends echo requests from a single "
+                    "ICMP socket, 'ping' runs ping processes, 'tcp' opens "
+                    "connections to the ssh port. 'auto' uses icmp if the "
+                    "test process may open an ICMP socket, ping otherwise."),
     cfg.IntOpt('ping_size',
                default=56,
                help="The packet size for ping packets originating "
@@ -454,7 +513,11 @@ ImageGroup = [
     cfg.IntOpt('build_interval',
                default=1,
                help="Time in seconds between image operation status "
-                    "checks.")
+                    "checks."),
+    cfg.IntOpt('http_chunk_size',
+               default=65536,
+               help="Size in bytes of the chunks used to stream image data "
+                    "to and from the image service."),
 ]
 
 image_feature_group = cfg.OptGroup(name='image-feature-enabled',
@@ -642,6 +705,20 @@ ValidationGroup = [
                help='Timeout in seconds to wait for the ssh banner.',
                deprecated_opts=[cfg.DeprecatedOpt('ssh_timeout',
                                                   group='compute')]),
+    cfg.BoolOpt('ssh_connection_pool',
+                default=True,
+                help="Keep the ssh connections to the servers open, and "
+                     "run all the commands of a server over the same "
+                     "connection, instead of connecting for each command."),
+    cfg.IntOpt('ssh_pool_idle_timeout',
+               default=60,
+               help="Time in seconds after which an unused pooled ssh "
+                    "connection is closed."),
+    cfg.IntOpt('ssh_keepalive_interval',
+               default=10,
+               help="Interval in seconds between the keepalive messages "
+                    "sent over the pooled ssh connections. 0 disables "
+                    "them."),
 ]
 
 volume_group = cfg.OptGroup(name='volume',
@@ -764,6 +841,12 @@ ObjectStoreGroup = [
                help="One name of cluster which is set in the realm whose name "
                     "is set in 'realm_name' item in this file. Set the "
                     "same cluster name as Swift's container-sync-realms.conf"),
+    cfg.IntOpt('container_listing_limit',
+               help="Maximum number of objects requested per container "
+                    "listing. It must not exceed the container_listing_limit "
+                    "of the cluster, Swift rejecting larger limits. If "
+                    "unset, it is read from the /info of the cluster, or "
+                    "Swift's default of 10000 is used."),
 ]
 
 object_storage_feature_group = cfg.OptGroup(
@@ -1107,7 +1190,19 @@ Expected values for this field are:
 
 If nothing is specified, this feature is not enabled. To trace everything
 specify .* as the regex.
-""")
+"""),
+    cfg.IntOpt('response_validation_sample_rate',
+               default=1,
+               help="Validate the responses of the service clients against "
+                    "their JSON schema only once every N responses of each "
+                    "schema. The status code is always checked. Meant for "
+                    "stress runs, where validating every response costs "
+                    "CPU time on the load host."),
+    cfg.StrOpt('test_history_file',
+               help="File where the wall time and the number of servers and "
+                    "volumes created by each test class are recorded, for "
+                    "tempest-schedule-tests to balance the next runs. "
+                    "Nothing is recorded if not set.")
 ]
 
 input_scenario_group = cfg.OptGroup(name="input-scenario",
@@ -1182,6 +1277,19 @@ NegativeGroup = [
                default='tempest.common.' +
                'generator.negative_generator.NegativeTestGenerator',
                help="Test generator class for all negative tests"),
+    cfg.StrOpt('scenario_cache_dir',
+               help="Directory in which the scenarios generated for the "
+                    "negative test descriptions are cached. The scenarios "
+                    "are generated again for every test run if not set."),
+    cfg.BoolOpt('batch_requests',
+                default=False,
+                help="Run all the scenarios of a negative test description "
+                     "as a single test, sending their requests "
+                     "concurrently, instead of a test per scenario."),
+    cfg.IntOpt('batch_concurrency',
+               default=8,
+               help="Number of concurrent requests of the batched negative "
+                    "tests."),
 ]
 
 DefaultGroup = [
@@ -166,6 +166,11 @@ class InvalidStructure(TempestException):
     message = "Invalid structure of table with details"
 
 
+class ObjectChecksumMismatch(TempestException):
+    message = ("Checksum of object %(name)s is %(actual)s instead of "
+               "%(expected)s")
+
+
 class CommandFailed(Exception):
     def __init__(self, returncode, cmd, output, stderr):
         super(CommandFailed, self).__init__()
@@ -16,6 +16,7 @@
 from tempest_lib import auth
 
 from tempest.common import cred_provider
+from tempest.common import token_cache
 from tempest import config
 from tempest import exceptions
 
@@ -55,15 +56,66 @@ class Manager(object):
             creds = self.credentials
         # Creates an auth provider for the credentials
         self.auth_provider = get_auth_provider(creds)
-        # FIXME(andreaf) unused
-        self.client_attr_names = []
+
+    def _setup_client(self, client):
+        """Called with each lazy client once it is built"""
+        pass
+
+    @property
+    def client_attr_names(self):
+        """Names of the lazy clients built so far by this manager."""
+        return [name for name in self.__dict__
+                if isinstance(getattr(type(self), name, None), lazy_client)]
+
+
+class lazy_client(object):
+
+    """
+    Descriptor building a client the first time it is accessed
+
+    The decorated method is called with the manager as its only argument
+    and must return the client instance. The client is then cached in the
+    manager instance dictionary, so later accesses do not go through the
+    descriptor anymore. Raising AttributeError from the method marks the
+    client as not available for this manager.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self.name = build.__name__
+        self.__doc__ = build.__doc__
+
+    def __get__(self, manager, owner):
+        if manager is None:
+            return self
+        client = self.build(manager)
+        setup_client = getattr(manager, '_setup_client', None)
+        if setup_client is not None:
+            setup_client(client)
+        manager.__dict__[self.name] = client
+        return client
 
 
 def get_auth_provider_class(credentials):
+    if CONF.identity.token_cache:
+        v2_class = token_cache.CachedKeystoneV2AuthProvider
+        v3_class = token_cache.CachedKeystoneV3AuthProvider
+    else:
+        v2_class = auth.KeystoneV2AuthProvider
+        v3_class = auth.KeystoneV3AuthProvider
     if isinstance(credentials, auth.KeystoneV3Credentials):
-        return auth.KeystoneV3AuthProvider, CONF.identity.uri_v3
+        return v3_class, CONF.identity.uri_v3
     else:
-        return auth.KeystoneV2AuthProvider, CONF.identity.uri
+        return v2_class, CONF.identity.uri
+
+
+def get_token_cache():
+    """Returns the token cache of the process, None if disabled"""
+    if not CONF.identity.token_cache:
+        return None
+    return token_cache.get_shared_cache(
+        CONF.identity.token_cache_dir,
+        CONF.identity.token_refresh_threshold)
 
 
 def get_auth_provider(credentials):
@@ -78,4 +130,7 @@ def get_auth_provider(credentials):
             'Credentials must be specified')
     auth_provider_class, auth_url = get_auth_provider_class(
         credentials)
+    cache = get_token_cache()
+    if cache is not None:
+        default_params['token_cache'] = cache
     return auth_provider_class(credentials, auth_url, **default_params)
@@ -14,7 +14,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import subprocess
+import collections
+import functools
+from multiprocessing.pool import ThreadPool
+import sys
 
 import netaddr
 from oslo_log import log
@@ -22,6 +25,7 @@ import six
 from tempest_lib.common.utils import misc as misc_utils
 from tempest_lib import exceptions as lib_exc
 
+from tempest.common import connectivity
 from tempest.common import fixed_network
 from tempest.common.utils import data_utils
 from tempest.common.utils.linux import remote_client
@@ -117,6 +121,39 @@ class ScenarioTest(tempest.test.BaseTestCase):
         }
         self.cleanup_waits.append(wait_dict)
 
+    def _deletion_waiter(self, waiter_callable):
+        """Returns a ResourceWaiter replacing a waiter_callable
+
+        The deletions waited for by the known waiters of the clients are
+        waited for at once, with a single listing per tick when the client
+        can list its resources. None is returned for the other waiters.
+        """
+        client = getattr(waiter_callable, '__self__', None)
+        name = getattr(waiter_callable, '__name__', None)
+        if name == 'wait_for_server_termination':
+            fetch = waiters.list_fetcher(
+                lambda: client.list_servers(detail=True), key='servers')
+            resource_type = 'Server'
+
+            def check_error(server_id, server):
+                if server['status'] == 'ERROR':
+                    raise exceptions.BuildErrorException(server_id=server_id)
+        elif (name == 'wait_for_resource_deletion' and
+                hasattr(client, 'is_resource_deleted')):
+            resource_type = client.resource_type
+            check_error = None
+            if resource_type == 'volume':
+                fetch = waiters.list_fetcher(
+                    lambda: client.list_volumes(detail=True))
+            else:
+                fetch = waiters.deletion_fetcher(client)
+        else:
+            return None
+        return waiters.ResourceWaiter(
+            fetch, lambda resource: resource is None, check_error=check_error,
+            interval=client.build_interval, timeout=client.build_timeout,
+            resource_type=resource_type, target='deletion')
+
     def _wait_for_cleanups(self):
         """To handle async delete actions, a list of waits is added
         which will be iterated over as the last step of clearing the
@@ -125,10 +162,48 @@ class ScenarioTest(tempest.test.BaseTestCase):
         successful. This is the same basic approach used in the api tests to
         limit cleanup execution time except here it is multi-resource,
         because of the nature of the scenario tests.
+
+        The waits of a same waiter are grouped, so the deletions of a
+        resource type are polled at once, and the groups are waited for
+        concurrently. The failures of all the groups are reported together.
         """
+        groups = collections.OrderedDict()
+        waits = []
         for wait in self.cleanup_waits:
+            wait = dict(wait)
             waiter_callable = wait.pop('waiter_callable')
-            waiter_callable(**wait)
+            if waiter_callable not in groups:
+                groups[waiter_callable] = self._deletion_waiter(
+                    waiter_callable)
+            waiter = groups[waiter_callable]
+            if waiter is None:
+                waits.append(functools.partial(waiter_callable, **wait))
+            else:
+                waiter.add(*wait.values())
+        waits.extend(waiter.wait for waiter in groups.values()
+                     if waiter is not None)
+        if not waits:
+            return
+
+        def run(wait):
+            try:
+                wait()
+            except Exception:
+                return sys.exc_info()
+
+        pool = ThreadPool(len(waits))
+        try:
+            failures = [f for f in pool.map(run, waits) if f is not None]
+        finally:
+            pool.close()
+            pool.join()
+        if len(failures) == 1:
+            six.reraise(*failures[0])
+        elif failures:
+            for failure in failures:
+                LOG.error("Cleanup wait failed: %s", failure[1])
+            raise exceptions.TearDownException(
+                *[failure[1] for failure in failures], num=len(failures))
 
     # ## Test functions library
     #
@@ -451,19 +526,36 @@ class ScenarioTest(tempest.test.BaseTestCase):
             waiters.wait_for_server_status(self.servers_client,
                                            server_id, 'ACTIVE')
 
-    def ping_ip_address(self, ip_address, should_succeed=True,
-                        ping_timeout=None):
+    def check_connectivity(self, pairs, should_succeed=True,
+                           ping_timeout=None):
+        """Checks the reachability of many addresses at once
+
+        :param pairs: (source, ip address) pairs, the source being None for
+            the test node, else a RemoteClient of a server pinging the
+            address
+        :param should_succeed: whether the addresses should become
+            reachable, or unreachable
+        :returns: the ConnectivityMatrix of the pairs, with the time each
+            pair took to reach the expected connectivity
+        """
         timeout = ping_timeout or CONF.compute.ping_timeout
-        cmd = ['ping', '-c1', '-w1', ip_address]
+        checker = connectivity.ConnectivityChecker(
+            method=CONF.compute.ping_method)
+        return checker.check(pairs, should_succeed=should_succeed,
+                             timeout=timeout)
+
+    def ping_ip_addresses(self, ip_addresses, should_succeed=True,
+                          ping_timeout=None):
+        matrix = self.check_connectivity(
+            [(None, ip_address) for ip_address in ip_addresses],
+            should_succeed=should_succeed, ping_timeout=ping_timeout)
+        return matrix.succeeded
 
-        def ping():
-            proc = subprocess.Popen(cmd,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.PIPE)
-            proc.communicate()
-            return (proc.returncode == 0) == should_succeed
-
-        return tempest.test.call_until_true(ping, timeout, 1)
+    def ping_ip_address(self, ip_address, should_succeed=True,
+                        ping_timeout=None):
+        return self.ping_ip_addresses([ip_address],
+                                      should_succeed=should_succeed,
+                                      ping_timeout=ping_timeout)
 
     def check_vm_connectivity(self, ip_address,
                               username=None,
@@ -752,12 +844,18 @@ class NetworkScenarioTest(ScenarioTest):
         # The target login is assumed to have been configured for
         # key-based authentication by cloud-init.
         try:
-            for net_name, ip_addresses in six.iteritems(server['addresses']):
+            ip_addresses = [ip_address['addr'] for ip_addresses
+                            in six.itervalues(server['addresses'])
+                            for ip_address in ip_addresses]
+            # All the addresses are pinged at once before checking ssh
+            matrix = self.check_connectivity(
+                [(None, ip_address) for ip_address in ip_addresses],
+                should_succeed=should_connect)
+            self.assertTrue(matrix.succeeded, msg=str(matrix))
+            if should_connect:
+                # no need to check ssh for negative connectivity
                 for ip_address in ip_addresses:
-                    self.check_vm_connectivity(ip_address['addr'],
-                                               username,
-                                               private_key,
-                                               should_connect=should_connect)
+                    self.get_remote_client(ip_address, username, private_key)
         except Exception as e:
             LOG.exception('Tenant network connectivity check failed')
             self._log_console_output(servers_for_debug)
@@ -774,18 +872,19 @@ class NetworkScenarioTest(ScenarioTest):
         :returns: boolean -- should_succeed == ping
         :returns: ping is false if ping failed
         """
-        def ping_remote():
-            try:
-                source.ping_host(dest)
-            except lib_exc.SSHExecCommandFailed:
-                LOG.warn('Failed to ping IP: %s via a ssh connection from: %s.'
-                         % (dest, source.ssh_client.host))
-                return not should_succeed
-            return should_succeed
-
-        return tempest.test.call_until_true(ping_remote,
-                                            CONF.compute.ping_timeout,
-                                            1)
+        return self._check_remote_connectivity_matrix(
+            [(source, dest)], should_succeed).succeeded
+
+    def _check_remote_connectivity_matrix(self, pairs, should_succeed=True):
+        """
+        check ping of many (source, dest) pairs at once
+
+        :param pairs: (RemoteClient, IP) pairs, the dests of a source being
+            pinged concurrently from a single ssh connection to it
+        :param should_succeed: boolean should ping succeed or not
+        :returns: the ConnectivityMatrix of the pairs
+        """
+        return self.check_connectivity(pairs, should_succeed=should_succeed)
 
     def _create_security_group(self, client=None, tenant_id=None,
                                namestart='secgroup-smoke'):
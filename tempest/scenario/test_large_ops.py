@@ -74,11 +74,11 @@ class TestLargeOpsScenario(manager.ScenarioTest):
         cls._cleanup_resources.append((function, arguments, keywordArguments))
 
     def _wait_for_server_status(self, status):
-        for server in self.servers:
-            # Make sure nova list keeps working throughout the build process
-            self.servers_client.list_servers()
-            waiters.wait_for_server_status(self.servers_client,
-                                           server['id'], status)
+        # NOTE: the batch waiter polls with the server list, which also
+        # makes sure nova list keeps working throughout the build process
+        waiters.wait_for_servers_status(self.servers_client,
+                                        [s['id'] for s in self.servers],
+                                        status)
 
     def nova_boot(self):
         name = data_utils.rand_name('scenario-server')
@@ -336,21 +336,16 @@ class TestNetworkBasicOps(manager.NetworkScenarioTest):
         private_key = self._get_server_key(self.floating_ip_tuple.server)
         ssh_source = self._ssh_to_server(ip_address, private_key)
 
-        for remote_ip in address_list:
-            if should_connect:
-                msg = "Timed out waiting for "
-                "%s to become reachable" % remote_ip
-            else:
-                msg = "ip address %s is reachable" % remote_ip
-            try:
-                self.assertTrue(self._check_remote_connectivity
-                                (ssh_source, remote_ip, should_connect),
-                                msg)
-            except Exception:
-                LOG.exception("Unable to access {dest} via ssh to "
-                              "floating-ip {src}".format(dest=remote_ip,
-                                                         src=floating_ip))
-                raise
+        # The addresses are pinged at once from the server
+        matrix = self._check_remote_connectivity_matrix(
+            [(ssh_source, remote_ip) for remote_ip in address_list],
+            should_connect)
+        if not matrix.succeeded:
+            LOG.error("Unable to access {dest} via ssh to floating-ip "
+                      "{src}".format(dest=", ".join(
+                          dest for _, dest in matrix.failures()),
+                          src=floating_ip))
+        self.assertTrue(matrix.succeeded, str(matrix))
 
     @test.attr(type='smoke')
     @test.idempotent_id('f323b3ba-82f8-4db7-8ea6-6a895869ec49')
@@ -151,31 +151,28 @@ class TestGettingAddress(manager.NetworkScenarioTest):
             self.assertTrue(test.call_until_true(srv2_v6_addr_assigned,
                                                  CONF.compute.ping_timeout, 1))
 
-        self._check_connectivity(sshv4_1, ips_from_api_2['4'])
-        self._check_connectivity(sshv4_2, ips_from_api_1['4'])
+        pairs = [(sshv4_1, ips_from_api_2['4']),
+                 (sshv4_2, ips_from_api_1['4'])]
 
         # Some VM (like cirros) may not have ping6 utility
         result = sshv4_1.exec_command('whereis ping6')
         is_ping6 = False if result == 'ping6:\n' else True
         if is_ping6:
             for i in range(n_subnets6):
-                self._check_connectivity(sshv4_1,
-                                         ips_from_api_2['6'][i])
-                self._check_connectivity(sshv4_1,
-                                         self.subnets_v6[i].gateway_ip)
-                self._check_connectivity(sshv4_2,
-                                         ips_from_api_1['6'][i])
-                self._check_connectivity(sshv4_2,
-                                         self.subnets_v6[i].gateway_ip)
+                pairs.extend([(sshv4_1, ips_from_api_2['6'][i]),
+                              (sshv4_1, self.subnets_v6[i].gateway_ip),
+                              (sshv4_2, ips_from_api_1['6'][i]),
+                              (sshv4_2, self.subnets_v6[i].gateway_ip)])
         else:
             LOG.warning('Ping6 is not available, skipping')
-
-    def _check_connectivity(self, source, dest):
-        self.assertTrue(
-            self._check_remote_connectivity(source, dest),
-            "Timed out waiting for %s to become reachable from %s" %
-            (dest, source.ssh_client.host)
-        )
+        self._check_connectivity(pairs)
+
+    def _check_connectivity(self, pairs):
+        # The addresses are pinged at once from both servers
+        matrix = self._check_remote_connectivity_matrix(pairs)
+        self.assertTrue(matrix.succeeded,
+                        "Timed out waiting for addresses to become "
+                        "reachable:\n%s" % matrix)
 
     @test.idempotent_id('2c92df61-29f0-4eaa-bee3-7c65bef62a43')
     @test.services('compute', 'network')
@@ -349,12 +349,17 @@ class TestSecurityGroupsBasicOps(manager.NetworkScenarioTest):
         self.assertTrue(self._check_remote_connectivity(access_point, ip,
                                                         should_succeed), msg)
 
+    def _check_connectivity_to_servers(self, access_point, servers,
+                                       should_succeed=True):
+        matrix = self._check_remote_connectivity_matrix(
+            [(access_point, self._get_server_ip(server))
+             for server in servers], should_succeed)
+        self.assertTrue(matrix.succeeded, str(matrix))
+
     def _test_in_tenant_block(self, tenant):
         access_point_ssh = self._connect_to_access_point(tenant)
-        for server in tenant.servers:
-            self._check_connectivity(access_point=access_point_ssh,
-                                     ip=self._get_server_ip(server),
-                                     should_succeed=False)
+        self._check_connectivity_to_servers(access_point_ssh, tenant.servers,
+                                            should_succeed=False)
 
     def _test_in_tenant_allow(self, tenant):
         ruleset = dict(
@@ -367,9 +372,7 @@ class TestSecurityGroupsBasicOps(manager.NetworkScenarioTest):
             **ruleset
         )
         access_point_ssh = self._connect_to_access_point(tenant)
-        for server in tenant.servers:
-            self._check_connectivity(access_point=access_point_ssh,
-                                     ip=self._get_server_ip(server))
+        self._check_connectivity_to_servers(access_point_ssh, tenant.servers)
 
     def _test_cross_tenant_block(self, source_tenant, dest_tenant):
         """
@@ -165,6 +165,17 @@ class ServersClient(service_client.ServiceClient):
         self.validate_response(_schema, resp, body)
         return service_client.ResponseBody(resp, body)
 
+    def iter_servers(self, detail=False, page_size=None, **params):
+        """Yields the servers of a user, one page at a time."""
+
+        url = 'servers'
+        _schema = schema.list_servers
+
+        if detail:
+            url += '/detail'
+            _schema = schema.list_servers_detail
+        return self.iter_pages(url, 'servers', params, page_size, _schema)
+
     def wait_for_server_termination(self, server_id, ignore_error=False):
         """Waits for server to reach termination."""
         start_time = int(time.time())
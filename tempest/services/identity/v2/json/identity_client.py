@@ -14,6 +14,7 @@ from oslo_serialization import jsonutils as json
 from tempest_lib import exceptions as lib_exc
 
 from tempest.common import service_client
+from tempest.common import token_cache
 
 
 class IdentityClient(service_client.ServiceClient):
@@ -212,6 +213,7 @@ class IdentityClient(service_client.ServiceClient):
         """Delete a token."""
         resp, body = self.delete("tokens/%s" % token_id)
         self.expected_success(204, resp.status)
+        token_cache.revoke_token(self.auth_provider, token_id)
         return service_client.ResponseBody(resp, body)
 
     def list_users_for_tenant(self, tenant_id):
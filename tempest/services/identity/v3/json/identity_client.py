@@ -17,6 +17,7 @@ from oslo_serialization import jsonutils as json
 from six.moves.urllib import parse as urllib
 
 from tempest.common import service_client
+from tempest.common import token_cache
 
 
 class IdentityV3Client(service_client.ServiceClient):
@@ -296,6 +297,7 @@ class IdentityV3Client(service_client.ServiceClient):
         headers = {'X-Subject-Token': resp_token}
         resp, body = self.delete("auth/tokens", headers=headers)
         self.expected_success(204, resp.status)
+        token_cache.revoke_token(self.auth_provider, resp_token)
         return service_client.ResponseBody(resp, body)
 
     def create_group(self, name, **kwargs):
@@ -37,7 +37,7 @@ class ImageClient(service_client.ServiceClient):
     def __init__(self, auth_provider, catalog_type, region, endpoint_type=None,
                  build_interval=None, build_timeout=None,
                  disable_ssl_certificate_validation=None,
-                 ca_certs=None, trace_requests=None):
+                 ca_certs=None, trace_requests=None, http_chunk_size=None):
         super(ImageClient, self).__init__(
             auth_provider,
             catalog_type,
@@ -52,6 +52,7 @@ class ImageClient(service_client.ServiceClient):
         self._http = None
         self.dscv = disable_ssl_certificate_validation
         self.ca_certs = ca_certs
+        self.http_chunk_size = http_chunk_size
 
     def _image_meta_from_headers(self, headers):
         meta = {'properties': {}}
@@ -122,23 +123,27 @@ class ImageClient(service_client.ServiceClient):
         return glance_http.HTTPClient(auth_provider=self.auth_provider,
                                       filters=self.filters,
                                       insecure=self.dscv,
-                                      ca_certs=self.ca_certs)
+                                      ca_certs=self.ca_certs,
+                                      chunk_size=self.http_chunk_size,
+                                      connection_pool=self.connection_pool)
 
     def _create_with_data(self, headers, data):
+        """Creates an image, streaming its data from a file or an mmap"""
         resp, body_iter = self.http.raw_request('POST', '/v1/images',
                                                 headers=headers, body=data)
         self._error_checker('POST', '/v1/images', headers, data, resp,
                             body_iter)
-        body = json.loads(''.join([c for c in body_iter]))
+        body = json.loads(body_iter.read())
         return service_client.ResponseBody(resp, body['image'])
 
     def _update_with_data(self, image_id, headers, data):
+        """Uploads image data, streaming it from a file or an mmap"""
         url = '/v1/images/%s' % image_id
         resp, body_iter = self.http.raw_request('PUT', url, headers=headers,
                                                 body=data)
         self._error_checker('PUT', url, headers, data,
                             resp, body_iter)
-        body = json.loads(''.join([c for c in body_iter]))
+        body = json.loads(body_iter.read())
         return service_client.ResponseBody(resp, body['image'])
 
     @property
@@ -232,8 +237,19 @@ class ImageClient(service_client.ServiceClient):
         body = self._image_meta_from_headers(resp)
         return service_client.ResponseBody(resp, body)
 
-    def show_image(self, image_id):
+    def show_image(self, image_id, sink=None):
+        """Downloads an image
+
+        If a file like sink is given, the image data is streamed to it
+        instead of being returned, so it is never held in memory.
+        """
         url = 'v1/images/%s' % image_id
+        if sink is not None:
+            resp, body_iter = self.http.raw_request('GET', url)
+            self._error_checker('GET', url, {}, None, resp, body_iter)
+            self.expected_success(200, resp.status)
+            body_iter.write_to(sink)
+            return service_client.ResponseBodyData(resp, sink)
         resp, body = self.get(url)
         self.expected_success(200, resp.status)
         return service_client.ResponseBodyData(resp, body)
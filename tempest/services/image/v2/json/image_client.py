@@ -27,7 +27,7 @@ class ImageClientV2(service_client.ServiceClient):
     def __init__(self, auth_provider, catalog_type, region, endpoint_type=None,
                  build_interval=None, build_timeout=None,
                  disable_ssl_certificate_validation=None, ca_certs=None,
-                 trace_requests=None):
+                 trace_requests=None, http_chunk_size=None):
         super(ImageClientV2, self).__init__(
             auth_provider,
             catalog_type,
@@ -42,12 +42,15 @@ class ImageClientV2(service_client.ServiceClient):
         self._http = None
         self.dscv = disable_ssl_certificate_validation
         self.ca_certs = ca_certs
+        self.http_chunk_size = http_chunk_size
 
     def _get_http(self):
         return glance_http.HTTPClient(auth_provider=self.auth_provider,
                                       filters=self.filters,
                                       insecure=self.dscv,
-                                      ca_certs=self.ca_certs)
+                                      ca_certs=self.ca_certs,
+                                      chunk_size=self.http_chunk_size,
+                                      connection_pool=self.connection_pool)
 
     def _validate_schema(self, body, type='image'):
         if type in ['image', 'images']:
@@ -145,6 +148,7 @@ class ImageClientV2(service_client.ServiceClient):
         return 'image'
 
     def store_image_file(self, image_id, data):
+        """Uploads image data, streaming it from a file or an mmap"""
         url = 'v2/images/%s/file' % image_id
         headers = {'Content-Type': 'application/octet-stream'}
         resp, body = self.http.raw_request('PUT', url, headers=headers,
@@ -152,8 +156,19 @@ class ImageClientV2(service_client.ServiceClient):
         self.expected_success(204, resp.status)
         return service_client.ResponseBody(resp, body)
 
-    def load_image_file(self, image_id):
+    def load_image_file(self, image_id, sink=None):
+        """Downloads the data of an image
+
+        If a file like sink is given, the image data is streamed to it
+        instead of being returned, so it is never held in memory.
+        """
         url = 'v2/images/%s/file' % image_id
+        if sink is not None:
+            resp, body_iter = self.http.raw_request('GET', url)
+            self._error_checker('GET', url, {}, None, resp, body_iter)
+            self.expected_success(200, resp.status)
+            body_iter.write_to(sink)
+            return service_client.ResponseBodyData(resp, sink)
         resp, body = self.get(url)
         self.expected_success(200, resp.status)
         return service_client.ResponseBodyData(resp, body)
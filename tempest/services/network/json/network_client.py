@@ -48,6 +48,10 @@ class NetworkClient(service_client.ServiceClient):
         self.expected_success(200, resp.status)
         return service_client.ResponseBody(resp, body)
 
+    def _iter_resources(self, uri, key, page_size=None, **filters):
+        return self.iter_pages(self.uri_prefix + uri, key, filters,
+                               page_size)
+
     def _delete_resource(self, uri):
         req_uri = self.uri_prefix + uri
         resp, body = self.delete(req_uri)
@@ -104,6 +108,10 @@ class NetworkClient(service_client.ServiceClient):
         uri = '/networks'
         return self._list_resources(uri, **filters)
 
+    def iter_networks(self, page_size=None, **filters):
+        uri = '/networks'
+        return self._iter_resources(uri, 'networks', page_size, **filters)
+
     def create_subnet(self, **kwargs):
         uri = '/subnets'
         post_data = {'subnet': kwargs}
@@ -126,6 +134,10 @@ class NetworkClient(service_client.ServiceClient):
         uri = '/subnets'
         return self._list_resources(uri, **filters)
 
+    def iter_subnets(self, page_size=None, **filters):
+        uri = '/subnets'
+        return self._iter_resources(uri, 'subnets', page_size, **filters)
+
     def create_port(self, **kwargs):
         uri = '/ports'
         post_data = {'port': kwargs}
@@ -148,6 +160,10 @@ class NetworkClient(service_client.ServiceClient):
         uri = '/ports'
         return self._list_resources(uri, **filters)
 
+    def iter_ports(self, page_size=None, **filters):
+        uri = '/ports'
+        return self._iter_resources(uri, 'ports', page_size, **filters)
+
     def create_floatingip(self, **kwargs):
         uri = '/floatingips'
         post_data = {'floatingip': kwargs}
@@ -170,6 +186,10 @@ class NetworkClient(service_client.ServiceClient):
         uri = '/floatingips'
         return self._list_resources(uri, **filters)
 
+    def iter_floatingips(self, page_size=None, **filters):
+        uri = '/floatingips'
+        return self._iter_resources(uri, 'floatingips', page_size, **filters)
+
     def create_metering_label(self, **kwargs):
         uri = '/metering/metering-labels'
         post_data = {'metering_label': kwargs}
@@ -226,6 +246,11 @@ class NetworkClient(service_client.ServiceClient):
         uri = '/security-groups'
         return self._list_resources(uri, **filters)
 
+    def iter_security_groups(self, page_size=None, **filters):
+        uri = '/security-groups'
+        return self._iter_resources(uri, 'security_groups', page_size,
+                                    **filters)
+
     def create_security_group_rule(self, **kwargs):
         uri = '/security-group-rules'
         post_data = {'security_group_rule': kwargs}
@@ -392,6 +417,10 @@ class NetworkClient(service_client.ServiceClient):
         uri = '/routers'
         return self._list_resources(uri, **filters)
 
+    def iter_routers(self, page_size=None, **filters):
+        uri = '/routers'
+        return self._iter_resources(uri, 'routers', page_size, **filters)
+
     def update_router_with_snat_gw_info(self, router_id, **kwargs):
         """Update a router passing also the enable_snat attribute.
 
@@ -13,16 +13,54 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import itertools
+import sys
+import threading
+import time
 from xml.etree import ElementTree as etree
 
+from oslo_log import log as logging
 from oslo_serialization import jsonutils as json
+import six
 from six.moves.urllib import parse as urllib
+from tempest_lib import exceptions as lib_exc
 
 from tempest.common import service_client
+from tempest import config
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
 
 
 class ContainerClient(service_client.ServiceClient):
 
+    # Default maximum number of objects returned by swift in a listing
+    listing_limit = 10000
+
+    def get_listing_limit(self):
+        """Returns the maximum number of objects listed per request
+
+        Swift rejects the listings with a larger limit than the
+        container_listing_limit of the cluster, which is read once from its
+        /info when not configured.
+        """
+        limit = CONF.object_storage.container_listing_limit
+        if limit:
+            return limit
+        if getattr(self, '_listing_limit', None) is None:
+            self.skip_path()
+            try:
+                resp, body = self.get('info')
+                info = json.loads(body)
+                self._listing_limit = info['swift'].get(
+                    'container_listing_limit', self.listing_limit)
+            except (lib_exc.NotFound, ValueError, KeyError):
+                # The cluster does not expose its capabilities
+                self._listing_limit = self.listing_limit
+            finally:
+                self.reset_path()
+        return self._listing_limit
+
     def create_container(
             self, container_name,
             metadata=None,
@@ -103,40 +141,77 @@ class ContainerClient(service_client.ServiceClient):
             Returns complete list of all objects in the container, even if
             item count is beyond 10,000 item listing limit.
             Does not require any parameters aside from container name.
+
+            params may contain the prefix, delimiter and marker of the
+            listing, and its limit, the maximum number of objects returned.
         """
-        # TODO(dwalleck): Rewrite using json format to avoid newlines at end of
-        # obj names. Set limit to API limit - 1 (max returned items = 9999)
-        limit = 9999
-        if params is not None:
-            if 'limit' in params:
-                limit = params['limit']
-
-            if 'marker' in params:
-                limit = params['marker']
-
-        resp, objlist = self.list_container_contents(
-            container,
-            params={'limit': limit, 'format': 'json'})
-        self.expected_success(200, resp.status)
-        return objlist
-        """tmp = []
-        for obj in objlist:
-            tmp.append(obj['name'])
-        objlist = tmp
-
-        if len(objlist) >= limit:
-
-            # Increment marker
-            marker = objlist[len(objlist) - 1]
-
-            # Get the next chunk of the list
-            objlist.extend(_list_all_container_objects(container,
-                                                      params={'marker': marker,
-                                                              'limit': limit}))
-            return objlist
-        else:
-            # Return final, complete list
-            return objlist"""
+        params = dict(params or {})
+        limit = params.get('limit')
+        page_size = self.get_listing_limit()
+        if limit is not None:
+            page_size = min(limit, page_size)
+        objects = self.iter_container_objects(
+            container, prefix=params.get('prefix'),
+            delimiter=params.get('delimiter'), marker=params.get('marker'),
+            page_size=page_size)
+        return list(itertools.islice(objects, limit))
+
+    def iter_container_objects(self, container, prefix=None, delimiter=None,
+                               marker=None, page_size=None, prefetch=False):
+        """Yields the records of the objects of a container
+
+        The objects are listed page_size at a time, each page starting
+        after the name of the last object of the previous one, so that only
+        one page is held in memory. When a delimiter is given, the records
+        of the pseudo directories have a 'subdir' key instead of a 'name'.
+
+        :param prefetch: request the next page in a background thread while
+                         the records of the current page are consumed
+        """
+        params = {'format': 'json',
+                  'limit': page_size or self.get_listing_limit()}
+        if prefix is not None:
+            params['prefix'] = prefix
+        if delimiter is not None:
+            params['delimiter'] = delimiter
+        if marker is not None:
+            params['marker'] = marker
+        # The listing client of the prefetching thread has its own
+        # connections, as they can not be shared between threads.
+        lister = self.clone() if prefetch else self
+
+        start = time.time()
+        pages = objects = 0
+        fetch = _PageFetcher(lister, container, params, prefetch)
+        try:
+            while True:
+                records = fetch.result()
+                pages += 1
+                objects += len(records)
+                if len(records) < params['limit']:
+                    fetch = None
+                else:
+                    last = records[-1]
+                    params['marker'] = last.get('name', last.get('subdir'))
+                    fetch = _PageFetcher(lister, container, params, prefetch)
+                for record in records:
+                    yield record
+                if fetch is None:
+                    return
+        finally:
+            elapsed = time.time() - start
+            LOG.debug("Listed %d objects of container %s in %d pages, "
+                      "%.1f pages/s", objects, container, pages,
+                      pages / elapsed if elapsed else 0.0)
+
+    def _list_page(self, container, params):
+        url = '%s?%s' % (container, urllib.urlencode(sorted(params.items())))
+        resp, body = self.get(url, headers={})
+        self.expected_success([200, 204], resp.status)
+        if not body:
+            # Empty listings may be returned as 204 No Content
+            return []
+        return json.loads(body)
 
     def list_container_contents(self, container, params=None):
         """
@@ -185,3 +260,33 @@ class ContainerClient(service_client.ServiceClient):
             body = etree.fromstring(body)
         self.expected_success([200, 204], resp.status)
         return resp, body
+
+
+class _PageFetcher(object):
+    """Lists a page of objects, in a background thread if asked to"""
+
+    def __init__(self, client, container, params, background):
+        self._args = (container, dict(params))
+        self._client = client
+        self._records = None
+        self._exc_info = None
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._fetch)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _fetch(self):
+        try:
+            self._records = self._client._list_page(*self._args)
+        except Exception:
+            self._exc_info = sys.exc_info()
+
+    def result(self):
+        if self._thread is None:
+            self._fetch()
+        else:
+            self._thread.join()
+        if self._exc_info is not None:
+            six.reraise(*self._exc_info)
+        return self._records
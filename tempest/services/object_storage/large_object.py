@@ -0,0 +1,314 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Parallel transfers of large swift objects.
+
+LargeObjectTransfer uploads a file as segments, several at a time, and
+writes the static (SLO) or dynamic (DLO) large object manifest joining
+them. Downloads are split in ranged GETs, also run concurrently, and are
+checked against the ETags of the segments or of the whole object.
+
+The file to upload is memory mapped, segments are streamed from the map
+without being read in memory first. The ranges downloaded are likewise
+written to the file as they are received.
+"""
+
+import contextlib
+import hashlib
+import mmap
+from multiprocessing.pool import ThreadPool
+import os
+import threading
+import time
+
+import httplib2
+from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
+
+from tempest.common import connection_pool
+from tempest import exceptions
+from tempest.services.object_storage import object_client as obj_client
+
+LOG = logging.getLogger(__name__)
+
+MiB = 1024 * 1024
+
+
+class TransferStats(object):
+    """Size and duration of a transfer"""
+
+    def __init__(self, operation, name):
+        self.operation = operation
+        self.name = name
+        self.bytes = 0
+        self.parts = 0
+        self.start = time.time()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, size):
+        with self._lock:
+            self.bytes += size
+            self.parts += 1
+
+    def stop(self):
+        self.elapsed = time.time() - self.start
+        LOG.info("%s of %s: %d bytes in %d parts, %.3fs, %.1f MiB/s",
+                 self.operation, self.name, self.bytes, self.parts,
+                 self.elapsed, self.throughput / MiB)
+
+    @property
+    def throughput(self):
+        """Bytes per second"""
+        if not self.elapsed:
+            return 0.0
+        return self.bytes / self.elapsed
+
+
+class _SegmentReader(object):
+    """File like object reading a segment of a memory mapped file
+
+    The MD5 of the data is computed while it is read, to be checked
+    against the ETag returned by swift.
+    """
+
+    def __init__(self, data, offset, size):
+        self._data = data
+        self._start = offset
+        self._pos = offset
+        self._end = offset + size
+        self.md5 = hashlib.md5()
+
+    def tell(self):
+        return self._pos - self._start
+
+    def seek(self, offset):
+        """Moves back to offset, to send the segment again"""
+        self._pos = self._start + offset
+        self.md5 = hashlib.md5(self._data[self._start:self._pos])
+
+    def read(self, size=-1):
+        end = self._end if size < 0 else min(self._pos + size, self._end)
+        chunk = self._data[self._pos:end]
+        self._pos = end
+        self.md5.update(chunk)
+        return chunk
+
+
+class _RangeWriter(object):
+    """File like object writing a range of a file
+
+    The MD5 of the data is computed while it is written, to be checked
+    against the ETag of its segment.
+    """
+
+    def __init__(self, f, offset):
+        self._file = f
+        self._file.seek(offset)
+        self.md5 = hashlib.md5()
+
+    def write(self, chunk):
+        self._file.write(chunk)
+        self.md5.update(chunk)
+
+
+def _check_etag(name, expected, actual):
+    expected = expected.strip('"')
+    if expected != actual:
+        raise exceptions.ObjectChecksumMismatch(name=name, actual=actual,
+                                                expected=expected)
+
+
+class LargeObjectTransfer(object):
+    """Uploads and downloads large objects with concurrent requests
+
+    :param client: the ObjectClient of the account
+    :param segment_size: size of the uploaded segments, and of the ranges
+                         of the downloads of objects without segments
+    :param concurrency: number of requests in flight
+    """
+
+    def __init__(self, client, segment_size=100 * MiB, concurrency=4):
+        self.client = client
+        self.segment_size = segment_size
+        self.concurrency = concurrency
+
+    def _map(self, func, items):
+        pool = ThreadPool(min(self.concurrency, len(items)) or 1)
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
+
+    @contextlib.contextmanager
+    def _connection_pool(self):
+        # NOTE: without a pool shared by the client, the connections of the
+        # workers are kept alive for the duration of the transfer only.
+        pool = self.client.connection_pool
+        if pool is not None:
+            yield pool
+            return
+        pool = connection_pool.ConnectionPool(max_size=self.concurrency)
+        try:
+            yield pool
+        finally:
+            pool.close()
+
+    def _put_segment(self, pool, container, name, reader, size):
+        client = self.client
+        headers = {'X-Auth-Token': client.token, 'Content-Length': size}
+        resp, body = obj_client.put_object(
+            client.base_url, container, name, reader, headers=headers,
+            connection_pool=pool)
+        resp = httplib2.Response(resp)
+        client._error_checker('PUT', name, headers, None, resp, body)
+        client.expected_success(201, resp.status)
+        _check_etag(name, resp['etag'], reader.md5.hexdigest())
+
+    def _get_range(self, pool, container, name, writer, offset, length):
+        client = self.client
+        headers = {'X-Auth-Token': client.token,
+                   'Range': 'bytes=%d-%d' % (offset, offset + length - 1)}
+        resp, body = obj_client.get_object_to_file(
+            client.base_url, container, name, writer, headers=headers,
+            connection_pool=pool)
+        resp = httplib2.Response(resp)
+        client._error_checker('GET', name, headers, None, resp, body)
+        client.expected_success([200, 206], resp.status)
+
+    def upload(self, container, object_name, path, manifest='slo',
+               segment_container=None):
+        """Uploads a file as a large object
+
+        The segments are named <object_name>/<8 digits index> and are put in
+        segment_container, by default the container of the object. An empty
+        file is uploaded as an empty object without manifest, as swift
+        rejects the static large object manifests without segments.
+
+        :param manifest: 'slo' or 'dlo', the kind of manifest to write
+        :returns: the TransferStats of the upload
+        """
+        if manifest not in ('slo', 'dlo'):
+            raise exceptions.InvalidConfiguration(
+                "Unknown large object manifest: %s" % manifest)
+        segment_container = segment_container or container
+        if self.client.base_url is None:
+            self.client._set_auth()
+        stats = TransferStats('Upload', object_name)
+        size = os.path.getsize(path)
+        if not size:
+            # NOTE: an empty file can not be memory mapped either
+            self.client.create_object(container, object_name, '')
+            stats.stop()
+            return stats
+        segments = [(i, offset, min(self.segment_size, size - offset))
+                    for i, offset in enumerate(
+                        range(0, size, self.segment_size))]
+
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                with self._connection_pool() as pool:
+                    def put(segment):
+                        index, offset, length = segment
+                        name = '%s/%08d' % (object_name, index)
+                        reader = _SegmentReader(data, offset, length)
+                        self._put_segment(pool, segment_container, name,
+                                          reader, length)
+                        stats.add(length)
+                        return {'path': '/%s/%s' % (segment_container, name),
+                                'etag': reader.md5.hexdigest(),
+                                'size_bytes': length}
+                    parts = self._map(put, segments)
+            finally:
+                data.close()
+
+        if manifest == 'slo':
+            self.client.create_object(
+                container, object_name, json.dumps(parts),
+                params={'multipart-manifest': 'put'})
+        else:
+            self.client.create_object(
+                container, object_name, '',
+                metadata={'X-Object-Manifest': '%s/%s/' % (
+                    segment_container, object_name)})
+        stats.stop()
+        return stats
+
+    def _get_ranges(self, container, object_name, resp):
+        """Returns the size and the (offset, size, etag) ranges to get
+
+        The ranges of a static large object are its segments, so they can
+        be checked against their ETag. Other objects are split in ranges
+        of segment_size, without ETag.
+
+        :param resp: the response to the HEAD request of the object
+        """
+        size = int(resp['content-length'])
+        if resp.get('x-static-large-object', '').lower() == 'true':
+            _, body = self.client.get_object(
+                container, '%s?multipart-manifest=get' % object_name)
+            ranges = []
+            offset = 0
+            for segment in json.loads(body):
+                ranges.append((offset, segment['bytes'], segment['hash']))
+                offset += segment['bytes']
+            return size, ranges
+        return size, [(offset, min(self.segment_size, size - offset), None)
+                      for offset in range(0, size, self.segment_size)]
+
+    def download(self, container, object_name, path, md5=None):
+        """Downloads an object to a file with concurrent ranged GETs
+
+        The ranges of static large objects are checked against the ETag of
+        their segment. The MD5 of the whole file is checked against md5
+        when given, or otherwise against the ETag of objects which are
+        not large objects.
+
+        :returns: the TransferStats of the download
+        """
+        stats = TransferStats('Download', object_name)
+        if self.client.base_url is None:
+            self.client._set_auth()
+        resp, _ = self.client.list_object_metadata(container, object_name)
+        size, ranges = self._get_ranges(container, object_name, resp)
+        if md5 is None and not ('x-object-manifest' in resp or
+                                'x-static-large-object' in resp):
+            md5 = resp['etag']
+        with open(path, 'wb') as f:
+            f.truncate(size)
+
+        with self._connection_pool() as pool:
+            def get(part):
+                offset, length, etag = part
+                with open(path, 'r+b') as f:
+                    writer = _RangeWriter(f, offset)
+                    self._get_range(pool, container, object_name, writer,
+                                    offset, length)
+                if etag is not None:
+                    _check_etag('%s@%d' % (object_name, offset), etag,
+                                writer.md5.hexdigest())
+                stats.add(length)
+            self._map(get, ranges)
+
+        if md5 is not None:
+            checksum = hashlib.md5()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(MiB), b''):
+                    checksum.update(chunk)
+            _check_etag(object_name, md5, checksum.hexdigest())
+        stats.stop()
+        return stats
@@ -13,12 +13,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from oslo_log import log as logging
 import six
 from six.moves import http_client as httplib
 from six.moves.urllib import parse as urlparse
 
+from tempest.common import connection_pool as pooling
 from tempest.common import service_client
 
+LOG = logging.getLogger(__name__)
+
 
 class ObjectClient(service_client.ServiceClient):
 
@@ -159,11 +163,9 @@ class ObjectClient(service_client.ServiceClient):
         if self.token:
             headers['X-Auth-Token'] = self.token
 
-        conn = put_object_connection(self.base_url, container, name, contents,
-                                     chunk_size, headers)
-
-        resp = conn.getresponse()
-        body = resp.read()
+        resp, body = put_object(self.base_url, container, name, contents,
+                                chunk_size, headers,
+                                connection_pool=self.connection_pool)
 
         resp_headers = {}
         for header, value in resp.getheaders():
@@ -202,8 +204,141 @@ class ObjectClient(service_client.ServiceClient):
         return resp
 
 
+def connection_key(base_url):
+    # NOTE: httplib connections are not mixed with the httplib2 ones of the
+    # same endpoint, their TLS settings differ.
+    parsed = urlparse.urlparse(base_url)
+    return 'httplib:%s:%s' % (parsed.scheme, parsed.netloc)
+
+
+def _pooled_response(base_url, connection_pool, send, rewind):
+    """Sends a request over a pooled connection and returns its response
+
+    When the server had already closed the idle connection taken from the
+    pool, the request is sent again once over a new connection, provided
+    rewind() is able to rewind its body.
+
+    :param send: callable taking the connection to send the request over,
+                 or None for a new one, and returning the connection used
+    :returns: the connection key, the connection and the httplib response
+    """
+    key = connection_key(base_url)
+    conn = None
+    if connection_pool is not None:
+        conn = connection_pool.acquire(key)
+    reused = conn is not None
+    try:
+        conn = send(conn)
+        resp = conn.getresponse()
+    except pooling.STALE_CONNECTION_ERRORS as e:
+        if (not reused or not pooling.is_stale_connection_error(e) or
+                not rewind()):
+            raise
+        LOG.debug("Pooled connection to %s closed (%s), sending the "
+                  "request again", key, e)
+        conn.close()
+        conn = send(None)
+        resp = conn.getresponse()
+    return key, conn, resp
+
+
+def _release_connection(connection_pool, key, conn, resp):
+    # The response must have been read
+    if connection_pool is not None and not resp.will_close:
+        connection_pool.release(key, conn)
+    else:
+        conn.close()
+
+
+def put_object(base_url, container, name, contents=None, chunk_size=65536,
+               headers=None, query_string=None, connection_pool=None):
+    """Puts an object with httplib and reads the response
+
+    The arguments are those of put_object_connection. With a
+    connection_pool, an idle connection of the pool is used when available,
+    and given back once the response is read. When the server had already
+    closed that connection, the request is sent again once over a new
+    connection, provided the contents can be read again.
+
+    :returns: the httplib response, and its body
+    """
+    position = pooling.body_position(contents)
+
+    def send(conn):
+        return put_object_connection(base_url, container, name, contents,
+                                     chunk_size, headers, query_string,
+                                     connection=conn)
+
+    def rewind():
+        if position is None:
+            return False
+        if hasattr(contents, 'seek'):
+            contents.seek(position)
+        return True
+
+    key, conn, resp = _pooled_response(base_url, connection_pool, send,
+                                       rewind)
+    body = resp.read()
+    _release_connection(connection_pool, key, conn, resp)
+    return resp, body
+
+
+def get_object_to_file(base_url, container, name, f, headers=None,
+                       chunk_size=65536, connection_pool=None):
+    """Gets an object with httplib and writes its data to a file
+
+    The data is written chunk_size at a time as it is received, without
+    being held in memory. The connection_pool is used as by put_object.
+
+    :param f: file like object the data is written to, when the response
+              is successful
+    :param headers: headers of the request, e.g. X-Auth-Token and Range
+    :returns: the httplib response, and its body when it is not successful
+    """
+    def send(conn):
+        return get_object_connection(base_url, container, name, headers,
+                                     connection=conn)
+
+    key, conn, resp = _pooled_response(base_url, connection_pool, send,
+                                       lambda: True)
+    body = b''
+    if resp.status in (200, 206):
+        for chunk in iter(lambda: resp.read(chunk_size), b''):
+            f.write(chunk)
+    else:
+        body = resp.read()
+    _release_connection(connection_pool, key, conn, resp)
+    return resp, body
+
+
+def _object_path(parsed, container, name):
+    return str(parsed.path) + "/%s/%s" % (str(container), str(name))
+
+
+def _new_connection(parsed):
+    if parsed.scheme == 'https':
+        return httplib.HTTPSConnection(parsed.netloc)
+    return httplib.HTTPConnection(parsed.netloc)
+
+
+def get_object_connection(base_url, container, name, headers=None,
+                          connection=None):
+    """Sends the GET request of an object with httplib
+
+    The arguments are those of put_object_connection.
+
+    :returns: the connection, to get the response from
+    """
+    parsed = urlparse.urlparse(base_url)
+    conn = connection or _new_connection(parsed)
+    conn.request('GET', _object_path(parsed, container, name),
+                 headers=dict(headers or {}))
+    return conn
+
+
 def put_object_connection(base_url, container, name, contents=None,
-                          chunk_size=65536, headers=None, query_string=None):
+                          chunk_size=65536, headers=None, query_string=None,
+                          connection=None):
     """
     Helper function to make connection to put object with httplib
     :param base_url: base_url of an object client
@@ -216,14 +351,12 @@ def put_object_connection(base_url, container, name, contents=None,
                        method, eg. file-like objects, ignored otherwise
     :param headers: additional headers to include in the request, if any
     :param query_string: if set will be appended with '?' to generated path
+    :param connection: if set, an open connection to send the request over,
+                       instead of a new one
     """
     parsed = urlparse.urlparse(base_url)
-    if parsed.scheme == 'https':
-        conn = httplib.HTTPSConnection(parsed.netloc)
-    else:
-        conn = httplib.HTTPConnection(parsed.netloc)
-    path = str(parsed.path) + "/"
-    path += "%s/%s" % (str(container), str(name))
+    conn = connection or _new_connection(parsed)
+    path = _object_path(parsed, container, name)
 
     if query_string:
         path += '?' + query_string
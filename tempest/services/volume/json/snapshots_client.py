@@ -42,6 +42,13 @@ class BaseSnapshotsClient(service_client.ServiceClient):
         self.expected_success(200, resp.status)
         return service_client.ResponseBodyList(resp, body['snapshots'])
 
+    def iter_snapshots(self, detail=False, params=None, page_size=None):
+        """Yields the snapshots, one page at a time."""
+        url = 'snapshots'
+        if detail:
+            url += '/detail'
+        return self.iter_pages(url, 'snapshots', params, page_size)
+
     def show_snapshot(self, snapshot_id):
         """Returns the details of a single snapshot."""
         url = "snapshots/%s" % str(snapshot_id)
@@ -91,6 +91,16 @@ class BaseVolumesClient(service_client.ServiceClient):
         key = None if return_body else 'volumes'
         return self._ext_get(url, key)
 
+    def iter_volumes(self, detail=False, params=None, page_size=None):
+        """Yields the volumes, one page at a time.
+
+        Unlike list_volumes, params must be a dictionary.
+        """
+        url = 'volumes'
+        if detail:
+            url += '/detail'
+        return self.iter_pages(url, 'volumes', params, page_size)
+
     def show_volume(self, volume_id):
         """Returns the details of a single volume."""
         url = "volumes/%s" % str(volume_id)
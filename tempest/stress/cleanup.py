@@ -24,17 +24,21 @@ LOG = logging.getLogger(__name__)
 def cleanup():
     admin_manager = clients.AdminManager()
 
-    body = admin_manager.servers_client.list_servers(all_tenants=True)
-    LOG.info("Cleanup::remove %s servers" % len(body['servers']))
-    for s in body['servers']:
+    # NOTE: servers are deleted while the next pages are listed, only their
+    # ids are kept to wait for their termination
+    server_ids = []
+    for s in admin_manager.servers_client.iter_servers(all_tenants=True):
+        server_ids.append(s['id'])
         try:
             admin_manager.servers_client.delete_server(s['id'])
         except Exception:
             pass
+    LOG.info("Cleanup::remove %s servers" % len(server_ids))
 
-    for s in body['servers']:
+    for server_id in server_ids:
         try:
-            admin_manager.servers_client.wait_for_server_termination(s['id'])
+            admin_manager.servers_client.wait_for_server_termination(
+                server_id)
         except Exception:
             pass
 
@@ -79,36 +83,39 @@ def cleanup():
     # We have to delete snapshots first or
     # volume deletion may block
 
-    _, snaps = admin_manager.snapshots_client.\
-        list_snapshots(params={"all_tenants": True})
-    LOG.info("Cleanup::remove %s snapshots" % len(snaps))
-    for v in snaps:
+    snapshot_ids = []
+    for v in admin_manager.snapshots_client.iter_snapshots(
+            params={"all_tenants": True}):
+        snapshot_ids.append(v['id'])
         try:
             admin_manager.snapshots_client.\
                 wait_for_snapshot_status(v['id'], 'available')
             admin_manager.snapshots_client.delete_snapshot(v['id'])
         except Exception:
             pass
+    LOG.info("Cleanup::remove %s snapshots" % len(snapshot_ids))
 
-    for v in snaps:
+    for snapshot_id in snapshot_ids:
         try:
-            admin_manager.snapshots_client.wait_for_resource_deletion(v['id'])
+            admin_manager.snapshots_client.wait_for_resource_deletion(
+                snapshot_id)
         except Exception:
             pass
 
-    vols = admin_manager.volumes_client.list_volumes(
-        params={"all_tenants": True})
-    LOG.info("Cleanup::remove %s volumes" % len(vols))
-    for v in vols:
+    volume_ids = []
+    for v in admin_manager.volumes_client.iter_volumes(
+            params={"all_tenants": True}):
+        volume_ids.append(v['id'])
         try:
             admin_manager.volumes_client.\
                 wait_for_volume_status(v['id'], 'available')
             admin_manager.volumes_client.delete_volume(v['id'])
         except Exception:
             pass
+    LOG.info("Cleanup::remove %s volumes" % len(volume_ids))
 
-    for v in vols:
+    for volume_id in volume_ids:
         try:
-            admin_manager.volumes_client.wait_for_resource_deletion(v['id'])
+            admin_manager.volumes_client.wait_for_resource_deletion(volume_id)
         except Exception:
             pass
@@ -18,6 +18,7 @@ import signal
 import time
 
 from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
 from oslo_utils import importutils
 import six
 from six import moves
@@ -30,6 +31,9 @@ from tempest.common.utils import data_utils
 from tempest import config
 from tempest import exceptions
 from tempest.stress import cleanup
+from tempest.stress import green
+from tempest.stress import metrics
+from tempest.stress import schedule
 
 CONF = config.CONF
 
@@ -37,6 +41,26 @@ LOG = logging.getLogger(__name__)
 processes = []
 
 
+class SharedStatistic(object):
+    """Run and failure counters of one worker process
+
+    Only the worker updates its counters, so they are kept in a lock free
+    shared memory array rather than in a multiprocessing.Manager dict proxy,
+    which needs a server process and an IPC round trip for every update.
+    """
+
+    fields = ('runs', 'fails')
+
+    def __init__(self):
+        self._values = multiprocessing.RawArray('l', len(self.fields))
+
+    def __getitem__(self, key):
+        return self._values[self.fields.index(key)]
+
+    def __setitem__(self, key, value):
+        self._values[self.fields.index(key)] = value
+
+
 def do_ssh(command, host, ssh_user, ssh_key=None):
     ssh_client = ssh.Client(host, ssh_user, key_filename=ssh_key)
     try:
@@ -95,9 +119,11 @@ def sigchld_handler(signalnum, frame):
             break
 
 
-def terminate_all_processes(check_interval=20):
+def terminate_all_processes(check_interval=20, aggregator=None):
     """
     Goes through the process list and terminates all child processes.
+    If a metrics aggregator is given, the metrics flushed by the processes
+    while they terminate are collected.
     """
     LOG.info("Stopping all processes.")
     for process in processes:
@@ -106,7 +132,18 @@ def terminate_all_processes(check_interval=20):
                 process['process'].terminate()
             except Exception:
                 pass
-    time.sleep(check_interval)
+    if aggregator is None:
+        time.sleep(check_interval)
+    else:
+        # NOTE: a process does not exit until the metrics it put in the
+        # queue are read, so keep draining while waiting for them.
+        end_time = time.time() + check_interval
+        while time.time() < end_time:
+            aggregator.drain()
+            if not any(p['process'].is_alive() for p in processes):
+                break
+            time.sleep(min(1, check_interval))
+        aggregator.drain()
     for process in processes:
         if process['process'].is_alive():
             try:
@@ -118,11 +155,52 @@ def terminate_all_processes(check_interval=20):
         process['process'].join()
 
 
-def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
+def _start_green_processes(tasks, processes_number, metrics_queue,
+                           schedule_queue):
+    """Starts the tasks of an action as green threads of a few processes"""
+    for group in green.split(tasks, processes_number):
+        worker = green.GreenWorker([task['action'] for task in group],
+                                   [task['statistic'] for task in group])
+        p = multiprocessing.Process(target=worker.execute,
+                                    args=(metrics_queue, schedule_queue))
+        for task in group:
+            processes.append({'process': p,
+                              'p_number': task['p_number'],
+                              'action': task['action'].action,
+                              'statistic': task['statistic']})
+        p.start()
+
+
+def write_metrics(metrics_file, summary):
+    """Writes the metrics summary of the actions to a JSON file
+
+    Actions already present in the file are kept unless they are part of
+    the summary, so serial runs can write their steps to the same file.
+    """
+    data = {}
+    if os.path.exists(metrics_file):
+        with open(metrics_file, 'r') as f:
+            data = json.loads(f.read())
+    data.update(summary)
+    with open(metrics_file, 'w') as f:
+        f.write(json.dumps(data, sort_keys=True, indent=2,
+                           separators=(',', ': ')))
+
+
+def stress_openstack(tests, duration, max_runs=None, stop_on_error=False,
+                     metrics_file=None):
     """
     Workload driver. Executes an action function against a nova-cluster.
+    If metrics_file is given, the latency percentiles and throughput of
+    each action are written to it as JSON. Tests with a "rate" profile are
+    run in open loop, see tempest.stress.schedule, and tests with the
+    "green" backend as green threads, see tempest.stress.green.
     """
     admin_manager = clients.AdminManager()
+    # NOTE: all the processes send their metrics through a single queue
+    metrics_queue = multiprocessing.Queue()
+    aggregator = metrics.Aggregator(metrics_queue)
+    schedulers = []
 
     ssh_user = CONF.stress.target_ssh_user
     ssh_key = CONF.stress.target_private_key_path
@@ -146,7 +224,22 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
             manager = admin_manager
         else:
             manager = clients.Manager()
-        for p_number in moves.xrange(test.get('threads', default_thread_num)):
+        backend = test.get('backend', 'process')
+        if backend == 'green':
+            green.check_available()
+        elif backend != 'process':
+            raise exceptions.InvalidConfiguration(
+                "Unknown stress backend: %s" % backend)
+        green_tasks = []
+        threads = test.get('threads', default_thread_num)
+        schedule_queue = None
+        if 'rate' in test:
+            # NOTE: all the processes of the action share the same tickets
+            schedule_queue = multiprocessing.Queue()
+            schedulers.append((schedule.RateScheduler(test['rate'],
+                                                      schedule_queue),
+                               threads))
+        for p_number in moves.xrange(threads):
             if test.get('use_isolated_tenants', False):
                 username = data_utils.rand_name("stress_user")
                 tenant_name = data_utils.rand_name("stress_tenant")
@@ -168,9 +261,14 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
                 creds = credentials_client.get_credentials(user, project,
                                                            password)
                 manager = clients.Manager(credentials=creds)
+                action_manager = manager
+            elif backend == 'green':
+                action_manager = green.clone_manager(manager)
+            else:
+                action_manager = manager
 
             test_obj = importutils.import_class(test['action'])
-            test_run = test_obj(manager, max_runs, stop_on_error)
+            test_run = test_obj(action_manager, max_runs, stop_on_error)
 
             kwargs = test.get('kwargs', {})
             test_run.setUp(**dict(six.iteritems(kwargs)))
@@ -178,13 +276,18 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
             LOG.debug("calling Target Object %s" %
                       test_run.__class__.__name__)
 
-            mp_manager = multiprocessing.Manager()
-            shared_statistic = mp_manager.dict()
-            shared_statistic['runs'] = 0
-            shared_statistic['fails'] = 0
+            shared_statistic = SharedStatistic()
+
+            if backend == 'green':
+                green_tasks.append({'action': test_run,
+                                    'p_number': p_number,
+                                    'statistic': shared_statistic})
+                continue
 
             p = multiprocessing.Process(target=test_run.execute,
-                                        args=(shared_statistic,))
+                                        args=(shared_statistic,
+                                              metrics_queue,
+                                              schedule_queue))
 
             process = {'process': p,
                        'p_number': p_number,
@@ -193,6 +296,15 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
 
             processes.append(process)
             p.start()
+        if green_tasks:
+            processes_number = test.get('processes',
+                                        multiprocessing.cpu_count())
+            _start_green_processes(green_tasks, processes_number,
+                                   metrics_queue, schedule_queue)
+    # NOTE: the schedules start once all the processes are set up, so the
+    # setUp time is not accounted as schedule lag
+    for scheduler, _ in schedulers:
+        scheduler.start()
     if stop_on_error:
         # NOTE(mkoderer): only the parent should register the handler
         signal.signal(signal.SIGCHLD, sigchld_handler)
@@ -215,6 +327,7 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
                     break
 
             time.sleep(min(remaining, log_check_interval))
+            aggregator.drain()
             if stop_on_error:
                 if any([True for proc in processes
                         if proc['statistic']['fails'] > 0]):
@@ -231,7 +344,15 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
 
     if stop_on_error:
         signal.signal(signal.SIGCHLD, signal.SIG_DFL)
-    terminate_all_processes()
+    aggregator.stop()
+    for scheduler, threads in schedulers:
+        # Each thread of the action, process or green thread, exits once it
+        # gets a None ticket
+        scheduler.stop(consumers=threads)
+        # NOTE: tickets left in the queue are never read, do not wait for
+        # them to be flushed when exiting
+        scheduler.queue.cancel_join_thread()
+    terminate_all_processes(aggregator=aggregator)
 
     sum_fails = 0
     sum_runs = 0
@@ -251,6 +372,19 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
     LOG.info("Run %d actions (%d failed)" %
              (sum_runs, sum_fails))
 
+    summary = aggregator.summary()
+    for action, stats in sorted(summary.items()):
+        run_time = stats['run_time']
+        LOG.info(" %s: %.2f runs/s, run time p50 %.3fs p95 %.3fs p99 %.3fs" %
+                 (action, stats['throughput'], run_time['p50'],
+                  run_time['p95'], run_time['p99']))
+        if 'schedule_lag' in stats:
+            lag = stats['schedule_lag']
+            LOG.info(" %s: schedule lag p50 %.3fs p95 %.3fs p99 %.3fs" %
+                     (action, lag['p50'], lag['p95'], lag['p99']))
+    if metrics_file:
+        write_metrics(metrics_file, summary)
+
     if not had_errors and CONF.stress.full_clean_stack:
         LOG.info("cleaning up")
         cleanup.cleanup()
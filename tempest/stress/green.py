@@ -0,0 +1,136 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Green thread backend of the stress driver.
+
+With the default "process" backend, every thread of a stress action is a
+separate process. When a test entry of the stress JSON file sets "backend"
+to "green", its threads are instead run as eventlet green threads, spread
+over a few processes (the "processes" key, one per CPU by default). The
+sockets of the worker processes are monkey patched, so the HTTP requests of
+the service clients yield to the other actions instead of blocking the
+process, and a single process can drive hundreds of concurrent actions.
+
+eventlet is not a requirement of tempest, it must be installed to use this
+backend.
+"""
+
+import signal
+import sys
+
+from oslo_log import log as logging
+from oslo_utils import importutils
+from six import moves
+
+from tempest import clients
+from tempest.common import schema_validation
+from tempest import exceptions
+from tempest.stress import metrics
+
+eventlet = importutils.try_import('eventlet')
+
+LOG = logging.getLogger(__name__)
+
+# Interval at which the schedule queue shared with the driver is polled
+POLL_INTERVAL = 0.01
+
+
+def check_available():
+    if eventlet is None:
+        raise exceptions.InvalidConfiguration(
+            "The green stress backend requires eventlet")
+
+
+def clone_manager(manager):
+    """Returns a manager with its own clients, sharing the authentication
+
+    The HTTP connections of a client can not be used by several green
+    threads at once, so each action needs its own clients. Sharing the auth
+    provider avoids requesting a token per action.
+    """
+    clone = clients.Manager(credentials=manager.credentials,
+                            service=getattr(manager, 'service', None))
+    clone.auth_provider = manager.auth_provider
+    return clone
+
+
+def split(tasks, processes):
+    """Distributes the tasks over at most the given number of processes"""
+    processes = max(min(processes, len(tasks)), 1)
+    return [tasks[i::processes] for i in moves.xrange(processes)]
+
+
+class GreenWorker(object):
+    """Runs stress actions as green threads of a single process
+
+    The actions must all be instances of the same stress action, they share
+    the metrics recorder of the process.
+    """
+
+    def __init__(self, actions, statistics):
+        self.actions = actions
+        self.statistics = statistics
+        self.metrics = None
+
+    def _shutdown_handler(self, signal, frame):
+        for action in self.actions:
+            try:
+                action.tearDown()
+            except Exception:
+                LOG.exception("Error while tearDown")
+        if self.metrics:
+            self.metrics.flush()
+            schema_validation.log_stats()
+        sys.exit(0)
+
+    @staticmethod
+    def _feed_tickets(schedule_queue, tickets):
+        # NOTE: a blocking get on the multiprocessing queue would block all
+        # the green threads, so it is polled instead.
+        while True:
+            try:
+                tickets.put(schedule_queue.get_nowait())
+            except moves.queue.Empty:
+                eventlet.sleep(POLL_INTERVAL)
+
+    def execute(self, metrics_queue=None, schedule_queue=None):
+        """Entry point of the worker process, called by the driver"""
+        eventlet.monkey_patch(socket=True, time=True)
+        signal.signal(signal.SIGHUP, self._shutdown_handler)
+        signal.signal(signal.SIGTERM, self._shutdown_handler)
+
+        self.metrics = metrics.Recorder(self.actions[0].action,
+                                        metrics_queue)
+        if metrics_queue is not None:
+            metrics.instrument_rest_client()
+            metrics.set_recorder(self.metrics)
+
+        feeder = None
+        tickets = None
+        if schedule_queue is not None:
+            tickets = eventlet.queue.LightQueue()
+            feeder = eventlet.spawn(self._feed_tickets, schedule_queue,
+                                    tickets)
+        pool = eventlet.GreenPool(len(self.actions))
+        for action, statistic in zip(self.actions, self.statistics):
+            action.metrics = self.metrics
+            pool.spawn(action.run_loop, statistic, tickets)
+        try:
+            pool.waitall()
+        finally:
+            if feeder is not None:
+                feeder.kill()
+            self.metrics.flush()
+            schema_validation.log_stats()
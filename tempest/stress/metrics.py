@@ -0,0 +1,240 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Low overhead latency metrics for the stress test framework.
+
+Each worker records the wall time of its runs and the latency of every API
+call into local histograms, and periodically sends a snapshot of them to the
+driver through a single shared queue. The driver merges the snapshots per
+action and computes percentiles and throughput at the end of the run.
+"""
+
+import functools
+import threading
+import time
+
+from six import moves
+from tempest_lib.common import rest_client
+
+# Number of bits used for the sub buckets of a power of two range. With 7
+# bits the relative error of a recorded value is below 1%.
+SUB_BUCKET_BITS = 7
+
+_local = threading.local()
+
+
+class Histogram(object):
+    """HDR style histogram of durations
+
+    Durations are stored in microseconds into log-linear buckets, so the
+    memory used only depends on the dynamic range of the values and the
+    relative error is bounded by SUB_BUCKET_BITS.
+    """
+
+    def __init__(self, counts=None, total=0, maximum=0):
+        self.counts = counts or {}
+        self.total = total
+        self.maximum = maximum
+
+    @staticmethod
+    def _bucket(value):
+        shift = max(value.bit_length() - SUB_BUCKET_BITS, 0)
+        return (value >> shift) << shift
+
+    @property
+    def count(self):
+        return sum(self.counts.values())
+
+    def record(self, seconds):
+        value = int(seconds * 1000000)
+        bucket = self._bucket(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+
+    def percentile(self, percent):
+        """Returns the given percentile of the recorded values in seconds"""
+        count = self.count
+        if not count:
+            return 0.0
+        threshold = count * percent / 100.0
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return bucket / 1000000.0
+        return self.maximum / 1000000.0
+
+    def to_dict(self):
+        return {'counts': self.counts, 'total': self.total,
+                'maximum': self.maximum}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(dict(data['counts']), data['total'], data['maximum'])
+
+    def summary(self):
+        count = self.count
+        return {'count': count,
+                'mean': self.total / 1000000.0 / count if count else 0.0,
+                'max': self.maximum / 1000000.0,
+                'p50': self.percentile(50),
+                'p95': self.percentile(95),
+                'p99': self.percentile(99)}
+
+
+class Recorder(object):
+    """Records the metrics of one worker
+
+    The recorder is only used by its own worker, so recording is a plain
+    in-process operation. flush() sends what was recorded since the previous
+    flush to the driver and resets the local histograms.
+    """
+
+    def __init__(self, action, queue=None, flush_interval=10):
+        self.action = action
+        self.queue = queue
+        self.flush_interval = flush_interval
+        self._last_flush = time.time()
+        self._reset()
+
+    def _reset(self):
+        self.runs = 0
+        self.fails = 0
+        self.run_time = Histogram()
+        self.schedule_lag = Histogram()
+        self.api_calls = {}
+
+    def record_lag(self, seconds):
+        """Records how late a scheduled run was started"""
+        self.schedule_lag.record(max(seconds, 0))
+
+    def record_run(self, seconds, failed=False):
+        self.runs += 1
+        if failed:
+            self.fails += 1
+        self.run_time.record(seconds)
+        if time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def record_api_call(self, name, seconds):
+        histogram = self.api_calls.get(name)
+        if histogram is None:
+            histogram = self.api_calls[name] = Histogram()
+        histogram.record(seconds)
+
+    def snapshot(self):
+        return {'action': self.action,
+                'runs': self.runs,
+                'fails': self.fails,
+                'run_time': self.run_time.to_dict(),
+                'schedule_lag': self.schedule_lag.to_dict(),
+                'api_calls': dict((name, h.to_dict()) for name, h
+                                  in self.api_calls.items())}
+
+    def flush(self):
+        self._last_flush = time.time()
+        if self.queue is None or (not self.runs and not self.api_calls):
+            return
+        self.queue.put(self.snapshot())
+        self._reset()
+
+
+class Aggregator(object):
+    """Merges the snapshots sent by all the workers, per action"""
+
+    def __init__(self, queue=None):
+        self.queue = queue
+        self.actions = {}
+        self.start_time = time.time()
+        self.end_time = None
+
+    def add(self, snapshot):
+        action = self.actions.setdefault(snapshot['action'], {
+            'runs': 0, 'fails': 0, 'run_time': Histogram(),
+            'schedule_lag': Histogram(), 'api_calls': {}})
+        action['runs'] += snapshot['runs']
+        action['fails'] += snapshot['fails']
+        action['run_time'].merge(Histogram.from_dict(snapshot['run_time']))
+        if 'schedule_lag' in snapshot:
+            action['schedule_lag'].merge(
+                Histogram.from_dict(snapshot['schedule_lag']))
+        for name, data in snapshot['api_calls'].items():
+            histogram = action['api_calls'].setdefault(name, Histogram())
+            histogram.merge(Histogram.from_dict(data))
+
+    def drain(self):
+        """Adds all the snapshots currently waiting in the queue"""
+        while True:
+            try:
+                self.add(self.queue.get_nowait())
+            except moves.queue.Empty:
+                return
+
+    def stop(self):
+        self.end_time = time.time()
+
+    def summary(self):
+        duration = (self.end_time or time.time()) - self.start_time
+        result = {}
+        for name, action in self.actions.items():
+            result[name] = {
+                'runs': action['runs'],
+                'fails': action['fails'],
+                'duration': duration,
+                'throughput': action['runs'] / duration if duration else 0.0,
+                'run_time': action['run_time'].summary(),
+                'api_calls': dict((call, h.summary()) for call, h
+                                  in action['api_calls'].items())}
+            if action['schedule_lag'].count:
+                result[name]['schedule_lag'] = (
+                    action['schedule_lag'].summary())
+        return result
+
+
+def set_recorder(recorder):
+    """Sets the recorder receiving the API calls of the current thread"""
+    _local.recorder = recorder
+
+
+def instrument_rest_client():
+    """Records the latency of every REST call into the current recorder
+
+    This patches RestClient.raw_request, so it is meant to be called in a
+    worker process only.
+    """
+    raw_request = rest_client.RestClient.raw_request
+    if getattr(raw_request, '_stress_metrics', False):
+        return
+
+    @functools.wraps(raw_request)
+    def timed_raw_request(self, url, method, *args, **kwargs):
+        start = time.time()
+        try:
+            return raw_request(self, url, method, *args, **kwargs)
+        finally:
+            recorder = getattr(_local, 'recorder', None)
+            if recorder is not None:
+                name = '%s %s' % (getattr(self, 'service', None), method)
+                recorder.record_api_call(name, time.time() - start)
+
+    timed_raw_request._stress_metrics = True
+    rest_client.RestClient.raw_request = timed_raw_request
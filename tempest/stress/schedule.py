@@ -0,0 +1,135 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Open loop scheduling of stress actions.
+
+By default each stress process runs its action in a closed loop, as fast as
+it can. When a test entry of the stress JSON file has a "rate" key, the
+driver instead dispatches runs at the requested rate: a scheduler thread
+puts the intended start time of every run in a queue shared by all the
+processes of the action, and each process waits for its next ticket. When
+the processes can not keep up, tickets pile up in the queue and the delay
+between the intended and the actual start time of the runs, the schedule
+lag, grows instead of being hidden by a slower request rate.
+
+The supported rate profiles are::
+
+    {"type": "constant", "ops": 5}
+    {"type": "ramp", "start": 1, "end": 10, "duration": 60}
+    {"type": "step", "steps": [[0, 1], [30, 5], [60, 10]]}
+
+where rates are in runs per second, and times in seconds from the start of
+the run. A ramp stays at its end rate after its duration and the steps are
+[start time, rate] pairs.
+"""
+
+import threading
+import time
+
+from tempest import exceptions
+
+# Time to wait before checking again the rate when it is zero
+IDLE_INTERVAL = 1.0
+
+
+def constant_profile(ops):
+    return lambda t: ops
+
+
+def ramp_profile(start, end, duration):
+    def rate(t):
+        if t >= duration:
+            return end
+        return start + (end - start) * t / float(duration)
+    return rate
+
+
+def step_profile(steps):
+    steps = sorted(steps)
+
+    def rate(t):
+        current = 0
+        for step_start, ops in steps:
+            if t < step_start:
+                break
+            current = ops
+        return current
+    return rate
+
+
+def get_profile(spec):
+    """Returns the rate function of a rate profile specification"""
+    profile_type = spec.get('type', 'constant')
+    try:
+        if profile_type == 'constant':
+            return constant_profile(spec['ops'])
+        elif profile_type == 'ramp':
+            return ramp_profile(spec['start'], spec['end'], spec['duration'])
+        elif profile_type == 'step':
+            return step_profile(spec['steps'])
+    except KeyError as e:
+        raise exceptions.InvalidConfiguration(
+            "Missing %s in %s rate profile" % (e, profile_type))
+    raise exceptions.InvalidConfiguration(
+        "Unknown rate profile type: %s" % profile_type)
+
+
+def intended_times(rate):
+    """Yields the offsets from the start at which runs must be started"""
+    t = 0.0
+    while True:
+        ops = rate(t)
+        if ops <= 0:
+            t += IDLE_INTERVAL
+            continue
+        yield t
+        t += 1.0 / ops
+
+
+class RateScheduler(threading.Thread):
+    """Puts the intended start times of the runs of an action in a queue
+
+    Tickets are queued slightly ahead of time so that the processes can
+    start their run on time. Once stopped, one None ticket per process is
+    queued to let them exit.
+    """
+
+    def __init__(self, spec, queue, lookahead=0.5):
+        super(RateScheduler, self).__init__()
+        self.daemon = True
+        self.rate = get_profile(spec)
+        self.queue = queue
+        self.lookahead = lookahead
+        self.start_time = None
+        self.scheduled = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        self.start_time = time.time()
+        for offset in intended_times(self.rate):
+            intended = self.start_time + offset
+            delay = intended - self.lookahead - time.time()
+            if delay > 0 and self._stop_event.wait(delay):
+                return
+            if self._stop_event.is_set():
+                return
+            self.queue.put(intended)
+            self.scheduled += 1
+
+    def stop(self, consumers=0):
+        self._stop_event.set()
+        self.join()
+        for i in range(consumers):
+            self.queue.put(None)
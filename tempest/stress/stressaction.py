@@ -15,11 +15,16 @@
 import abc
 import signal
 import sys
+import time
 
 import six
+from six import moves
 
 from oslo_log import log as logging
 
+from tempest.common import schema_validation
+from tempest.stress import metrics
+
 
 @six.add_metaclass(abc.ABCMeta)
 class StressAction(object):
@@ -30,12 +35,16 @@ class StressAction(object):
         self.manager = manager
         self.max_runs = max_runs
         self.stop_on_error = stop_on_error
+        self.metrics = None
 
     def _shutdown_handler(self, signal, frame):
         try:
             self.tearDown()
         except Exception:
             self.logger.exception("Error while tearDown")
+        if self.metrics:
+            self.metrics.flush()
+            schema_validation.log_stats()
         sys.exit(0)
 
     @property
@@ -61,29 +70,80 @@ class StressAction(object):
         """
         self.logger.debug("tearDown")
 
-    def execute(self, shared_statistic):
+    def _wait_for_ticket(self, schedule_queue):
+        """Waits for the intended start time of the next scheduled run
+
+        Returns False once the scheduler is stopped. The queue is polled
+        with a timeout so the process still handles its signals.
+        """
+        while True:
+            try:
+                intended = schedule_queue.get(timeout=1)
+                break
+            except moves.queue.Empty:
+                continue
+        if intended is None:
+            return False
+        delay = intended - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        self.metrics.record_lag(time.time() - intended)
+        return True
+
+    def execute(self, shared_statistic, metrics_queue=None,
+                schedule_queue=None):
         """This is the main execution entry point called
         by the driver.   We register a signal handler to
         allow us to tearDown gracefully, and then exit.
         We also keep track of how many runs we do.
+
+        If a metrics queue is given, the wall time of each run and the
+        latency of each API call are recorded and periodically sent to it.
+        If a schedule queue is given, each run is started at the time
+        taken from it instead of right after the previous one, and the
+        schedule lag is recorded.
         """
         signal.signal(signal.SIGHUP, self._shutdown_handler)
         signal.signal(signal.SIGTERM, self._shutdown_handler)
 
+        self.metrics = metrics.Recorder(self.action, metrics_queue)
+        if metrics_queue is not None:
+            metrics.instrument_rest_client()
+            metrics.set_recorder(self.metrics)
+
+        self.run_loop(shared_statistic, schedule_queue)
+        self.metrics.flush()
+        schema_validation.log_stats()
+
+    def run_loop(self, shared_statistic, schedule_queue=None):
+        """Runs the action until max_runs is reached or the schedule ends
+
+        The metrics recorder must be set beforehand. This is shared by the
+        process and the green thread backends.
+        """
         while self.max_runs is None or (shared_statistic['runs'] <
                                         self.max_runs):
             self.logger.debug("Trigger new run (run %d)" %
                               shared_statistic['runs'])
+            if (schedule_queue is not None and
+                    not self._wait_for_ticket(schedule_queue)):
+                break
+            start = time.time()
+            failed = False
             try:
                 self.run()
             except Exception:
+                failed = True
                 shared_statistic['fails'] += 1
                 self.logger.exception("Failure in run")
             finally:
                 shared_statistic['runs'] += 1
+                self.metrics.record_run(time.time() - start, failed)
                 if self.stop_on_error and (shared_statistic['fails'] > 1):
                     self.logger.warn("Stop process due to"
                                      "\"stop-on-error\" argument")
+                    self.metrics.flush()
+                    schema_validation.log_stats()
                     self.tearDown()
                     sys.exit(1)
 
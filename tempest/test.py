@@ -19,24 +19,25 @@ import os
 import re
 import sys
 import time
-import urllib
 import uuid
 
 import fixtures
 from oslo_log import log as logging
-from oslo_serialization import jsonutils as json
-from oslo_utils import importutils
 import six
 import testscenarios
 import testtools
 
 from tempest import clients
+from tempest.common import accounts
 from tempest.common import credentials
 from tempest.common import fixed_network
-import tempest.common.generator.valid_generator as valid
+from tempest.common.generator import compiler
+from tempest.common import isolated_creds
+from tempest.common import shared_fixtures as shared
 import tempest.common.validation_resources as vresources
 from tempest import config
 from tempest import exceptions
+from tempest.test_discover import scheduler
 
 LOG = logging.getLogger(__name__)
 
@@ -217,12 +218,14 @@ class BaseTestCase(testtools.testcase.WithAttributes,
     - skip_checks
     - setup_credentials
     - setup_clients
+    - acquire_shared_fixtures (defined in the base test class)
     - resource_setup
 
     Tear-down is also split in a series of steps (teardown stages), which are
     stacked for execution only if the corresponding setup stage had been
     reached during the setup phase. Tear-down stages are:
     - clear_isolated_creds (defined in the base test class)
+    - release_shared_fixtures (defined in the base test class)
     - resource_cleanup
     """
 
@@ -237,6 +240,10 @@ class BaseTestCase(testtools.testcase.WithAttributes,
     # Resources required to validate a server using ssh
     validation_resources = {}
     network_resources = {}
+    # Names of the read-only resources of tempest.common.shared_fixtures used
+    # by the class, they are available in cls.shared after setup_clients and
+    # must be used with the clients of cls.shared_os
+    shared_fixtures = []
 
     # NOTE(sdague): log_format is defined inline here instead of using the oslo
     # default because going through the config path recouples config to the
@@ -250,8 +257,13 @@ class BaseTestCase(testtools.testcase.WithAttributes,
         if hasattr(super(BaseTestCase, cls), 'setUpClass'):
             super(BaseTestCase, cls).setUpClass()
         cls.setUpClassCalled = True
+        if CONF.debug.test_history_file:
+            scheduler.start_class(cls)
         # Stack of (name, callable) to be invoked in reverse order at teardown
         cls.teardowns = []
+        # Client managers returned by get_client_manager
+        cls._client_managers = []
+        cls.teardowns.append(('client managers', cls.close_client_managers))
         # All the configuration checks that may generate a skip
         cls.skip_checks()
         try:
@@ -260,6 +272,10 @@ class BaseTestCase(testtools.testcase.WithAttributes,
             cls.setup_credentials()
             # Shortcuts to clients
             cls.setup_clients()
+            # Read-only resources shared with other classes
+            cls.teardowns.append(('shared fixtures',
+                                  cls.release_shared_fixtures))
+            cls.acquire_shared_fixtures()
             # Additional class-wide test resources
             cls.teardowns.append(('resources', cls.resource_cleanup))
             cls.resource_setup()
@@ -303,6 +319,8 @@ class BaseTestCase(testtools.testcase.WithAttributes,
                     LOG.exception("teardown of %s failed: %s" % (name, te))
                 if not etype:
                     etype, value, trace = sys_exec_info
+        if CONF.debug.test_history_file:
+            scheduler.end_class(cls, CONF.debug.test_history_file)
         # If exceptions were raised during teardown, an not before, re-raise
         # the first one
         if re_raise and etype is not None:
@@ -373,6 +391,36 @@ class BaseTestCase(testtools.testcase.WithAttributes,
         # specify which client is `client` and nothing else.
         pass
 
+    @classmethod
+    def acquire_shared_fixtures(cls):
+        """Acquires the fixtures listed in shared_fixtures"""
+        cls.shared = {}
+        if not cls.shared_fixtures:
+            return
+        # NOTE: isolated tenants are deleted and locked accounts are handed to
+        # other workers at the end of the class, so their fixtures can not
+        # outlive it. The fixtures of isolated tenants are owned by the
+        # fixture tenant of the worker instead, which outlives the class
+        # like the configured credentials.
+        cred_provider = cls._get_credentials_provider()
+        if isinstance(cred_provider, isolated_creds.IsolatedCreds):
+            owner, keep = shared.get_fixture_tenant(), True
+        else:
+            owner = cls
+            keep = isinstance(cred_provider, accounts.NotLockingAccounts)
+        cls._shared_owner = owner
+        cls.shared_os = owner.os
+        for name in cls.shared_fixtures:
+            cls.shared[name] = shared.acquire(name, owner, keep=keep)
+
+    @classmethod
+    def release_shared_fixtures(cls):
+        shared_names = list(getattr(cls, 'shared', {}))
+        cls.shared = {}
+        for name in reversed(cls.shared_fixtures):
+            if name in shared_names:
+                shared.release(name, cls._shared_owner)
+
     @classmethod
     def resource_setup(cls):
         """Class level resource setup for test cases.
@@ -491,7 +539,16 @@ class BaseTestCase(testtools.testcase.WithAttributes,
             else:
                 raise exceptions.InvalidCredentials(
                     "Invalid credentials type %s" % credential_type)
-        return clients.Manager(credentials=creds, service=cls._service)
+        manager = clients.Manager(credentials=creds, service=cls._service)
+        if '_client_managers' in cls.__dict__:
+            cls._client_managers.append(manager)
+        return manager
+
+    @classmethod
+    def close_client_managers(cls):
+        """Closes the connections of the client managers of the class"""
+        while cls.__dict__.get('_client_managers'):
+            cls._client_managers.pop().close()
 
     @classmethod
     def clear_isolated_creds(cls):
@@ -611,7 +668,8 @@ class NegativeAutoTest(BaseTestCase):
             standard_tests, module, loader = args
         for test in testtools.iterate_tests(standard_tests):
             schema = getattr(test, '_schema', None)
-            if schema is not None:
+            # NOTE: batched tests run all their scenarios at once
+            if schema is not None and not CONF.negative.batch_requests:
                 setattr(test, 'scenarios',
                         NegativeAutoTest.generate_scenario(schema))
         return testscenarios.load_tests_apply_scenarios(*args)
@@ -636,29 +694,14 @@ class NegativeAutoTest(BaseTestCase):
                 create invalid data for the api calls. For "GET" and "HEAD",
                 the data is used to generate query strings appended to the url,
                 otherwise for the body of the http call.
+
+        The scenarios are compiled once per description, see
+        tempest.common.generator.compiler.
         """
         LOG.debug(description)
-        generator = importutils.import_class(
-            CONF.negative.test_generator)()
-        generator.validate_schema(description)
-        schema = description.get("json-schema", None)
-        resources = description.get("resources", [])
-        scenario_list = []
-        expected_result = None
-        for resource in resources:
-            if isinstance(resource, dict):
-                expected_result = resource['expected_result']
-                resource = resource['name']
-            LOG.debug("Add resource to test %s" % resource)
-            scn_name = "inv_res_%s" % (resource)
-            scenario_list.append((scn_name, {"resource": (resource,
-                                                          str(uuid.uuid4())),
-                                             "expected_result": expected_result
-                                             }))
-        if schema is not None:
-            for scenario in generator.generate_scenarios(schema):
-                scenario_list.append((scenario['_negtest_name'],
-                                      scenario))
+        compiled = compiler.compile_description(description)
+        scenario_list = [(str(name), scenario)
+                         for name, scenario in compiled['scenarios']]
         LOG.debug(scenario_list)
         return scenario_list
 
@@ -688,41 +731,89 @@ class NegativeAutoTest(BaseTestCase):
         """
         LOG.info("Executing %s" % description["name"])
         LOG.debug(description)
-        generator = importutils.import_class(
-            CONF.negative.test_generator)()
-        schema = description.get("json-schema", None)
         method = description["http-method"]
         url = description["url"]
-        expected_result = None
-        if "default_result_code" in description:
-            expected_result = description["default_result_code"]
-
-        resources = [self.get_resource(r) for
-                     r in description.get("resources", [])]
+        default_result = description.get("default_result_code")
+        compiled = compiler.compile_description(description)
 
         if hasattr(self, "resource"):
             # Note(mkoderer): The resources list already contains an invalid
             # entry (see get_resource).
             # We just send a valid json-schema with it
-            valid_schema = None
-            if schema:
-                valid_schema = \
-                    valid.ValidTestGenerator().generate_valid(schema)
-            new_url, body = self._http_arguments(valid_schema, url, method)
+            payload = compiled['valid_payload']
+            expected_result = default_result
         elif hasattr(self, "_negtest_name"):
-            schema_under_test = \
-                valid.ValidTestGenerator().generate_valid(schema)
-            local_expected_result = \
-                generator.generate_payload(self, schema_under_test)
-            if local_expected_result is not None:
-                expected_result = local_expected_result
-            new_url, body = \
-                self._http_arguments(schema_under_test, url, method)
+            payload = self._negtest_payload
+            expected_result = self._negtest_expected_result
+            if expected_result is None:
+                expected_result = default_result
+        elif CONF.negative.batch_requests:
+            self._execute_batch(description, compiled)
+            return
         else:
             raise Exception("testscenarios are not active. Please make sure "
                             "that your test runner supports the load_tests "
                             "mechanism")
 
+        resources = [self.get_resource(r) for
+                     r in description.get("resources", [])]
+        new_url, body = self._http_arguments(payload, url, method)
+        client = self._get_negative_client(description)
+        resp, resp_body = client.send_request(method, new_url,
+                                              resources, body=body)
+        self._check_negative_response(expected_result, resp.status, resp_body)
+
+    def _execute_batch(self, description, compiled):
+        """Sends the requests of all the scenarios of a description at once
+
+        The scenarios are independent, so their requests are sent
+        concurrently. All the scenarios are checked and the unexpected
+        responses are reported together.
+        """
+        method = description["http-method"]
+        url = description["url"]
+        default_result = description.get("default_result_code")
+        names = [r['name'] if isinstance(r, dict) else r
+                 for r in description.get("resources", [])]
+        valid_resources = [self.get_resource(name) for name in names]
+
+        requests = []
+        expected_results = []
+        for name, scenario in compiled['scenarios']:
+            resources = list(valid_resources)
+            if "resource" in scenario:
+                invalid_name, invalid_id = scenario["resource"]
+                resources[names.index(invalid_name)] = invalid_id
+                payload = compiled['valid_payload']
+                expected_result = default_result
+            else:
+                payload = scenario["_negtest_payload"]
+                expected_result = scenario["_negtest_expected_result"]
+                if expected_result is None:
+                    expected_result = default_result
+            new_url, body = self._http_arguments(payload, url, method)
+            requests.append((method, new_url, resources, body))
+            expected_results.append(expected_result)
+
+        client = self._get_negative_client(description)
+        results = client.send_requests(requests)
+        failures = []
+        for (name, scenario), expected_result, result in zip(
+                compiled['scenarios'], expected_results, results):
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                resp, resp_body = result
+                self._check_negative_response(expected_result, resp.status,
+                                              resp_body)
+            except Exception as e:
+                failures.append("%s: %s" % (name, e))
+        if failures:
+            self.fail("%d of %d negative scenarios of %s failed:\n%s" %
+                      (len(failures), len(results), description["name"],
+                       "\n".join(failures)))
+
+    def _get_negative_client(self, description):
         if "admin_client" in description and description["admin_client"]:
             if not credentials.is_admin_available():
                 msg = ("Missing Identity Admin API credentials in"
@@ -730,21 +821,11 @@ class NegativeAutoTest(BaseTestCase):
                 raise self.skipException(msg)
             creds = self.credentials_provider.get_admin_creds()
             os_adm = clients.Manager(credentials=creds)
-            client = os_adm.negative_client
-        else:
-            client = self.client
-        resp, resp_body = client.send_request(method, new_url,
-                                              resources, body=body)
-        self._check_negative_response(expected_result, resp.status, resp_body)
+            return os_adm.negative_client
+        return self.client
 
     def _http_arguments(self, json_dict, url, method):
-        LOG.debug("dict: %s url: %s method: %s" % (json_dict, url, method))
-        if not json_dict:
-            return url, None
-        elif method in ["GET", "HEAD", "PUT", "DELETE"]:
-            return "%s?%s" % (url, urllib.urlencode(json_dict)), None
-        else:
-            return url, json.dumps(json_dict)
+        return compiler.http_arguments(json_dict, url, method)
 
     def _check_negative_response(self, expected_result, result, body):
         self.assertTrue(result >= 400 and result < 500 and result != 413,
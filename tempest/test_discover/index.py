@@ -0,0 +1,297 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Static index of the tempest tests.
+
+Listing the tests with the unittest loader imports every test module, and
+through them the configuration and all the service clients. The index
+instead parses the test modules, like tools/check_uuid.py does, and records
+their classes, test methods and the attributes set by the @test.attr,
+@test.services, @test.stresstest and @test.idempotent_id decorators, from
+which the test ids are built without importing anything.
+
+The index is cached in a JSON file. A module is parsed again only when its
+size or modification time changed and its content hash differs.
+
+The tests of modules defining load_tests, such as the scenarios of the input
+scenario tests, and of classes with class decorators, such as the negative
+auto tests, are generated at import time. The index only lists these
+modules, as dynamic, for the caller to load them with the unittest loader.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import re
+
+import six
+
+# Version of the format of the cached data, for the cache to be rebuilt when
+# it changes
+INDEX_VERSION = 1
+
+TEST_DIRS = ['tempest/api', 'tempest/scenario', 'tempest/thirdparty']
+# Modules loaded by unittest discovery
+TEST_MODULE_PATTERN = re.compile(r'^test.*\.py$')
+
+
+def _literal(node):
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return None
+
+
+def _dotted_name(node):
+    """Returns the dotted name of a Name or Attribute node, or None"""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        if value is not None:
+            return '%s.%s' % (value, node.attr)
+    return None
+
+
+def _decorator_attrs(decorator):
+    """Returns the testtools attributes set by a tempest decorator"""
+    if not isinstance(decorator, ast.Call):
+        return []
+    name = (_dotted_name(decorator.func) or '').rsplit('.', 1)[-1]
+    if name == 'attr':
+        for keyword in decorator.keywords:
+            if keyword.arg == 'type':
+                value = _literal(keyword.value)
+                if isinstance(value, six.string_types):
+                    return [value]
+                if isinstance(value, list):
+                    return value
+    elif name == 'idempotent_id' and decorator.args:
+        value = _literal(decorator.args[0])
+        if value is not None:
+            return ['id-%s' % value]
+    elif name == 'services':
+        return [value for value in map(_literal, decorator.args)
+                if value is not None]
+    elif name == 'stresstest':
+        return ['stress']
+    return []
+
+
+def _imports(tree, module_name, is_package):
+    """Returns the names bound by the imports of a module"""
+    package = module_name if is_package else module_name.rpartition('.')[0]
+    names = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    names[alias.asname] = alias.name
+                else:
+                    top = alias.name.split('.')[0]
+                    names[top] = top
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ''
+            if node.level:
+                parent = package.split('.')
+                if node.level > 1:
+                    parent = parent[:1 - node.level]
+                base = '.'.join([p for p in parent + [base] if p])
+            for alias in node.names:
+                names[alias.asname or alias.name] = '%s.%s' % (base,
+                                                               alias.name)
+    return names
+
+
+def parse_module(source, module_name, is_package=False):
+    """Returns the index data of a module source"""
+    tree = ast.parse(source)
+    imports = _imports(tree, module_name, is_package)
+    local_classes = set(node.name for node in tree.body
+                        if isinstance(node, ast.ClassDef))
+    classes = {}
+    dynamic = False
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == 'load_tests':
+            dynamic = True
+        elif isinstance(node, ast.Assign):
+            if any(isinstance(target, ast.Name) and
+                   target.id == 'load_tests' for target in node.targets):
+                dynamic = True
+        elif isinstance(node, ast.ClassDef):
+            bases = []
+            for base in node.bases:
+                name = _dotted_name(base)
+                if name is None:
+                    continue
+                first, _, rest = name.partition('.')
+                if first in local_classes and not rest:
+                    name = '%s.%s' % (module_name, name)
+                elif first in imports:
+                    name = '.'.join(filter(None, [imports[first], rest]))
+                bases.append(name)
+            tests = {}
+            for item in node.body:
+                if (isinstance(item, ast.FunctionDef) and
+                        item.name.startswith('test')):
+                    attrs = []
+                    for decorator in item.decorator_list:
+                        attrs.extend(_decorator_attrs(decorator))
+                    tests[item.name] = sorted(set(attrs))
+            classes[node.name] = {'bases': bases, 'tests': tests,
+                                  'dynamic': bool(node.decorator_list)}
+    return {'classes': classes, 'dynamic': dynamic}
+
+
+class TestIndex(object):
+    """Cached static index of the test modules under a top directory
+
+    :param top_dir: the directory of the tempest package
+    :param cache_path: JSON file of the cached index, None to not cache it
+    """
+
+    def __init__(self, top_dir, cache_path=None, test_dirs=None):
+        self.top_dir = os.path.abspath(top_dir)
+        self.cache_path = cache_path
+        self.test_dirs = test_dirs or TEST_DIRS
+        self.modules = {}
+        self.parsed = 0
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except ValueError:
+            return {}
+        if cache.get('version') != INDEX_VERSION:
+            return {}
+        return cache.get('modules', {})
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'modules': self.modules}, f)
+        os.rename(tmp_path, self.cache_path)
+
+    def _module_name(self, path):
+        relative = os.path.relpath(path, self.top_dir)
+        name = os.path.splitext(relative)[0].replace(os.sep, '.')
+        if name.endswith('.__init__'):
+            return name[:-len('.__init__')], True
+        return name, False
+
+    def update(self):
+        """Indexes the modules added or changed since the cached index
+
+        :returns: the number of modules parsed
+        """
+        cached = self._load_cache()
+        self.modules = {}
+        self.parsed = 0
+        for test_dir in self.test_dirs:
+            for root, dirs, files in os.walk(os.path.join(self.top_dir,
+                                                          test_dir)):
+                dirs.sort()
+                if not os.path.exists(os.path.join(root, '__init__.py')):
+                    dirs[:] = []
+                    continue
+                for filename in sorted(files):
+                    if filename.endswith('.py'):
+                        self._index_file(os.path.join(root, filename),
+                                         cached)
+        self._save_cache()
+        return self.parsed
+
+    def _index_file(self, path, cached):
+        module_name, is_package = self._module_name(path)
+        stat = os.stat(path)
+        entry = cached.get(module_name)
+        if (entry is not None and entry['mtime'] == stat.st_mtime and
+                entry['size'] == stat.st_size):
+            self.modules[module_name] = entry
+            return
+        with open(path, 'rb') as f:
+            source = f.read()
+        digest = hashlib.sha1(source).hexdigest()
+        if entry is None or entry['sha1'] != digest:
+            data = parse_module(source, module_name, is_package)
+            self.parsed += 1
+        else:
+            data = entry['data']
+        self.modules[module_name] = {
+            'mtime': stat.st_mtime, 'size': stat.st_size, 'sha1': digest,
+            'data': data,
+            'test_module': bool(TEST_MODULE_PATTERN.match(
+                os.path.basename(path)))}
+
+    def _get_class(self, name):
+        module_name, _, class_name = name.rpartition('.')
+        module = self.modules.get(module_name)
+        if module is None:
+            return None
+        return module['data']['classes'].get(class_name)
+
+    def _is_test_case(self, name, seen=()):
+        cls = self._get_class(name)
+        if cls is None:
+            # Classes out of the index, such as tempest.test.BaseTestCase
+            last = name.rsplit('.', 1)[-1]
+            return last.endswith('TestCase') or last.endswith('Test')
+        return any(self._is_test_case(base, seen + (name,))
+                   for base in cls['bases'] if base not in seen)
+
+    def _class_tests(self, name, seen=()):
+        """Returns the tests of a class with their attrs, inherited too"""
+        cls = self._get_class(name)
+        if cls is None:
+            return {}
+        tests = {}
+        for base in reversed(cls['bases']):
+            if base not in seen:
+                tests.update(self._class_tests(base, seen + (name,)))
+        tests.update(cls['tests'])
+        return tests
+
+    def dynamic_modules(self):
+        """Returns the test modules whose tests are generated on import"""
+        return sorted(
+            name for name, module in self.modules.items()
+            if module['test_module'] and (
+                module['data']['dynamic'] or
+                any(cls['dynamic']
+                    for cls in module['data']['classes'].values())))
+
+    def test_ids(self):
+        """Yields the ids of the tests of the static test modules"""
+        dynamic = set(self.dynamic_modules())
+        for module_name in sorted(self.modules):
+            module = self.modules[module_name]
+            if not module['test_module'] or module_name in dynamic:
+                continue
+            for class_name in sorted(module['data']['classes']):
+                name = '%s.%s' % (module_name, class_name)
+                if not self._is_test_case(name):
+                    continue
+                tests = self._class_tests(name)
+                for test_name in sorted(tests):
+                    test_id = '%s.%s' % (name, test_name)
+                    if tests[test_name]:
+                        test_id += '[%s]' % ','.join(tests[test_name])
+                    yield test_id
@@ -0,0 +1,252 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Cost based partitioning of the test classes over the workers of a run.
+
+When [debug] test_history_file is set, every test class records in that file
+its wall time and the number of servers and volumes it created. The
+tempest-schedule-tests command then uses this history to split the classes
+of a test list over the workers of the next run, longest first, so that the
+run ends as early as possible, and optionally so that the classes running at
+the same time do not create more servers or volumes than the quota of a
+shared tenant allows.
+"""
+
+import collections
+import functools
+import json
+import os
+import re
+import threading
+import time
+
+from oslo_concurrency import lockutils
+from oslo_log import log as logging
+from tempest_lib.common import rest_client
+
+LOG = logging.getLogger(__name__)
+
+# Resources counted for each test class, with the path of their creation
+RESOURCES = {
+    'servers': re.compile(r'/servers/?(\?|$)'),
+    'volumes': re.compile(r'/volumes/?(\?|$)'),
+}
+
+# Weight of the last run in the recorded averages
+SMOOTHING = 0.5
+
+_usage = collections.Counter()
+_usage_lock = threading.Lock()
+_started = {}
+
+
+def _instrument_rest_client():
+    """Counts the POST requests creating the resources of RESOURCES"""
+    raw_request = rest_client.RestClient.raw_request
+    if getattr(raw_request, '_test_history', False):
+        return
+
+    @functools.wraps(raw_request)
+    def counted_raw_request(self, url, method, *args, **kwargs):
+        if method == 'POST':
+            for resource, pattern in RESOURCES.items():
+                if pattern.search(url):
+                    with _usage_lock:
+                        _usage[resource] += 1
+        return raw_request(self, url, method, *args, **kwargs)
+
+    counted_raw_request._test_history = True
+    rest_client.RestClient.raw_request = counted_raw_request
+
+
+def class_id(test_id):
+    """Returns the id of the class of a test id"""
+    # Strip the attributes and the scenario of the test
+    test_id = re.sub(r'[\[(].*$', '', test_id)
+    return test_id.rsplit('.', 1)[0]
+
+
+class History(object):
+    """Average wall time and resource usage of the test classes
+
+    The history is a JSON file shared by the workers of the runs, updated
+    under an external lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _lock(self):
+        return lockutils.lock('test_history', external=True,
+                              lock_path=os.path.dirname(
+                                  os.path.abspath(self.path)))
+
+    def load(self):
+        """Returns the recorded stats of the classes, by class id"""
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def record(self, class_name, elapsed, usage):
+        """Updates the averages of a class with the stats of a run"""
+        with self._lock():
+            classes = self.load()
+            stats = classes.get(class_name)
+            sample = dict(usage, time=elapsed)
+            if stats is None:
+                stats = dict(sample, runs=0)
+            else:
+                for key, value in sample.items():
+                    stats[key] = (stats.get(key, value) * (1 - SMOOTHING) +
+                                  value * SMOOTHING)
+            stats['runs'] += 1
+            classes[class_name] = stats
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(classes, f, indent=1, sort_keys=True)
+            os.rename(tmp_path, self.path)
+
+
+def start_class(test_class):
+    """Starts measuring a test class, called by setUpClass"""
+    _instrument_rest_client()
+    with _usage_lock:
+        _started[test_class] = (time.time(), dict(_usage))
+
+
+def end_class(test_class, path):
+    """Records the stats of a test class, called by tearDownClass"""
+    started = _started.pop(test_class, None)
+    if started is None:
+        return
+    start, usage_before = started
+    elapsed = time.time() - start
+    with _usage_lock:
+        usage = dict((resource, _usage[resource] -
+                      usage_before.get(resource, 0))
+                     for resource in RESOURCES)
+    name = '%s.%s' % (test_class.__module__, test_class.__name__)
+    try:
+        History(path).record(name, elapsed, usage)
+    except Exception:
+        LOG.exception("Failed to record the test history of %s", name)
+
+
+class Worker(object):
+
+    def __init__(self, index):
+        self.index = index
+        self.classes = []
+        # (start, end, usage) of the classes, in the order they run
+        self.timeline = []
+        self.load = 0.0
+
+    def add(self, class_name, cost, usage):
+        self.classes.append(class_name)
+        self.timeline.append((self.load, self.load + cost, usage))
+        self.load += cost
+
+
+def _peak_usage(workers, start, end, resource):
+    """Returns the peak usage of a resource over [start, end)"""
+    intervals = [(s, e, usage.get(resource, 0))
+                 for worker in workers for s, e, usage in worker.timeline
+                 if s < end and e > start and usage.get(resource, 0)]
+    peak = 0
+    for instant in [start] + [s for s, e, used in intervals if s > start]:
+        peak = max(peak, sum(used for s, e, used in intervals
+                             if s <= instant < e))
+    return peak
+
+
+def _overflow(workers, worker, cost, usage, limits):
+    """Returns by how much a class would exceed the limits on a worker"""
+    start, end = worker.load, worker.load + cost
+    others = [w for w in workers if w is not worker]
+    overflow = 0
+    for resource, limit in limits.items():
+        used = usage.get(resource, 0)
+        if used:
+            peak = _peak_usage(others, start, end, resource)
+            overflow += max(0, peak + used - limit)
+    return overflow
+
+
+def partition(class_names, stats, workers, limits=None, default_cost=None):
+    """Splits test classes over workers, minimising the run time
+
+    The classes are assigned longest first, each to the worker finishing
+    first (LPT). With limits, a dict of resource: quota, a class is put on
+    the first worker where it does not run alongside classes using more
+    than the quota, or else on the one where the excess is the lowest.
+
+    :param stats: the recorded stats of the classes, by class name
+    :param default_cost: time of the classes without history, by default
+                         the median time of the known ones
+    :returns: a list of Worker
+    """
+    limits = limits or {}
+    if default_cost is None:
+        times = sorted(stats[name]['time'] for name in class_names
+                       if name in stats)
+        default_cost = times[len(times) // 2] if times else 1.0
+
+    def cost(name):
+        return stats.get(name, {}).get('time', default_cost)
+
+    result = [Worker(i) for i in range(workers)]
+    for name in sorted(class_names, key=lambda name: (-cost(name), name)):
+        usage = dict((resource, stats.get(name, {}).get(resource, 0))
+                     for resource in limits)
+        candidates = sorted(result, key=lambda w: (w.load, w.index))
+        if any(usage.values()):
+            overflows = [(_overflow(result, w, cost(name), usage, limits),
+                          w.load, w.index, w) for w in candidates]
+            best = min(overflows, key=lambda o: o[:3])
+            if best[0]:
+                LOG.warning("%s exceeds the quotas by %s", name, best[0])
+            chosen = best[3]
+        else:
+            chosen = candidates[0]
+        chosen.add(name, cost(name), usage)
+    return result
+
+
+def write_schedule(workers, test_ids, output_dir):
+    """Writes the test list of each worker, and a summary of the schedule
+
+    The test ids of worker N are written in worker-N.list, a file which can
+    be given to the --load-list option of the test runner of that worker.
+    """
+    by_class = collections.defaultdict(list)
+    for test_id in test_ids:
+        by_class[class_id(test_id)].append(test_id)
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    summary = {'makespan': max(w.load for w in workers) if workers else 0,
+               'workers': []}
+    for worker in workers:
+        path = os.path.join(output_dir, 'worker-%d.list' % worker.index)
+        with open(path, 'w') as f:
+            for name in worker.classes:
+                for test_id in by_class[name]:
+                    f.write(test_id + '\n')
+        summary['workers'].append({'list': path,
+                                   'estimated_time': worker.load,
+                                   'classes': worker.classes})
+    with open(os.path.join(output_dir, 'schedule.json'), 'w') as f:
+        json.dump(summary, f, indent=1, sort_keys=True)
+    return summary
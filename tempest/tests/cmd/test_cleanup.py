@@ -0,0 +1,66 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from tempest.cmd import cleanup
+from tempest.tests import base
+
+
+class TestCleanup(base.TestCase):
+
+    def setUp(self):
+        super(TestCleanup, self).setUp()
+        self.patch('tempest.clients.AdminManager')
+        self.patch('tempest.clients.Manager')
+        self.patch('tempest.common.cred_provider.get_credentials')
+        self.patch('tempest.cmd.cleanup.Cleanup._load_json')
+        self.patch('tempest.cmd.cleanup.Cleanup._add_admin')
+        self.patch('tempest.cmd.cleanup.Cleanup._remove_admin_user_roles')
+        self.patch('tempest.cmd.cleanup_service.get_global_cleanup_services',
+                   return_value=[])
+        self.tenant_service = self.patch(
+            'tempest.cmd.cleanup_service.TenantService')
+        self.tenant_service.return_value.list.return_value = [
+            {'id': '1', 'name': 'ok'}, {'id': '2', 'name': 'broken'}]
+        self.service = mock.Mock()
+        self.patch('tempest.cmd.cleanup_service.get_tenant_cleanup_services',
+                   return_value=[self.service])
+
+    def _run(self, *args):
+        with mock.patch('sys.argv', ['tempest-cleanup'] + list(args)):
+            self.cleanup = cleanup.Cleanup()
+        return self.cleanup.run()
+
+    def _fail_tenant(self, manager, **kwargs):
+        svc = mock.Mock(elapsed=0.0, deleted=0, failed=0)
+        if kwargs['tenant_id'] == '2':
+            svc.run.side_effect = Exception()
+        return svc
+
+    def test_run(self):
+        self.service.return_value = mock.Mock(elapsed=0.0, deleted=1,
+                                              failed=0)
+        self.assertEqual(0, self._run())
+        self.assertEqual([], self.cleanup.failed_tenants)
+
+    def test_run_serial_failure(self):
+        self.service.side_effect = self._fail_tenant
+        self.assertEqual(1, self._run())
+        self.assertEqual(['broken'], self.cleanup.failed_tenants)
+        self.assertEqual(2, self.service.call_count)
+
+    def test_run_concurrent_failure(self):
+        self.service.side_effect = self._fail_tenant
+        self.assertEqual(1, self._run('--concurrency', '2'))
+        self.assertEqual(['broken'], self.cleanup.failed_tenants)
+        self.assertEqual(2, self.service.call_count)
@@ -0,0 +1,133 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from tempest.cmd import cleanup_service
+from tempest.services.network.json import network_client
+from tempest.tests import base
+
+
+class TestBaseService(base.TestCase):
+
+    def _get_service(self, **kwargs):
+        manager = mock.Mock()
+        kwargs.setdefault('is_dry_run', False)
+        kwargs.setdefault('is_save_state', False)
+        svc = cleanup_service.ServerService(manager, **kwargs)
+        servers = [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}]
+        svc.client.list_servers.return_value = {'servers': servers}
+        svc.client.iter_servers.side_effect = lambda: iter(servers)
+        self.wait = self.patch(
+            'tempest.common.waiters.wait_for_servers_termination')
+        return svc
+
+    def test_delete_serial(self):
+        svc = self._get_service()
+        svc.run()
+        self.assertEqual([mock.call('a'), mock.call('b'), mock.call('c')],
+                         svc.client.delete_server.call_args_list)
+        self.assertEqual(3, svc.deleted)
+        self.assertEqual(0, svc.failed)
+
+    def test_delete_counts_failures(self):
+        svc = self._get_service()
+        svc.client.delete_server.side_effect = [None, Exception(), None]
+        svc.run()
+        self.assertEqual(2, svc.deleted)
+        self.assertEqual(1, svc.failed)
+
+    def test_delete_waits_for_deleted_servers(self):
+        svc = self._get_service()
+        svc.client.delete_server.side_effect = [None, Exception(), None]
+        svc.run()
+        self.wait.assert_called_once_with(svc.client, ['a', 'c'],
+                                          ignore_error=True)
+
+    def test_delete_without_servers_does_not_wait(self):
+        svc = self._get_service()
+        svc.client.iter_servers.side_effect = lambda: iter([])
+        svc.run()
+        self.assertFalse(self.wait.called)
+
+    def test_delete_in_flight_uses_thread_clients(self):
+        svc = self._get_service(max_in_flight=2)
+        thread_client = svc.client.clone.return_value
+        svc.run()
+        self.assertEqual(3, thread_client.delete_server.call_count)
+        self.assertFalse(svc.client.delete_server.called)
+        self.assertEqual(3, svc.deleted)
+
+
+class TestNetworkServices(base.TestCase):
+
+    def _get_service(self, service_class, **kwargs):
+        kwargs.setdefault('is_dry_run', False)
+        kwargs.setdefault('is_save_state', False)
+        kwargs.setdefault('is_preserve', True)
+        return service_class(mock.Mock(), **kwargs)
+
+    def test_subnets_streamed(self):
+        self.patch('tempest.cmd.cleanup_service.CONF_NETWORKS', new=['net'])
+        svc = self._get_service(cleanup_service.NetworkSubnetService,
+                                tenant_id='t')
+        svc.client.iter_subnets.return_value = iter(
+            [{'id': 'a', 'network_id': 'net'},
+             {'id': 'b', 'network_id': 'other'}])
+        svc.run()
+        svc.client.iter_subnets.assert_called_once_with(tenant_id='t')
+        self.assertFalse(svc.client.list_subnets.called)
+        svc.client.delete_subnet.assert_called_once_with('b')
+
+    def test_security_groups_streamed(self):
+        svc = self._get_service(cleanup_service.NetworkSecGroupService)
+        svc.client.iter_security_groups.return_value = iter(
+            [{'id': 'a', 'name': 'default'}, {'id': 'b', 'name': 'sg'}])
+        svc.run()
+        svc.client.delete_security_group.assert_called_once_with('b')
+
+    def test_security_groups_deleted_with_network_client(self):
+        svc = self._get_service(cleanup_service.NetworkSecGroupService)
+        svc.client = mock.Mock(spec=network_client.NetworkClient)
+        svc.client.iter_security_groups.return_value = iter(
+            [{'id': 'a', 'name': 'sg'}])
+        svc.run()
+        svc.client.delete_security_group.assert_called_once_with('a')
+        self.assertEqual(1, svc.deleted)
+        self.assertEqual(0, svc.failed)
+
+    def test_list_and_delete_filter_ports_alike(self):
+        self.patch('tempest.cmd.cleanup_service.CONF_NETWORKS', new=['net'])
+        ports = [{'id': 'a', 'device_owner': '', 'network_id': 'net'},
+                 {'id': 'b', 'device_owner': 'compute:nova',
+                  'network_id': 'other'},
+                 {'id': 'c', 'device_owner': 'network:dhcp',
+                  'network_id': 'other'},
+                 {'id': 'd', 'device_owner': '', 'network_id': 'other'}]
+        svc = self._get_service(cleanup_service.NetworkPortService)
+        svc.client.list_ports.return_value = {'ports': ports}
+        svc.client.iter_ports.return_value = iter(ports)
+        self.assertEqual(['b', 'd'], [port['id'] for port in svc.list()])
+        svc.run()
+        self.assertEqual([mock.call('b'), mock.call('d')],
+                         svc.client.delete_port.call_args_list)
+
+    def test_list_and_delete_filter_routers_alike(self):
+        self.patch('tempest.cmd.cleanup_service.CONF_PUB_ROUTER', new='pub')
+        routers = [{'id': 'pub'}, {'id': 'r'}]
+        svc = self._get_service(cleanup_service.NetworkRouterService)
+        svc.client.list_routers.return_value = {'routers': routers}
+        svc.client.iter_routers.return_value = iter(routers)
+        svc.client.list_router_interfaces.return_value = {'ports': []}
+        self.assertEqual([{'id': 'r'}], svc.list())
+        svc.run()
+        svc.client.delete_router.assert_called_once_with('r')
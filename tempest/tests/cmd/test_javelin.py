@@ -216,6 +216,7 @@ class TestCreateResources(JavelinUnitTest):
                                               return_value=self.fake_client))
         self.useFixture(mockpatch.PatchObject(javelin, "_get_volume_by_name",
                                               return_value=None))
+        self.useFixture(mockpatch.PatchObject(javelin, "waiters"))
         self.fake_client.volumes.create_volume.return_value = \
             self.fake_object.body
 
@@ -225,9 +226,10 @@ class TestCreateResources(JavelinUnitTest):
         mocked_function.assert_called_once_with(
             size=self.fake_object['gb'],
             display_name=self.fake_object['name'])
-        mocked_function = self.fake_client.volumes.wait_for_volume_status
+        mocked_function = javelin.waiters.wait_for_volumes_status
         mocked_function.assert_called_once_with(
-            self.fake_object.body['id'],
+            self.fake_client.volumes,
+            [self.fake_object.body['id']],
             'available')
 
     def test_create_volume_existing(self):
@@ -238,11 +240,13 @@ class TestCreateResources(JavelinUnitTest):
         self.fake_client.volumes.create_volume.return_value = \
             self.fake_object.body
 
+        self.useFixture(mockpatch.PatchObject(javelin, "waiters"))
+
         javelin.create_volumes([self.fake_object])
 
         mocked_function = self.fake_client.volumes.create_volume
         self.assertFalse(mocked_function.called)
-        mocked_function = self.fake_client.volumes.wait_for_volume_status
+        mocked_function = javelin.waiters.wait_for_volumes_status
         self.assertFalse(mocked_function.called)
 
     def test_create_router(self):
@@ -360,6 +364,9 @@ class TestDestroyResources(JavelinUnitTest):
         self.useFixture(mockpatch.PatchObject(
             javelin, "_get_volume_by_name",
             return_value=self.fake_object.volume))
+        self.useFixture(mockpatch.PatchObject(javelin, "waiters"))
+        self.fake_client.volumes.show_volume.return_value = {
+            'attachments': [self.fake_object.attachment]}
 
         javelin.destroy_volumes([self.fake_object])
 
@@ -411,3 +418,53 @@ class TestDestroyResources(JavelinUnitTest):
 
         mocked_function = self.fake_client.secgroups.delete_security_group
         mocked_function.assert_called_once_with(self.fake_object['id'])
+
+
+class TestSteps(JavelinUnitTest):
+
+    def setUp(self):
+        super(TestSteps, self).setUp()
+        self.calls = []
+        self.patch('tempest.cmd.javelin.RES', new={'a': 'a', 'b': 'b',
+                                                   'c': 'c', 'd': 'd'})
+
+    def _step(self, name, requires, fail=False):
+        def action(resources):
+            if fail:
+                raise ValueError(name)
+            self.calls.append((name, resources))
+        return javelin.Step(name, name.lower(), action, action, requires)
+
+    def _steps(self, fail=None):
+        return [self._step('A', []),
+                self._step('B', ['A'], fail == 'B'),
+                self._step('C', ['A']),
+                self._step('D', ['B', 'C'])]
+
+    def test_run_steps(self):
+        javelin._run_steps(self._steps(), 'create')
+        names = [name for name, resources in self.calls]
+        self.assertEqual('A', names[0])
+        self.assertEqual(set(['B', 'C']), set(names[1:3]))
+        self.assertEqual('D', names[3])
+        self.assertIn(('B', 'b'), self.calls)
+
+    def test_run_steps_reverse(self):
+        javelin._run_steps(self._steps(), 'destroy', reverse=True)
+        names = [name for name, resources in self.calls]
+        self.assertEqual('D', names[0])
+        self.assertEqual(set(['B', 'C']), set(names[1:3]))
+        self.assertEqual('A', names[3])
+
+    def test_run_steps_error(self):
+        self.assertRaises(ValueError, javelin._run_steps,
+                          self._steps(fail='B'), 'create')
+        names = [name for name, resources in self.calls]
+        self.assertIn('A', names)
+        self.assertNotIn('D', names)
+
+    def test_run_steps_sequential(self):
+        self.patch('tempest.cmd.javelin.CONCURRENCY', new=1)
+        javelin._run_steps(self._steps(), 'create')
+        self.assertEqual(['A', 'B', 'C', 'D'],
+                         [name for name, resources in self.calls])
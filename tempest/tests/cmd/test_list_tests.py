@@ -0,0 +1,118 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import textwrap
+
+import fixtures
+
+from tempest.cmd import list_tests
+from tempest.test_discover import index
+from tempest.tests import base
+
+BASE_MODULE = """
+from tempest import test
+
+
+class BaseFooTest(test.BaseTestCase):
+
+    @test.attr(type='smoke')
+    def test_inherited(self):
+        pass
+"""
+
+TEST_MODULE = """
+from tempest.api.foo import base
+from tempest import test
+
+
+class FooTest(base.BaseFooTest):
+
+    @test.attr(type=['negative', 'gate'])
+    @test.idempotent_id('e1b6b0ab-7f18-4a60-8d3e-13d3b8c2f3d5')
+    @test.services('compute')
+    def test_foo(self):
+        pass
+
+    def helper(self):
+        pass
+
+
+class Mixin(object):
+
+    def test_not_a_test_case(self):
+        pass
+"""
+
+DYNAMIC_MODULE = """
+from tempest.scenario import utils
+
+load_tests = utils.load_tests_input_scenario_utils
+"""
+
+
+class TestIndex(base.TestCase):
+
+    def setUp(self):
+        super(TestIndex, self).setUp()
+        self.top_dir = self.useFixture(fixtures.TempDir()).path
+        self._write('tempest/__init__.py', '')
+        self._write('tempest/api/__init__.py', '')
+        self._write('tempest/api/foo/__init__.py', '')
+        self._write('tempest/api/foo/base.py', BASE_MODULE)
+        self._write('tempest/api/foo/test_foo.py', TEST_MODULE)
+        self._write('tempest/api/foo/test_dynamic.py', DYNAMIC_MODULE)
+        self.cache = os.path.join(self.top_dir, 'index.json')
+
+    def _write(self, path, source):
+        path = os.path.join(self.top_dir, path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(textwrap.dedent(source))
+
+    def _index(self):
+        test_index = index.TestIndex(self.top_dir, self.cache,
+                                     test_dirs=['tempest/api'])
+        return test_index, test_index.update()
+
+    def test_test_ids(self):
+        test_index, parsed = self._index()
+        self.assertEqual(5, parsed)
+        self.assertEqual(
+            ['tempest.api.foo.test_foo.FooTest.test_foo[compute,gate,'
+             'id-e1b6b0ab-7f18-4a60-8d3e-13d3b8c2f3d5,negative]',
+             'tempest.api.foo.test_foo.FooTest.test_inherited[smoke]'],
+            list(test_index.test_ids()))
+        self.assertEqual(['tempest.api.foo.test_dynamic'],
+                         test_index.dynamic_modules())
+
+    def test_incremental_update(self):
+        self._index()
+        test_index, parsed = self._index()
+        self.assertEqual(0, parsed)
+        self._write('tempest/api/foo/test_foo.py',
+                    TEST_MODULE.replace('test_foo(', 'test_bar('))
+        test_index, parsed = self._index()
+        self.assertEqual(1, parsed)
+        self.assertIn('tempest.api.foo.test_foo.FooTest.test_bar',
+                      list(test_index.test_ids())[0])
+
+    def test_list_tests_filters(self):
+        opts = list_tests.get_options(
+            ['--top-dir', self.top_dir, '--static-only', '--attr', 'smoke',
+             'FooTest'])
+        self.assertEqual(
+            ['tempest.api.foo.test_foo.FooTest.test_inherited[smoke]'],
+            list(list_tests.list_tests(opts)))
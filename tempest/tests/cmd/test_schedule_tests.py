@@ -0,0 +1,92 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import os
+
+import fixtures
+
+from tempest.cmd import schedule_tests
+from tempest.test_discover import scheduler
+from tempest.tests import base
+
+
+class TestScheduler(base.TestCase):
+
+    def setUp(self):
+        super(TestScheduler, self).setUp()
+        self.dir = self.useFixture(fixtures.TempDir()).path
+
+    def test_class_id(self):
+        self.assertEqual(
+            'tempest.api.compute.test_a.ATest',
+            scheduler.class_id('tempest.api.compute.test_a.ATest.test_b'
+                               '[id-1234,smoke]'))
+        self.assertEqual(
+            'tempest.scenario.test_c.CTest',
+            scheduler.class_id('tempest.scenario.test_c.CTest.test_d(v2)'))
+
+    def test_history_record(self):
+        history = scheduler.History(os.path.join(self.dir, 'history.json'))
+        self.assertEqual({}, history.load())
+        history.record('a.ATest', 10.0, {'servers': 2})
+        history.record('a.ATest', 20.0, {'servers': 0})
+        self.assertEqual({'a.ATest': {'time': 15.0, 'servers': 1.0,
+                                      'runs': 2}}, history.load())
+
+    def test_partition_longest_first(self):
+        stats = {'a': {'time': 10}, 'b': {'time': 7}, 'c': {'time': 5},
+                 'd': {'time': 4}, 'e': {'time': 3}}
+        workers = scheduler.partition(stats.keys(), stats, 2)
+        self.assertEqual([['a', 'd'], ['b', 'c', 'e']],
+                         [w.classes for w in workers])
+        self.assertEqual(15, max(w.load for w in workers))
+
+    def test_partition_default_cost(self):
+        stats = {'a': {'time': 10}, 'b': {'time': 2}, 'c': {'time': 4}}
+        workers = scheduler.partition(['a', 'b', 'c', 'new'], stats, 2)
+        # The median of the known times is used for the new class
+        self.assertEqual([['a'], ['c', 'new', 'b']],
+                         [w.classes for w in workers])
+
+    def test_partition_respects_limits(self):
+        stats = {'a': {'time': 10, 'servers': 8},
+                 'b': {'time': 9, 'servers': 8},
+                 'c': {'time': 5, 'servers': 0},
+                 'd': {'time': 4, 'servers': 0}}
+        workers = scheduler.partition(stats.keys(), stats, 2,
+                                      limits={'servers': 10})
+        # a and b can not run at the same time
+        self.assertEqual([['a', 'b'], ['c', 'd']],
+                         [w.classes for w in workers])
+
+    def test_main(self):
+        history = scheduler.History(os.path.join(self.dir, 'history.json'))
+        history.record('t.ATest', 10.0, {})
+        history.record('t.BTest', 5.0, {})
+        test_list = os.path.join(self.dir, 'tests.list')
+        with open(test_list, 'w') as f:
+            f.write('t.ATest.test_1\nt.ATest.test_2[id-1]\nt.BTest.test_3\n')
+        output = os.path.join(self.dir, 'out')
+        opts = schedule_tests.get_options(
+            ['--history', history.path, '--workers', '2', test_list,
+             output])
+        schedule_tests.main(opts)
+        with open(os.path.join(output, 'worker-0.list')) as f:
+            self.assertEqual('t.ATest.test_1\nt.ATest.test_2[id-1]\n',
+                             f.read())
+        with open(os.path.join(output, 'schedule.json')) as f:
+            summary = json.load(f)
+        self.assertEqual(10.0, summary['makespan'])
+        self.assertEqual(['t.BTest'], summary['workers'][1]['classes'])
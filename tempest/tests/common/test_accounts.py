@@ -15,10 +15,12 @@
 import hashlib
 import os
 
+import fixtures
 import mock
 from oslo_concurrency.fixture import lockutils as lockutils_fixtures
 from oslo_concurrency import lockutils
 from oslo_config import cfg
+from oslo_serialization import jsonutils as json
 from oslotest import mockpatch
 import six
 from tempest_lib import auth
@@ -309,6 +311,77 @@ class TestAccount(base.TestCase):
         self.assertEqual('network-2', network['name'])
 
 
+class TestIndexedAccount(base.TestCase):
+
+    def setUp(self):
+        super(TestIndexedAccount, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        lock_path = self.useFixture(fixtures.TempDir()).path
+        lockutils.set_defaults(lock_path=lock_path)
+        self.index_path = os.path.join(lock_path, 'test_accounts.json')
+        self.test_accounts = [
+            {'username': 'test_user1', 'tenant_name': 'test_tenant1',
+             'password': 'p'},
+            {'username': 'test_user2', 'tenant_name': 'test_tenant2',
+             'password': 'p', 'roles': ['role1']},
+            {'username': 'test_user3', 'tenant_name': 'test_tenant3',
+             'password': 'p', 'roles': ['role1']},
+        ]
+        self.useFixture(mockpatch.Patch(
+            'tempest.common.accounts.read_accounts_yaml',
+            return_value=self.test_accounts))
+        accounts_file = os.path.join(lock_path, 'accounts.yaml')
+        open(accounts_file, 'w').close()
+        cfg.CONF.set_default('test_accounts_file', accounts_file,
+                             group='auth')
+        self.hashes = {}
+        for account in self.test_accounts:
+            account = dict((k, v) for k, v in account.items() if k != 'roles')
+            hash = hashlib.md5()
+            hash.update(six.text_type(account).encode('utf-8'))
+            self.hashes[account['username']] = hash.hexdigest()
+
+    def test_get_free_hash(self):
+        test_accounts_class = accounts.IndexedAccounts('v2', 'test_name')
+        hashes = [self.hashes['test_user2'], self.hashes['test_user3']]
+        self.assertEqual(hashes[0], test_accounts_class._get_free_hash(hashes))
+        self.assertEqual(hashes[1], test_accounts_class._get_free_hash(hashes))
+        with open(self.index_path) as fd:
+            self.assertEqual({hashes[0]: 'test_name', hashes[1]: 'test_name'},
+                             json.loads(fd.read()))
+
+    def test_get_free_hash_no_free_accounts(self):
+        test_accounts_class = accounts.IndexedAccounts('v2', 'test_name')
+        hashes = [self.hashes['test_user1']]
+        test_accounts_class._get_free_hash(hashes)
+        other_class = accounts.IndexedAccounts('v2', 'other_name')
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          other_class._get_free_hash, hashes)
+
+    def test_remove_hash(self):
+        test_accounts_class = accounts.IndexedAccounts('v2', 'test_name')
+        hashes = [self.hashes['test_user1'], self.hashes['test_user2']]
+        test_accounts_class._get_free_hash(hashes)
+        test_accounts_class._get_free_hash(hashes)
+        test_accounts_class.remove_hash(hashes[0])
+        self.assertEqual({hashes[1]: 'test_name'},
+                         test_accounts_class._read_index())
+        test_accounts_class.remove_hash(hashes[1])
+        self.assertFalse(os.path.exists(self.index_path))
+
+    def test_get_stats(self):
+        test_accounts_class = accounts.IndexedAccounts('v2', 'test_name')
+        test_accounts_class._get_free_hash([self.hashes['test_user2']])
+        stats = test_accounts_class.get_stats()
+        self.assertEqual(3, stats['total'])
+        self.assertEqual(1, stats['allocated'])
+        self.assertEqual({'total': 2, 'allocated': 1},
+                         stats['roles']['role1'])
+        self.assertEqual({self.hashes['test_user2']: 'test_name'},
+                         stats['owners'])
+
+
 class TestNotLockingAccount(base.TestCase):
 
     def setUp(self):
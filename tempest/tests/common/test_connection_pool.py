@@ -0,0 +1,105 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import httplib2
+import mock
+
+from tempest.common import connection_pool
+from tempest.tests import base
+
+
+class TestConnectionPool(base.TestCase):
+
+    def setUp(self):
+        super(TestConnectionPool, self).setUp()
+        self.pool = connection_pool.ConnectionPool(max_size=2,
+                                                   idle_timeout=30)
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.pool.acquire('http:a'))
+        conn = mock.Mock()
+        self.pool.release('http:a', conn)
+        self.assertIsNone(self.pool.acquire('http:b'))
+        self.assertIs(conn, self.pool.acquire('http:a'))
+        self.assertEqual({'hits': 1, 'misses': 2, 'evictions': 0,
+                          'idle': 0}, self.pool.stats())
+
+    def test_most_recent_first(self):
+        first, second = mock.Mock(), mock.Mock()
+        self.pool.release('http:a', first)
+        self.pool.release('http:a', second)
+        self.assertIs(second, self.pool.acquire('http:a'))
+
+    def test_closed_connection_not_kept(self):
+        conn = mock.Mock(sock=None)
+        self.pool.release('http:a', conn)
+        self.assertEqual(0, self.pool.stats()['idle'])
+
+    def test_max_size(self):
+        conns = [mock.Mock() for i in range(3)]
+        for conn in conns:
+            self.pool.release('http:a', conn)
+        conns[2].close.assert_called_once_with()
+        self.assertEqual(2, self.pool.stats()['idle'])
+        self.assertEqual(1, self.pool.stats()['evictions'])
+
+    @mock.patch('time.time')
+    def test_idle_eviction(self, time_mock):
+        time_mock.return_value = 100
+        conn = mock.Mock()
+        self.pool.release('http:a', conn)
+        time_mock.return_value = 131
+        self.assertIsNone(self.pool.acquire('http:a'))
+        conn.close.assert_called_once_with()
+        self.assertEqual(1, self.pool.stats()['evictions'])
+
+    def test_close(self):
+        conn = mock.Mock()
+        self.pool.release('http:a', conn)
+        self.pool.close()
+        conn.close.assert_called_once_with()
+        self.assertIsNone(self.pool.acquire('http:a'))
+
+
+class TestPooledHttp(base.TestCase):
+
+    def test_request_reuses_pooled_connection(self):
+        pool = connection_pool.ConnectionPool()
+        conn = mock.Mock()
+        pool.release('http:fake.com:8080', conn)
+        http = connection_pool.PooledHttp(pool)
+
+        used = []
+
+        def fake_request(self, uri, method, *args, **kwargs):
+            used.append(self.connections.get('http:fake.com:8080'))
+            return 'resp', 'body'
+
+        with mock.patch.object(httplib2.Http, 'request', fake_request):
+            self.assertEqual(('resp', 'body'),
+                             http.request('http://fake.com:8080/v2', 'GET'))
+        self.assertEqual([conn], used)
+        self.assertEqual({}, http.connections)
+        self.assertIs(conn, pool.acquire('http:fake.com:8080'))
+        self.assertEqual(2, pool.hits)
+
+    def test_clone(self):
+        pool = connection_pool.ConnectionPool()
+        http = connection_pool.PooledHttp(pool, ca_certs='/ca.pem')
+        http.connections['http:fake.com'] = mock.Mock()
+        clone = http.clone()
+        self.assertIsInstance(clone, connection_pool.PooledHttp)
+        self.assertIs(pool, clone.pool)
+        self.assertEqual('/ca.pem', clone.ca_certs)
+        self.assertEqual({}, clone.connections)
@@ -0,0 +1,132 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import socket
+import struct
+
+import mock
+from tempest_lib import exceptions as lib_exc
+
+from tempest.common import connectivity
+from tempest.tests import base
+
+
+class TestProbes(base.TestCase):
+
+    def test_echo_request_checksum(self):
+        packet = connectivity.echo_request(0x1234, 1)
+        self.assertEqual((8, 0, 0x1234, 1),
+                         struct.unpack('!BBxxHH', packet[:8]))
+        # The checksum of a packet including its checksum is 0
+        self.assertEqual(0, connectivity._checksum(packet))
+
+    def test_ping_probe(self):
+        procs = {'10.0.0.1': 0, '10.0.0.2': 1, '::1': 0}
+
+        def popen(cmd, **kwargs):
+            return mock.Mock(returncode=procs[cmd[-1]])
+
+        popen_mock = self.patch('subprocess.Popen', side_effect=popen)
+        self.assertEqual(set(['10.0.0.1', '::1']),
+                         connectivity.ping_probe(['10.0.0.1', '10.0.0.2',
+                                                  '::1']))
+        self.assertEqual(['ping', 'ping', 'ping6'],
+                         [c[0][0][0] for c in popen_mock.call_args_list])
+
+    def test_tcp_probe(self):
+        server = socket.socket()
+        self.addCleanup(server.close)
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        port = server.getsockname()[1]
+        self.assertEqual(set(['127.0.0.1']),
+                         connectivity.tcp_probe(['127.0.0.1'], port=port))
+
+
+class FakeRemoteClient(object):
+
+    def __init__(self, host, replies):
+        self.ssh_client = mock.Mock(host=host)
+        self.replies = iter(replies)
+        self.calls = []
+
+    def ping_hosts(self, hosts):
+        self.calls.append(list(hosts))
+        replied = next(self.replies)
+        if isinstance(replied, Exception):
+            raise replied
+        return [host for host in hosts if host in replied]
+
+
+class TestConnectivityChecker(base.TestCase):
+
+    def setUp(self):
+        super(TestConnectivityChecker, self).setUp()
+        self.patch('time.sleep')
+        self.checker = connectivity.ConnectivityChecker(method='ping')
+
+    def test_check_matrix(self):
+        self.patch('tempest.common.connectivity.ping_probe',
+                   side_effect=[set(), set(['10.0.0.1'])])
+        source = FakeRemoteClient('172.24.4.3', [
+            lib_exc.SSHExecCommandFailed(command='ping', exit_status=1,
+                                         strerror=''),
+            ['10.0.0.2'], ['10.0.0.3']])
+        matrix = self.checker.check([(None, '10.0.0.1'),
+                                     (source, '10.0.0.2'),
+                                     (source, '10.0.0.3')])
+        self.assertTrue(matrix.succeeded)
+        self.assertEqual([('localhost', '10.0.0.1'),
+                          ('172.24.4.3', '10.0.0.2'),
+                          ('172.24.4.3', '10.0.0.3')], list(matrix.results))
+        # The dests of a source are pinged at once, until they reply
+        self.assertEqual([['10.0.0.2', '10.0.0.3'], ['10.0.0.2', '10.0.0.3'],
+                          ['10.0.0.3']], source.calls)
+
+    def test_check_timeout(self):
+        self.patch('tempest.common.connectivity.ping_probe',
+                   return_value=set(['10.0.0.1']))
+        matrix = self.checker.check([(None, '10.0.0.1'), (None, '10.0.0.2')],
+                                    timeout=0)
+        self.assertFalse(matrix.succeeded)
+        self.assertEqual([('localhost', '10.0.0.2')], matrix.failures())
+        self.assertIn('localhost -> 10.0.0.2: not reachable', str(matrix))
+
+    def test_check_unreachable(self):
+        self.patch('tempest.common.connectivity.ping_probe',
+                   return_value=set(['10.0.0.1']))
+        matrix = self.checker.check([(None, '10.0.0.1'), (None, '10.0.0.2')],
+                                    should_succeed=False, timeout=0)
+        self.assertEqual([('localhost', '10.0.0.1')], matrix.failures())
+
+    def test_icmp_fallback(self):
+        checker = connectivity.ConnectivityChecker(method='auto')
+        self.patch('tempest.common.connectivity.icmp_probe',
+                   return_value=None)
+        ping_probe = self.patch('tempest.common.connectivity.ping_probe',
+                                return_value=set(['10.0.0.1']))
+        self.assertTrue(checker.check([(None, '10.0.0.1')]).succeeded)
+        ping_probe.assert_called_once_with(['10.0.0.1'], 1)
+        self.assertFalse(checker._icmp_available)
+
+    def test_icmp_probe(self):
+        checker = connectivity.ConnectivityChecker(method='icmp')
+        icmp_probe = self.patch('tempest.common.connectivity.icmp_probe',
+                                return_value=set(['10.0.0.1']))
+        ping_probe = self.patch('tempest.common.connectivity.ping_probe',
+                                return_value=set(['::1']))
+        self.assertTrue(checker.check([(None, '10.0.0.1'),
+                                       (None, '::1')]).succeeded)
+        icmp_probe.assert_called_once_with(['10.0.0.1'], 1)
+        ping_probe.assert_called_once_with(['::1'], 1)
@@ -0,0 +1,111 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from oslo_config import cfg
+from tempest_lib.common import rest_client
+from tempest_lib import exceptions as lib_exc
+
+from tempest.api_schema.response.compute.v2_1 import servers
+from tempest.common import schema_validation
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class FakeResponse(dict):
+
+    def __init__(self, status, headers=None):
+        super(FakeResponse, self).__init__(headers or {})
+        self.status = status
+
+
+class TestSchemaValidation(base.TestCase):
+
+    schema = {
+        'status_code': [200],
+        'response_body': {
+            'type': 'object',
+            'properties': {'id': {'type': 'string'}},
+            'required': ['id']
+        },
+        'response_header': {
+            'type': 'object',
+            'properties': {'x-request-id': {'type': 'string'}},
+            'required': ['x-request-id']
+        }
+    }
+
+    def setUp(self):
+        super(TestSchemaValidation, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.patch('tempest.common.schema_validation._validators', new={})
+        self.patch('tempest.common.schema_validation._stats', new={})
+        self.resp = FakeResponse(200, {'x-request-id': 'req-1'})
+
+    def test_validator_is_cached(self):
+        validator_class = rest_client.JSONSCHEMA_VALIDATOR
+        with mock.patch.object(validator_class, 'check_schema') as check:
+            for i in range(3):
+                schema_validation.validate_response(self.schema, self.resp,
+                                                    {'id': 'a'})
+        # Once for the body and once for the header schema
+        self.assertEqual(2, check.call_count)
+
+    def test_invalid_body(self):
+        self.assertRaises(lib_exc.InvalidHTTPResponseBody,
+                          schema_validation.validate_response,
+                          self.schema, self.resp, {'id': 1})
+
+    def test_invalid_header(self):
+        self.assertRaises(lib_exc.InvalidHTTPResponseHeader,
+                          schema_validation.validate_response,
+                          self.schema, FakeResponse(200), {'id': 'a'})
+
+    def test_unexpected_status(self):
+        self.assertRaises(lib_exc.InvalidHttpSuccessCode,
+                          schema_validation.validate_response,
+                          self.schema, FakeResponse(202), {'id': 'a'})
+
+    def test_sample_rate(self):
+        cfg.CONF.set_default('response_validation_sample_rate', 3,
+                             group='debug')
+        results = []
+        for i in range(5):
+            try:
+                schema_validation.validate_response(self.schema, self.resp,
+                                                    {'id': 1})
+                results.append(True)
+            except lib_exc.InvalidHTTPResponseBody:
+                results.append(False)
+        # Only the 1st and the 4th responses are validated
+        self.assertEqual([False, True, True, False, True], results)
+        stats = list(schema_validation.get_stats().values())[0]
+        self.assertEqual(5, stats['calls'])
+        self.assertEqual(2, stats['validations'])
+
+    def test_stats_name(self):
+        body = {'server': {'id': 'a'}}
+        with mock.patch.object(schema_validation, '_validate'):
+            schema_validation.validate_response(servers.delete_server,
+                                                FakeResponse(204), body)
+        self.assertIn('response.compute.v2_1.servers.delete_server',
+                      schema_validation.get_stats())
+
+    def test_log_stats(self):
+        schema_validation.validate_response(self.schema, self.resp,
+                                            {'id': 'a'})
+        with mock.patch.object(schema_validation.LOG, 'debug') as debug:
+            schema_validation.log_stats()
+        self.assertEqual(1, debug.call_count)
+        self.assertEqual((1, 1), debug.call_args[0][2:4])
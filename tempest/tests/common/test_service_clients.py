@@ -16,6 +16,8 @@ import mock
 import random
 import six
 
+from tempest.common import connection_pool
+from tempest.common import service_client as base_service_client
 from tempest.services.baremetal.v1.json import baremetal_client
 from tempest.services.compute.json import agents_client
 from tempest.services.compute.json import aggregates_client
@@ -101,6 +103,7 @@ from tempest.services.volume.v2.json import snapshots_client \
 from tempest.services.volume.v2.json import volumes_client as \
     volume_v2_volumes_client
 from tempest.tests import base
+from tempest.tests import fake_auth_provider
 
 
 class TestServiceClient(base.TestCase):
@@ -196,3 +199,25 @@ class TestServiceClient(base.TestCase):
             client(auth, service, region, **params)
             mock_init.assert_called_once_with(auth, service, region, **params)
             mock_init.reset_mock()
+
+
+class TestServiceClientClone(base.TestCase):
+
+    def setUp(self):
+        super(TestServiceClientClone, self).setUp()
+        self.client = base_service_client.ServiceClient(
+            fake_auth_provider.FakeAuthProvider(), 'compute', 'regionOne')
+
+    def test_clone_own_connections(self):
+        self.client.http_obj.connections['key'] = mock.Mock()
+        clone = self.client.clone()
+        self.assertIsNot(self.client.http_obj, clone.http_obj)
+        self.assertEqual({}, clone.http_obj.connections)
+        self.assertIs(self.client.auth_provider, clone.auth_provider)
+
+    def test_clone_keeps_connection_pool(self):
+        pool = connection_pool.ConnectionPool()
+        self.client.use_connection_pool(pool)
+        clone = self.client.clone()
+        self.assertIsNot(self.client.http_obj, clone.http_obj)
+        self.assertIs(pool, clone.http_obj.pool)
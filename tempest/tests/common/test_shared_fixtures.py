@@ -0,0 +1,143 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from oslotest import mockpatch
+
+from tempest.common import accounts
+from tempest.common import isolated_creds
+from tempest.common import shared_fixtures
+from tempest import test
+from tempest.tests import base
+
+
+def _test_class(tenant_id):
+    test_class = mock.Mock(__name__='FakeTest')
+    test_class.os.credentials.tenant_id = tenant_id
+    return test_class
+
+
+class TestSharedFixtures(base.TestCase):
+
+    def setUp(self):
+        super(TestSharedFixtures, self).setUp()
+        self.patch('tempest.common.shared_fixtures._factories', new={})
+        self.patch('tempest.common.shared_fixtures._entries', new={})
+        self.patch('tempest.common.shared_fixtures._fixture_tenant', new=None)
+        self.create = mock.Mock(side_effect=lambda cls: object())
+        self.delete = mock.Mock()
+        shared_fixtures.register('server', self.create, self.delete)
+
+    def test_shared_by_tenant(self):
+        first, second = _test_class('t1'), _test_class('t1')
+        other = _test_class('t2')
+        server = shared_fixtures.acquire('server', first)
+        self.assertIs(server, shared_fixtures.acquire('server', second))
+        self.assertIsNot(server, shared_fixtures.acquire('server', other))
+        self.assertEqual(2, self.create.call_count)
+
+    def test_deleted_by_last_user(self):
+        first, second = _test_class('t1'), _test_class('t1')
+        server = shared_fixtures.acquire('server', first)
+        shared_fixtures.acquire('server', second)
+        shared_fixtures.release('server', first)
+        self.assertFalse(self.delete.called)
+        shared_fixtures.release('server', second)
+        # Deleted with the class which created it
+        self.delete.assert_called_once_with(first, server)
+        self.assertIsNot(server, shared_fixtures.acquire('server', second))
+
+    def test_kept_until_delete_all(self):
+        first, second = _test_class('t1'), _test_class('t1')
+        server = shared_fixtures.acquire('server', first, keep=True)
+        shared_fixtures.release('server', first)
+        self.assertIs(server, shared_fixtures.acquire('server', second))
+        shared_fixtures.release('server', second)
+        self.assertFalse(self.delete.called)
+        shared_fixtures.delete_all()
+        self.delete.assert_called_once_with(first, server)
+
+    def test_dependencies_deleted_last(self):
+        deleted = []
+
+        def create_image(cls):
+            shared_fixtures.acquire('server', cls)
+            return 'image'
+
+        def delete_image(cls, image):
+            deleted.append(image)
+            shared_fixtures.release('server', cls)
+        self.delete.side_effect = lambda cls, server: deleted.append(
+            'server')
+        shared_fixtures.register('image', create_image, delete_image)
+        test_class = _test_class('t1')
+        shared_fixtures.acquire('image', test_class, keep=True)
+        shared_fixtures.acquire('server', test_class, keep=True)
+        shared_fixtures.delete_all()
+        self.assertEqual(['image', 'server'], deleted)
+
+    def test_fixture_tenant_deleted_last(self):
+        deleted = []
+        fixture_tenant = _test_class('t1')
+        fixture_tenant.clear.side_effect = lambda: deleted.append('tenant')
+        self.delete.side_effect = lambda cls, server: deleted.append(
+            'server')
+        self.patch('tempest.common.shared_fixtures.FixtureTenant',
+                   return_value=fixture_tenant)
+        owner = shared_fixtures.get_fixture_tenant()
+        self.assertIs(owner, shared_fixtures.get_fixture_tenant())
+        shared_fixtures.acquire('server', owner, keep=True)
+        shared_fixtures.delete_all()
+        self.assertEqual(['server', 'tenant'], deleted)
+        self.assertIsNone(shared_fixtures._fixture_tenant)
+
+
+class TestAcquireSharedFixtures(base.TestCase):
+
+    class FakeTest(test.BaseTestCase):
+        shared_fixtures = ['server']
+
+    def _acquire(self, provider_class):
+        self.useFixture(mockpatch.PatchObject(
+            self.FakeTest, '_get_credentials_provider',
+            return_value=mock.Mock(spec=provider_class)))
+        self.fixture_tenant = mock.Mock()
+        self.patch('tempest.common.shared_fixtures.get_fixture_tenant',
+                   return_value=self.fixture_tenant)
+        self.FakeTest.os = mock.Mock()
+        self.addCleanup(delattr, self.FakeTest, 'os')
+        acquire = self.patch('tempest.common.shared_fixtures.acquire')
+        self.FakeTest.acquire_shared_fixtures()
+        return acquire.call_args
+
+    def test_configured_credentials_kept(self):
+        args, kwargs = self._acquire(accounts.NotLockingAccounts)
+        self.assertEqual(('server', self.FakeTest), args)
+        self.assertTrue(kwargs['keep'])
+        self.assertIs(self.FakeTest.os, self.FakeTest.shared_os)
+
+    def test_locked_account_not_kept(self):
+        args, kwargs = self._acquire(accounts.Accounts)
+        self.assertEqual(('server', self.FakeTest), args)
+        self.assertFalse(kwargs['keep'])
+        self.assertIs(self.FakeTest.os, self.FakeTest.shared_os)
+
+    def test_isolated_tenant_uses_fixture_tenant(self):
+        args, kwargs = self._acquire(isolated_creds.IsolatedCreds)
+        self.assertEqual(('server', self.fixture_tenant), args)
+        self.assertTrue(kwargs['keep'])
+        self.assertIs(self.fixture_tenant.os, self.FakeTest.shared_os)
+        release = self.patch('tempest.common.shared_fixtures.release')
+        self.FakeTest.release_shared_fixtures()
+        release.assert_called_once_with('server', self.fixture_tenant)
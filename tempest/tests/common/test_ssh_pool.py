@@ -0,0 +1,165 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import socket
+import subprocess
+
+import mock
+from tempest_lib.common import ssh
+from tempest_lib import exceptions as lib_exc
+
+from tempest.common import ssh_pool
+from tempest.tests import base
+
+
+def _connection(active=True):
+    conn = mock.Mock()
+    conn.get_transport.return_value.is_active.return_value = active
+    return conn
+
+
+class TestSSHConnectionPool(base.TestCase):
+
+    def setUp(self):
+        super(TestSSHConnectionPool, self).setUp()
+        self.pool = ssh_pool.SSHConnectionPool(idle_timeout=60, keepalive=5)
+
+    def test_hit_and_miss(self):
+        conn = _connection()
+        self.assertEqual((conn, False), self.pool.acquire('a', lambda: conn))
+        self.assertEqual((conn, True), self.pool.acquire('a', None))
+        conn.get_transport.return_value.set_keepalive.assert_called_once_with(
+            5)
+        self.assertEqual({'hits': 1, 'misses': 1, 'evictions': 0,
+                          'open': 1}, self.pool.stats())
+
+    def test_inactive_connection_replaced(self):
+        old, new = _connection(active=False), _connection()
+        self.pool.acquire('a', lambda: old)
+        self.assertEqual((new, False), self.pool.acquire('a', lambda: new))
+        old.close.assert_called_once_with()
+
+    @mock.patch('time.time')
+    def test_idle_eviction(self, time_mock):
+        time_mock.return_value = 100
+        conn = _connection()
+        self.pool.acquire('a', lambda: conn)
+        time_mock.return_value = 161
+        self.pool.acquire('b', _connection)
+        conn.close.assert_called_once_with()
+        self.assertEqual(1, self.pool.stats()['evictions'])
+
+    def test_discard(self):
+        conn = _connection()
+        self.pool.acquire('a', lambda: conn)
+        self.pool.discard('a', conn)
+        conn.close.assert_called_once_with()
+        self.assertEqual(0, self.pool.stats()['open'])
+
+
+class TestPooledClient(base.TestCase):
+
+    def setUp(self):
+        super(TestPooledClient, self).setUp()
+        self.pool = ssh_pool.SSHConnectionPool()
+        self.connections = []
+
+        def connect(client, sleep=1.5, backoff=1):
+            conn = _connection()
+            self.connections.append(conn)
+            return conn
+
+        self.patch('tempest_lib.common.ssh.Client._get_ssh_connection',
+                   side_effect=connect, autospec=True)
+        self.client = ssh_pool.PooledClient('10.0.0.1', 'cirros',
+                                            password='pass', pool=self.pool)
+
+    def _exec(self, results):
+        results = iter(results)
+
+        def exec_command(client, cmd, encoding='utf-8'):
+            client._get_ssh_connection()
+            result = next(results)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        self.patch('tempest_lib.common.ssh.Client.exec_command',
+                   side_effect=exec_command, autospec=True)
+
+    def test_connection_reused(self):
+        self._exec(['a', 'b'])
+        self.assertEqual('a', self.client.exec_command('cmd'))
+        other = ssh_pool.PooledClient('10.0.0.1', 'cirros', password='pass',
+                                      pool=self.pool)
+        self.assertEqual('b', other.exec_command('cmd'))
+        self.assertEqual(1, len(self.connections))
+
+    def test_credentials_in_key(self):
+        other = ssh_pool.PooledClient('10.0.0.1', 'cirros', password='other',
+                                      pool=self.pool)
+        self.assertNotEqual(self.client.pool_key, other.pool_key)
+        self.assertNotIn('pass', self.client.pool_key)
+
+    def test_closed_connection_retried(self):
+        self._exec(['a', socket.error('reset'), 'b'])
+        self.client.exec_command('cmd')
+        self.assertEqual('b', self.client.exec_command('cmd'))
+        self.assertEqual(2, len(self.connections))
+        self.connections[0].close.assert_called_once_with()
+
+    def test_new_connection_not_retried(self):
+        self._exec([socket.error('reset')])
+        self.assertRaises(socket.error, self.client.exec_command, 'cmd')
+
+    def test_connection_auth_kept(self):
+        self.client.test_connection_auth()
+        self.assertFalse(self.connections[0].close.called)
+        self.assertEqual(1, self.pool.stats()['open'])
+
+    def test_plain_client_unchanged(self):
+        self.assertTrue(issubclass(ssh_pool.PooledClient, ssh.Client))
+
+
+class FakeShellClient(object):
+    """Runs the commands in a local shell"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def exec_command(self, cmd):
+        self.calls += 1
+        return subprocess.check_output(
+            ['bash', '-c', 'set -eu -o pipefail; ' + cmd]).decode('utf-8')
+
+
+class TestExecCommands(base.TestCase):
+
+    def test_exec_commands(self):
+        client = FakeShellClient()
+        self.assertEqual(['a\nb\n', '', 'c\n\n'],
+                         ssh_pool.exec_commands(
+                             client, ['echo a; echo b', 'true',
+                                      'printf "c\\n\\n"']))
+        self.assertEqual(1, client.calls)
+
+    def test_exec_commands_failure(self):
+        exc = self.assertRaises(lib_exc.SSHExecCommandFailed,
+                                ssh_pool.exec_commands, FakeShellClient(),
+                                ['echo a', 'echo b; exit 3', 'echo c'])
+        self.assertIn('echo b; exit 3', str(exc))
+        self.assertIn('3', str(exc))
+
+    def test_exec_commands_empty(self):
+        self.assertEqual([], ssh_pool.exec_commands(FakeShellClient(), []))
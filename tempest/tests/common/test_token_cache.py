@@ -0,0 +1,186 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+import datetime
+import os
+import stat
+
+import fixtures
+import mock
+from tempest_lib import auth
+from tempest_lib import exceptions as lib_exc
+
+from tempest.common import service_client
+from tempest.common import token_cache
+from tempest import manager
+from tempest.tests import base
+from tempest.tests import fake_config
+from tempest.tests import fake_identity
+
+
+def _expires_in(seconds):
+    expiry = datetime.datetime.utcnow() + datetime.timedelta(seconds=seconds)
+    return expiry.strftime(auth.ISO8601_INT_SECONDS)
+
+
+def _auth_data(token, seconds=3600):
+    access = copy.deepcopy(fake_identity.IDENTITY_V2_RESPONSE['access'])
+    access['token']['id'] = token
+    access['token']['expires'] = _expires_in(seconds)
+    return token, access
+
+
+class TestTokenCache(base.TestCase):
+
+    def setUp(self):
+        super(TestTokenCache, self).setUp()
+        self.cache = token_cache.TokenCache(refresh_threshold=300)
+        self.tokens = iter(['token%d' % i for i in range(10)])
+        self.lifetime = 3600
+
+    def _authenticate(self):
+        return _auth_data(next(self.tokens), self.lifetime)
+
+    def _expiry(self, auth_data):
+        return datetime.datetime.strptime(
+            auth_data[1]['token']['expires'], auth.ISO8601_INT_SECONDS)
+
+    def _get(self, cache=None, key='key'):
+        cache = cache or self.cache
+        return cache.get_auth(key, self._authenticate, self._expiry)[0]
+
+    def test_hit_and_miss(self):
+        self.assertEqual('token0', self._get())
+        self.assertEqual('token0', self._get())
+        self.assertEqual('token1', self._get(key='other'))
+        self.assertEqual({'hits': 1, 'misses': 2, 'refreshes': 0,
+                          'invalidations': 0, 'entries': 2},
+                         self.cache.stats())
+
+    def test_refresh_before_expiry(self):
+        self.lifetime = 200
+        self.assertEqual('token0', self._get())
+        self.assertEqual('token1', self._get())
+        self.assertEqual(1, self.cache.stats()['refreshes'])
+
+    def test_invalidate(self):
+        self._get()
+        self.cache.invalidate('key', token='other')
+        self.assertEqual('token0', self._get())
+        self.cache.invalidate('key', token='token0')
+        self.assertEqual('token1', self._get())
+        self.assertEqual(1, self.cache.stats()['invalidations'])
+
+    def test_shared_on_disk(self):
+        path = self.useFixture(fixtures.TempDir()).path
+        cache = token_cache.TokenCache(path=path)
+        other_cache = token_cache.TokenCache(path=path)
+        self.assertEqual('token0', self._get(cache))
+        self.assertEqual('token0', self._get(other_cache))
+        self.assertEqual(1, other_cache.stats()['hits'])
+        cache_file = os.path.join(path, 'key.json')
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(cache_file).st_mode))
+
+        other_cache.invalidate('key')
+        self.assertFalse(os.path.exists(cache_file))
+        self.assertEqual('token1', self._get(other_cache))
+
+
+class TestCachedAuthProvider(base.TestCase):
+
+    def setUp(self):
+        super(TestCachedAuthProvider, self).setUp()
+        self.conf_fixture = self.useFixture(fake_config.ConfigFixture())
+        self.patch('tempest.common.token_cache._shared_cache', new=None)
+        self.patch('atexit.register')
+        self.cache = token_cache.TokenCache()
+        self.get_token = mock.Mock(side_effect=[_auth_data('token0'),
+                                                _auth_data('token1')])
+
+    def _provider(self, password='pass'):
+        creds = auth.KeystoneV2Credentials(username='user', password=password,
+                                           tenant_name='tenant')
+        provider = token_cache.CachedKeystoneV2AuthProvider(
+            creds, fake_identity.FAKE_AUTH_URL, token_cache=self.cache)
+        provider.auth_client.get_token = self.get_token
+        return provider
+
+    def test_providers_share_token(self):
+        self.assertEqual('token0', self._provider().get_token())
+        self.assertEqual('token0', self._provider().get_token())
+        self.assertEqual(1, self.get_token.call_count)
+        self.assertEqual('token1', self._provider('other').get_token())
+
+    def test_clear_auth(self):
+        provider = self._provider()
+        provider.get_token()
+        provider.clear_auth()
+        self.assertEqual('token1', self._provider().get_token())
+
+    def test_revoke_token(self):
+        provider = self._provider()
+        other = self._provider()
+        self.assertEqual('token0', provider.get_token())
+        self.assertEqual('token0', other.get_token())
+        token_cache.revoke_token(provider, 'token0')
+        # The revoking provider keeps the token until clear_auth
+        self.assertEqual('token0', provider.get_token())
+        self.assertFalse(provider.renew_rejected_auth())
+        self.assertEqual('token1', other.get_token())
+        provider.clear_auth()
+        self.assertEqual('token1', provider.get_token())
+
+    def test_renew_rejected_auth(self):
+        provider = self._provider()
+        provider.get_token()
+        self.assertTrue(provider.renew_rejected_auth())
+        self.assertEqual('token1', provider.get_token())
+
+    def test_service_client_renews_rejected_token(self):
+        provider = self._provider()
+        provider.get_token()
+        client = service_client.ServiceClient(provider, 'compute',
+                                              'regionOne')
+        request = self.patch(
+            'tempest_lib.common.rest_client.RestClient.request',
+            side_effect=[lib_exc.Unauthorized(), ('resp', 'body')])
+        self.assertEqual(('resp', 'body'), client.request('GET', 'servers'))
+        self.assertEqual(2, request.call_count)
+        self.assertEqual('token1', provider.get_token())
+
+    def test_service_client_revoked_token_rejected(self):
+        provider = self._provider()
+        provider.get_token()
+        token_cache.revoke_token(provider, 'token0')
+        client = service_client.ServiceClient(provider, 'compute',
+                                              'regionOne')
+        self.patch('tempest_lib.common.rest_client.RestClient.request',
+                   side_effect=lib_exc.Unauthorized())
+        self.assertRaises(lib_exc.Unauthorized, client.request, 'GET',
+                          'servers')
+
+    def test_get_auth_provider(self):
+        creds = auth.KeystoneV2Credentials(username='user', password='pass',
+                                           tenant_name='tenant')
+        provider = manager.get_auth_provider(creds)
+        self.assertIsInstance(provider,
+                              token_cache.CachedKeystoneV2AuthProvider)
+        self.assertIs(token_cache.get_shared_cache(), provider.token_cache)
+
+        self.conf_fixture.conf.set_default('token_cache', False,
+                                           group='identity')
+        provider = manager.get_auth_provider(creds)
+        self.assertNotIsInstance(provider,
+                                 token_cache.CachedAuthProviderMixin)
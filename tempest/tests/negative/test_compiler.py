@@ -0,0 +1,102 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+import fixtures
+import mock
+
+from tempest.common.generator import compiler
+from tempest.common.generator import negative_generator
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestCompiler(base.TestCase):
+
+    description = {
+        "name": "create-thing",
+        "http-method": "POST",
+        "url": "things/%s",
+        "json-schema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "maxLength": 5},
+                "size": {"type": "integer", "minimum": 1}
+            }
+        },
+        "resources": [{"name": "parent", "expected_result": 404}]
+    }
+
+    def setUp(self):
+        super(TestCompiler, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.patch('tempest.common.generator.compiler._generators', new={})
+        self.patch('tempest.common.generator.compiler._compiled', new={})
+
+    def _scenarios(self, compiled):
+        return dict((name, scenario)
+                    for name, scenario in compiled['scenarios'])
+
+    def test_compile_description(self):
+        compiled = compiler.compile_description(self.description)
+        self.assertEqual({"name": "x", "size": 1},
+                         compiled['valid_payload'])
+        scenarios = self._scenarios(compiled)
+        self.assertEqual(['parent', 404],
+                         [scenarios['inv_res_parent']['resource'][0],
+                          scenarios['inv_res_parent']['expected_result']])
+        self.assertEqual({"name": "xxxxxx", "size": 1},
+                         scenarios['name_gen_str_max_length'][
+                             '_negtest_payload'])
+        self.assertEqual({"name": "x", "size": 0},
+                         scenarios['size_gen_int_min']['_negtest_payload'])
+        # The valid payload is not modified by the scenarios
+        self.assertEqual({"name": "x", "size": 1},
+                         compiled['valid_payload'])
+
+    def test_compile_description_memoised(self):
+        with mock.patch.object(compiler, '_compile',
+                               wraps=compiler._compile) as compile_mock:
+            first = compiler.compile_description(self.description)
+            second = compiler.compile_description(dict(self.description))
+        self.assertIs(first, second)
+        self.assertEqual(1, compile_mock.call_count)
+
+    def test_get_generator_shared(self):
+        self.assertIs(compiler.get_generator(), compiler.get_generator())
+        self.assertIsInstance(compiler.get_generator(),
+                              negative_generator.NegativeTestGenerator)
+
+    def test_compile_description_cached_on_disk(self):
+        cache_dir = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'negative')
+        compiled = compiler.compile_description(self.description,
+                                                cache_dir=cache_dir)
+        key = compiler.description_key(self.description)
+        self.assertEqual([key + '.json'], os.listdir(cache_dir))
+
+        self.patch('tempest.common.generator.compiler._compiled', new={})
+        self.patch('tempest.common.generator.compiler._compile',
+                   side_effect=AssertionError)
+        self.assertEqual(compiled,
+                         compiler.compile_description(self.description,
+                                                      cache_dir=cache_dir))
+
+    def test_description_key(self):
+        other = dict(self.description, url="other/%s")
+        self.assertEqual(compiler.description_key(self.description),
+                         compiler.description_key(dict(self.description)))
+        self.assertNotEqual(compiler.description_key(self.description),
+                            compiler.description_key(other))
@@ -0,0 +1,170 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+import mock
+import six
+
+from tempest.common.generator import fuzz_generator
+from tempest.common.generator import fuzzer
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestFuzzTestGenerator(base.TestCase):
+
+    schema = {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string", "maxLength": 10},
+            "limits": {
+                "type": "object",
+                "properties": {"ram": {"type": "integer", "minimum": 1}}
+            }
+        }
+    }
+
+    def setUp(self):
+        super(TestFuzzTestGenerator, self).setUp()
+        self.generator = fuzz_generator.FuzzTestGenerator(seed=42)
+
+    def test_fields(self):
+        self.assertEqual([(), ('limits',), ('limits', 'ram'), ('name',)],
+                         [path for path, _ in self.generator.fields(
+                             self.schema)])
+
+    def test_mutations(self):
+        mutations = list(self.generator.mutations(self.schema))
+        self.assertGreater(len(mutations), 100)
+        name_values = [value for path, name, value in mutations
+                       if path == ('name',)]
+        self.assertIn("x" * 11, name_values)
+        self.assertIn(fuzz_generator.REMOVE, name_values)
+        ram_values = [value for path, name, value in mutations
+                      if path == ('limits', 'ram')]
+        self.assertIn(0, ram_values)
+        self.assertIn("1", ram_values)
+
+    def test_random_mutation_reproducible(self):
+        other = fuzz_generator.FuzzTestGenerator(seed=42)
+        for i in range(50):
+            self.assertEqual(other.random_mutation(self.schema),
+                             self.generator.random_mutation(self.schema))
+
+    def test_apply_mutation(self):
+        payload = {"name": "x", "limits": {"ram": 1}}
+        self.assertEqual({"name": "x", "limits": {"ram": -1}},
+                         fuzz_generator.apply_mutation(
+                             payload, ('limits', 'ram'), -1))
+        self.assertEqual({"limits": {"ram": 1}},
+                         fuzz_generator.apply_mutation(
+                             payload, ('name',), fuzz_generator.REMOVE))
+        self.assertIsNone(fuzz_generator.apply_mutation(
+            {"name": "x", "limits": None}, ('limits', 'ram'), -1))
+        self.assertEqual({"name": "x", "limits": {"ram": 1}}, payload)
+
+
+class TestFuzzer(base.TestCase):
+
+    description = {
+        "name": "create-thing",
+        "http-method": "POST",
+        "url": "things/%s",
+        "resources": ["parent"],
+        "json-schema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "maxLength": 10},
+                "size": {"type": "integer", "minimum": 1}
+            }
+        }
+    }
+
+    def setUp(self):
+        super(TestFuzzer, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.client = mock.Mock()
+        self.client.send_requests.side_effect = self._send_requests
+        self.requests = []
+
+    def _response(self, body):
+        payload = json.loads(body) if body else {}
+        if not isinstance(payload, dict):
+            return mock.Mock(status=400), '{"badRequest": {}}'
+        name = payload.get("name")
+        if isinstance(name, six.string_types) and len(name) > 255:
+            return mock.Mock(status=500), '{"computeFault": {}}'
+        if name is None:
+            return mock.Mock(status=400), 'Bad request'
+        return mock.Mock(status=400), '{"badRequest": {}}'
+
+    def _send_requests(self, requests, concurrency=None):
+        self.requests.extend(requests)
+        return [self._response(body) for method, url, resources, body
+                in requests]
+
+    def test_error_class(self):
+        self.assertEqual('badRequest',
+                         fuzzer.error_class('{"badRequest": {"code": 400}}'))
+        self.assertEqual('NeutronError.HTTPBadRequest', fuzzer.error_class(
+            '{"NeutronError": {"type": "HTTPBadRequest"}}'))
+        self.assertEqual('text', fuzzer.error_class('Bad request'))
+        self.assertIsNone(fuzzer.error_class(''))
+        self.assertEqual((None, 'ValueError'), fuzzer.signature(ValueError()))
+
+    def test_corpus_keeps_smallest_payload(self):
+        corpus = fuzzer.Corpus()
+        self.assertTrue(corpus.add((400, 'badRequest'), {"a": "xx"}, 'm1'))
+        self.assertFalse(corpus.add((400, 'badRequest'), {"a": "x"}, 'm2'))
+        self.assertFalse(corpus.add((400, 'badRequest'), {"a": "xxx"}, 'm3'))
+        entry = corpus.entries[(400, 'badRequest')]
+        self.assertEqual(({"a": "x"}, 'm2', 3),
+                         (entry['payload'], entry['mutation'],
+                          entry['count']))
+
+    def test_run(self):
+        api_fuzzer = fuzzer.Fuzzer(self.client, self.description,
+                                   resources={"parent": "parent-id"},
+                                   batch_size=50, seed=1)
+        corpus = api_fuzzer.run(1000)
+        self.assertEqual(1000, api_fuzzer.sent)
+        self.assertEqual(1000, len(self.requests))
+        self.assertEqual(1000, len(set(body for _, _, _, body
+                                       in self.requests)))
+        self.assertEqual(set([(400, 'badRequest'), (400, 'text'),
+                              (500, 'computeFault')]),
+                         set(corpus.entries))
+        fault = corpus.entries[(500, 'computeFault')]
+        # The smallest payload getting the error is kept
+        self.assertEqual({"name": "x" * 256}, fault['payload'])
+        self.assertEqual(('POST', 'things/%s', ['parent-id']),
+                         self.requests[0][:3])
+
+    def test_run_novel_payloads_first(self):
+        api_fuzzer = fuzzer.Fuzzer(self.client, self.description,
+                                   batch_size=10, seed=1)
+        api_fuzzer.run(500)
+        statuses = [self._response(body)[0].status
+                    for _, _, _, body in self.requests]
+        first_fault = statuses.index(500)
+        # The mutations of the first payload getting a server error are
+        # sent in the next batch, half of them at least keeping its name
+        start = (first_fault // 10 + 1) * 10
+        next_batch = [json.loads(body) for _, _, _, body
+                      in self.requests[start:start + 10]]
+        long_names = [payload for payload in next_batch
+                      if isinstance(payload, dict) and
+                      payload.get("name") == "x" * 256]
+        self.assertGreaterEqual(len(long_names), 5)
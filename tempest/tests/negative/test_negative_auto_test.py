@@ -13,6 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+from oslo_config import cfg
+
 from tempest import config
 import tempest.test as test
 from tempest.tests import base
@@ -64,3 +67,44 @@ class TestNegativeAutoTest(base.TestCase):
         self._check_prop_entries(scenarios, "minRam")
         self._check_prop_entries(scenarios, "minDisk")
         self._check_resource_entries(scenarios, "inv_res")
+
+    batch_desc = dict(fake_input_desc, url="flavors/%s/%s/%s",
+                      **{"http-method": "POST"})
+
+    def _batch_test(self, statuses):
+        cfg.CONF.set_default('batch_requests', True, group='negative')
+        negative_test = test.NegativeAutoTest('get_resource')
+        negative_test.set_resource('flavor', 'flavor-id')
+        self.addCleanup(test.NegativeAutoTest._resources.clear)
+        negative_test.client = mock.Mock()
+        negative_test.client.send_requests.side_effect = lambda requests: [
+            (mock.Mock(status=status), '') for status in statuses]
+        return negative_test
+
+    def test_execute_batch(self):
+        scenarios = test.NegativeAutoTest.generate_scenario(
+            self.batch_desc)
+        negative_test = self._batch_test([400] * len(scenarios))
+        negative_test.execute(self.batch_desc)
+        requests = negative_test.client.send_requests.call_args[0][0]
+        self.assertEqual(len(scenarios), len(requests))
+        self.assertEqual(
+            [(name, ['flavor-id', None, None]) for name, scenario
+             in scenarios if 'resource' not in scenario],
+            [(name, request[2]) for (name, scenario), request
+             in zip(scenarios, requests) if 'resource' not in scenario])
+        invalid = [(scenario['resource'][1], request[2][0]) for
+                   (name, scenario), request in zip(scenarios, requests)
+                   if name == 'inv_res_flavor']
+        self.assertEqual(invalid[0][0], invalid[0][1])
+
+    def test_execute_batch_failures(self):
+        scenarios = test.NegativeAutoTest.generate_scenario(
+            self.batch_desc)
+        statuses = [400] * len(scenarios)
+        statuses[-1] = 200
+        negative_test = self._batch_test(statuses)
+        e = self.assertRaises(negative_test.failureException,
+                              negative_test.execute, self.batch_desc)
+        self.assertIn('1 of %d negative scenarios' % len(scenarios), str(e))
+        self.assertIn(scenarios[-1][0], str(e))
@@ -0,0 +1,91 @@
+# Copyright 2015 NEC Corporation.  All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import httplib2
+import mock
+from oslo_serialization import jsonutils as json
+from oslotest import mockpatch
+
+from tempest.services.compute.json import servers_client
+from tempest.tests import base
+from tempest.tests import fake_auth_provider
+
+
+class TestServersClient(base.TestCase):
+
+    def setUp(self):
+        super(TestServersClient, self).setUp()
+        fake_auth = fake_auth_provider.FakeAuthProvider()
+        self.client = servers_client.ServersClient(
+            fake_auth, 'compute', 'regionOne')
+
+    def _server(self, server_id):
+        return {'id': server_id, 'name': server_id, 'links': []}
+
+    def _mock_pages(self, *pages):
+        responses = [(httplib2.Response({'status': 200}), json.dumps(page))
+                     for page in pages]
+        return self.useFixture(mockpatch.Patch(
+            'tempest.common.service_client.ServiceClient.get',
+            side_effect=responses)).mock
+
+    def test_iter_servers_follows_links(self):
+        next_link = [{'rel': 'next',
+                      'href': 'http://nova/v2.1/servers?limit=2&marker=b'}]
+        get = self._mock_pages(
+            {'servers': [self._server('a'), self._server('b')],
+             'servers_links': next_link},
+            {'servers': [self._server('c')]})
+        servers = self.client.iter_servers(page_size=2, all_tenants=True)
+        self.assertEqual(['a', 'b', 'c'], [s['id'] for s in servers])
+        self.assertEqual(
+            [mock.call('servers?all_tenants=True&limit=2'),
+             mock.call('servers?all_tenants=True&limit=2&marker=b')],
+            get.call_args_list)
+
+    def test_iter_servers_without_links(self):
+        get = self._mock_pages(
+            {'servers': [self._server('a'), self._server('b')]},
+            {'servers': []})
+        servers = list(self.client.iter_servers(page_size=2))
+        self.assertEqual(2, len(servers))
+        self.assertEqual(mock.call('servers?limit=2&marker=b'),
+                         get.call_args)
+
+    def test_iter_servers_not_paginated(self):
+        get = self._mock_pages(
+            {'servers': [self._server('a'), self._server('b'),
+                         self._server('c')]})
+        servers = list(self.client.iter_servers(page_size=2))
+        self.assertEqual(3, len(servers))
+        self.assertEqual(1, get.call_count)
+
+    def test_iter_servers_marker_yielded_last(self):
+        get = self._mock_pages(
+            {'servers': [self._server('a'), self._server('b')]},
+            {'servers': [self._server('c')]})
+        servers = self.client.iter_servers(page_size=2)
+        self.assertEqual('a', next(servers)['id'])
+        self.assertEqual(1, get.call_count)
+        # The marker of the second page is requested before being yielded
+        self.assertEqual('b', next(servers)['id'])
+        self.assertEqual(2, get.call_count)
+
+    def test_iter_servers_marker_ignored(self):
+        page = {'servers': [self._server('a'), self._server('b')]}
+        get = self._mock_pages(page, page)
+        servers = list(self.client.iter_servers(page_size=2))
+        # The repeated page is not yielded twice
+        self.assertEqual(['a', 'b'], [s['id'] for s in servers])
+        self.assertEqual(2, get.call_count)
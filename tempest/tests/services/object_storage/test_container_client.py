@@ -0,0 +1,134 @@
+# Copyright 2015 NEC Corporation.  All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import httplib2
+import mock
+from oslo_config import cfg
+from oslo_serialization import jsonutils as json
+from oslotest import mockpatch
+from tempest_lib import exceptions as lib_exc
+
+from tempest.services.object_storage import container_client
+from tempest.tests import base
+from tempest.tests import fake_auth_provider
+from tempest.tests import fake_config
+
+
+class TestContainerClient(base.TestCase):
+
+    def setUp(self):
+        super(TestContainerClient, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        fake_auth = fake_auth_provider.FakeAuthProvider()
+        self.client = container_client.ContainerClient(
+            fake_auth, 'object-store', 'regionOne')
+
+    def _mock_pages(self, *pages):
+        responses = []
+        for page in pages:
+            if isinstance(page, Exception):
+                responses.append(page)
+            elif page:
+                responses.append((httplib2.Response({'status': 200}),
+                                  json.dumps([{'name': name}
+                                              for name in page])))
+            else:
+                responses.append((httplib2.Response({'status': 204}), ''))
+        return self.useFixture(mockpatch.Patch(
+            'tempest.common.service_client.ServiceClient.get',
+            side_effect=responses)).mock
+
+    def _mock_info(self, info):
+        self.client._listing_limit = None
+        self.useFixture(mockpatch.PatchObject(
+            self.client, 'get', return_value=(
+                httplib2.Response({'status': 200}), json.dumps(info))))
+
+    def test_list_all_container_objects(self):
+        self.client._listing_limit = 2
+        get = self._mock_pages(['a', 'b'], ['c', 'd'], [])
+        objects = self.client.list_all_container_objects(
+            'cont', params={'prefix': 'p'})
+        self.assertEqual(['a', 'b', 'c', 'd'], [o['name'] for o in objects])
+        self.assertEqual(
+            [mock.call('cont?format=json&limit=2&prefix=p', headers={}),
+             mock.call('cont?format=json&limit=2&marker=b&prefix=p',
+                       headers={}),
+             mock.call('cont?format=json&limit=2&marker=d&prefix=p',
+                       headers={})],
+            get.call_args_list)
+
+    def test_list_all_container_objects_limit(self):
+        self.client._listing_limit = 2
+        get = self._mock_pages(['a', 'b'], ['c', 'd'])
+        objects = self.client.list_all_container_objects(
+            'cont', params={'limit': 3})
+        self.assertEqual(['a', 'b', 'c'], [o['name'] for o in objects])
+        self.assertEqual(2, get.call_count)
+
+    def test_listing_limit_from_info(self):
+        self._mock_info({'swift': {'container_listing_limit': 500}})
+        self.assertEqual(500, self.client.get_listing_limit())
+        self.assertEqual(500, self.client.get_listing_limit())
+        self.client.get.assert_called_once_with('info')
+
+    def test_listing_limit_default(self):
+        self.client._listing_limit = None
+        self.useFixture(mockpatch.PatchObject(self.client, 'get',
+                                              side_effect=lib_exc.NotFound))
+        self.assertEqual(10000, self.client.get_listing_limit())
+
+    def test_listing_limit_configured(self):
+        cfg.CONF.set_default('container_listing_limit', 100,
+                             group='object-storage')
+        self._mock_info({'swift': {'container_listing_limit': 500}})
+        self.assertEqual(100, self.client.get_listing_limit())
+        self.assertFalse(self.client.get.called)
+
+    def test_iter_stops_on_short_page(self):
+        get = self._mock_pages(['a', 'b'], ['c'])
+        objects = list(self.client.iter_container_objects('cont',
+                                                          page_size=2))
+        self.assertEqual(3, len(objects))
+        self.assertEqual(2, get.call_count)
+
+    def test_iter_subdir_marker(self):
+        responses = [(httplib2.Response({'status': 200}),
+                      json.dumps([{'name': 'a'}, {'subdir': 'b/'}])),
+                     (httplib2.Response({'status': 204}), '')]
+        get = self.useFixture(mockpatch.Patch(
+            'tempest.common.service_client.ServiceClient.get',
+            side_effect=responses)).mock
+        objects = list(self.client.iter_container_objects(
+            'cont', delimiter='/', page_size=2))
+        self.assertEqual(2, len(objects))
+        self.assertEqual(
+            mock.call('cont?delimiter=%2F&format=json&limit=2&marker=b%2F',
+                      headers={}),
+            get.call_args)
+
+    def test_iter_prefetch(self):
+        self._mock_pages(['a', 'b'], ['c', 'd'], ['e'])
+        objects = self.client.iter_container_objects('cont', page_size=2,
+                                                     prefetch=True)
+        self.assertEqual(['a', 'b', 'c', 'd', 'e'],
+                         [o['name'] for o in objects])
+
+    def test_iter_prefetch_error(self):
+        self._mock_pages(['a', 'b'], lib_exc.NotFound())
+        objects = self.client.iter_container_objects('cont', page_size=2,
+                                                     prefetch=True)
+        self.assertEqual('a', next(objects)['name'])
+        self.assertEqual('b', next(objects)['name'])
+        self.assertRaises(lib_exc.NotFound, next, objects)
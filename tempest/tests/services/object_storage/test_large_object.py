@@ -0,0 +1,156 @@
+# Copyright 2015 NEC Corporation.  All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+import os
+import re
+
+import fixtures
+import mock
+from oslo_serialization import jsonutils as json
+import six
+from six.moves import http_client as httplib
+from tempest_lib import exceptions as lib_exc
+
+from tempest import exceptions
+from tempest.services.object_storage import large_object
+from tempest.tests import base
+
+DATA = b'0123456789'
+
+
+class TestLargeObjectTransfer(base.TestCase):
+
+    def setUp(self):
+        super(TestLargeObjectTransfer, self).setUp()
+        self.client = mock.Mock(connection_pool=None, token='token',
+                                base_url='http://swift/v1/AUTH_a')
+        self.transfer = large_object.LargeObjectTransfer(
+            self.client, segment_size=4, concurrency=2)
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'data')
+        with open(self.path, 'wb') as f:
+            f.write(DATA)
+        self.uploaded = {}
+        self.etag = None
+        self.patch('tempest.services.object_storage.object_client.'
+                   'put_object_connection', side_effect=self._put)
+        self.patch('tempest.services.object_storage.object_client.'
+                   'get_object_connection', side_effect=self._get)
+
+    def _put(self, base_url, container, name, contents, chunk_size=65536,
+             headers=None, query_string=None, connection=None):
+        data = contents.read(headers['Content-Length'])
+        self.uploaded[(container, name)] = data
+        resp = mock.Mock(spec=httplib.HTTPResponse, status=201,
+                         reason='Created', version=11, will_close=False)
+        resp.getheaders.return_value = [
+            ('Etag', self.etag or hashlib.md5(data).hexdigest())]
+        resp.read.return_value = b''
+        conn = mock.Mock()
+        conn.getresponse.return_value = resp
+        return conn
+
+    def test_upload_slo(self):
+        stats = self.transfer.upload('cont', 'obj', self.path)
+        self.assertEqual({('cont', 'obj/00000000'): b'0123',
+                          ('cont', 'obj/00000001'): b'4567',
+                          ('cont', 'obj/00000002'): b'89'}, self.uploaded)
+        self.assertEqual(10, stats.bytes)
+        self.assertEqual(3, stats.parts)
+        args, kwargs = self.client.create_object.call_args
+        self.assertEqual(('cont', 'obj'), args[:2])
+        self.assertEqual({'multipart-manifest': 'put'}, kwargs['params'])
+        manifest = json.loads(args[2])
+        self.assertEqual(['/cont/obj/00000000', '/cont/obj/00000001',
+                          '/cont/obj/00000002'],
+                         [segment['path'] for segment in manifest])
+        self.assertEqual(hashlib.md5(b'89').hexdigest(), manifest[2]['etag'])
+
+    def test_upload_dlo(self):
+        self.transfer.upload('cont', 'obj', self.path, manifest='dlo',
+                             segment_container='segments')
+        self.assertIn(('segments', 'obj/00000002'), self.uploaded)
+        self.client.create_object.assert_called_once_with(
+            'cont', 'obj', '',
+            metadata={'X-Object-Manifest': 'segments/obj/'})
+
+    def test_upload_etag_mismatch(self):
+        self.etag = 'bad'
+        self.assertRaises(exceptions.ObjectChecksumMismatch,
+                          self.transfer.upload, 'cont', 'obj', self.path)
+        self.assertFalse(self.client.create_object.called)
+
+    def _get(self, base_url, container, name, headers=None,
+             connection=None):
+        start, end = re.match(r'bytes=(\d+)-(\d+)',
+                              headers['Range']).groups()
+        resp = mock.Mock(spec=httplib.HTTPResponse, status=206,
+                         reason='Partial Content', version=11,
+                         will_close=False)
+        resp.getheaders.return_value = []
+        resp.read.side_effect = six.BytesIO(
+            DATA[int(start):int(end) + 1]).read
+        conn = mock.Mock()
+        conn.getresponse.return_value = resp
+        return conn
+
+    def test_download(self):
+        self.client.list_object_metadata.return_value = (
+            {'content-length': '10', 'etag': hashlib.md5(DATA).hexdigest()},
+            '')
+        target = self.path + '.out'
+        stats = self.transfer.download('cont', 'obj', target)
+        with open(target, 'rb') as f:
+            self.assertEqual(DATA, f.read())
+        self.assertEqual(3, stats.parts)
+
+    def test_download_checksum_mismatch(self):
+        self.client.list_object_metadata.return_value = (
+            {'content-length': '10', 'etag': 'bad'}, '')
+        self.assertRaises(exceptions.ObjectChecksumMismatch,
+                          self.transfer.download, 'cont', 'obj',
+                          self.path + '.out')
+
+    def test_download_slo_checks_segments(self):
+        self.client.list_object_metadata.return_value = (
+            {'content-length': '10', 'etag': '"slo-etag"',
+             'x-static-large-object': 'True'}, '')
+        segments = [{'bytes': 6, 'hash': hashlib.md5(DATA[:6]).hexdigest()},
+                    {'bytes': 4, 'hash': 'bad'}]
+
+        self.client.get_object.side_effect = lambda container, name: (
+            {}, json.dumps(segments))
+        self.assertRaises(exceptions.ObjectChecksumMismatch,
+                          self.transfer.download, 'cont', 'obj',
+                          self.path + '.out')
+        segments[1]['hash'] = hashlib.md5(DATA[6:]).hexdigest()
+        stats = self.transfer.download('cont', 'obj', self.path + '.out')
+        self.assertEqual(2, stats.parts)
+
+    def test_upload_empty_file(self):
+        with open(self.path, 'wb'):
+            pass
+        stats = self.transfer.upload('cont', 'obj', self.path)
+        self.assertEqual({}, self.uploaded)
+        self.client.create_object.assert_called_once_with('cont', 'obj', '')
+        self.assertEqual(0, stats.bytes)
+
+    def test_download_error(self):
+        self.client.list_object_metadata.return_value = (
+            {'content-length': '10', 'etag': hashlib.md5(DATA).hexdigest()},
+            '')
+        self.client._error_checker.side_effect = lib_exc.NotFound
+        self.assertRaises(lib_exc.NotFound, self.transfer.download, 'cont',
+                          'obj', self.path + '.out')
@@ -0,0 +1,122 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import socket
+
+import mock
+import six
+from six.moves import http_client as httplib
+
+from tempest.common import connection_pool
+from tempest.services.object_storage import object_client
+from tempest.tests import base
+
+BASE_URL = 'http://swift/v1/AUTH_a'
+
+
+class TestPutObject(base.TestCase):
+
+    def setUp(self):
+        super(TestPutObject, self).setUp()
+        self.pool = connection_pool.ConnectionPool()
+        self.sent = []
+        self.patch('tempest.services.object_storage.object_client.'
+                   'put_object_connection', side_effect=self._put)
+
+    def _put(self, base_url, container, name, contents, chunk_size=65536,
+             headers=None, query_string=None, connection=None):
+        self.sent.append(contents.read())
+        if connection is not None:
+            return connection
+        conn = mock.Mock()
+        conn.getresponse.return_value = mock.Mock(
+            spec=httplib.HTTPResponse, status=201, will_close=False)
+        return conn
+
+    def _stale_connection(self, error):
+        conn = mock.Mock()
+        conn.getresponse.side_effect = error
+        self.pool.release(object_client.connection_key(BASE_URL), conn)
+        return conn
+
+    def test_pooled_connection_closed_retried(self):
+        stale = self._stale_connection(httplib.BadStatusLine(''))
+        resp, _ = object_client.put_object(
+            BASE_URL, 'cont', 'obj', six.BytesIO(b'data'),
+            connection_pool=self.pool)
+        self.assertEqual(201, resp.status)
+        stale.close.assert_called_once_with()
+        # The contents are sent again from their start
+        self.assertEqual([b'data', b'data'], self.sent)
+        self.assertEqual(1, self.pool.stats()['idle'])
+
+    def test_timeout_not_retried(self):
+        self._stale_connection(socket.timeout())
+        self.assertRaises(socket.timeout, object_client.put_object,
+                          BASE_URL, 'cont', 'obj', six.BytesIO(b'data'),
+                          connection_pool=self.pool)
+
+
+class TestGetObjectToFile(base.TestCase):
+
+    def setUp(self):
+        super(TestGetObjectToFile, self).setUp()
+        self.pool = connection_pool.ConnectionPool()
+
+    def _connection(self, status, data):
+        resp = mock.Mock(spec=httplib.HTTPResponse, status=status,
+                         will_close=False)
+        resp.read.side_effect = six.BytesIO(data).read
+        conn = mock.Mock()
+        conn.getresponse.return_value = resp
+        return conn
+
+    def test_data_written(self):
+        conn = self._connection(206, b'data')
+        self.patch('tempest.services.object_storage.object_client.'
+                   'get_object_connection', return_value=conn)
+        f = six.BytesIO()
+        resp, body = object_client.get_object_to_file(
+            BASE_URL, 'cont', 'obj', f, headers={'Range': 'bytes=0-3'},
+            chunk_size=3, connection_pool=self.pool)
+        self.assertEqual(b'data', f.getvalue())
+        self.assertEqual(b'', body)
+        self.assertEqual(1, self.pool.stats()['idle'])
+
+    def test_error_not_written(self):
+        conn = self._connection(404, b'Not Found')
+        self.patch('tempest.services.object_storage.object_client.'
+                   'get_object_connection', return_value=conn)
+        f = six.BytesIO()
+        resp, body = object_client.get_object_to_file(
+            BASE_URL, 'cont', 'obj', f)
+        self.assertEqual(b'', f.getvalue())
+        self.assertEqual(b'Not Found', body)
+        conn.close.assert_called_once_with()
+
+    def test_pooled_connection_closed_retried(self):
+        stale = mock.Mock()
+        stale.getresponse.side_effect = httplib.BadStatusLine('')
+        self.pool.release(object_client.connection_key(BASE_URL), stale)
+        conn = self._connection(200, b'data')
+        connect = self.patch('tempest.services.object_storage.object_client.'
+                             'get_object_connection',
+                             side_effect=lambda *args, **kwargs: (
+                                 kwargs['connection'] or conn))
+        f = six.BytesIO()
+        object_client.get_object_to_file(BASE_URL, 'cont', 'obj', f,
+                                         connection_pool=self.pool)
+        self.assertEqual(b'data', f.getvalue())
+        self.assertEqual(2, connect.call_count)
+        stale.close.assert_called_once_with()
@@ -0,0 +1,40 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from tempest import exceptions
+from tempest.stress import green
+from tempest.tests import base
+
+
+class TestGreenBackend(base.TestCase):
+
+    def test_split(self):
+        self.assertEqual([[0, 2, 4], [1, 3]], green.split([0, 1, 2, 3, 4], 2))
+        self.assertEqual([[0], [1]], green.split([0, 1], 8))
+        self.assertEqual([[0, 1]], green.split([0, 1], 0))
+
+    @mock.patch('tempest.stress.green.eventlet', None)
+    def test_check_available_without_eventlet(self):
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          green.check_available)
+
+    @mock.patch('tempest.clients.Manager')
+    def test_clone_manager_shares_auth(self, manager_mock):
+        manager = mock.Mock()
+        clone = green.clone_manager(manager)
+        manager_mock.assert_called_once_with(
+            credentials=manager.credentials, service=manager.service)
+        self.assertIs(manager.auth_provider, clone.auth_provider)
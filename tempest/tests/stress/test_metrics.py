@@ -0,0 +1,105 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from six import moves
+
+from tempest.stress import driver
+from tempest.stress import metrics
+from tempest.tests import base
+
+
+class TestHistogram(base.TestCase):
+
+    def test_percentiles(self):
+        histogram = metrics.Histogram()
+        for i in moves.xrange(1, 101):
+            histogram.record(i / 1000.0)
+        summary = histogram.summary()
+        self.assertEqual(100, summary['count'])
+        self.assertAlmostEqual(0.05, summary['p50'], delta=0.001)
+        self.assertAlmostEqual(0.095, summary['p95'], delta=0.001)
+        self.assertAlmostEqual(0.099, summary['p99'], delta=0.001)
+        self.assertAlmostEqual(0.1, summary['max'])
+        self.assertAlmostEqual(0.0505, summary['mean'])
+
+    def test_bounded_relative_error(self):
+        histogram = metrics.Histogram()
+        histogram.record(123.456789)
+        self.assertAlmostEqual(123.456789, histogram.percentile(100),
+                               delta=123.456789 / 100)
+
+    def test_merge(self):
+        first = metrics.Histogram()
+        second = metrics.Histogram()
+        first.record(0.001)
+        second.record(0.002)
+        second.record(0.003)
+        first.merge(metrics.Histogram.from_dict(second.to_dict()))
+        self.assertEqual(3, first.count)
+        self.assertAlmostEqual(0.003, first.summary()['max'])
+
+
+class TestRecorder(base.TestCase):
+
+    def test_flush_sends_and_resets(self):
+        queue = moves.queue.Queue()
+        recorder = metrics.Recorder('action', queue)
+        recorder.record_run(0.5)
+        recorder.record_run(1.5, failed=True)
+        recorder.record_api_call('compute GET', 0.1)
+        recorder.flush()
+        snapshot = queue.get_nowait()
+        self.assertEqual('action', snapshot['action'])
+        self.assertEqual(2, snapshot['runs'])
+        self.assertEqual(1, snapshot['fails'])
+        self.assertIn('compute GET', snapshot['api_calls'])
+        self.assertEqual(0, recorder.runs)
+        recorder.flush()
+        self.assertTrue(queue.empty())
+
+    def test_periodic_flush(self):
+        queue = moves.queue.Queue()
+        recorder = metrics.Recorder('action', queue, flush_interval=0)
+        recorder.record_run(0.5)
+        self.assertEqual(1, queue.get_nowait()['runs'])
+
+
+class TestAggregator(base.TestCase):
+
+    def test_summary(self):
+        queue = moves.queue.Queue()
+        for run_time in (1, 2):
+            recorder = metrics.Recorder('action', queue)
+            recorder.record_run(run_time)
+            recorder.record_api_call('compute GET', 0.1)
+            recorder.flush()
+        aggregator = metrics.Aggregator(queue)
+        aggregator.drain()
+        aggregator.stop()
+        summary = aggregator.summary()['action']
+        self.assertEqual(2, summary['runs'])
+        self.assertEqual(2, summary['run_time']['count'])
+        self.assertEqual(2, summary['api_calls']['compute GET']['count'])
+        self.assertTrue(summary['throughput'] > 0)
+
+
+class TestSharedStatistic(base.TestCase):
+
+    def test_counters(self):
+        statistic = driver.SharedStatistic()
+        self.assertEqual(0, statistic['runs'])
+        statistic['runs'] += 1
+        statistic['fails'] = 3
+        self.assertEqual(1, statistic['runs'])
+        self.assertEqual(3, statistic['fails'])
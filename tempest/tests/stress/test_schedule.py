@@ -0,0 +1,78 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+
+from six import moves
+
+from tempest import exceptions
+from tempest.stress import schedule
+from tempest.tests import base
+
+
+class TestRateProfiles(base.TestCase):
+
+    def test_constant(self):
+        rate = schedule.get_profile({'type': 'constant', 'ops': 4})
+        self.assertEqual(4, rate(0))
+        self.assertEqual(4, rate(1000))
+
+    def test_ramp(self):
+        rate = schedule.get_profile({'type': 'ramp', 'start': 1, 'end': 11,
+                                     'duration': 10})
+        self.assertEqual(1, rate(0))
+        self.assertEqual(6, rate(5))
+        self.assertEqual(11, rate(10))
+        self.assertEqual(11, rate(100))
+
+    def test_step(self):
+        rate = schedule.get_profile({'type': 'step',
+                                     'steps': [[10, 5], [0, 1]]})
+        self.assertEqual(1, rate(0))
+        self.assertEqual(1, rate(9.9))
+        self.assertEqual(5, rate(10))
+
+    def test_invalid_profiles(self):
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          schedule.get_profile, {'type': 'sine'})
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          schedule.get_profile, {'type': 'ramp', 'start': 1})
+
+    def test_intended_times(self):
+        times = schedule.intended_times(schedule.constant_profile(4))
+        self.assertEqual([0, 0.25, 0.5, 0.75],
+                         list(itertools.islice(times, 4)))
+
+    def test_intended_times_skip_idle_periods(self):
+        rate = schedule.step_profile([[0, 0], [2, 2]])
+        times = schedule.intended_times(rate)
+        self.assertEqual([2, 2.5], list(itertools.islice(times, 2)))
+
+
+class TestRateScheduler(base.TestCase):
+
+    def test_schedule(self):
+        queue = moves.queue.Queue()
+        scheduler = schedule.RateScheduler({'ops': 1000}, queue)
+        scheduler.start()
+        first = queue.get(timeout=5)
+        second = queue.get(timeout=5)
+        scheduler.stop(consumers=2)
+        self.assertAlmostEqual(0.001, second - first, places=5)
+        self.assertEqual(scheduler.start_time, first)
+        tickets = []
+        while not queue.empty():
+            tickets.append(queue.get_nowait())
+        self.assertEqual([None, None], tickets[-2:])
+        self.assertEqual(scheduler.scheduled, len(tickets))
@@ -13,6 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
+import mock
+from six import moves
+
+from tempest.stress import metrics
 import tempest.stress.stressaction as stressaction
 import tempest.test
 
@@ -61,3 +67,33 @@ class TestStressAction(tempest.test.BaseTestCase):
         stressAction.execute(stats)
         self.assertEqual(stats['runs'], 1)
         self.assertEqual(stats['fails'], 1)
+
+    @mock.patch('tempest.stress.metrics.instrument_rest_client')
+    def testStressTestRunWithMetrics(self, instrument_mock):
+        stressAction = FakeStressActionFailing(manager=None, max_runs=2)
+        stats = self._bulid_stats_dict()
+        queue = moves.queue.Queue()
+        stressAction.execute(stats, queue)
+        snapshot = queue.get_nowait()
+        self.assertEqual('FakeStressActionFailing', snapshot['action'])
+        self.assertEqual(2, snapshot['runs'])
+        self.assertEqual(2, snapshot['fails'])
+        instrument_mock.assert_called_once_with()
+
+    @mock.patch('tempest.stress.metrics.instrument_rest_client')
+    def testStressTestRunWithSchedule(self, instrument_mock):
+        stressAction = FakeStressAction(manager=None)
+        stats = self._bulid_stats_dict()
+        queue = moves.queue.Queue()
+        schedule_queue = moves.queue.Queue()
+        now = time.time()
+        schedule_queue.put(now - 1)
+        schedule_queue.put(now)
+        schedule_queue.put(None)
+        stressAction.execute(stats, queue, schedule_queue)
+        self.assertEqual(stats['runs'], 2)
+        snapshot = queue.get_nowait()
+        self.assertEqual(2, snapshot['runs'])
+        lag = metrics.Histogram.from_dict(snapshot['schedule_lag'])
+        self.assertEqual(2, lag.count)
+        self.assertTrue(lag.summary()['max'] >= 1)
@@ -0,0 +1,118 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from oslo_config import cfg
+
+from tempest import clients
+from tempest.common import connection_pool
+from tempest import config
+from tempest import manager
+from tempest.services.compute.json import servers_client
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class TestLazyClient(base.TestCase):
+
+    class FakeManager(object):
+        builds = 0
+
+        @manager.lazy_client
+        def fake_client(self):
+            self.builds += 1
+            return object()
+
+        @manager.lazy_client
+        def unavailable_client(self):
+            raise AttributeError('unavailable_client')
+
+    def test_client_is_built_once(self):
+        mgr = self.FakeManager()
+        client = mgr.fake_client
+        self.assertIs(client, mgr.fake_client)
+        self.assertEqual(1, mgr.builds)
+
+    def test_client_is_cached_per_manager(self):
+        mgr1 = self.FakeManager()
+        mgr2 = self.FakeManager()
+        self.assertIsNot(mgr1.fake_client, mgr2.fake_client)
+
+    def test_client_can_be_overridden(self):
+        mgr = self.FakeManager()
+        mgr.fake_client = 'fake'
+        self.assertEqual('fake', mgr.fake_client)
+        self.assertEqual(0, mgr.builds)
+
+    def test_unavailable_client(self):
+        self.assertFalse(hasattr(self.FakeManager(), 'unavailable_client'))
+
+
+class TestManager(base.TestCase):
+
+    def setUp(self):
+        super(TestManager, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.patch('tempest.manager.get_auth_provider')
+        self.credentials = mock.Mock()
+
+    def test_no_client_built_at_init(self):
+        mgr = clients.Manager(credentials=self.credentials)
+        self.assertEqual([], mgr.client_attr_names)
+
+    def test_client_built_on_access(self):
+        mgr = clients.Manager(credentials=self.credentials)
+        self.assertIsInstance(mgr.servers_client,
+                              servers_client.ServersClient)
+        self.assertEqual(['servers_client'], mgr.client_attr_names)
+
+    def test_unavailable_service_client(self):
+        cfg.CONF.set_default('ceilometer', False, group='service_available')
+        mgr = clients.Manager(credentials=self.credentials)
+        self.assertFalse(hasattr(mgr, 'telemetry_client'))
+
+    def test_no_connection_pool_by_default(self):
+        mgr = clients.Manager(credentials=self.credentials)
+        self.assertIsNone(mgr.connection_pool)
+        self.assertNotIsInstance(mgr.servers_client.http_obj,
+                                 connection_pool.PooledHttp)
+
+    def test_manager_connection_pool(self):
+        cfg.CONF.set_default('http_connection_pool', 'manager',
+                             group='identity')
+        mgr = clients.Manager(credentials=self.credentials)
+        for client in (mgr.servers_client, mgr.flavors_client):
+            self.assertIs(mgr.connection_pool, client.connection_pool)
+            self.assertIs(mgr.connection_pool, client.http_obj.pool)
+        other = clients.Manager(credentials=self.credentials)
+        self.assertIsNot(mgr.connection_pool, other.connection_pool)
+
+    def test_close_manager_connection_pool(self):
+        cfg.CONF.set_default('http_connection_pool', 'manager',
+                             group='identity')
+        mgr = clients.Manager(credentials=self.credentials)
+        conn = mock.Mock()
+        mgr.connection_pool.release('http:fake.com', conn)
+        mgr.close()
+        conn.close.assert_called_once_with()
+
+    def test_process_connection_pool(self):
+        self.patch('tempest.common.connection_pool._shared_pool', new=None)
+        cfg.CONF.set_default('http_connection_pool', 'process',
+                             group='identity')
+        mgr = clients.Manager(credentials=self.credentials)
+        other = clients.Manager(credentials=self.credentials)
+        self.assertIsNotNone(mgr.connection_pool)
+        self.assertIs(mgr.connection_pool, other.connection_pool)
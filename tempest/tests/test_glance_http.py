@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mmap
 import socket
 
 import mock
@@ -22,6 +23,7 @@ import six
 from six.moves import http_client as httplib
 from tempest_lib import exceptions as lib_exc
 
+from tempest.common import connection_pool
 from tempest.common import glance_http
 from tempest import exceptions
 from tempest.tests import base
@@ -56,6 +58,16 @@ class TestGlanceHTTPClient(base.TestCase):
                         'getresponse', return_value=resp))
         return resp
 
+    def _set_send_fixture(self):
+        # NOTE: chunks may be views of a reused buffer, copy them when sent
+        sent = []
+        self.useFixture(mockpatch.PatchObject(httplib.HTTPConnection,
+                        'endheaders'))
+        self.useFixture(mockpatch.PatchObject(
+            httplib.HTTPConnection, 'send',
+            side_effect=lambda data: sent.append(bytes(data))))
+        return sent
+
     def test_json_request_without_content_type_header_in_response(self):
         self._set_response_fixture({}, 200, 'fake_response_body')
         self.assertRaises(lib_exc.InvalidContentType,
@@ -127,18 +139,46 @@ class TestGlanceHTTPClient(base.TestCase):
     def test_raw_request_chunked(self):
         self.useFixture(mockpatch.PatchObject(glance_http,
                                               'CHUNKSIZE', 1))
-        self.useFixture(mockpatch.PatchObject(httplib.HTTPConnection,
-                        'endheaders'))
-        self.useFixture(mockpatch.PatchObject(httplib.HTTPConnection,
-                        'send'))
+        sent = self._set_send_fixture()
 
         self._set_response_fixture({}, 200, 'fake_response_body')
-        req_body = six.StringIO('fake_request_body')
+        req_body = six.BytesIO(b'fake_request_body')
         resp, body = self.client.raw_request('PUT', '/images', body=req_body)
         self.assertEqual(200, resp.status)
         self.assertEqual('fake_response_body', body.read())
-        call_count = httplib.HTTPConnection.send.call_count
-        self.assertEqual(call_count - 1, req_body.tell())
+        expected = b''.join(b'1\r\n' + req_body.getvalue()[i:i + 1] + b'\r\n'
+                            for i in range(len(req_body.getvalue())))
+        self.assertEqual(expected + b'0\r\n\r\n', b''.join(sent))
+
+    def test_raw_request_chunked_mmap(self):
+        sent = self._set_send_fixture()
+        self._set_response_fixture({}, 200, 'fake_response_body')
+        self.client.chunk_size = 4
+        data = mmap.mmap(-1, 6)
+        data.write(b'abcdef')
+        data.seek(0)
+        self.client.raw_request('PUT', '/images', body=data)
+        self.assertEqual(b'4\r\nabcd\r\n2\r\nef\r\n0\r\n\r\n',
+                         b''.join(sent))
+
+    def test_pooled_connection_closed_retried(self):
+        self._set_response_fixture({}, 200, 'fake_response_body')
+        pool = connection_pool.ConnectionPool()
+        stale = mock.Mock()
+        stale.request.side_effect = httplib.BadStatusLine('')
+        pool.release(self.client.connection_key, stale)
+        self.client.connection_pool = pool
+        resp, body = self.client.raw_request('GET', '/images')
+        self.assertEqual(200, resp.status)
+        stale.close.assert_called_once_with()
+
+    def test_new_connection_closed_not_retried(self):
+        self.useFixture(mockpatch.PatchObject(
+            httplib.HTTPConnection, 'request',
+            side_effect=httplib.BadStatusLine('')))
+        self.client.connection_pool = connection_pool.ConnectionPool()
+        self.assertRaises(httplib.BadStatusLine, self.client.raw_request,
+                          'GET', '/images')
 
     def test_get_connection_class_for_https(self):
         conn_class = self.client.get_connection_class('https')
@@ -212,3 +252,16 @@ class TestResponseBodyIterator(base.TestCase):
         iterator = glance_http.ResponseBodyIterator(resp)
         chunks = list(iterator)
         self.assertEqual(chunks, ['X' * glance_http.CHUNKSIZE, 'X'])
+
+    def test_iter_configured_chunk_size(self):
+        resp = fake_http.fake_httplib({}, six.StringIO('X' * 5))
+        iterator = glance_http.ResponseBodyIterator(resp, chunk_size=2)
+        self.assertEqual(['XX', 'XX', 'X'], list(iterator))
+
+    def test_write_to(self):
+        data = b'X' * (glance_http.CHUNKSIZE * 2 + 1)
+        resp = fake_http.fake_httplib({}, six.BytesIO(data))
+        sink = six.BytesIO()
+        iterator = glance_http.ResponseBodyIterator(resp)
+        self.assertEqual(len(data), iterator.write_to(sink))
+        self.assertEqual(data, sink.getvalue())
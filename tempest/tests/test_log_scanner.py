@@ -0,0 +1,84 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import argparse
+import gzip
+import importlib
+import os
+import sys
+
+import fixtures
+
+from tempest.tests import base
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))), 'tools')
+
+ERROR_LINE = (b"2015-06-01 10:00:00.000 123 ERROR nova.api [req-1 - -] "
+              b"Failure\n")
+
+
+class TestLogScanner(base.TestCase):
+
+    def setUp(self):
+        super(TestLogScanner, self).setUp()
+        # The scripts of tools import their sibling modules
+        self.useFixture(fixtures.MonkeyPatch('sys.path',
+                                             [TOOLS_DIR] + sys.path))
+        self.log_scanner = importlib.import_module('log_scanner')
+        self.check_logs = importlib.import_module('check_logs')
+        self.directory = self.useFixture(fixtures.TempDir()).path
+
+    def _write_gzip(self, name, data):
+        path = os.path.join(self.directory, name)
+        with gzip.open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def _scan(self, source):
+        return self.log_scanner.scan_log(
+            self.log_scanner.LogJob('n-api', source, [], False))
+
+    def test_scan_gzip(self):
+        result = self._scan(self._write_gzip('screen-n-api.log.gz',
+                                             ERROR_LINE * 3))
+        self.assertEqual(3, result['errors'])
+        self.assertNotIn('failure', result)
+
+    def test_scan_truncated_gzip(self):
+        path = self._write_gzip('screen-n-api.log.gz', ERROR_LINE * 100)
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(data[:len(data) // 2])
+        self.assertIn('failure', self._scan(path))
+
+    def test_scan_missing_file(self):
+        result = self._scan(os.path.join(self.directory, 'missing.log'))
+        self.assertIn('failure', result)
+
+    def _check_logs(self):
+        opts = argparse.Namespace(directory=self.directory, url=None,
+                                  processes=1, json=None)
+        return self.check_logs.main(opts)
+
+    def test_check_logs_ok(self):
+        with open(os.path.join(self.directory, 'screen-n-api.log'),
+                  'wb') as f:
+            f.write(b"2015-06-01 10:00:00.000 123 INFO nova.api Started\n")
+        self.assertEqual(0, self._check_logs())
+
+    def test_check_logs_fails_on_unreadable_log(self):
+        os.mkdir(os.path.join(self.directory, 'screen-n-api.log'))
+        self.assertEqual(1, self._check_logs())
@@ -0,0 +1,103 @@
+# Copyright 2015 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from tempest import exceptions
+from tempest.scenario import manager
+from tempest.tests import base
+from tempest.tests import fake_config
+
+
+class FakeServersClient(object):
+    build_interval = 1
+    build_timeout = 10
+
+    def __init__(self, listings):
+        self.list_servers = mock.Mock(side_effect=listings)
+
+    def wait_for_server_termination(self, server_id):
+        raise AssertionError('Servers are waited for at once')
+
+
+class FakeImageClient(object):
+    build_interval = 1
+    build_timeout = 10
+    resource_type = 'image_meta'
+
+    def __init__(self, deleted):
+        self.is_resource_deleted = mock.Mock(side_effect=deleted)
+
+    def wait_for_resource_deletion(self, id):
+        raise AssertionError('Images are waited for at once')
+
+
+class FakeScenarioTest(manager.ScenarioTest):
+
+    def fake_test(self):
+        pass
+
+
+class TestWaitForCleanups(base.TestCase):
+
+    def setUp(self):
+        super(TestWaitForCleanups, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.patch('time.sleep')
+        self.test = FakeScenarioTest('fake_test')
+        self.test.cleanup_waits = []
+
+    def _add_wait(self, waiter_callable, thing_id, thing_id_param):
+        self.test.cleanup_waits.append({'waiter_callable': waiter_callable,
+                                        thing_id_param: thing_id})
+
+    def test_grouped_waits(self):
+        servers = FakeServersClient([
+            {'servers': [{'id': 'a', 'status': 'ACTIVE'},
+                         {'id': 'b', 'status': 'ACTIVE'}]},
+            {'servers': [{'id': 'b', 'status': 'ACTIVE'}]},
+            {'servers': []}])
+        images = FakeImageClient([True])
+        other_wait = mock.Mock()
+        for server_id in ('a', 'b'):
+            self._add_wait(servers.wait_for_server_termination, server_id,
+                           'server_id')
+        self._add_wait(images.wait_for_resource_deletion, 'i', 'id')
+        self._add_wait(other_wait, 'x', 'thing_id')
+
+        self.test._wait_for_cleanups()
+
+        self.assertEqual(3, servers.list_servers.call_count)
+        servers.list_servers.assert_called_with(detail=True)
+        images.is_resource_deleted.assert_called_once_with('i')
+        other_wait.assert_called_once_with(thing_id='x')
+
+    def test_failures_reported_together(self):
+        servers = FakeServersClient([
+            {'servers': [{'id': 'a', 'status': 'ERROR'}]}])
+        other_wait = mock.Mock(side_effect=exceptions.TimeoutException)
+        self._add_wait(servers.wait_for_server_termination, 'a',
+                       'server_id')
+        self._add_wait(other_wait, 'x', 'thing_id')
+
+        exc = self.assertRaises(exceptions.TearDownException,
+                                self.test._wait_for_cleanups)
+        self.assertIn('2 cleanUp operation failed', str(exc))
+        self.assertIn('Server a failed to build', str(exc))
+
+    def test_single_failure_raised(self):
+        other_wait = mock.Mock(side_effect=exceptions.TimeoutException)
+        self._add_wait(other_wait, 'x', 'thing_id')
+        self.assertRaises(exceptions.TimeoutException,
+                          self.test._wait_for_cleanups)
@@ -12,6 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+import time
+
 import mock
 from oslo_config import cfg
 from oslotest import mockpatch
@@ -42,6 +45,8 @@ class TestTenantIsolation(base.TestCase):
         cfg.CONF.set_default('operator_role', 'FakeRole',
                              group='object-storage')
         self._mock_list_ec2_credentials('fake_user_id', 'fake_tenant_id')
+        self.patch('tempest.common.isolated_creds._cidr_allocators',
+                   new={})
 
     def test_tempest_client(self):
         iso_creds = isolated_creds.IsolatedCreds(name='test class')
@@ -123,6 +128,10 @@ class TestTenantIsolation(base.TestCase):
         return net_fix
 
     def _mock_subnet_create(self, iso_creds, id, name):
+        self.useFixture(mockpatch.PatchObject(
+            iso_creds.network_admin_client,
+            'list_subnets',
+            return_value={'subnets': []}))
         subnet_fix = self.useFixture(mockpatch.PatchObject(
             iso_creds.network_admin_client,
             'create_subnet',
@@ -562,3 +571,112 @@ class TestTenantIsolation(base.TestCase):
         self._mock_tenant_create('1234', 'fake_prim_tenant')
         self.assertRaises(exceptions.InvalidConfiguration,
                           iso_creds.get_primary_creds)
+
+
+class TestCidrAllocator(base.TestCase):
+
+    def setUp(self):
+        super(TestCidrAllocator, self).setUp()
+        self.client = mock.Mock()
+        self.client.list_subnets.return_value = {
+            'subnets': [{'cidr': '10.100.0.16/28'},
+                        {'cidr': '10.100.0.64/26'},
+                        {'cidr': '172.16.0.0/24'}]}
+        self.allocator = isolated_creds.CidrAllocator('10.100.0.0/24', 28)
+
+    def test_skip_existing_subnets(self):
+        cidrs = [str(self.allocator.allocate(self.client)) for i in range(3)]
+        self.assertEqual(['10.100.0.0/28', '10.100.0.32/28',
+                          '10.100.0.48/28'], cidrs)
+        self.client.list_subnets.assert_called_once_with(ip_version=4)
+
+    def test_reuse_released_subnet(self):
+        first = self.allocator.allocate(self.client)
+        self.allocator.allocate(self.client)
+        self.allocator.release(first)
+        self.assertEqual(first, self.allocator.allocate(self.client))
+
+    def test_mark_existing(self):
+        first = self.allocator.allocate(self.client)
+        self.allocator.mark_existing(first)
+        self.allocator.release(first)
+        self.assertNotEqual(first, self.allocator.allocate(self.client))
+
+    def test_exhausted(self):
+        allocator = isolated_creds.CidrAllocator('10.100.0.0/27', 28)
+        allocator.allocate(self.client)
+        self.assertRaises(Exception, allocator.allocate, self.client)
+        # Existing subnets are listed again before giving up
+        self.assertEqual(2, self.client.list_subnets.call_count)
+
+
+class TestCredentialsPool(base.TestCase):
+
+    def setUp(self):
+        super(TestCredentialsPool, self).setUp()
+        self.iso_creds = mock.Mock()
+        self.iso_creds.provision.side_effect = (
+            lambda credential_type: mock.Mock())
+        self.patch('tempest.common.isolated_creds.IsolatedCreds',
+                   return_value=self.iso_creds)
+        self.pool = isolated_creds.CredentialsPool(2)
+        self.addCleanup(self.pool.shutdown)
+
+    def _wait_for(self, condition):
+        for i in range(100):
+            if condition():
+                return
+            time.sleep(0.01)
+        self.fail('Condition not met')
+
+    def test_fill_and_get(self):
+        self.assertIsNone(self.pool.get())
+        self._wait_for(lambda: len(self.pool._ready) == 2)
+        self.assertIsNotNone(self.pool.get())
+        self._wait_for(lambda: self.iso_creds.provision.call_count == 3)
+
+    def test_release_deletes_in_background(self):
+        self.pool.get()
+        self._wait_for(lambda: len(self.pool._ready) == 2)
+        credentials = self.pool.get()
+        self.pool.release(credentials)
+        self._wait_for(
+            lambda: self.iso_creds.clear_isolated_creds.call_count == 1)
+
+    def test_shutdown_deletes_ready_credentials(self):
+        self.pool.get()
+        self._wait_for(lambda: len(self.pool._ready) == 2)
+        self.pool.shutdown()
+        self.assertEqual(2, len(self.iso_creds.isolated_creds))
+        self.iso_creds.clear_isolated_creds.assert_called_once_with()
+
+    def test_shutdown_deletes_credentials_being_provisioned(self):
+        provisioning = threading.Event()
+
+        def provision(credential_type):
+            provisioning.set()
+            # Blocks until the pool is shut down
+            self._wait_for(lambda: self.pool._stopped)
+            return mock.Mock()
+        self.iso_creds.provision.side_effect = provision
+        self.pool.get()
+        self.assertTrue(provisioning.wait(5))
+        self.pool.shutdown()
+        self.assertEqual(1, len(self.iso_creds.isolated_creds))
+        self.iso_creds.clear_isolated_creds.assert_called_once_with()
+
+    def test_release_after_shutdown(self):
+        self.pool.get()
+        self._wait_for(lambda: len(self.pool._ready) == 2)
+        credentials = self.pool.get()
+        self.pool.shutdown()
+        self.iso_creds.clear_isolated_creds.reset_mock()
+        self.pool.release(credentials)
+        self.assertEqual({'0': credentials}, self.iso_creds.isolated_creds)
+        self.iso_creds.clear_isolated_creds.assert_called_once_with()
+
+    def test_creation_failure(self):
+        self.iso_creds.provision.side_effect = Exception
+        self.pool.get()
+        self._wait_for(lambda: self.pool._failed)
+        self.assertIsNone(self.pool.get())
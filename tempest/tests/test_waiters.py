@@ -15,6 +15,7 @@
 import time
 
 import mock
+from tempest_lib import exceptions as lib_exc
 
 from tempest.common import waiters
 from tempest import exceptions
@@ -47,3 +48,132 @@ class TestImageWaiters(base.TestCase):
         self.assertRaises(exceptions.AddImageException,
                           waiters.wait_for_image_status,
                           self.client, 'fake_image_id', 'active')
+
+
+class TestResourceWaiter(base.TestCase):
+    def setUp(self):
+        super(TestResourceWaiter, self).setUp()
+        self.sleep = self.patch('time.sleep')
+
+    def _waiter(self, fetch, **kwargs):
+        return waiters.ResourceWaiter(
+            fetch, lambda r: r is not None and r['status'] == 'ACTIVE',
+            interval=1, timeout=10, **kwargs)
+
+    def test_wait_resolves_all_resources_with_one_fetch_per_tick(self):
+        states = iter([
+            {'a': {'status': 'BUILD'}, 'b': {'status': 'BUILD'}},
+            {'a': {'status': 'ACTIVE'}, 'b': {'status': 'BUILD'}},
+            {'b': {'status': 'ACTIVE'}},
+        ])
+        fetch = mock.Mock(side_effect=lambda ids: next(states))
+        waiter = self._waiter(fetch)
+        waiter.add('a', 'b')
+        result = waiter.wait()
+        self.assertEqual(3, fetch.call_count)
+        fetch.assert_called_with(['b'])
+        self.assertEqual({'a': {'status': 'ACTIVE'},
+                          'b': {'status': 'ACTIVE'}}, result)
+
+    def test_wait_backs_off_while_nothing_changes(self):
+        states = iter([{'a': {'status': 'BUILD'}}] * 4 +
+                      [{'a': {'status': 'ACTIVE'}}])
+        waiter = self._waiter(lambda ids: next(states), backoff=2,
+                              max_interval=5)
+        waiter.add('a')
+        waiter.wait()
+        self.assertEqual([mock.call(1), mock.call(2), mock.call(4),
+                          mock.call(5)], self.sleep.call_args_list)
+
+    def test_wait_missing_resource(self):
+        waiter = self._waiter(lambda ids: {})
+        waiter.add('a')
+        self.assertRaises(lib_exc.NotFound, waiter.wait)
+
+    def test_wait_error_check(self):
+        def check_error(resource_id, resource):
+            if resource['status'] == 'ERROR':
+                raise exceptions.BuildErrorException(server_id=resource_id)
+
+        waiter = self._waiter(lambda ids: {'a': {'status': 'ERROR'}},
+                              check_error=check_error)
+        waiter.add('a')
+        self.assertRaises(exceptions.BuildErrorException, waiter.wait)
+
+    def test_wait_deletion(self):
+        client = mock.Mock()
+        client.is_resource_deleted.side_effect = [False, True, True]
+        waiter = waiters.ResourceWaiter(waiters.deletion_fetcher(client),
+                                        lambda r: r is None, interval=1,
+                                        timeout=10)
+        waiter.add('a', 'b')
+        self.assertEqual({'a': None, 'b': None}, waiter.wait())
+        self.assertEqual(3, client.is_resource_deleted.call_count)
+
+    def test_wait_timeout(self):
+        waiter = waiters.ResourceWaiter(
+            lambda ids: {'a': {'status': 'BUILD'}},
+            lambda r: r['status'] == 'ACTIVE', interval=1, timeout=0)
+        waiter.add('a')
+        self.assertRaises(exceptions.TimeoutException, waiter.wait)
+
+
+class TestBatchWaiters(base.TestCase):
+    def setUp(self):
+        super(TestBatchWaiters, self).setUp()
+        self.patch('time.sleep')
+        self.client = mock.MagicMock()
+        self.client.build_timeout = 10
+        self.client.build_interval = 1
+
+    def test_wait_for_servers_status(self):
+        self.client.list_servers.side_effect = [
+            {'servers': [{'id': 'a', 'status': 'BUILD'},
+                         {'id': 'b', 'status': 'ACTIVE'}]},
+            {'servers': [{'id': 'a', 'status': 'ACTIVE'},
+                         {'id': 'b', 'status': 'ACTIVE'}]},
+        ]
+        waiters.wait_for_servers_status(self.client, ['a', 'b'], 'ACTIVE',
+                                        ready_wait=False)
+        self.assertEqual(2, self.client.list_servers.call_count)
+        self.client.list_servers.assert_called_with(detail=True)
+        self.assertFalse(self.client.show_server.called)
+
+    def test_wait_for_servers_status_error(self):
+        self.client.list_servers.return_value = {
+            'servers': [{'id': 'a', 'status': 'ERROR'}]}
+        self.assertRaises(exceptions.BuildErrorException,
+                          waiters.wait_for_servers_status,
+                          self.client, ['a'], 'ACTIVE')
+
+    def test_wait_for_servers_termination(self):
+        self.client.list_servers.side_effect = [
+            {'servers': [{'id': 'a', 'status': 'DELETED'},
+                         {'id': 'b', 'status': 'ACTIVE'}]},
+            {'servers': []},
+        ]
+        waiters.wait_for_servers_termination(self.client, ['a', 'b'])
+        self.assertEqual(2, self.client.list_servers.call_count)
+        self.assertFalse(self.client.show_server.called)
+
+    def test_wait_for_servers_termination_error(self):
+        self.client.list_servers.return_value = {
+            'servers': [{'id': 'a', 'status': 'ERROR'}]}
+        self.assertRaises(exceptions.BuildErrorException,
+                          waiters.wait_for_servers_termination,
+                          self.client, ['a'])
+
+    def test_wait_for_volumes_status(self):
+        self.client.list_volumes.side_effect = [
+            [{'id': 'a', 'status': 'creating'}],
+            [{'id': 'a', 'status': 'available'}],
+        ]
+        waiters.wait_for_volumes_status(self.client, ['a'], 'available')
+        self.assertEqual(2, self.client.list_volumes.call_count)
+
+    def test_wait_for_volumes_status_error(self):
+        self.client.list_volumes.return_value = [
+            {'id': 'a', 'status': 'error'}]
+        self.assertRaises(exceptions.VolumeBuildErrorException,
+                          waiters.wait_for_volumes_status,
+                          self.client, ['a'], 'available')
@@ -16,20 +16,20 @@
 #    under the License.
 
 import argparse
-import gzip
+import json
 import os
 import re
-import StringIO
 import sys
-import urllib2
 
+from six.moves.urllib import request as urllib_request
 import yaml
 
+import log_scanner  # noqa
+
 
 # DEVSTACK_GATE_GRENADE is either unset if grenade is not running
 # or a string describing what type of grenade run to perform.
 is_grenade = os.environ.get('DEVSTACK_GATE_GRENADE') is not None
-dump_all_errors = True
 
 # As logs are made clean, remove from this set
 allowed_dirty = set([
@@ -58,46 +58,18 @@ allowed_dirty = set([
     's-proxy'])
 
 
-def process_files(file_specs, url_specs, whitelists):
-    regexp = re.compile(r"^.* (ERROR|CRITICAL|TRACE) .*\[.*\-.*\]")
-    logs_with_errors = []
-    for (name, filename) in file_specs:
-        whitelist = whitelists.get(name, [])
-        with open(filename) as content:
-            if scan_content(name, content, regexp, whitelist):
-                logs_with_errors.append(name)
-    for (name, url) in url_specs:
-        whitelist = whitelists.get(name, [])
-        req = urllib2.Request(url)
-        req.add_header('Accept-Encoding', 'gzip')
-        page = urllib2.urlopen(req)
-        buf = StringIO.StringIO(page.read())
-        f = gzip.GzipFile(fileobj=buf)
-        if scan_content(name, f.read().splitlines(), regexp, whitelist):
-            logs_with_errors.append(name)
-    return logs_with_errors
-
-
-def scan_content(name, content, regexp, whitelist):
-    had_errors = False
-    for line in content:
-        if not line.startswith("Stderr:") and regexp.match(line):
-            whitelisted = False
-            for w in whitelist:
-                pat = ".*%s.*%s.*" % (w['module'].replace('.', '\\.'),
-                                      w['message'])
-                if re.match(pat, line):
-                    whitelisted = True
-                    break
-            if not whitelisted or dump_all_errors:
-                if not whitelisted:
-                    had_errors = True
-    return had_errors
+def process_files(file_specs, url_specs, whitelists, processes=None):
+    jobs = [log_scanner.LogJob(name, source, whitelists.get(name, []), False)
+            for (name, source) in file_specs + url_specs]
+    results = log_scanner.scan_logs(jobs, processes)
+    logs_with_errors = [result['name'] for result in results
+                        if result.get('errors')]
+    return logs_with_errors, results
 
 
 def collect_url_logs(url):
-    page = urllib2.urlopen(url)
-    content = page.read()
+    page = urllib_request.urlopen(url)
+    content = page.read().decode('utf-8')
     logs = re.findall('(screen-[\w-]+\.txt\.gz)</a>', content)
     return logs
 
@@ -138,15 +110,26 @@ def main(opts):
     with open(WHITELIST_FILE) as stream:
         loaded = yaml.safe_load(stream)
         if loaded:
-            for (name, l) in loaded.iteritems():
+            for (name, l) in loaded.items():
                 for w in l:
                     assert 'module' in w, 'no module in %s' % name
                     assert 'message' in w, 'no message in %s' % name
             whitelists = loaded
-    logs_with_errors = process_files(files_to_process, urls_to_process,
-                                     whitelists)
+    logs_with_errors, results = process_files(files_to_process,
+                                              urls_to_process, whitelists,
+                                              opts.processes)
+    if opts.json:
+        with open(opts.json, 'w') as stream:
+            json.dump(log_scanner.report(results), stream, indent=2,
+                      sort_keys=True)
 
     failed = False
+    for result in results:
+        if 'failure' in result:
+            print("Failed to scan %s: %s" % (result['source'],
+                                             result['failure']))
+            failed = True
+
     if logs_with_errors:
         log_files = set(logs_with_errors)
         for log in log_files:
@@ -188,6 +171,12 @@ parser.add_argument('-d', '--directory',
                     help="Directory containing log files")
 parser.add_argument('-u', '--url',
                     help="url containing logs from an OpenStack gate job")
+parser.add_argument('-p', '--processes', type=int,
+                    help="Number of log files scanned in parallel, the "
+                         "number of CPUs by default")
+parser.add_argument('--json',
+                    help="File to write the JSON report of the errors "
+                         "to, with their counts per service and module")
 
 if __name__ == "__main__":
     try:
@@ -15,20 +15,21 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import gzip
+import json
 import pprint
 import re
-import StringIO
 import sys
-import urllib2
+
+from six.moves.urllib import request as urllib_request
+
+import log_scanner  # noqa
 
 
 pp = pprint.PrettyPrinter()
 
-NOVA_TIMESTAMP = r"\d\d\d\d-\d\d-\d\d \d\d:\d\d:\d\d\.\d\d\d"
+NOVA_TIMESTAMP = log_scanner.NOVA_TIMESTAMP
 
-NOVA_REGEX = r"(?P<timestamp>%s) (?P<pid>\d+ )?(?P<level>(ERROR|TRACE)) " \
-    "(?P<module>[\w\.]+) (?P<msg>.*)" % (NOVA_TIMESTAMP)
+NOVA_REGEX = log_scanner.NOVA_REGEX
 
 
 class StackTrace(object):
@@ -39,12 +40,13 @@ class StackTrace(object):
     msg = ""
 
     def __init__(self, timestamp=None, pid=None, level="", module="",
-                 msg=""):
+                 msg="", count=1):
         self.timestamp = timestamp
         self.pid = pid
         self.level = level
         self.module = module
         self.msg = msg
+        self.count = count
 
     def append(self, msg):
         self.msg = self.msg + msg
@@ -58,6 +60,8 @@ class StackTrace(object):
 
     def __str__(self):
         buff = "<%s %s %s>\n" % (self.timestamp, self.level, self.module)
+        if self.count > 1:
+            buff = buff + "(seen %d times)\n" % self.count
         for line in self.msg.splitlines():
             buff = buff + line + "\n"
         return buff
@@ -65,39 +69,11 @@ class StackTrace(object):
 
 def hunt_for_stacktrace(url):
     """Return TRACE or ERROR lines out of logs."""
-    req = urllib2.Request(url)
-    req.add_header('Accept-Encoding', 'gzip')
-    page = urllib2.urlopen(req)
-    buf = StringIO.StringIO(page.read())
-    f = gzip.GzipFile(fileobj=buf)
-    content = f.read()
-
-    traces = []
-    trace = StackTrace()
-    for line in content.splitlines():
-        m = re.match(NOVA_REGEX, line)
-        if m:
-            data = m.groupdict()
-            if trace.not_none() and trace.is_same(data):
-                trace.append(data['msg'] + "\n")
-            else:
-                trace = StackTrace(
-                    timestamp=data.get('timestamp'),
-                    pid=data.get('pid'),
-                    level=data.get('level'),
-                    module=data.get('module'),
-                    msg=data.get('msg'))
-
-        else:
-            if trace.not_none():
-                traces.append(trace)
-                trace = StackTrace()
-
-    # once more at the end to pick up any stragglers
-    if trace.not_none():
-        traces.append(trace)
-
-    return traces
+    return [StackTrace(timestamp=trace['timestamp'], pid=trace['pid'],
+                       level=trace['level'], module=trace['module'],
+                       msg=trace['msg'])
+            for trace in log_scanner.iter_traces(
+                log_scanner.read_lines(url))]
 
 
 def log_url(url, log):
@@ -105,28 +81,30 @@ def log_url(url, log):
 
 
 def collect_logs(url):
-    page = urllib2.urlopen(url)
-    content = page.read()
+    page = urllib_request.urlopen(url)
+    content = page.read().decode('utf-8')
     logs = re.findall('(screen-[\w-]+\.txt\.gz)</a>', content)
     return logs
 
 
 def usage():
     print("""
-Usage: find_stack_traces.py <logurl>
+Usage: find_stack_traces.py [--json] <logurl>
 
 Hunts for stack traces in a devstack run. Must provide it a base log url
 from a tempest devstack run. Should start with http and end with /logs/.
 
 Returns a report listing stack traces out of the various files where
-they are found.
+they are found, the same stack traces being listed once with their count.
+With --json, the report is a JSON document of the stack traces, each found
+in one or more of the files.
 """)
     sys.exit(0)
 
 
 def print_stats(items, fname, verbose=False):
-    errors = len(filter(lambda x: x.level == "ERROR", items))
-    traces = len(filter(lambda x: x.level == "TRACE", items))
+    errors = sum(x.count for x in items if x.level == "ERROR")
+    traces = sum(x.count for x in items if x.level == "TRACE")
     print("%d ERRORS found in %s" % (errors, fname))
     print("%d TRACES found in %s" % (traces, fname))
 
@@ -137,20 +115,38 @@ def print_stats(items, fname, verbose=False):
 
 
 def main():
-    if len(sys.argv) == 2:
-        url = sys.argv[1]
+    args = sys.argv[1:]
+    as_json = '--json' in args
+    if as_json:
+        args.remove('--json')
+    if len(args) == 1:
+        url = args[0]
         loglist = collect_logs(url)
 
         # probably wrong base url
         if not loglist:
             usage()
 
-        for log in loglist:
-            logurl = log_url(url, log)
-            traces = hunt_for_stacktrace(logurl)
+        jobs = [log_scanner.LogJob(log, log_url(url, log), [], True)
+                for log in loglist]
+        results = log_scanner.scan_logs(jobs)
+        if as_json:
+            print(json.dumps(log_scanner.report(results), indent=2))
+            return
+
+        for result in results:
+            if 'failure' in result:
+                print("Failed to read %s: %s" % (result['name'],
+                                                 result['failure']))
+                continue
+            traces = [StackTrace(timestamp=trace['timestamp'],
+                                 pid=trace['pid'], level=trace['level'],
+                                 module=trace['module'], msg=trace['msg'],
+                                 count=trace['count'])
+                      for trace in result['traces']]
 
             if traces:
-                print_stats(traces, log, verbose=True)
+                print_stats(traces, result['name'], verbose=True)
 
     else:
         usage()
@@ -0,0 +1,287 @@
+# Copyright 2015 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Log analysis shared by check_logs.py and find_stack_traces.py.
+
+The logs are read line by line, gzipped ones being decompressed as they are
+read, so that a log is never held in memory. The whitelist of a service is
+compiled into a single regex, and the logs are scanned in parallel by a
+pool of processes, each returning a summary of its log.
+"""
+
+import collections
+import hashlib
+import multiprocessing
+import re
+import zlib
+
+import six
+from six.moves.urllib import request as urllib_request
+
+CHUNK_SIZE = 64 * 1024
+
+ERROR_REGEX = re.compile(r"^.* (?P<level>ERROR|CRITICAL|TRACE) "
+                         r"(?P<module>[\w\.]*).*\[.*\-.*\]")
+
+NOVA_TIMESTAMP = r"\d\d\d\d-\d\d-\d\d \d\d:\d\d:\d\d\.\d\d\d"
+
+NOVA_REGEX = (r"(?P<timestamp>%s) (?P<pid>\d+ )?(?P<level>(ERROR|TRACE)) "
+              r"(?P<module>[\w\.]+) (?P<msg>.*)" % NOVA_TIMESTAMP)
+
+# Parts of a message changing from a trace to the other, replaced when
+# computing the signature of a stack trace
+VOLATILE_REGEX = re.compile(
+    r"[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?"
+    r"[0-9a-fA-F]{12}|req-[\w-]+|0x[0-9a-fA-F]+|\d+")
+
+# A log to scan: its service name, its path or url, the whitelist entries
+# of the service, and whether to collect its stack traces
+LogJob = collections.namedtuple('LogJob',
+                                ['name', 'source', 'whitelist', 'traces'])
+
+
+def compile_whitelist(whitelist):
+    """Returns a regex matching the lines whitelisted by any entry
+
+    :param whitelist: list of {'module': ..., 'message': ...} entries
+    :returns: the compiled regex, or None for an empty whitelist
+    """
+    if not whitelist:
+        return None
+    patterns = ["(?:%s.*%s)" % (w['module'].replace('.', '\\.'), w['message'])
+                for w in whitelist]
+    return re.compile('|'.join(patterns))
+
+
+def _gzip_lines(stream, chunk_size=CHUNK_SIZE):
+    # NOTE: GzipFile needs a seekable file on python 2, an url is not
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    pending = b''
+    received = False
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        while chunk:
+            received = True
+            data = decompressor.decompress(chunk)
+            # A new gzip member may follow the end of the previous one
+            chunk = decompressor.unused_data
+            if chunk:
+                data += decompressor.flush()
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                received = False
+            lines = (pending + data).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line
+    pending += decompressor.flush()
+    # NOTE: zlib silently returns the data of a truncated stream, eof is only
+    # available on python 3
+    if received and not getattr(decompressor, 'eof', True):
+        raise zlib.error("Truncated gzip stream")
+    if pending:
+        for line in pending.split(b'\n'):
+            yield line
+
+
+def _is_url(source):
+    return re.match(r"^https?://", source) is not None
+
+
+def read_lines(source):
+    """Yields the lines of a local or remote log, as text
+
+    The logs whose name ends with .gz, and the urls served gzipped, are
+    decompressed while read.
+    """
+    if _is_url(source):
+        req = urllib_request.Request(source)
+        req.add_header('Accept-Encoding', 'gzip')
+        stream = urllib_request.urlopen(req)
+        gzipped = (stream.info().get('Content-Encoding') == 'gzip' or
+                   source.endswith('.gz'))
+        lines = _gzip_lines(stream) if gzipped else stream
+    elif source.endswith('.gz'):
+        stream = open(source, 'rb')
+        lines = _gzip_lines(stream)
+    else:
+        stream = open(source, 'rb')
+        lines = stream
+    try:
+        for line in lines:
+            yield line.rstrip(b'\r\n').decode('utf-8', 'replace')
+    finally:
+        stream.close()
+
+
+def scan_errors(lines, whitelist_regex):
+    """Counts the error lines of a log
+
+    :returns: the number of error lines not whitelisted, the number of
+              whitelisted ones, and the number of error lines per module
+    """
+    errors = 0
+    whitelisted = 0
+    modules = collections.Counter()
+    for line in lines:
+        if line.startswith("Stderr:"):
+            continue
+        m = ERROR_REGEX.match(line)
+        if not m:
+            continue
+        if whitelist_regex is not None and whitelist_regex.search(line):
+            whitelisted += 1
+            continue
+        errors += 1
+        modules[m.group('module')] += 1
+    return errors, whitelisted, modules
+
+
+def iter_traces(lines):
+    """Yields the ERROR and TRACE messages of a log
+
+    The consecutive lines of a message, sharing their timestamp and level,
+    are joined, so that a stack trace is yielded as a single message.
+    """
+    regex = re.compile(NOVA_REGEX)
+    trace = None
+    for line in lines:
+        m = regex.match(line)
+        if not m:
+            if trace is not None:
+                yield trace
+                trace = None
+            continue
+        data = m.groupdict()
+        if (trace is not None and data['timestamp'] == trace['timestamp'] and
+                data['level'] == trace['level']):
+            trace['msg'] += data['msg'] + "\n"
+        else:
+            if trace is not None:
+                yield trace
+            trace = dict((key, data[key]) for key in
+                         ('timestamp', 'pid', 'level', 'module', 'msg'))
+    if trace is not None:
+        yield trace
+
+
+def signature(trace):
+    """Returns a digest identifying the traces of a same failure"""
+    msg = VOLATILE_REGEX.sub('#', trace['msg'])
+    key = '%s %s %s' % (trace['level'], trace['module'], msg)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _tee(lines, trace_lines):
+    # Keeps the ERROR and TRACE lines, each run of them followed by an empty
+    # line, for iter_traces to rebuild the traces without the whole log
+    regex = re.compile(NOVA_REGEX)
+    in_trace = False
+    for line in lines:
+        if regex.match(line):
+            trace_lines.append(line)
+            in_trace = True
+        elif in_trace:
+            trace_lines.append('')
+            in_trace = False
+        yield line
+
+
+def scan_log(job):
+    """Scans the log of a LogJob, in a single read
+
+    :returns: a dict summarizing the log, picklable to be returned by the
+              processes of a pool
+    """
+    result = {'name': job.name, 'source': job.source}
+    try:
+        lines = read_lines(job.source)
+        trace_lines = []
+        if job.traces:
+            lines = _tee(lines, trace_lines)
+        errors, whitelisted, modules = scan_errors(
+            lines, compile_whitelist(job.whitelist))
+    except (IOError, OSError, zlib.error) as e:
+        result['failure'] = '%s' % e
+        return result
+    result.update(errors=errors, whitelisted=whitelisted,
+                  modules=dict(modules))
+    if job.traces:
+        traces = collections.OrderedDict()
+        for trace in iter_traces(trace_lines):
+            key = signature(trace)
+            if key in traces:
+                traces[key]['count'] += 1
+            else:
+                trace['count'] = 1
+                trace['signature'] = key
+                traces[key] = trace
+        result['traces'] = list(traces.values())
+    return result
+
+
+def scan_logs(jobs, processes=None):
+    """Scans LogJobs in parallel
+
+    :param processes: number of scanning processes, the number of CPUs by
+                      default. With 1, the logs are scanned in this process.
+    :returns: the result of scan_log for each job, in the order of the jobs
+    """
+    jobs = list(jobs)
+    if processes == 1 or len(jobs) < 2:
+        return [scan_log(job) for job in jobs]
+    pool = multiprocessing.Pool(min(processes or multiprocessing.cpu_count(),
+                                    len(jobs)))
+    try:
+        return pool.map(scan_log, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def report(results):
+    """Returns the JSON-serializable report of the results of scan_logs
+
+    The counts are summed per service, and the stack traces found in
+    several logs are reported once, with the logs they were found in.
+    """
+    services = {}
+    traces = collections.OrderedDict()
+    for result in results:
+        service = services.setdefault(result['name'], {
+            'errors': 0, 'whitelisted': 0, 'modules': {}, 'failures': []})
+        if 'failure' in result:
+            service['failures'].append({'source': result['source'],
+                                        'failure': result['failure']})
+            continue
+        service['errors'] += result['errors']
+        service['whitelisted'] += result['whitelisted']
+        for module, count in six.iteritems(result['modules']):
+            service['modules'][module] = (
+                service['modules'].get(module, 0) + count)
+        for trace in result.get('traces', []):
+            entry = traces.setdefault(trace['signature'], {
+                'signature': trace['signature'],
+                'level': trace['level'],
+                'module': trace['module'],
+                'message': trace['msg'],
+                'count': 0,
+                'logs': []})
+            entry['count'] += trace['count']
+            if result['name'] not in entry['logs']:
+                entry['logs'].append(result['name'])
+    return {'services': services, 'stack_traces': list(traces.values())}